@@ -2,27 +2,32 @@
  Basic non-class-based routines specific to the application.
 """
 
+import contextlib
 import os
 import pprint
 import time
+from typing import Iterable, Iterator, List, Optional
 
 from PDL.app.pdl_config import PdlConfig
 import PDL.configuration.cli.args as args
-from PDL.configuration.cli.url_file import UrlFile
-from PDL.configuration.cli.urls import UrlArgProcessing as ArgProcessing
+from PDL.configuration.cli.url_file import UrlFile, UrlFileWriter
+from PDL.configuration.cli.urls import (
+    UrlArgProcessing as ArgProcessing, UrlSanitizer, photo_key)
 from PDL.configuration.properties.app_cfg import (
     AppCfgFileSections, AppCfgFileSectionKeys)
 from PDL.engine.images.image_info import ImageData
 from PDL.engine.images.status import DownloadStatus as Status
+from PDL.engine.inventory.bloom import UrlBloomFilter
+from PDL.engine.metrics import export as metrics_export
+from PDL.engine.metrics import memory
+from PDL.engine.metrics.pdl_metrics import PdlMetrics
 from PDL.engine.module_imports import import_module_class
+from PDL.engine.timer.tracing import span, traced
 import PDL.logger.json_log as json_logger
 from PDL.logger.logger import Logger
-from PDL.reporting.invstats import InvStats
+from PDL.reporting.aggregator import StatusAggregator
 from PDL.reporting.summary import ReportingSummary
 
-
-import pyperclip
-
 LOG = Logger()
 
 """
@@ -57,6 +62,9 @@ def read_from_buffer(read_delay: float = 0.25) -> list:
     :return: list of URLs
 
     """
+    # Only needed when reading from the buffer (imported here to keep startup fast)
+    import pyperclip
+
     last_url = None
     url_list = list()
     LOG.info("Press CTRL-C to stop buffer scanning.")
@@ -91,55 +99,75 @@ def read_from_buffer(read_delay: float = 0.25) -> list:
     return url_list
 
 
-def process_and_record_urls(cfg_obj: PdlConfig) -> list:
+def get_url_source(cfg_obj: PdlConfig) -> Iterable[str]:
     """
-    Take the generated list of URLs, and verify all URLs are correct, no duplicates
-    (in the list, or downloaded previously).  The resulting list should be written to
-    file for archival purposes.
+    Determine the source of the URLs: the CLI, a URL file (or stdin), or the OS
+    copy/paste buffer. File (and stdin) sources are read lazily.
 
-    :param cfg_obj: (PdlConfig): Contains the inventory structure.
+    :param cfg_obj: (PdlConfig): Contains the CLI args.
 
-    :return: List of valid URLs
+    :return: Iterable of raw URL entries
 
     """
-    url_file = UrlFile()
-
     # Check for URLs on the CLI
     raw_url_list = getattr(cfg_obj.cli_args, args.ArgOptions.URLS)
+    if raw_url_list:
+        return raw_url_list
 
-    # If no URLs are provided, check if URL file was specified
-    if not raw_url_list:
-        LOG.debug("URL list from CLI is empty.")
+    LOG.debug("URL list from CLI is empty.")
 
-        # Check for URL file specified on the CLI
-        url_file_name = getattr(
-            cfg_obj.cli_args, args.ArgOptions.FILE, None)
+    # Check for URL file specified on the CLI
+    url_file_name = getattr(cfg_obj.cli_args, args.ArgOptions.FILE, None)
 
-        # URL file found, so read and store file contents
-        if url_file_name is not None:
+    # URL file found, so stream the file contents
+    if url_file_name is not None:
+        if url_file_name != UrlFile.STDIN:
             url_file_name = os.path.abspath(url_file_name)
-            raw_url_list = url_file.read_file(url_file_name)
+        return UrlFile().iter_file(url_file_name)
 
-        # Otherwise was the --buffer option specified the CLI
-        elif getattr(cfg_obj.cli_args, args.ArgOptions.BUFFER, False):
-            raw_url_list = read_from_buffer()
+    # Otherwise was the --buffer option specified the CLI
+    if getattr(cfg_obj.cli_args, args.ArgOptions.BUFFER, False):
+        return read_from_buffer()
 
-        # Otherwise, no sure how to proceed... so raise an exception
-        else:
-            LOG.info(cfg_obj.cli_args)
-            LOG.debug("No URL file was specified on the CLI, nor reading from buffer.")
-            raise NoURLsProvided()
+    # Otherwise, no sure how to proceed... so raise an exception
+    LOG.info(cfg_obj.cli_args)
+    LOG.debug("No URL file was specified on the CLI, nor reading from buffer.")
+    raise NoURLsProvided()
+
+
+def process_and_record_urls(cfg_obj: PdlConfig,
+                            url_filter: Optional[UrlBloomFilter] = None,
+                            urls: Optional[Iterable[str]] = None) -> Iterator[str]:
+    """
+    Take the generated URLs, and verify all URLs are correct, no duplicates
+    (in the list, or downloaded previously).  The resulting URLs are written to
+    file for archival purposes.
+
+    The URLs are streamed from the source through the sanitation and inventory dedup
+    stages, and each accepted URL is written to the URL file and yielded as soon as it
+    is accepted: the URLs are never held in memory.
+
+    :param cfg_obj: (PdlConfig): Contains the inventory structure.
+    :param url_filter: (UrlBloomFilter): Filter of previously processed URLs (optional)
+    :param urls: Raw URL entries to process (e.g. - a submitted job). If not provided,
+        the URLs are read from the source specified on the CLI.
 
+    :return: Generator of valid URLs (the URL file is closed when it is exhausted or closed)
+
+    """
     # Determine the supported URL domains (to remove junk/unexpected URLs)
     url_domains = cfg_obj.app_cfg.get_list(
         AppCfgFileSections.PROJECT, AppCfgFileSectionKeys.URL_DOMAINS)
 
-    # Sanitize the URL list (missing spaces, duplicates, valid and accepted URLs)
-    cfg_obj.urls = ArgProcessing.process_url_list(raw_url_list, domains=url_domains)
+    # Sanitize the URLs (missing spaces, duplicates, valid and accepted URLs)
+    sanitizer = UrlSanitizer(domains=url_domains)
+    urls = sanitizer.sanitize(get_url_source(cfg_obj) if urls is None else urls)
 
     # Remove duplicates from the inventory (can be disabled via CLI)
-    if not cfg_obj.cli_args.ignore_dups:
-        cfg_obj.urls = remove_duplicate_urls_from_inv(cfg_obj)
+    inv_dups = None
+    if not getattr(cfg_obj.cli_args, args.ArgOptions.IGNORE_DUPS, False):
+        inv_dups = InventoryUrlFilter(cfg_obj, url_filter=url_filter)
+        urls = inv_dups.filter(urls)
 
     # Write the file of accepted/sanitized URLs to be processed
     url_file_dir = cfg_obj.app_cfg.get(AppCfgFileSections.LOGGING,
@@ -150,65 +178,220 @@ def process_and_record_urls(cfg_obj: PdlConfig) -> list:
         url_file_dir = f"{url_file_drive}:{url_file_dir}"
         LOG.debug(f"Updated URL File directory for drive letter: {url_file_dir}")
 
-    # If there were URLs available to DL after validation, create the URL file.
-    # TODO: Write test to verify URL file is written if there are URLs and no file if there are not URLS
-    if cfg_obj.urls:
-        url_file.write_file(urls=cfg_obj.urls, create_dir=True, location=url_file_dir)
-    else:
+    # Record each URL as it is accepted. The URL file is only created if there are URLs
+    # available to DL after validation.
+    with UrlFileWriter(location=url_file_dir, create_dir=True) as url_file:
+        for url in urls:
+            url_file.write_url(url)
+            yield url
+
+    sanitizer.log_summary()
+    if inv_dups is not None:
+        inv_dups.log_summary()
+    if not url_file.count:
         LOG.info("No URLs for DL, no URL FILE created.")
 
-    return cfg_obj.urls
 
+class InventoryUrlFilter:
+    """
+    Streaming filter that drops URLs already in the inventory. URLs are compared by
+    canonical photo key, so any alias of a photo page URL (domain alias, query string,
+    trailing slash, title) matches the inventory.
+
+    If a URL filter is provided, only the URLs that the filter has (probably) seen
+    before are checked against the inventory; URLs the filter has never seen are new
+    by definition, and the inventory page keys are only collected if needed.
+
+    """
+    def __init__(self, cfg_obj: PdlConfig,
+                 url_filter: Optional[UrlBloomFilter] = None) -> None:
+        """
+        :param cfg_obj: (PdlCfg) - Contains the inventory data structure.
+        :param url_filter: (UrlBloomFilter) - Filter of previously processed URLs (optional)
+
+        """
+        self.cfg_obj = cfg_obj
+        self.url_filter = url_filter
+        self.checked = 0
+        self.maybe_seen = 0
+        self.duplicates = 0
+        self.accepted = 0
+        self._page_keys_in_inv = None
+
+    @property
+    def page_keys_in_inv(self) -> set:
+        """
+        Set of the page URL keys in the inventory (built on first use).
+        """
+        if self._page_keys_in_inv is None:
+            self._page_keys_in_inv = {
+                photo_key(page_url) for page_url in
+                (getattr(image_obj, ImageData.PAGE_URL) for
+                 image_obj in self.cfg_obj.inventory.inventory.values()) if page_url}
+        return self._page_keys_in_inv
+
+    def filter(self, urls: Iterable[str]) -> Iterator[str]:
+        """
+        Drop the URLs that are in the inventory.
+
+        :param urls: Iterable of URLs
+
+        :return: Iterator of URLs not in the existing inventory
+
+        """
+        for url in urls:
+            self.checked += 1
+            key = photo_key(url)
+
+            # Pre-screen the URL: only URLs that may have been seen need to be checked.
+            if self.url_filter is None or key in self.url_filter:
+                self.maybe_seen += 1
+
+                if key in self.page_keys_in_inv:
+                    self.duplicates += 1
+                    LOG.info(f"Duplicate: {url}")
+                    continue
+
+                # Previously processed URLs that are not in the inventory
+                # (e.g. - previous errors) are retried.
+                if self.url_filter is not None:
+                    LOG.info(f"Previously processed, but not in inventory (retrying): {url}")
+
+            self.accepted += 1
+            yield url
+
+    def log_summary(self) -> None:
+        """
+        Log the number of duplicates and the number of URLs to be DL'd.
+
+        :return: None
+
+        """
+        if self.url_filter is not None:
+            LOG.debug(f"URL filter: {self.maybe_seen} of {self.checked} URLs "
+                      f"were previously processed.")
+        LOG.info(f"Removing URLs from existing inventory: Found {self.duplicates} duplicates.")
+        LOG.info(f"URLs for downloading: {self.accepted}")
 
-def remove_duplicate_urls_from_inv(cfg_obj: PdlConfig) -> list:
+
+def remove_duplicate_urls_from_inv(cfg_obj: PdlConfig,
+                                   url_filter: Optional[UrlBloomFilter] = None) -> list:
     """
-    Remove any provided URLs that were already in the inventory.
+    Remove any provided URLs that were already in the inventory (see InventoryUrlFilter).
 
     :param cfg_obj: (PdlCfg) - Contains the inventory data structure.
+    :param url_filter: (UrlBloomFilter) - Filter of previously processed URLs (optional)
 
     :return: List of URLs not in the existing inventory
 
     """
-    # Get list of page URLs in inventory.
-    page_urls_in_inv = [getattr(image_obj, ImageData.PAGE_URL) for
-                        image_obj in cfg_obj.inventory.inventory.values()]
+    inv_dups = InventoryUrlFilter(cfg_obj, url_filter=url_filter)
+    cfg_obj.urls = list(inv_dups.filter(cfg_obj.urls))
+    inv_dups.log_summary()
 
-    # Create a copy a list of the provided URLS
-    # Used for statistics generation, source list will be modified.
-    orig_urls = set(cfg_obj.urls.copy())
+    # Return the list of unique URLs that can be DL'd.
+    return cfg_obj.urls
 
-    # Create a list of URLs that are not found in the inventory list
-    cfg_obj.urls = [url for url in cfg_obj.urls if url not in page_urls_in_inv]
 
-    # Convert to a set so the difference can be generated (and remove any duplicates).
-    new_urls = set(cfg_obj.urls.copy())
-    duplicates = orig_urls - new_urls
+def check_url_filter(cfg_obj: PdlConfig, url_filter: UrlBloomFilter) -> bool:
+    """
+    Check if the URL filter holds all the URLs of the inventory, by comparing the digest
+    of the inventory file with the digest recorded when the filter was last synchronized.
+    Only the inventory file is read, so the check can be done before the inventory is
+    loaded (loading the inventory rewrites the file). A forced scan builds the inventory
+    from the file system and the JSON logs, so the filter is not considered in sync.
 
-    # List the number of duplicates and the number of URLs to be DL'd
-    LOG.info("Removing URLs from existing inventory: Found {dups} duplicates.".format(
-        dups=len(orig_urls)-len(new_urls)))
-    LOG.info(f"URLs for downloading: {len(new_urls)}")
+    :param cfg_obj: (PdlCfg) - Contains the inventory file name.
+    :param url_filter: (UrlBloomFilter) - Filter of previously processed URLs
 
-    # List the specific duplicate URLs
-    for dup in duplicates:
-        LOG.info(f"Duplicate: {dup}")
+    :return: True if the filter is in sync with the inventory file
 
-    # Return the list of unique URLs that can be DL'd.
-    return cfg_obj.urls
+    """
+    if getattr(cfg_obj.cli_args, args.ArgOptions.FORCE_SCAN, False):
+        return False
+    return url_filter.in_sync(url_filter.file_digest(cfg_obj.inv_pickle_file))
+
+
+def sync_url_filter(cfg_obj: PdlConfig, url_filter: UrlBloomFilter,
+                    in_sync: Optional[bool] = None) -> None:
+    """
+    Add the page and image URLs in the inventory to the URL filter, if the inventory
+    has changed since the filter was last synchronized (or the filter is new).
 
+    :param cfg_obj: (PdlCfg) - Contains the inventory data structure.
+    :param url_filter: (UrlBloomFilter) - Filter of previously processed URLs
+    :param in_sync: Result of check_url_filter(), if checked before the inventory was
+        loaded (DEFAULT: check now)
 
-def download_images(cfg_obj: PdlConfig) -> None:
+    :return: None
+
+    """
+    if in_sync is None:
+        in_sync = check_url_filter(cfg_obj=cfg_obj, url_filter=url_filter)
+    if in_sync:
+        return
+
+    inventory = cfg_obj.inventory.inventory
+
+    page_urls = (getattr(image_obj, ImageData.PAGE_URL, None) for
+                 image_obj in inventory.values())
+    image_urls = (getattr(image_obj, ImageData.IMAGE_URL, None) for
+                  image_obj in inventory.values())
+    added = (url_filter.update(photo_key(url) for url in page_urls if url) +
+             url_filter.update(image_urls))
+
+    # The inventory file is written from the (loaded) inventory, so the filter now holds
+    # all of its URLs.
+    url_filter.mark_synced(url_filter.file_digest(cfg_obj.inv_pickle_file))
+    LOG.info(f"URL filter synchronized with inventory: {added} URLs added.")
+
+
+@traced('download_images')
+@memory.measured('download_batch')
+def download_images(cfg_obj: PdlConfig, urls: Optional[Iterable[str]] = None,
+                    write_inventory: bool = True,
+                    url_filter: Optional[UrlBloomFilter] = None) -> List[ImageData]:
     """
     Download the Display pages for the URLS provided.
 
+    Every page URL (by photo key) and image URL processed is recorded in the URL filter,
+    so URLs can be pre-screened (before any network access) on subsequent runs.
+
     :param cfg_obj: (PdlConfig) - Contains the list of URLs to DL
+    :param urls: URLs to DL (DEFAULT: read the URLs from the source specified on the CLI)
+    :param write_inventory: Write the updated inventory to file (the service defers
+        the write until it is idle).
+    :param url_filter: (UrlBloomFilter) - Open URL filter, synchronized with the inventory
+        (see check_url_filter()). DEFAULT: the filter is opened, synchronized with the
+        loaded inventory, and closed when the run completes.
 
-    :return: None
+    :return: List of ImageData objects processed (including errors)
+
+    """
+    if url_filter is not None:
+        return _download_images(cfg_obj=cfg_obj, url_filter=url_filter, urls=urls,
+                                write_inventory=write_inventory)
 
+    with UrlBloomFilter(filename=cfg_obj.url_filter_file) as url_filter:
+        with span('filter_urls'):
+            sync_url_filter(cfg_obj=cfg_obj, url_filter=url_filter)
+        return _download_images(cfg_obj=cfg_obj, url_filter=url_filter, urls=urls,
+                                write_inventory=write_inventory)
+
+
+def _download_images(cfg_obj: PdlConfig, url_filter: UrlBloomFilter,
+                     urls: Optional[Iterable[str]], write_inventory: bool) -> List[ImageData]:
     """
-    # Process the urls and return the final list to download
-    url_list = process_and_record_urls(cfg_obj=cfg_obj)
+    Download the Display pages for the URLS provided (see download_images()).
+
+    :param cfg_obj: (PdlConfig) - Contains the list of URLs to DL
+    :param url_filter: (UrlBloomFilter) - Open URL filter, synchronized with the inventory
+    :param urls: URLs to DL (None: read the URLs from the source specified on the CLI)
+    :param write_inventory: Write the updated inventory to file
+
+    :return: List of ImageData objects processed (including errors)
 
+    """
     # Import the specified libraries for processing the URLs,
     # based on the user-specified config file
     # -----------------------------------------------
@@ -222,86 +405,112 @@ def download_images(cfg_obj: PdlConfig) -> None:
         cfg_obj.app_cfg.get(AppCfgFileSections.PROJECT,
                             AppCfgFileSectionKeys.IMAGE_CONTACT_PARSE))
 
-    # Log the list of URLs to DL
-    LOG.info(f"URL LIST:\n{ArgProcessing.list_urls(url_list=url_list)}")
+    # Get the sets of the URLs and the ImageData Objects
+    downloaded_image_urls = set(cfg_obj.inventory.get_list_of_image_urls())
+    downloaded_images = set(cfg_obj.inventory.get_list_of_images())
+    LOG.debug(f"Have {len(downloaded_image_urls)} URLs in inventory.")
 
-    # Get the correct image URL from each catalog Page
     cfg_obj.image_data = list()
     image_errors = list()
 
-    # For each URL specified
-    for index, page_url in enumerate(url_list):
-
-        # Create a catalog object, and parse the primary image page for
-        # the image URL and metadata.
-        catalog = catalog_class(page_url=page_url)
-        LOG.info(f"({index + 1}/{len(url_list)}) Retrieving URL: {page_url}")
-        catalog.get_image_info()
-
-        # If parsing was successful, store the ImageData object created
-        # during the parsing
-        if (catalog.image_info.image_url is not None and
-                catalog.image_info.image_url.lower().startswith(
-                    ArgProcessing.PROTOCOL.lower())):
-            cfg_obj.image_data.append(catalog.image_info)
-
-        # ERROR encountered. Store the error for reporting after
-        # all URLs have been processed.
-        else:
-            image_errors.append(catalog.image_info)
-
-    # Get a list of the URLs and the ImageData Objects
-    downloaded_image_urls = cfg_obj.inventory.get_list_of_image_urls()
-    downloaded_images = cfg_obj.inventory.get_list_of_images()
-    LOG.debug(f"Have {len(downloaded_image_urls)} URLs in inventory.")
-
-    # Download each image
-    for index, image_data in enumerate(cfg_obj.image_data):
-        LOG.info(f"{index + 1:>3}: {image_data.image_url}")
-
-        # Create a ContactPage object for storing metadata, location, and statuses.
-        contact = contact_class(image_url=image_data.image_url,
-                                dl_dir=cfg_obj.dl_dir, image_info=image_data)
-
-        # If both the URL and image name is unique, DL the image.
-        # If the image was DL'd by a different/aliased link, the name will be the same,
-        # so it will not DL the image again.
-        if (image_data.image_url not in downloaded_image_urls and
-                image_data.id not in downloaded_images):
-            contact.status = contact.download_image()
-
-        else:
-            # Gather information about the image was DL'd
-            image_metadata = None
-            match_type = None
-
-            # If the download URL is in the inventory...
-            if image_data.image_url in downloaded_image_urls:
-                image_metadata = image_data.image_url
-                match_type = "image URL"
-
-            # If the download image is in the inventory...
-            elif image_data.id in downloaded_images:
-                image_metadata = image_data.id
-                match_type = "image name"
-
-            # Report where the image existence was discovered.
-            # Set and record the status.
-            LOG.info(f"Found {match_type} that exists in metadata: {image_metadata}")
-            contact.status = Status.EXISTS
-
-        LOG.info(f'DL STATUS: {contact.status}')
+    # Aggregate the results for the reports as each image's processing completes
+    aggregator = StatusAggregator()
+
+    # The URLs are processed (retrieve the page, then DL the image) as they are accepted,
+    # so the run starts with the first URL, and the URLs are never held in memory.
+    url_stream = process_and_record_urls(cfg_obj=cfg_obj, url_filter=url_filter, urls=urls)
+
+    # Record each image's metadata as soon as its processing is complete (the log is
+    # closed, and the last record flushed, even if the run is interrupted by an exception)
+    with json_logger.JsonLinesLog(log_filespec=cfg_obj.json_logfile) as run_log, \
+            contextlib.closing(url_stream):
+        # For each URL accepted
+        for index, page_url in enumerate(url_stream, start=1):
+            with span('page', url=page_url):
+                # Create a catalog object, and parse the primary image page for
+                # the image URL and metadata.
+                catalog = catalog_class(page_url=page_url)
+                LOG.info(f"({index}) Retrieving URL: {page_url}")
+                catalog.get_image_info()
+                url_filter.add(photo_key(page_url))
+
+                # ERROR encountered. Store the error for reporting after
+                # all URLs have been processed.
+                if (catalog.image_info.image_url is None or
+                        not catalog.image_info.image_url.lower().startswith(
+                            ArgProcessing.PROTOCOL.lower())):
+                    image_errors.append(catalog.image_info)
+                    run_log.append(catalog.image_info)
+                    aggregator.add(catalog.image_info)
+                    continue
 
-    cfg_obj.inventory.update_inventory(cfg_obj.image_data)
-    cfg_obj.inventory.write()
+            # Parsing was successful: download the image described by the ImageData object
+            # created during the parsing
+            image_data = catalog.image_info
+            cfg_obj.image_data.append(image_data)
+            with span('image', url=image_data.page_url):
+                LOG.info(f"{index:>3}: {image_data.image_url}")
+
+                # Create a ContactPage object for storing metadata, location, and statuses.
+                contact = contact_class(image_url=image_data.image_url,
+                                        dl_dir=cfg_obj.dl_dir, image_info=image_data)
+
+                # If both the URL and image name is unique, DL the image.
+                # If the image was DL'd by a different/aliased link, the name will be the
+                # same, so it will not DL the image again.
+                with span('dedup'):
+                    is_new_image = (image_data.image_url not in downloaded_image_urls and
+                                    image_data.id not in downloaded_images)
+                if is_new_image:
+                    contact.status = contact.download_image()
+
+                else:
+                    # Gather information about the image was DL'd
+                    image_metadata = None
+                    match_type = None
+
+                    # If the download URL is in the inventory...
+                    if image_data.image_url in downloaded_image_urls:
+                        image_metadata = image_data.image_url
+                        match_type = "image URL"
+
+                    # If the download image is in the inventory...
+                    elif image_data.id in downloaded_images:
+                        image_metadata = image_data.id
+                        match_type = "image name"
+
+                    # Report where the image existence was discovered.
+                    # Set and record the status.
+                    LOG.info(f"Found {match_type} that exists in metadata: {image_metadata}")
+                    contact.status = Status.EXISTS
+
+                LOG.info(f'DL STATUS: {contact.status}')
+                run_log.append(image_data)
+                aggregator.add(image_data)
+                url_filter.add(image_data.image_url)
+
+    with span('inventory_update', images=len(cfg_obj.image_data)):
+        cfg_obj.inventory.update_inventory(cfg_obj.image_data)
+        if write_inventory:
+            cfg_obj.inventory.write()
+
+    # The new inventory records were added to the filter as they were processed, so once
+    # the inventory is written, the filter holds all the URLs of the inventory file.
+    if write_inventory:
+        url_filter.mark_synced(url_filter.file_digest(cfg_obj.inv_pickle_file))
 
     # Add error_info to be included in results
     cfg_obj.image_data += image_errors
+    for status, count in aggregator.counts.items():
+        PdlMetrics.IMAGES.inc(count, status=status)
 
     # Log Results
-    results = ReportingSummary(cfg_obj.image_data)
-    results.log_download_status_results_table()
-    results.log_detailed_download_results_table()
+    with memory.stage('report'):
+        results = ReportingSummary(cfg_obj.image_data, aggregator=aggregator)
+        results.log_download_status_results_table()
+        results.log_detailed_download_results_table()
+        results.log_duration_histogram_table()
+        results.write_download_results(filespec=cfg_obj.results_report_file)
 
     # Log image metadata (DEBUG)
     if cfg_obj.cli_args.debug:
@@ -309,38 +518,33 @@ def download_images(cfg_obj: PdlConfig) -> None:
             LOG.debug(image_data.image_name)
             LOG.debug(pprint.pformat(image_data.to_dict()))
 
-    # If images were downloaded, create the corresponding JSON file
-    if cfg_obj.image_data:
-        json_logger.JsonLog(
-            image_obj_list=cfg_obj.image_data,
-            log_filespec=cfg_obj.json_logfile).write_json()
-    else:
+    # The JSON Lines log is only created if images were processed
+    if not run_log.count:
         LOG.info("No images DL'd. No JSON file created.")
 
+    export_metrics(cfg_obj=cfg_obj)
+    return cfg_obj.image_data
 
-def display_statistics(cfg_obj: PdlConfig) -> None:
+
+def export_metrics(cfg_obj: PdlConfig) -> None:
     """
-    Display the inventory statistics based on the CLI arguments
+    Write the metrics: JSON (next to the log file) and the Prometheus textfile
+    (if a textfile directory is configured). A failure to write is logged, but does
+    not fail the run.
 
-    :param cfg_obj: PdlConfigObj with inventory.
+    :param cfg_obj: PdlConfigObj with the metrics file names.
 
     :return: None
 
     """
-
-    # Stats based on AUTHOR
-    if getattr(cfg_obj.cli_args, args.ArgOptions.AUTHOR, False):
-        LOG.debug("Getting inventory stats by AUTHOR")
-
-    # Stats based on DIRECTORY
-    elif getattr(cfg_obj.cli_args, args.ArgOptions.DIRECTORY, False):
-        LOG.debug("Getting inventory stats by DIRECTORY")
-
-    # SUMMARY (or no options provided for the STATS submenu)
-    else:
-        LOG.debug("Getting inventory SUMMARY stats")
-        stats = InvStats(cfg_obj.inventory)
-        ReportingSummary.log_table(table=stats.inventory_summary_table(), log_level='info')
-        data = stats.tally_directory_data("E:\\Other Backups\\System\\Media\\Music\\TC\\500px")
-        import pprint
-        pprint.pprint(data)
+    exports = [(metrics_export.write_json, cfg_obj.metrics_json_file),
+               (metrics_export.write_textfile, cfg_obj.metrics_textfile)]
+    for write_metrics, filespec in exports:
+        if filespec is None:
+            continue
+        try:
+            write_metrics(filespec)
+        except OSError as exc:
+            LOG.error(f"Unable to write the metrics to '{filespec}': {exc}")
+        else:
+            LOG.info(f"Metrics written to: {filespec}")
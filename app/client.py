@@ -0,0 +1,194 @@
+"""
+    Thin client for the PDL service (see PDL.app.service).
+
+    The client only depends on the standard library (and the URL file reader), so
+    submitting a batch of URLs does not pay for the configuration and inventory load.
+
+    Each request carries the service's access token (read from the token file written
+    by the service, see token_filename()).
+
+"""
+import argparse
+import json
+import os
+import time
+from typing import List, Optional
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+import PDL.configuration.cli.args as args
+from PDL.configuration.cli.url_file import UrlFile
+from PDL.logger.logger import Logger
+
+LOG = Logger()
+
+FINISHED = ('done', 'failed')   # PDL.app.service.JobStatus.FINISHED
+TOKEN_FILE_FORMAT = "service_{port}.token"
+
+
+def token_filename(port: int, token_dir: str = args.ServiceDefaults.TOKEN_DIR) -> str:
+    """
+    :param port: Port the service is listening on
+    :param token_dir: Directory of the token files
+
+    :return: Absolute path of the service's token file
+
+    """
+    return os.path.abspath(os.path.join(os.path.expanduser(token_dir),
+                                        TOKEN_FILE_FORMAT.format(port=port)))
+
+
+class ServiceRequestError(Exception):
+    """
+    Raised when the service is unreachable, or rejected the request.
+    """
+    def __init__(self, reason: str) -> None:
+        self.message = f"PDL service request failed: {reason}"
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class PdlClient:
+    """
+    Submit jobs to (and query) the PDL service.
+    """
+    TIMEOUT = 10
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, host: str = args.ServiceDefaults.HOST,
+                 port: int = args.ServiceDefaults.PORT, token: Optional[str] = None,
+                 token_dir: str = args.ServiceDefaults.TOKEN_DIR) -> None:
+        """
+        :param host: Service host
+        :param port: Service port
+        :param token: Service access token (DEFAULT: read from the service's token file)
+        :param token_dir: Directory of the service token files
+
+        """
+        self.base_url = f"http://{host}:{port}"
+        self.token = token
+        self.token_file = token_filename(port=port, token_dir=token_dir)
+
+    def _get_token(self) -> str:
+        """
+        :return: Service access token (read from the token file on first use)
+        """
+        if self.token is None:
+            try:
+                with open(self.token_file) as token_file:
+                    self.token = token_file.read().strip()
+            except OSError as exc:
+                raise ServiceRequestError(f"Unable to read the service token: {exc} "
+                                          f"(is 'pdl serve' running?)")
+        return self.token
+
+    def submit(self, urls: List[str]) -> dict:
+        """
+        Submit a job.
+
+        :param urls: List of URLs to download
+
+        :return: Job (dictionary)
+
+        """
+        return self._request('/jobs', data={'urls': urls})
+
+    def get_job(self, job_id: int) -> dict:
+        """
+        :param job_id: Job id
+
+        :return: Job (dictionary)
+
+        """
+        return self._request(f'/jobs/{job_id}')
+
+    def status(self) -> dict:
+        """
+        :return: Service status (dictionary)
+        """
+        return self._request('/status')
+
+    def shutdown(self) -> dict:
+        """
+        Request the service to stop (queued jobs are completed first).
+
+        :return: Service status (dictionary)
+
+        """
+        return self._request('/shutdown', data={})
+
+    def wait(self, job_id: int, poll_interval: float = POLL_INTERVAL) -> dict:
+        """
+        Wait for a job to complete.
+
+        :param job_id: Job id
+        :param poll_interval: Time (seconds) between job status queries
+
+        :return: Job (dictionary)
+
+        """
+        job = self.get_job(job_id)
+        while job['status'] not in FINISHED:
+            time.sleep(poll_interval)
+            job = self.get_job(job_id)
+        return job
+
+    def _request(self, path: str, data: Optional[dict] = None) -> dict:
+        """
+        Send a request (POST if data is provided, otherwise GET).
+
+        :param path: Resource path
+        :param data: JSON request body
+
+        :return: JSON response body (dictionary)
+
+        """
+        body = None if data is None else json.dumps(data).encode('utf-8')
+        request = Request(f"{self.base_url}{path}", data=body,
+                          headers={'Content-Type': 'application/json',
+                                   args.ServiceDefaults.TOKEN_HEADER: self._get_token()})
+        try:
+            with urlopen(request, timeout=self.TIMEOUT) as response:
+                return json.loads(response.read())
+        except HTTPError as exc:
+            try:
+                reason = json.loads(exc.read()).get('error', exc.reason)
+            except ValueError:
+                reason = exc.reason
+            raise ServiceRequestError(f"{exc.code}: {reason}")
+        except URLError as exc:
+            raise ServiceRequestError(f"{self.base_url}: {exc.reason} (is 'pdl serve' running?)")
+
+
+def submit_urls(cli_args: argparse.Namespace) -> Optional[dict]:
+    """
+    Submit the URLs from the CLI (or URL file/stdin) to the service.
+
+    :param cli_args: Parsed CLI args (submit)
+
+    :return: Job (dictionary), or None if there were no URLs to submit.
+
+    """
+    urls = getattr(cli_args, args.ArgOptions.URLS, None)
+    url_file_name = getattr(cli_args, args.ArgOptions.FILE, None)
+    if not urls and url_file_name is not None:
+        urls = list(UrlFile().iter_file(url_file_name))
+
+    if not urls:
+        LOG.error("No URLs to submit (specify URLs on the CLI, or a URL file).")
+        return None
+
+    client = PdlClient(host=getattr(cli_args, args.ArgOptions.HOST),
+                       port=getattr(cli_args, args.ArgOptions.PORT))
+    job = client.submit(urls)
+    LOG.info(f"Submitted job {job['job_id']} ({job['urls']} URLs) to {client.base_url}")
+
+    if getattr(cli_args, args.ArgOptions.WAIT, False):
+        job = client.wait(job['job_id'])
+        LOG.info(f"Job {job['job_id']}: {job['status']} in "
+                 f"{job['finished'] - job['started']:0.3f}s: {job['results']}")
+        if job['error']:
+            LOG.error(f"Job {job['job_id']}: {job['error']}")
+
+    return job
@@ -12,18 +12,23 @@
 
 """
 
+import argparse
 from collections import OrderedDict
 import configparser
+import datetime
 import os
+import shutil
+from typing import Optional
 
 import PDL.configuration.cli.args as args
 from PDL.configuration.properties.app_cfg import (
     AppConfig, AppCfgFileSections, AppCfgFileSectionKeys,
     ProjectCfgFileSectionKeys, ProjectCfgFileSections)
-from PDL.logger.json_log import JsonLog
+from PDL.logger.json_log import JsonLinesLog
 from PDL.logger.logger import Logger
 import PDL.logger.utils as utils
 from PDL.reporting.summary import ReportingSummary
+from PDL.reporting.writers import ReportFormats, UnsupportedReportFormat
 
 
 import prettytable
@@ -31,6 +36,14 @@ import prettytable
 DEFAULT_ENGINE_CONFIG = 'pdl.cfg'  # Default Engine config file name
 DEFAULT_APP_CONFIG = None          # Default app config file name
 PICKLE_EXT = ".dat"                # Default extension for pickled (binary) data files
+HASH_CACHE_SUFFIX = "_hashes.cache"  # Suffix for the file content hash cache (duplicates)
+LEGACY_HASH_CACHE_SUFFIX = "_hashes.json"  # Former suffix (stored with the JSON inventory files)
+URL_FILTER_SUFFIX = "_urls.bloom"   # Suffix for the filter of processed URLs
+METRICS_JSON_SUFFIX = "_metrics.json"  # Suffix (replaces the log extension) for the run's metrics
+METRICS_TEXTFILE_EXT = ".prom"         # Extension of the Prometheus textfile (node_exporter)
+PROFILE_SUFFIX = "_profile"            # Suffix (replaces the log extension) for --profile output
+RESULTS_REPORT_SUFFIX = "_dl_results"  # Suffix (replaces the log extension) for the DL results report
+INVENTORY_REPORT_SUFFIX = "_inventory"  # Suffix (replaces the log extension) for the inventory report
 
 
 LOG = Logger()
@@ -43,12 +56,16 @@ class PdlConfig:
     file (e.g. - file paths)
 
     """
-    def __init__(self) -> None:
+    def __init__(self, cli_args: Optional[argparse.Namespace] = None) -> None:
+        """
+        :param cli_args: Parsed CLI args (DEFAULT: parse the CLI)
+
+        """
         self.image_data = None
         self.inventory = None
         self.urls = None
 
-        self.cli_args = args.CLIArgs().args
+        self.cli_args = cli_args if cli_args is not None else args.CLIArgs().args
         self.app_cfg = AppConfig(self.cli_args.cfg or DEFAULT_APP_CONFIG)
         self.engine_cfg = AppConfig(self.cli_args.engine or DEFAULT_ENGINE_CONFIG)
 
@@ -59,6 +76,15 @@ class PdlConfig:
         self.json_logfile = self._build_json_logfile_name()
         self.inv_pickle_file = self._build_pickle_filename()
         self.temp_storage_path = self._build_temp_storage()
+        self.hash_cache_file = self._build_hash_cache_filename()
+        self.url_filter_file = self._build_url_filter_filename()
+        self.metrics_json_file = self._build_metrics_json_filename()
+        self.metrics_textfile = self._build_metrics_textfile_name()
+        self.report_format = self._get_report_format()
+        self.results_report_file = self._build_report_filename(RESULTS_REPORT_SUFFIX)
+        self.inventory_report_file = self._build_report_filename(INVENTORY_REPORT_SUFFIX)
+        self.profile_file = build_profile_filename(
+            command=self.cli_args.command, logfile_name=self.logfile_name)
 
         self._display_file_locations()
 
@@ -115,7 +141,7 @@ class PdlConfig:
 
     def _build_json_logfile_name(self) -> str:
         """
-        Builds the JSON inventory log file name.
+        Builds the JSON Lines inventory log file name.
 
         :return: (str) Absolute path to the JSON inventory file name.
 
@@ -134,7 +160,7 @@ class PdlConfig:
                 timestamp = timestamp.replace(update, '')
 
         # Build the file name
-        filename = f"{timestamp}.{JsonLog.EXTENSION}"
+        filename = f"{timestamp}.{JsonLinesLog.EXTENSION}"
 
         # Build the full file spec
         filename = os.path.abspath(os.path.sep.join([self.json_log_location, filename]))
@@ -156,6 +182,103 @@ class PdlConfig:
         utils.check_if_location_exists(location=pickle_location, create_dir=True)
         return pickle_filename
 
+    def _build_hash_cache_filename(self) -> str:
+        """
+        Builds the file name of the content hash cache (used for finding duplicates).
+        The cache is kept in the temp (local) storage: any *.json file in the JSON log
+        location is read as inventory. A cache left there by a previous version is moved.
+
+        :return: (str) Absolute path to the hash cache file.
+
+        """
+        project = self.engine_cfg.get(ProjectCfgFileSections.PYTHON_PROJECT,
+                                      ProjectCfgFileSectionKeys.NAME).upper()
+        cache_filename = os.path.abspath(os.path.sep.join(
+            [self.temp_storage_path, f"{project}{HASH_CACHE_SUFFIX}"]))
+
+        legacy_filename = os.path.abspath(os.path.sep.join(
+            [self.json_log_location, f"{project}{LEGACY_HASH_CACHE_SUFFIX}"]))
+        if os.path.exists(legacy_filename):
+            LOG.info(f"Moving the hash cache out of the JSON inventory location: "
+                     f"{legacy_filename} --> {cache_filename}")
+            try:
+                shutil.move(legacy_filename, cache_filename)
+            except OSError as exc:
+                # It is only a cache (the hashes are recalculated): do not leave it behind
+                LOG.warn(f"Unable to move the hash cache ({exc}): removing it.")
+                try:
+                    os.remove(legacy_filename)
+                except OSError as exc:
+                    LOG.error(f"Unable to remove the hash cache ({legacy_filename}): {exc}")
+        return cache_filename
+
+    def _build_url_filter_filename(self) -> str:
+        """
+        Builds the file name of the (Bloom) filter of processed URLs.
+
+        :return: (str) Absolute path to the URL filter file.
+
+        """
+        filter_filename = "{0}{1}".format(
+            self.engine_cfg.get(ProjectCfgFileSections.PYTHON_PROJECT,
+                                ProjectCfgFileSectionKeys.NAME).upper(), URL_FILTER_SUFFIX)
+        return os.path.abspath(os.path.sep.join([self.json_log_location, filter_filename]))
+
+    def _build_metrics_json_filename(self) -> str:
+        """
+        Builds the file name of the run's metrics (JSON), next to the log file.
+
+        :return: (str) Absolute path to the metrics file.
+
+        """
+        return f"{os.path.splitext(self.logfile_name)[0]}{METRICS_JSON_SUFFIX}"
+
+    def _build_metrics_textfile_name(self) -> Optional[str]:
+        """
+        Builds the file name of the Prometheus textfile (if a textfile collector
+        directory is configured), and creates the directory if necessary.
+
+        :return: (str) Absolute path to the textfile, or None if not configured.
+
+        """
+        textfile_dir = self.app_cfg.get(
+            AppCfgFileSections.LOGGING, AppCfgFileSectionKeys.METRICS_TEXTFILE_DIR,
+            fallback=None)
+        if textfile_dir in [None, '']:
+            return None
+
+        textfile_dir = os.path.abspath(textfile_dir)
+        utils.check_if_location_exists(location=textfile_dir, create_dir=True)
+        textfile_name = "{0}{1}".format(
+            self.engine_cfg.get(ProjectCfgFileSections.PYTHON_PROJECT,
+                                ProjectCfgFileSectionKeys.NAME).lower(), METRICS_TEXTFILE_EXT)
+        return os.path.abspath(os.path.sep.join([textfile_dir, textfile_name]))
+
+    def _get_report_format(self) -> str:
+        """
+        Gets the format of the report files (CSV, TSV or JSONL).
+
+        :return: (str) Report format (DEFAULT: CSV)
+
+        """
+        report_format = self.app_cfg.get(
+            AppCfgFileSections.LOGGING, AppCfgFileSectionKeys.REPORT_FORMAT,
+            fallback=ReportFormats.DEFAULT) or ReportFormats.DEFAULT
+        if report_format.lower() not in ReportFormats.FORMATS:
+            raise UnsupportedReportFormat(report_format)
+        return report_format.lower()
+
+    def _build_report_filename(self, suffix: str) -> str:
+        """
+        Builds the file name of a report, next to the log file.
+
+        :param suffix: Report suffix (replaces the log extension)
+
+        :return: (str) Absolute path to the report file.
+
+        """
+        return f"{os.path.splitext(self.logfile_name)[0]}{suffix}.{self.report_format}"
+
     def _build_temp_storage(self) -> str:
         """
         Builds the temp (local) file storage directory.
@@ -198,6 +321,11 @@ class PdlConfig:
             ('DL Log File', self.logfile_name),
             ('JSON Data File', self.json_logfile),
             ('Binary Inv File', self.inv_pickle_file),
+            ('Hash Cache File', self.hash_cache_file),
+            ('URL Filter File', self.url_filter_file),
+            ('Metrics File', self.metrics_json_file),
+            ('Metrics Textfile', self.metrics_textfile or 'Not configured'),
+            ('DL Results Report', self.results_report_file),
             ('Temp Storage', self.temp_storage_path)])
 
         # Populate the table
@@ -208,6 +336,23 @@ class PdlConfig:
         ReportingSummary.log_table(table.get_string(title="FILE INFORMATION"))
 
 
+def build_profile_filename(command: str, logfile_name: Optional[str] = None) -> str:
+    """
+    Builds the file name (without extension) of the subcommand's profile (--profile):
+    next to the log file, or in the current directory if there is no log file.
+
+    :param command: Subcommand being profiled
+    :param logfile_name: Log file of the run (None = no log file)
+
+    :return: (str) Absolute path to the profile files, without the extension.
+
+    """
+    if logfile_name is None:
+        timestamp = datetime.datetime.now().strftime(utils.TIMESTAMP)
+        return os.path.abspath(f"pdl_{timestamp}_{command}{PROFILE_SUFFIX}")
+    return f"{os.path.splitext(logfile_name)[0]}_{command}{PROFILE_SUFFIX}"
+
+
 class AppLogging:
     """
 
@@ -274,13 +419,21 @@ class AppLogging:
             os.path.sep.join(app_cfg_obj.logfile_name.split(os.path.sep)[0:-1]))
         utils.check_if_location_exists(location=log_dir, create_dir=True)
 
-        # Setup the root logger for the app
+        # Setup the root logger for the app (log records are written by a background
+        # thread, via a bounded queue: see Logger)
         logger = Logger(filename=app_cfg_obj.logfile_name,
                         default_level=Logger.STR_TO_VAL[log_level],
                         project=app_cfg_obj.app_cfg.get(
                             AppCfgFileSections.PROJECT,
                             AppCfgFileSectionKeys.NAME),
-                        set_root=True)
+                        set_root=True,
+                        queue_size=app_cfg_obj.app_cfg.getint(
+                            AppCfgFileSections.LOGGING, AppCfgFileSectionKeys.LOG_QUEUE_SIZE,
+                            fallback=Logger.QUEUE_SIZE),
+                        queue_overflow=app_cfg_obj.app_cfg.get(
+                            AppCfgFileSections.LOGGING,
+                            AppCfgFileSectionKeys.LOG_QUEUE_OVERFLOW,
+                            fallback=Logger.QUEUE_OVERFLOW))
 
         # Show defined loggers and log levels
         logger.debug(f"Log File: {app_cfg_obj.logfile_name}")
@@ -0,0 +1,461 @@
+"""
+    PDL as a long-running service.
+
+    The startup cost (configuration, inventory load and merge, URL filter sync) is paid
+    once. URL batches ("jobs") are submitted over HTTP on a local interface (see
+    PDL.app.client), and downloaded by a single worker, in submission order, against the
+    in-memory inventory and the shared HTTP session (warm connection pools).
+
+    The inventory file is written when the job queue is empty (and at shutdown), rather
+    than after every job; each image record is still written to the JSON Lines log as
+    soon as it is processed.
+
+    API (JSON request and response bodies):
+        POST /jobs              {"urls": [<url>, ...]}  -> 202: job
+        GET  /jobs/<job_id>                             -> 200: job
+        GET  /status                                    -> 200: service status
+        POST /shutdown                                  -> 202: service status
+
+    Listening on a local interface does not stop other local software (e.g. - a web page
+    in a browser) from sending requests, so:
+      * Every request must carry the service's access token (ServiceDefaults.TOKEN_HEADER).
+        The token is generated when the service starts, and written to a file only the
+        user can read (see PDL.app.client.token_filename); otherwise 401.
+      * POST requests must be 'Content-Type: application/json' (browsers can not send
+        that cross-origin without a CORS preflight, which is not supported); otherwise 415.
+
+"""
+import hmac
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import itertools
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from typing import Dict, List, Optional
+
+import PDL.app.app as app
+from PDL.app.client import token_filename
+from PDL.app.pdl_config import PdlConfig
+from PDL.configuration.cli.args import ServiceDefaults
+from PDL.engine.download import http_session
+from PDL.engine.images.image_info import ImageData
+from PDL.engine.metrics.pdl_metrics import PdlMetrics
+from PDL.logger.logger import Logger
+
+LOG = Logger()
+
+
+class ServiceError(Exception):
+    """
+    Raised when the service can not be started, or a request to the service failed.
+    """
+    def __init__(self, reason: str) -> None:
+        self.message = f"PDL service error: {reason}"
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class JobStatus:
+    """
+    Lifecycle of a submitted job
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    FINISHED = (DONE, FAILED)
+
+
+class Job:
+    """
+    A batch of URLs submitted to the service.
+    """
+    def __init__(self, job_id: int, urls: List[str]) -> None:
+        """
+        :param job_id: Unique (per service run) job id
+        :param urls: Raw URL entries to download
+
+        """
+        self.job_id = job_id
+        self.urls = urls
+        self.status = JobStatus.QUEUED
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.results = dict()
+        self.error = None
+
+    def to_dict(self) -> dict:
+        """
+        Job summary (API representation)
+
+        :return: dictionary
+
+        """
+        return {'job_id': self.job_id,
+                'status': self.status,
+                'urls': len(self.urls),
+                'submitted': self.submitted,
+                'started': self.started,
+                'finished': self.finished,
+                'results': self.results,
+                'error': self.error}
+
+
+class PdlService:
+    """
+    Accepts jobs over HTTP (local interfaces only), and processes them with a single
+    worker thread (the inventory and URL filter are not thread-safe).
+
+    """
+    LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1')
+    MAX_FINISHED_JOBS = 1000
+
+    def __init__(self, cfg_obj: PdlConfig, host: str = ServiceDefaults.HOST,
+                 port: int = ServiceDefaults.PORT,
+                 token_dir: str = ServiceDefaults.TOKEN_DIR) -> None:
+        """
+        :param cfg_obj: (PdlConfig) - Configuration, with the inventory loaded
+        :param host: Interface to listen on (must be a local interface)
+        :param port: Port to listen on (0 = any available port)
+        :param token_dir: Directory for the access token file
+
+        """
+        if host not in self.LOCAL_HOSTS:
+            raise ServiceError(f"Host '{host}' is not a local interface "
+                               f"({', '.join(self.LOCAL_HOSTS)})")
+
+        self.cfg_obj = cfg_obj
+        self.jobs: Dict[int, Job] = dict()
+        self.started = time.time()
+        self.inventory_dirty = False
+
+        self._job_ids = itertools.count(1)
+        self._jobs_lock = threading.Lock()
+        self._queue = queue.Queue()
+        PdlMetrics.JOBS_QUEUED.set_function(self._queue.qsize)
+        self._worker = threading.Thread(target=self._process_jobs, name='pdl-worker',
+                                        daemon=True)
+
+        try:
+            self.server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+        except OSError as exc:
+            raise ServiceError(f"Unable to listen on {host}:{port}: {exc}")
+        self.server.daemon_threads = True
+        self.server.service = self
+
+        self.token = secrets.token_urlsafe(32)
+        self.token_file = token_filename(port=self.server.server_address[1],
+                                         token_dir=token_dir)
+        try:
+            self._write_token()
+        except OSError as exc:
+            self.server.server_close()
+            raise ServiceError(f"Unable to write the token file '{self.token_file}': {exc}")
+
+    def _write_token(self) -> None:
+        """
+        Write the access token to a new file, readable by the user only.
+
+        :return: None
+
+        """
+        os.makedirs(os.path.dirname(self.token_file), mode=0o700, exist_ok=True)
+        if os.path.exists(self.token_file):
+            os.remove(self.token_file)
+        token_fd = os.open(self.token_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(token_fd, "w") as token_file:
+            token_file.write(self.token)
+
+    def authorized(self, token: Optional[str]) -> bool:
+        """
+        :param token: Token sent with the request
+
+        :return: (bool) True if the token is the service's access token
+
+        """
+        return token is not None and hmac.compare_digest(token, self.token)
+
+    @property
+    def address(self) -> str:
+        """
+        Address the service is listening on (host:port)
+        """
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    def submit(self, urls: List[str]) -> Job:
+        """
+        Queue a job.
+
+        :param urls: Raw URL entries to download (sanitized by the worker)
+
+        :return: Job
+
+        """
+        with self._jobs_lock:
+            job = Job(job_id=next(self._job_ids), urls=urls)
+            self.jobs[job.job_id] = job
+            self._prune_jobs()
+
+        self._queue.put(job)
+        LOG.info(f"Job {job.job_id}: queued ({len(urls)} URLs, "
+                 f"{self._queue.qsize()} jobs in queue).")
+        return job
+
+    def get_job(self, job_id: int) -> Optional[Job]:
+        """
+        Get a job by id.
+
+        :param job_id: Job id
+
+        :return: Job (None if unknown or pruned)
+
+        """
+        with self._jobs_lock:
+            return self.jobs.get(job_id)
+
+    def status(self) -> dict:
+        """
+        Service status (API representation)
+
+        :return: dictionary
+
+        """
+        with self._jobs_lock:
+            jobs = dict()
+            for job in self.jobs.values():
+                jobs[job.status] = jobs.get(job.status, 0) + 1
+
+        return {'address': self.address,
+                'uptime': time.time() - self.started,
+                'queued': self._queue.qsize(),
+                'jobs': jobs,
+                'inventory': len(self.cfg_obj.inventory.inventory)}
+
+    def serve_forever(self) -> None:
+        """
+        Process requests until shutdown (via the API or CTRL-C). Queued jobs are
+        completed before returning.
+
+        :return: None
+
+        """
+        self._worker.start()
+        LOG.info(f"PDL service listening on {self.address}. Press CTRL-C to stop.")
+        LOG.info(f"Access token file: {self.token_file}")
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            LOG.info("CTRL-C detected.")
+        finally:
+            self.stop()
+
+    def shutdown(self) -> None:
+        """
+        Request the service to stop (non-blocking, safe to call from a request handler).
+
+        :return: None
+
+        """
+        LOG.info("Shutdown requested.")
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    def stop(self) -> None:
+        """
+        Complete the queued jobs, write the inventory (if changed) and release the
+        listening socket and HTTP connections.
+
+        :return: None
+
+        """
+        if self._worker.is_alive():
+            LOG.info(f"Completing {self._queue.qsize()} queued jobs before stopping.")
+            self._queue.put(None)
+            self._worker.join()
+
+        self.server.server_close()
+        if os.path.exists(self.token_file):
+            os.remove(self.token_file)
+        self._write_inventory()
+        http_session.close_session()
+        PdlMetrics.JOBS_QUEUED.set_function(None)
+        LOG.info("PDL service stopped.")
+
+    def _process_jobs(self) -> None:
+        """
+        Worker: process the jobs in submission order, until the stop sentinel (None).
+
+        :return: None
+
+        """
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+
+            self._run_job(job)
+
+            # Write the inventory once the burst of jobs is complete.
+            if self._queue.empty():
+                self._write_inventory()
+
+    def _run_job(self, job: Job) -> None:
+        """
+        Download the job's URLs, and record the results in the job.
+
+        :param job: Job to process
+
+        :return: None
+
+        """
+        job.status = JobStatus.RUNNING
+        job.started = time.time()
+        LOG.info(f"Job {job.job_id}: started.")
+
+        try:
+            image_data = app.download_images(cfg_obj=self.cfg_obj, urls=job.urls,
+                                             write_inventory=False)
+        except Exception as exc:
+            job.error = f"{exc.__class__.__name__}: {exc}"
+            job.status = JobStatus.FAILED
+            LOG.error(f"Job {job.job_id}: failed: {job.error}")
+        else:
+            job.results = self._tally(image_data)
+            job.status = JobStatus.DONE
+        finally:
+            self.inventory_dirty = True
+            job.finished = time.time()
+
+        LOG.info(f"Job {job.job_id}: {job.status} in {job.finished - job.started:0.3f}s "
+                 f"{job.results}")
+
+    @staticmethod
+    def _tally(image_data: List[ImageData]) -> Dict[str, int]:
+        """
+        Count the download status of each image.
+
+        :param image_data: List of ImageData objects
+
+        :return: dictionary (k: status, v: count)
+
+        """
+        results = dict()
+        for image_obj in image_data or list():
+            results[image_obj.dl_status] = results.get(image_obj.dl_status, 0) + 1
+        return results
+
+    def _write_inventory(self) -> None:
+        if self.inventory_dirty:
+            self.cfg_obj.inventory.write()
+            self.inventory_dirty = False
+
+    def _prune_jobs(self) -> None:
+        """
+        Forget the oldest finished jobs, so a long-running service has bounded memory.
+        (Caller holds the jobs lock.)
+
+        :return: None
+
+        """
+        finished = [job_id for job_id, job in self.jobs.items()
+                    if job.status in JobStatus.FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes the API requests to the PdlService (self.server.service).
+    """
+    server_version = 'PDL'
+    JOBS = '/jobs'
+    STATUS = '/status'
+    SHUTDOWN = '/shutdown'
+    JSON_CONTENT_TYPE = 'application/json'
+
+    def _authorized(self) -> bool:
+        """
+        Check the request's access token (sends 401 if it is missing or invalid).
+
+        :return: (bool) True if the request can be processed
+
+        """
+        if self.server.service.authorized(self.headers.get(ServiceDefaults.TOKEN_HEADER)):
+            return True
+        self._send_error(HTTPStatus.UNAUTHORIZED,
+                         f"Missing or invalid '{ServiceDefaults.TOKEN_HEADER}' header.")
+        return False
+
+    def do_GET(self) -> None:
+        service = self.server.service
+        if not self._authorized():
+            return
+
+        if self.path == self.STATUS:
+            self._send_json(HTTPStatus.OK, service.status())
+
+        elif self.path.startswith(f"{self.JOBS}/"):
+            job_id = self.path[len(self.JOBS) + 1:]
+            job = service.get_job(int(job_id)) if job_id.isdigit() else None
+            if job is None:
+                self._send_error(HTTPStatus.NOT_FOUND, f"Unknown job: '{job_id}'")
+            else:
+                self._send_json(HTTPStatus.OK, job.to_dict())
+
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown resource: '{self.path}'")
+
+    def do_POST(self) -> None:
+        service = self.server.service
+
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type != self.JSON_CONTENT_TYPE:
+            self._send_error(HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                             f"Content-Type must be '{self.JSON_CONTENT_TYPE}'.")
+            return
+        if not self._authorized():
+            return
+
+        if self.path == self.JOBS:
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                urls = json.loads(self.rfile.read(length) or b'{}').get('urls')
+            except (ValueError, AttributeError) as exc:
+                self._send_error(HTTPStatus.BAD_REQUEST, f"Invalid JSON request: {exc}")
+                return
+
+            if (not isinstance(urls, list) or not urls or
+                    not all(isinstance(url, str) for url in urls)):
+                self._send_error(HTTPStatus.BAD_REQUEST,
+                                 "Request must contain 'urls': a list of URL strings.")
+                return
+
+            self._send_json(HTTPStatus.ACCEPTED, service.submit(urls).to_dict())
+
+        elif self.path == self.SHUTDOWN:
+            self._send_json(HTTPStatus.ACCEPTED, service.status())
+            service.shutdown()
+
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown resource: '{self.path}'")
+
+    def log_message(self, format: str, *args) -> None:
+        LOG.debug(f"{self.address_string()} - {format % args}")
+
+    def _send_json(self, status: HTTPStatus, data: dict) -> None:
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: HTTPStatus, reason: str) -> None:
+        self._send_json(status, {'error': reason})
@@ -0,0 +1,44 @@
+"""
+ Inventory statistics (stats subcommand).
+
+ Kept apart from the download routines (PDL.app.app), so the stats subcommand does not
+ import the download pipeline (HTTP session, metrics, URL filter, tracing).
+"""
+
+from PDL.app.pdl_config import PdlConfig
+import PDL.configuration.cli.args as args
+from PDL.engine.metrics import memory
+from PDL.logger.logger import Logger
+from PDL.reporting.summary import ReportingSummary
+
+LOG = Logger()
+
+
+def display_statistics(cfg_obj: PdlConfig) -> None:
+    """
+    Display the inventory statistics based on the CLI arguments
+
+    :param cfg_obj: PdlConfigObj with inventory.
+
+    :return: None
+
+    """
+
+    # Stats based on AUTHOR
+    if getattr(cfg_obj.cli_args, args.ArgOptions.AUTHOR, False):
+        LOG.debug("Getting inventory stats by AUTHOR")
+
+    # Stats based on DIRECTORY
+    elif getattr(cfg_obj.cli_args, args.ArgOptions.DIRECTORY, False):
+        LOG.debug("Getting inventory stats by DIRECTORY")
+
+    # SUMMARY (or no options provided for the STATS submenu)
+    else:
+        LOG.debug("Getting inventory SUMMARY stats")
+        from PDL.reporting.invstats import InvStats
+        with memory.stage('report'):
+            stats = InvStats(cfg_obj.inventory)
+            ReportingSummary.log_table(table=stats.inventory_summary_table(), log_level='info')
+        data = stats.tally_directory_data("E:\\Other Backups\\System\\Media\\Music\\TC\\500px")
+        import pprint
+        pprint.pprint(data)
@@ -0,0 +1,5 @@
+"""
+    Benchmarks for measuring PDL performance (run as modules, e.g.
+    `python -m PDL.benchmarks.inventory_format`).
+
+"""
@@ -0,0 +1,298 @@
+"""
+    PURPOSE: Measure the end-to-end download throughput of download_images()
+    ===========================================================================================
+        * Start a local stand-in 500px server (see benchmarks/px_server.py): synthetic display
+          pages and images, with configurable latency, bandwidth, sizes and error mix.
+        * Route the site's hosts to the stand-in server (shared HTTP session).
+        * Run download_images() for N synthetic photo URLs, in a temporary workspace (copy
+          of the application config, with the storage and logging directories replaced),
+          so the real inventory is not read or modified.
+        * Report images/sec, MB/s and the per-image latency percentiles (p50/p95/p99).
+
+    Usage: pdl.py -c <app.cfg> [-e <engine.cfg>] bench download [--images N] [--image_kb KB]
+                  [--latency_ms MS] [--bandwidth_mbps MBPS] [--image_errors 0.05] [--keep] ...
+"""
+
+import argparse
+import configparser
+import math
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import prettytable
+
+from PDL.app.pdl_config import AppLogging, PdlConfig
+import PDL.configuration.cli.args as args
+from PDL.configuration.properties.app_cfg import AppCfgFileSections, AppCfgFileSectionKeys
+from PDL.benchmarks.px_server import ServerProfile, SiteHosts, StandInPxServer, route_to_server
+from PDL.engine.download import http_session
+from PDL.engine.images.status import DownloadStatus
+from PDL.engine.metrics.pdl_metrics import MetricLabels, PdlMetrics
+from PDL.engine.module_imports import import_module_class
+from PDL.logger.logger import Logger
+from PDL.reporting.summary import ReportingSummary
+
+LOG = Logger()
+
+MEGABYTE = 1024 * 1024
+MILLISECONDS = 1000
+PERCENTILES = (50, 95, 99)
+FIRST_PHOTO_ID = 100000000
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    :param values: Values (any order)
+    :param pct: Percentile (0-100)
+
+    :return: Value at the percentile (0.0 if there are no values)
+
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def build_workspace(cli_args: argparse.Namespace) -> str:
+    """
+    Create a temporary workspace, and a copy of the application config that stores
+    everything (downloads, logs, inventory, metrics) in the workspace.
+
+    :param cli_args: Parsed CLI args (cfg = application config)
+
+    :return: Workspace directory (the config is <workspace>/bench.cfg)
+
+    """
+    workspace = tempfile.mkdtemp(prefix='pdl_bench_')
+    app_cfg = configparser.ConfigParser()
+    app_cfg.read(cli_args.cfg)
+
+    overrides = {
+        AppCfgFileSections.STORAGE: {
+            AppCfgFileSectionKeys.LOCAL_DRIVE_LETTER: '',
+            AppCfgFileSectionKeys.LOCAL_DIR: os.path.join(workspace, 'images'),
+            AppCfgFileSectionKeys.TEMP_STORAGE_DRIVE: '',
+            AppCfgFileSectionKeys.TEMP_STORAGE_PATH: os.path.join(workspace, 'temp')},
+        AppCfgFileSections.LOGGING: {
+            AppCfgFileSectionKeys.LOG_DRIVE_LETTER: '',
+            AppCfgFileSectionKeys.LOG_DIRECTORY: os.path.join(workspace, 'logs'),
+            AppCfgFileSectionKeys.URL_FILE_DIR: os.path.join(workspace, 'urls'),
+            AppCfgFileSectionKeys.JSON_FILE_DIR: os.path.join(workspace, 'data'),
+            AppCfgFileSectionKeys.METRICS_TEXTFILE_DIR: ''},
+        AppCfgFileSections.PROJECT: {
+            AppCfgFileSectionKeys.URL_DOMAINS: SiteHosts.PAGE_HOST},
+    }
+    for section, options in overrides.items():
+        if not app_cfg.has_section(section):
+            app_cfg.add_section(section)
+        for option, value in options.items():
+            app_cfg.set(section, option, value)
+
+    with open(os.path.join(workspace, 'bench.cfg'), 'w') as cfg_file:
+        app_cfg.write(cfg_file)
+    return workspace
+
+
+def image_bytes() -> float:
+    """
+    :return: Image bytes received so far (metrics registry)
+    """
+    return dict((labels[MetricLabels.TYPE], value) for labels, value in
+                PdlMetrics.BYTES.samples()).get(MetricLabels.IMAGE, 0)
+
+
+class BenchRun(NamedTuple):
+    """
+    Results of a download run against the stand-in server
+    """
+    image_data: List        # ImageData objects returned by download_images()
+    elapsed: float          # Wall time of download_images() (seconds)
+    received: float         # Image bytes received (including discarded transfers)
+    requests: Dict[str, int]  # Stand-in server request counts
+
+    @property
+    def statuses(self) -> Dict[str, int]:
+        statuses = dict()
+        for image_obj in self.image_data:
+            statuses[image_obj.dl_status] = statuses.get(image_obj.dl_status, 0) + 1
+        return statuses
+
+    @property
+    def latencies(self) -> List[float]:
+        """
+        :return: Download duration (page + image, seconds) of each DL'd image
+        """
+        return [image_obj.download_duration for image_obj in self.image_data
+                if image_obj.dl_status == DownloadStatus.DOWNLOADED]
+
+
+def server_profile(cli_args: argparse.Namespace, **overrides) -> ServerProfile:
+    """
+    Build the stand-in server profile from the CLI args.
+
+    :param cli_args: Parsed CLI args (bench)
+    :param overrides: ServerProfile fields to override (e.g. - fault)
+
+    :return: ServerProfile
+
+    """
+    profile = ServerProfile(
+        latency=getattr(cli_args, args.ArgOptions.LATENCY) / MILLISECONDS,
+        jitter=getattr(cli_args, args.ArgOptions.JITTER) / MILLISECONDS,
+        bandwidth=getattr(cli_args, args.ArgOptions.BANDWIDTH) * MEGABYTE,
+        image_kb=getattr(cli_args, args.ArgOptions.IMAGE_KB),
+        page_kb=getattr(cli_args, args.ArgOptions.PAGE_KB),
+        page_error_rate=getattr(cli_args, args.ArgOptions.PAGE_ERRORS),
+        image_error_rate=getattr(cli_args, args.ArgOptions.IMAGE_ERRORS),
+        seed=getattr(cli_args, args.ArgOptions.SEED))
+    return profile._replace(**overrides)
+
+
+def setup(cli_args: argparse.Namespace) -> Tuple[str, PdlConfig]:
+    """
+    Create the workspace, the configuration (with its inventory) and the logging.
+
+    :param cli_args: Parsed CLI args (bench)
+
+    :return: Tuple: (workspace directory, PdlConfig)
+
+    """
+    workspace = build_workspace(cli_args)
+    bench_args = argparse.Namespace(**vars(cli_args))
+    bench_args.cfg = os.path.join(workspace, 'bench.cfg')
+
+    cfg_obj = PdlConfig(cli_args=bench_args)
+    AppLogging.configure_logging(app_cfg_obj=cfg_obj)
+
+    from PDL.engine.inventory.inventory_composite import Inventory
+    cfg_obj.inventory = Inventory(cfg=cfg_obj)
+    return workspace, cfg_obj
+
+
+def cleanup(cli_args: argparse.Namespace, workspace: str) -> None:
+    """
+    Remove the workspace (unless --keep).
+
+    :param cli_args: Parsed CLI args (bench)
+    :param workspace: Workspace directory
+
+    :return: None
+
+    """
+    if getattr(cli_args, args.ArgOptions.KEEP, False):
+        LOG.info(f"Benchmark workspace: {workspace}")
+    else:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def run_downloads(cfg_obj: PdlConfig, cli_args: argparse.Namespace, profile: ServerProfile,
+                  first_photo_id: int = FIRST_PHOTO_ID) -> BenchRun:
+    """
+    Start a stand-in server, and run download_images() for the configured number of
+    photo URLs against it.
+
+    :param cfg_obj: PdlConfig (see setup())
+    :param cli_args: Parsed CLI args (bench: images, retry delay, read timeout)
+    :param profile: Stand-in server profile
+    :param first_photo_id: Id of the first photo (runs sharing an inventory need
+                           distinct ids)
+
+    :return: BenchRun
+
+    """
+    server = StandInPxServer(profile=profile).start()
+    route_to_server(http_session.get_session(), server)
+
+    # Failed requests are retried: use the benchmark's retry delay (and read timeout)
+    page_class, contact_class = [
+        import_module_class(cfg_obj.app_cfg.get(AppCfgFileSections.PROJECT, key))
+        for key in (AppCfgFileSectionKeys.CATALOG_PARSE,
+                    AppCfgFileSectionKeys.IMAGE_CONTACT_PARSE)]
+    settings = [(page_class, 'RETRY_INTERVAL'), (contact_class, 'RETRY_DELAY'),
+                (http_session.Timeouts, 'READ')]
+    original = [getattr(obj, name) for obj, name in settings]
+    retry_delay = getattr(cli_args, args.ArgOptions.RETRY_DELAY)
+    for (obj, name), value in zip(settings, (retry_delay, retry_delay,
+                                             getattr(cli_args, args.ArgOptions.READ_TIMEOUT))):
+        setattr(obj, name, value)
+
+    urls = [server.page_url(first_photo_id + index)
+            for index in range(getattr(cli_args, args.ArgOptions.IMAGES))]
+
+    import PDL.app.app as app
+    try:
+        received = image_bytes()
+        start = time.perf_counter()
+        image_data = app.download_images(cfg_obj=cfg_obj, urls=urls)
+        elapsed = time.perf_counter() - start
+        return BenchRun(image_data=image_data, elapsed=elapsed,
+                        received=image_bytes() - received, requests=dict(server.requests))
+
+    finally:
+        for (obj, name), value in zip(settings, original):
+            setattr(obj, name, value)
+        http_session.close_session()
+        server.stop()
+
+
+def report(run: BenchRun) -> str:
+    """
+    Build the results table.
+
+    :param run: Results of the download run
+
+    :return: Table (str)
+
+    """
+    downloaded = run.statuses.get(DownloadStatus.DOWNLOADED, 0)
+    latencies = run.latencies
+
+    table = prettytable.PrettyTable()
+    table.field_names = ['Measurement', 'Value']
+    table.align['Measurement'] = 'l'
+    table.align['Value'] = 'r'
+
+    table.add_row(['URLs processed', len(run.image_data)])
+    for status, count in sorted(run.statuses.items()):
+        table.add_row([f"  {status}", count])
+    table.add_row(['Server requests (pages/images/errors)',
+                   f"{run.requests['pages']}/{run.requests['images']}/"
+                   f"{run.requests['errors']}"])
+    table.add_row(['Elapsed (s)', f"{run.elapsed:0.3f}"])
+    table.add_row(['Images/sec', f"{downloaded / run.elapsed:0.2f}" if run.elapsed else 'n/a'])
+    table.add_row(['MB/s (images)',
+                   f"{run.received / MEGABYTE / run.elapsed:0.2f}" if run.elapsed else 'n/a'])
+    for pct in PERCENTILES:
+        table.add_row([f"Latency p{pct} (ms, page + image)",
+                       f"{percentile(latencies, pct) * MILLISECONDS:0.1f}"])
+
+    return table.get_string(title='DOWNLOAD BENCHMARK')
+
+
+def run_benchmark(cli_args: argparse.Namespace) -> None:
+    """
+    Run the download benchmark (pdl bench download).
+
+    :param cli_args: Parsed CLI args (bench)
+
+    :return: None
+
+    """
+    if not cli_args.cfg:
+        LOG.error("The benchmark requires an application config file (-c <app.cfg>).")
+        return
+
+    workspace, cfg_obj = setup(cli_args)
+    try:
+        run = run_downloads(cfg_obj=cfg_obj, cli_args=cli_args,
+                            profile=server_profile(cli_args))
+        ReportingSummary.log_table(report(run))
+    finally:
+        cleanup(cli_args, workspace)
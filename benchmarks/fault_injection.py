@@ -0,0 +1,124 @@
+"""
+    PURPOSE: Exercise the download retry logic under injected faults
+    ===========================================================================================
+        * Run download_images() against the local stand-in 500px server (see
+          benchmarks/px_server.py), once without faults (baseline), then once per fault
+          scenario: connection resets, stalled responses (read timeout), 429/503 with
+          Retry-After, truncated bodies and tiny error pages (MIN_KB check).
+        * The fault is injected into a fraction of the page and image requests (drawn per
+          attempt, so retries can succeed).
+        * Report, per scenario: images DL'd, errors, faults injected, goodput (MB/s of
+          complete images), wasted time (elapsed - baseline elapsed) and the image data
+          written to files that were discarded (error pages, incomplete transfers).
+
+    Usage: pdl.py -c <app.cfg> [-e <engine.cfg>] bench faults [--fault <fault>|all]
+                  [--fault_rate 0.3] [--stall_s 3] [--read_timeout 1] [--retry_after 1]
+                  [--retry_delay 0] [--images N] ...
+"""
+
+import argparse
+from typing import List
+
+import prettytable
+
+import PDL.configuration.cli.args as args
+from PDL.benchmarks import download_throughput as throughput
+from PDL.benchmarks.px_server import Faults, StandInPxServer
+from PDL.engine.images.status import DownloadStatus
+from PDL.logger.logger import Logger
+from PDL.reporting.summary import ReportingSummary
+
+LOG = Logger()
+
+PHOTO_ID_BLOCK = 1000000   # Photo ids per scenario (scenarios share the inventory)
+
+
+def scenarios(fault: str) -> List[str]:
+    """
+    :param fault: Fault requested on the CLI (or 'all')
+
+    :return: Scenarios to run (baseline first)
+
+    """
+    selected = (list(Faults.SCENARIOS) if fault == args.BenchDefaults.ALL_FAULTS
+                else [fault])
+    return [Faults.NONE] + selected
+
+
+def report(results: List[tuple], image_kb: int) -> str:
+    """
+    Build the results table.
+
+    :param results: List of (scenario, BenchRun)
+    :param image_kb: Image size (KB)
+
+    :return: Table (str)
+
+    """
+    baseline = results[0][1].elapsed
+
+    table = prettytable.PrettyTable()
+    table.field_names = ['Scenario', 'DL\'d', 'Errors', 'Faults', 'Requests (pg/img)',
+                         'Elapsed (s)', 'Goodput (MB/s)', 'Wasted (s)', 'Discarded (MB)',
+                         'p95 (ms)']
+    table.align = 'r'
+    table.align['Scenario'] = 'l'
+
+    for scenario, run in results:
+        downloaded = run.statuses.get(DownloadStatus.DOWNLOADED, 0)
+        good_bytes = downloaded * image_kb * StandInPxServer.KILOBYTES
+        table.add_row([
+            scenario,
+            downloaded,
+            run.statuses.get(DownloadStatus.ERROR, 0),
+            run.requests['faults'],
+            f"{run.requests['pages']}/{run.requests['images']}",
+            f"{run.elapsed:0.2f}",
+            f"{good_bytes / throughput.MEGABYTE / run.elapsed:0.2f}" if run.elapsed else 'n/a',
+            f"{run.elapsed - baseline:0.2f}",
+            f"{max(run.received - good_bytes, 0) / throughput.MEGABYTE:0.2f}",
+            f"{throughput.percentile(run.latencies, 95) * throughput.MILLISECONDS:0.0f}",
+        ])
+
+    return table.get_string(title='FAULT INJECTION: RETRY BEHAVIOR')
+
+
+def run_fault_scenarios(cli_args: argparse.Namespace) -> None:
+    """
+    Run the fault injection scenarios (pdl bench faults).
+
+    :param cli_args: Parsed CLI args (bench)
+
+    :return: None
+
+    """
+    fault = getattr(cli_args, args.ArgOptions.FAULT)
+    if fault != args.BenchDefaults.ALL_FAULTS and fault not in Faults.SCENARIOS:
+        LOG.error(f"Unknown fault '{fault}'. Valid faults: {', '.join(Faults.SCENARIOS)}, "
+                  f"{args.BenchDefaults.ALL_FAULTS}")
+        return
+
+    if not cli_args.cfg:
+        LOG.error("The benchmark requires an application config file (-c <app.cfg>).")
+        return
+
+    workspace, cfg_obj = throughput.setup(cli_args)
+    results = list()
+    try:
+        for index, scenario in enumerate(scenarios(fault)):
+            LOG.info(f"Fault scenario: {scenario}")
+            profile = throughput.server_profile(
+                cli_args, fault=scenario,
+                fault_rate=getattr(cli_args, args.ArgOptions.FAULT_RATE),
+                stall=getattr(cli_args, args.ArgOptions.STALL),
+                retry_after=getattr(cli_args, args.ArgOptions.RETRY_AFTER))
+
+            run = throughput.run_downloads(
+                cfg_obj=cfg_obj, cli_args=cli_args, profile=profile,
+                first_photo_id=throughput.FIRST_PHOTO_ID + index * PHOTO_ID_BLOCK)
+            results.append((scenario, run))
+
+        ReportingSummary.log_table(
+            report(results, image_kb=getattr(cli_args, args.ArgOptions.IMAGE_KB)))
+    finally:
+        throughput.cleanup(cli_args, workspace)
@@ -0,0 +1,157 @@
+"""
+    PURPOSE: Compare load times of the legacy pickled inventory (.dat) and the binary
+    inventory format (see engine/inventory/filesystems/binary_store.py).
+    ===========================================================================================
+        * Use an existing inventory file (pickled or binary), or generate a synthetic inventory.
+        * Write the inventory in each format (pickle, binary/zlib, binary/lzma) to a temp dir.
+        * Time full loads (best of N) and single-record seeks, and report the file sizes.
+
+    Usage: python -m PDL.benchmarks.inventory_format [--inventory <file.dat>] [--records N]
+"""
+
+import argparse
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import prettytable
+
+from PDL.engine.images.image_info import ImageData
+from PDL.engine.images.status import DownloadStatus
+from PDL.engine.inventory.filesystems.binary_store import (
+    BinaryInventoryFile, Codec, read_inventory)
+from PDL.logger.logger import Logger
+
+PURPOSE_CLI = "Compare load times of the pickled and binary inventory formats."
+
+LOG = Logger()
+
+
+def parse_cli() -> argparse.Namespace:
+    """
+    Define basic CLI arguments
+
+    :return: Arguments parsed from CLI
+
+    """
+    parser = argparse.ArgumentParser(PURPOSE_CLI)
+    parser.add_argument('--inventory', default=None,
+                        help="Existing inventory file (.dat) to benchmark")
+    parser.add_argument('--records', type=int, default=50000,
+                        help="Number of records to generate if no inventory file is provided")
+    parser.add_argument('--repeat', type=int, default=3, help="Number of timed loads per format")
+    parser.add_argument('--seeks', type=int, default=100, help="Number of single-record seeks")
+    return parser.parse_args()
+
+
+def build_inventory(records: int, seed: int = 500) -> Dict[str, ImageData]:
+    """
+    Generate a synthetic inventory, similar in content to a real inventory.
+
+    :param records: Number of records to generate
+    :param seed: Random seed (for repeatable inventories)
+
+    :return: Inventory dictionary (K: image id, V: ImageData object)
+
+    """
+    rand = random.Random(seed)
+    inventory = dict()
+    for index in range(records):
+        image_id = f"{index}-{rand.randint(10 ** 8, 10 ** 9)}"
+        inventory[image_id] = ImageData(
+            author=f"Author {rand.randint(1, records // 10 + 1)}",
+            description=f"Description of image {index}" * rand.randint(1, 4),
+            dl_status=DownloadStatus.DOWNLOADED,
+            downloaded_on=f"2019-{rand.randint(1, 12):02d}-{rand.randint(1, 28):02d}",
+            filename=f"{image_id}.jpg",
+            file_size=f"{rand.uniform(100, 10000):0.2f} KB",
+            id_=image_id,
+            image_name=f"Image {index}",
+            image_url=f"https://drscdn.500px.org/photo/{image_id}/m%3D2048/v2?sig={index:064x}",
+            locations=[f"/images/{rand.choice(['nature', 'people', 'city'])}"],
+            page_url=f"https://500px.com/photo/{image_id}/image-{index}",
+            resolution=f"{rand.randint(1000, 6000)}x{rand.randint(1000, 6000)}")
+    return inventory
+
+
+def time_call(func: Callable, repeat: int) -> float:
+    """
+    Time a call (best of `repeat`).
+
+    :param func: Callable (no args) to time
+    :param repeat: Number of times to call func
+
+    :return: Best elapsed time (seconds)
+
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def load_pickle(filename: str) -> dict:
+    with open(filename, "rb") as pickle_file:
+        return pickle.load(pickle_file)
+
+
+def seek_records(filename: str, keys: List[str]) -> None:
+    for key in keys:
+        BinaryInventoryFile(filename).get(key)
+
+
+def main_routine() -> None:
+    args = parse_cli()
+
+    if args.inventory:
+        LOG.info(f"Reading inventory from {args.inventory}")
+        inventory, _ = read_inventory(args.inventory)
+    else:
+        LOG.info(f"Generating inventory: {args.records} records")
+        inventory = build_inventory(args.records)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        pickle_file = os.path.join(temp_dir, 'inventory.dat')
+        with open(pickle_file, "wb") as data_file:
+            pickle.dump(inventory, data_file)
+
+        binary_files = dict()
+        for codec in (Codec.ZLIB, Codec.LZMA):
+            binary_files[codec] = os.path.join(temp_dir, f'inventory_{codec}.dat')
+            BinaryInventoryFile.write(data=inventory, filename=binary_files[codec], codec=codec)
+
+        keys = random.Random(0).sample(list(inventory.keys()), min(args.seeks, len(inventory)))
+
+        table = prettytable.PrettyTable()
+        table.field_names = ['Format', 'Size (KB)', 'Full Load (s)', 'Seek (ms/record)']
+        for column in table.field_names:
+            table.align[column] = 'r'
+        table.align['Format'] = 'l'
+
+        baseline = time_call(lambda: load_pickle(pickle_file), args.repeat)
+        table.add_row(['pickle (legacy)', f"{os.stat(pickle_file).st_size / 1024:0.1f}",
+                       f"{baseline:0.3f}", 'n/a'])
+
+        for codec, filename in binary_files.items():
+            load = time_call(lambda: BinaryInventoryFile(filename).load(), args.repeat)
+            seek = time_call(lambda: seek_records(filename, keys), 1) / max(len(keys), 1)
+            table.add_row([f'binary ({codec})', f"{os.stat(filename).st_size / 1024:0.1f}",
+                           f"{load:0.3f}", f"{seek * 1000:0.2f}"])
+
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    LOG.info(f"Records: {len(inventory)}  (Load: best of {args.repeat})")
+    for line in table.get_string().split('\n'):
+        LOG.info(line)
+
+
+if __name__ == '__main__':
+    main_routine()
@@ -0,0 +1,337 @@
+"""
+    PURPOSE: Measure how the inventory operations scale with the number of records
+    ===========================================================================================
+        * For each dataset size (e.g. - 10k/100k/1M records), generate synthetic ImageData
+          records (see inventory_format.build_inventory), written as JSON Lines run files,
+          and a directory tree of (empty) images for the file system scan.
+        * Time each stage:
+            - JsonInventory.get_inventory()        (read and merge the JSON files)
+            - FSInv scan of the directory tree
+            - Inventory._accumulate_inv()          (force scan: FS + JSON, includes consistency)
+            - Inventory._make_inv_consistent()
+            - Inventory write/read (binary inventory file: _pickle_/_unpickle_)
+            - InvStats tallies (summary, image directories)
+        * Write the results to a JSON file, and compare them against a JSON baseline: a stage
+          slower than the baseline by more than the tolerance is flagged as a regression
+          (exit code 1).
+
+    Usage: python -m PDL.benchmarks.inventory_scale [--sizes 10000,100000,1000000]
+               [--fs_max 100000] [--output results.json] [--baseline baseline.json]
+               [--update_baseline] [--tolerance 0.25]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+import prettytable
+
+from PDL.benchmarks.inventory_format import build_inventory
+from PDL.engine.inventory.filesystems.inventory import FSInv
+from PDL.engine.inventory.inventory_composite import Inventory
+from PDL.engine.inventory.json.inventory import JsonInventory
+from PDL.logger.json_log import JsonLinesLog
+from PDL.logger.logger import Logger
+from PDL.reporting.invstats import InvStats
+
+PURPOSE_CLI = "Measure how the inventory operations scale with the number of records."
+
+LOG = Logger()
+
+CATEGORIES = ['nature', 'people', 'city']
+FILES_PER_DIR = 1000
+RESULTS_VERSION = 1
+
+
+class Stages:
+    """
+    Timed stages (keys of the results)
+    """
+    JSON_INVENTORY = 'json_get_inventory'
+    FS_SCAN = 'fs_scan'
+    ACCUMULATE = 'accumulate_inv'
+    CONSISTENT = 'make_inv_consistent'
+    WRITE = 'inventory_write'
+    READ = 'inventory_read'
+    STATS = 'invstats_tally'
+
+    ORDER = (JSON_INVENTORY, FS_SCAN, ACCUMULATE, CONSISTENT, WRITE, READ, STATS)
+
+
+def parse_cli() -> argparse.Namespace:
+    """
+    Define basic CLI arguments
+
+    :return: Arguments parsed from CLI
+
+    """
+    parser = argparse.ArgumentParser(PURPOSE_CLI)
+    parser.add_argument('--sizes', default='10000,100000',
+                        help="Comma-separated dataset sizes (records)")
+    parser.add_argument('--fs_max', type=int, default=100000,
+                        help="Maximum number of image files created for the file system scan")
+    parser.add_argument('--records_per_file', type=int, default=1000,
+                        help="Records per JSON Lines file")
+    parser.add_argument('--output', default=None, help="Write the results to this JSON file")
+    parser.add_argument('--baseline', default=None,
+                        help="JSON baseline: compare the results and flag regressions")
+    parser.add_argument('--update_baseline', action='store_true',
+                        help="Write the results to the baseline file (after comparing)")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed slowdown vs the baseline (fraction)")
+    parser.add_argument('--min_delta', type=float, default=0.05,
+                        help="Ignore slowdowns smaller than this (seconds; timer noise)")
+    return parser.parse_args()
+
+
+def timed(func: Callable[[], object]) -> Tuple[float, object]:
+    """
+    Time a call.
+
+    :param func: Callable (no args)
+
+    :return: Tuple: (elapsed time in seconds, result of the call)
+
+    """
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def write_json_files(records: dict, directory: str, records_per_file: int) -> int:
+    """
+    Write the records as JSON Lines run files.
+
+    :param records: Inventory dictionary (K: image id, V: ImageData object)
+    :param directory: Directory for the files
+    :param records_per_file: Records per file
+
+    :return: Number of files written
+
+    """
+    os.makedirs(directory, exist_ok=True)
+    files = 0
+    log = None
+    for index, image_obj in enumerate(records.values()):
+        if index % records_per_file == 0:
+            if log is not None:
+                log.close()
+            files += 1
+            filename = f"run_{files:06d}.{JsonLinesLog.EXTENSION}"
+            log = JsonLinesLog(os.path.join(directory, filename), fsync=False)
+        log.append(image_obj)
+    if log is not None:
+        log.close()
+    return files
+
+
+def build_image_tree(image_ids: List[str], base_dir: str) -> None:
+    """
+    Create (empty) image files in a categorized directory tree:
+    <base_dir>/<category>/<bucket>/<image_id>.jpg
+
+    :param image_ids: Image ids
+    :param base_dir: Root of the tree
+
+    :return: None
+
+    """
+    for index, image_id in enumerate(image_ids):
+        directory = os.path.join(base_dir, CATEGORIES[index % len(CATEGORIES)],
+                                 f"{index // (FILES_PER_DIR * len(CATEGORIES)):04d}")
+        if index % (FILES_PER_DIR * len(CATEGORIES)) < len(CATEGORIES):
+            os.makedirs(directory, exist_ok=True)
+        open(os.path.join(directory, f"{image_id}{FSInv.INV_FILE_EXT}"), 'w').close()
+
+
+def composite_inventory(fs_inventory_obj: FSInv, fs_inv: dict, json_inv: dict) -> Inventory:
+    """
+    Build an Inventory from existing FS and JSON inventories (Inventory() reads the
+    configured locations, so the constructor is bypassed).
+
+    :param fs_inventory_obj: FSInv (used to write/read the inventory file)
+    :param fs_inv: File system inventory
+    :param json_inv: JSON inventory
+
+    :return: Inventory
+
+    """
+    inventory = Inventory.__new__(Inventory)
+    inventory.force_scan = True
+    inventory.read_only = False
+    inventory.metadata = CATEGORIES
+    inventory.fs_inventory_obj = fs_inventory_obj
+    inventory.fs_inv = fs_inv
+    inventory.json_inv = json_inv
+    inventory.compaction = None
+    inventory.inventory = dict()
+    return inventory
+
+
+def run_size(size: int, fs_max: int, records_per_file: int, work_dir: str) -> Dict[str, float]:
+    """
+    Generate a dataset and time each stage.
+
+    :param size: Number of records
+    :param fs_max: Maximum number of image files for the file system scan
+    :param records_per_file: Records per JSON Lines file
+    :param work_dir: Scratch directory (emptied by the caller)
+
+    :return: Dictionary (K: stage, V: seconds)
+
+    """
+    json_dir = os.path.join(work_dir, 'json')
+    image_dir = os.path.join(work_dir, 'images')
+    inventory_file = os.path.join(work_dir, f'inventory{FSInv.DATA_FILE_EXT}')
+
+    # Generate the dataset (not timed)
+    start = time.perf_counter()
+    records = build_inventory(size)
+    files = write_json_files(records, json_dir, records_per_file)
+    image_ids = list(records.keys())[:fs_max]
+    del records
+    build_image_tree(image_ids, image_dir)
+    LOG.info(f"{size} records: {files} JSON files, {len(image_ids)} image files "
+             f"(generated in {time.perf_counter() - start:0.1f} s)")
+
+    timings = dict()
+    timings[Stages.JSON_INVENTORY], json_inv = timed(
+        lambda: JsonInventory(dir_location=json_dir).get_inventory())
+
+    fs_inventory_obj = FSInv(base_dir=image_dir, metadata=CATEGORIES, serialization=False,
+                             binary_filename=inventory_file)
+    timings[Stages.FS_SCAN], fs_inv = timed(
+        lambda: fs_inventory_obj.get_inventory(from_file=False, serialize=False))
+
+    inventory = composite_inventory(fs_inventory_obj, fs_inv, json_inv)
+    timings[Stages.ACCUMULATE], inventory.inventory = timed(inventory._accumulate_inv)
+    timings[Stages.CONSISTENT], _ = timed(
+        lambda: Inventory._make_inv_consistent(data_dict=inventory.inventory))
+
+    timings[Stages.WRITE], _ = timed(inventory.write)
+    timings[Stages.READ], _ = timed(inventory._unpickle_)
+
+    stats = InvStats(inventory)
+    timings[Stages.STATS], _ = timed(
+        lambda: (stats.tally_summary_data(), stats.get_image_directories()))
+
+    return timings
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float, min_delta: float) -> Tuple[prettytable.PrettyTable, int]:
+    """
+    Compare the results with the baseline.
+
+    :param results: Results (K: size, V: {stage: seconds})
+    :param baseline: Baseline results (same layout; may be empty)
+    :param tolerance: Allowed slowdown (fraction of the baseline time)
+    :param min_delta: Slowdowns smaller than this (seconds) are not flagged
+
+    :return: Tuple: (results table, number of regressions)
+
+    """
+    table = prettytable.PrettyTable()
+    table.field_names = ['Records', 'Stage', 'Time (s)', 'Baseline (s)', 'Ratio', 'Flag']
+    for column in table.field_names:
+        table.align[column] = 'r'
+    table.align['Stage'] = 'l'
+
+    regressions = 0
+    for size, timings in results.items():
+        for stage in Stages.ORDER:
+            elapsed = timings[stage]
+            reference = baseline.get(size, dict()).get(stage)
+            ratio = elapsed / reference if reference else None
+            flag = ''
+            if (reference is not None and elapsed > reference * (1 + tolerance) and
+                    elapsed - reference > min_delta):
+                flag = 'REGRESSION'
+                regressions += 1
+
+            table.add_row([size, stage, f"{elapsed:0.3f}",
+                           f"{reference:0.3f}" if reference is not None else 'n/a',
+                           f"{ratio:0.2f}" if ratio is not None else 'n/a', flag])
+
+    return table, regressions
+
+
+def read_results(filename: str) -> Dict[str, Dict[str, float]]:
+    """
+    :param filename: Results/baseline JSON file
+
+    :return: Results (K: size, V: {stage: seconds}); empty if the file does not exist
+
+    """
+    if not os.path.exists(filename):
+        LOG.warn(f"Baseline '{filename}' does not exist: nothing to compare.")
+        return dict()
+    with open(filename) as results_file:
+        return json.load(results_file)['results']
+
+
+def write_results(filename: str, results: Dict[str, Dict[str, float]]) -> None:
+    """
+    :param filename: JSON file to write
+    :param results: Results (K: size, V: {stage: seconds})
+
+    :return: None
+
+    """
+    data = {'version': RESULTS_VERSION,
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results}
+    with open(filename, 'w') as results_file:
+        json.dump(data, results_file, indent=2, sort_keys=True)
+    LOG.info(f"Wrote results to {filename}")
+
+
+def main_routine() -> int:
+    """
+    Run the benchmark.
+
+    :return: Number of regressions (vs the baseline)
+
+    """
+    args = parse_cli()
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    results = dict()
+    for size in sizes:
+        work_dir = tempfile.mkdtemp(prefix='pdl_inv_scale_')
+        try:
+            results[str(size)] = run_size(size=size, fs_max=args.fs_max,
+                                          records_per_file=args.records_per_file,
+                                          work_dir=work_dir)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = read_results(args.baseline) if args.baseline else dict()
+
+    table, regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    for line in table.get_string().split('\n'):
+        LOG.info(line)
+
+    if regressions:
+        LOG.error(f"{regressions} stage(s) slower than the baseline by more than "
+                  f"{args.tolerance:0.0%}.")
+
+    if args.output:
+        write_results(args.output, results)
+    if args.baseline and args.update_baseline:
+        write_results(args.baseline, results)
+
+    return regressions
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main_routine() else 0)
@@ -0,0 +1,109 @@
+"""
+    PURPOSE: Measure the per-call overhead of PDL.logger.logger.Logger
+    ===========================================================================================
+        * Enabled (INFO) and filtered (DEBUG) log calls, from a nested call stack.
+        * ReportingSummary.log_table() with a large table (one log call per line).
+        * Log records are discarded (NullHandler), so only the logger overhead is measured.
+
+    Usage: python -m PDL.benchmarks.logger_overhead [--calls 2000] [--rows 1000] [--depth 20]
+"""
+
+import argparse
+import logging
+import time
+from typing import Callable
+
+import prettytable
+
+from PDL.logger.logger import Logger
+from PDL.reporting.summary import ReportingSummary
+
+PURPOSE_CLI = "Measure the per-call overhead of the PDL Logger."
+
+LOG = Logger()
+
+
+def parse_cli() -> argparse.Namespace:
+    """
+    Define basic CLI arguments
+
+    :return: Arguments parsed from CLI
+
+    """
+    parser = argparse.ArgumentParser(PURPOSE_CLI)
+    parser.add_argument('--calls', type=int, default=2000, help="Number of log calls")
+    parser.add_argument('--rows', type=int, default=1000, help="Number of rows in the table")
+    parser.add_argument('--depth', type=int, default=20,
+                        help="Depth of the call stack the log calls are made from")
+    return parser.parse_args()
+
+
+def at_depth(depth: int, routine: Callable[[], None]) -> None:
+    """
+    Call routine from a call stack of (at least) the specified depth.
+
+    :param depth: Number of nested calls
+    :param routine: Routine to call
+
+    :return: None
+
+    """
+    if depth > 0:
+        at_depth(depth - 1, routine)
+    else:
+        routine()
+
+
+def time_call(routine: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    routine()
+    return time.perf_counter() - start
+
+
+def main_routine() -> None:
+    args = parse_cli()
+
+    def _log_calls(log_call: Callable[[str], None]) -> Callable[[], None]:
+        def _calls():
+            for index in range(args.calls):
+                log_call(f"Message {index}")
+        return _calls
+
+    table = prettytable.PrettyTable()
+    table.field_names = ['Row', 'Value']
+    for row in range(args.rows):
+        table.add_row([row, f"value {row}"])
+    table_str = table.get_string()
+
+    # Discard the log records, at INFO (DEBUG is filtered)
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    root.handlers = [logging.NullHandler()]
+    root.setLevel(logging.INFO)
+    try:
+        timings = [
+            ('INFO (enabled)', args.calls,
+             time_call(lambda: at_depth(args.depth, _log_calls(LOG.info)))),
+            ('DEBUG (filtered)', args.calls,
+             time_call(lambda: at_depth(args.depth, _log_calls(LOG.debug)))),
+            (f'log_table ({args.rows} rows)', args.rows + 4,
+             time_call(lambda: at_depth(args.depth, lambda: ReportingSummary.log_table(
+                 table_str, log_level='info')))),
+        ]
+    finally:
+        root.handlers = handlers
+        root.setLevel(level)
+
+    results = prettytable.PrettyTable()
+    results.field_names = ['Case', 'Log calls', 'Time (s)', 'us/call']
+    for column in results.field_names[1:]:
+        results.align[column] = 'r'
+    for case, calls, elapsed in timings:
+        results.add_row([case, calls, f"{elapsed:0.3f}", f"{elapsed / calls * 1e6:,.1f}"])
+
+    for line in results.get_string().split('\n'):
+        LOG.info(line)
+
+
+if __name__ == '__main__':
+    main_routine()
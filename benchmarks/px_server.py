@@ -0,0 +1,394 @@
+"""
+    Local stand-in for the 500px site, for benchmarking downloads without the network.
+    ===========================================================================================
+        * Display pages: https://500px.com/photo/<id>/<title> -> HTML page with the embedded
+          window.PxPreloadedData blob parsed by ParseDisplayPage.
+        * Images: https://drscdn.500px.org/photo/<id>/m%3D<size>/v2?sig=<sig> -> JPEG payload.
+
+    Latency (time to first byte, with jitter), bandwidth (per connection), payload sizes and
+    the fraction of failing pages/images are configurable (ServerProfile). Failures are
+    deterministic per photo id (seeded), so runs are repeatable.
+
+    Transient faults (Faults: connection resets, stalled responses, 429/503 with
+    Retry-After, truncated bodies, tiny error pages) can be injected into a fraction of the
+    requests. A fault is drawn per request attempt (seeded by photo id and attempt
+    number), so retries of the same URL may succeed.
+
+    The application requests the real site URLs: LocalRoutingAdapter (mounted on the shared
+    HTTP session) sends the requests for the site's hosts to the local server.
+
+"""
+
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import hashlib
+import json
+import random
+import re
+import socket
+import struct
+import sys
+import threading
+import time
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from PDL.logger.logger import Logger
+
+LOG = Logger()
+
+
+class Faults:
+    """
+    Transient faults injected by the stand-in server
+    """
+    NONE = 'none'
+    RESET = 'reset'              # Connection reset (RST) before responding
+    STALL = 'stall'              # Headers and first chunk sent, then the server stalls
+    THROTTLE = 'throttle'        # 429 Too Many Requests, with Retry-After
+    UNAVAILABLE = 'unavailable'  # 503 Service Unavailable, with Retry-After
+    TRUNCATED = 'truncated'      # Connection closed after half of the (announced) body
+    ERROR_PAGE = 'error_page'    # 200 with a tiny HTML error page (not an image)
+
+    SCENARIOS = (RESET, STALL, THROTTLE, UNAVAILABLE, TRUNCATED, ERROR_PAGE)
+
+
+class ServerProfile(NamedTuple):
+    """
+    Behavior of the stand-in server
+    """
+    latency: float = 0.02         # Time to first byte (seconds)
+    jitter: float = 0.01          # Additional random latency: 0..jitter (seconds)
+    bandwidth: float = 0          # Bytes/second per connection (0 = unlimited)
+    image_kb: int = 500           # Image payload size (KB)
+    page_kb: int = 50             # Display page size (KB)
+    page_error_rate: float = 0.0  # Fraction of the pages that return 404
+    image_error_rate: float = 0.0  # Fraction of the images that return 503
+    seed: int = 500
+    fault: str = Faults.NONE      # Transient fault injected (Faults)
+    fault_rate: float = 0.0       # Fraction of the requests (attempts) with the fault
+    stall: float = 5.0            # Duration of a stalled response (seconds)
+    retry_after: int = 1          # Retry-After of the 429/503 faults (seconds)
+
+
+class SiteHosts:
+    """
+    Hosts (and URL formats) served by the stand-in server
+    """
+    PAGE_HOST = '500px.com'
+    IMAGE_HOST = 'drscdn.500px.org'
+
+    PAGE_URL = 'https://{host}/photo/{photo_id}/bench-image-{photo_id}'
+    IMAGE_URL = 'https://{host}/photo/{photo_id}/m%3D{size}/v2?sig={sig}'
+
+    PAGE_PATH = re.compile(r'^/photo/(?P<photo_id>\d+)/[^/]+$')
+    IMAGE_PATH = re.compile(r'^/photo/(?P<photo_id>\d+)/m%3D\d+/v2$')
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server that ignores clients closing (keep-alive) connections.
+    """
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super(QuietHTTPServer, self).handle_error(request, client_address)
+
+
+class StandInPxServer:
+    """
+    Threaded HTTP server serving synthetic display pages and images.
+    """
+    CHUNK_SIZE = 64 * 1024
+    KILOBYTES = 1024
+
+    def __init__(self, profile: ServerProfile = ServerProfile(), host: str = '127.0.0.1',
+                 port: int = 0) -> None:
+        """
+        :param profile: Server behavior (latency, bandwidth, sizes, errors)
+        :param host: Interface to listen on
+        :param port: Port to listen on (0 = any available port)
+
+        """
+        self.profile = profile
+        self.server = QuietHTTPServer((host, port), PxRequestHandler)
+        self.server.standin = self
+        self.requests = {'pages': 0, 'images': 0, 'errors': 0, 'faults': 0}
+        self._attempts = dict()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._image = self._build_image(profile.image_kb * self.KILOBYTES, profile.seed)
+        self._filler = 'x' * (profile.page_kb * self.KILOBYTES)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInPxServer":
+        self._thread = threading.Thread(target=self.server.serve_forever,
+                                        name='px-standin', daemon=True)
+        self._thread.start()
+        LOG.info(f"Stand-in 500px server listening on {self.base_url}: {self.profile}")
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    @staticmethod
+    def page_url(photo_id: int) -> str:
+        """
+        :param photo_id: Photo id
+
+        :return: Display page URL (site URL: route it with LocalRoutingAdapter)
+
+        """
+        return SiteHosts.PAGE_URL.format(host=SiteHosts.PAGE_HOST, photo_id=photo_id)
+
+    @staticmethod
+    def signature(photo_id: int) -> str:
+        return hashlib.sha1(str(photo_id).encode('utf-8')).hexdigest()
+
+    def fails(self, photo_id: int, resource: str) -> bool:
+        """
+        Determine (deterministically) if the resource of the photo fails.
+
+        :param photo_id: Photo id
+        :param resource: 'page' or 'image'
+
+        :return: bool
+
+        """
+        rate = (self.profile.page_error_rate if resource == 'page' else
+                self.profile.image_error_rate)
+        return rate > 0 and random.Random(
+            f"{self.profile.seed}-{photo_id}-{resource}").random() < rate
+
+    def fault(self, photo_id: int, resource: str) -> str:
+        """
+        Determine (deterministically, per attempt) the fault injected into the request.
+
+        :param photo_id: Photo id
+        :param resource: 'page' or 'image'
+
+        :return: Fault (Faults.NONE if the request is served normally)
+
+        """
+        if self.profile.fault == Faults.NONE or self.profile.fault_rate <= 0:
+            return Faults.NONE
+
+        with self._lock:
+            attempt = self._attempts.get((photo_id, resource), 0) + 1
+            self._attempts[(photo_id, resource)] = attempt
+
+        if random.Random(f"{self.profile.seed}-{photo_id}-{resource}-{attempt}").random() \
+                >= self.profile.fault_rate:
+            return Faults.NONE
+
+        self.count('faults')
+        return self.profile.fault
+
+    def delay(self) -> None:
+        """
+        Wait for the configured latency (plus jitter) before responding.
+        """
+        time.sleep(self.profile.latency + random.uniform(0, self.profile.jitter))
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.requests[key] += 1
+
+    def build_page(self, photo_id: int) -> bytes:
+        """
+        Build the display page, with the embedded metadata (PxPreloadedData).
+
+        :param photo_id: Photo id
+
+        :return: HTML page (bytes)
+
+        """
+        image_urls = [{'size': size,
+                       'url': SiteHosts.IMAGE_URL.format(
+                           host=SiteHosts.IMAGE_HOST, photo_id=photo_id, size=size,
+                           sig=self.signature(photo_id))}
+                      for size in (1080, 2048)]
+        photo = {'id': photo_id,
+                 'name': f"Bench Image {photo_id}",
+                 'description': f"Synthetic image {photo_id}",
+                 'created_at': '2019-05-01T10:00:00+00:00',
+                 'width': 2048,
+                 'height': 1365,
+                 'user': {'username': f"author_{photo_id % 100}"},
+                 'images': image_urls}
+        data = json.dumps({'photo': photo})[:-1]   # PxPreloadedData continues: ,"comments"
+        return (f'<html><head><title>{photo["name"]}</title></head><body>\n'
+                f'<script>window.PxPreloadedData = {data},"comments": []}};</script>\n'
+                f'<!-- {self._filler} -->\n</body></html>\n').encode('utf-8')
+
+    @property
+    def image(self) -> bytes:
+        return self._image
+
+    @staticmethod
+    def _build_image(size: int, seed: int) -> bytes:
+        """
+        Build a JPEG-like payload (SOI/JFIF header, random data, EOI) of the given size.
+
+        :param size: Payload size (bytes)
+        :param seed: Random seed
+
+        :return: bytes
+
+        """
+        header = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'
+        trailer = b'\xff\xd9'
+        body_size = max(0, size - len(header) - len(trailer))
+        body = random.Random(seed).getrandbits(8 * body_size).to_bytes(body_size, 'little')
+        return header + body + trailer
+
+
+class PxRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the display pages and images (self.server.standin: StandInPxServer)
+    """
+    protocol_version = 'HTTP/1.1'   # Keep-alive: exercises the connection pools
+    server_version = 'PxStandIn'
+
+    def do_GET(self) -> None:
+        standin = self.server.standin
+        path = urlsplit(self.path).path
+        standin.delay()
+
+        page = SiteHosts.PAGE_PATH.match(path)
+        image = SiteHosts.IMAGE_PATH.match(path)
+
+        if page is not None:
+            photo_id = int(page.group('photo_id'))
+            standin.count('pages')
+            if standin.fails(photo_id, 'page'):
+                self._send_error(HTTPStatus.NOT_FOUND)
+            else:
+                self._respond(standin.build_page(photo_id), 'text/html; charset=utf-8',
+                              fault=standin.fault(photo_id, 'page'))
+
+        elif image is not None:
+            photo_id = int(image.group('photo_id'))
+            standin.count('images')
+            if standin.fails(photo_id, 'image'):
+                self._send_error(HTTPStatus.SERVICE_UNAVAILABLE)
+            else:
+                self._respond(standin.image, 'image/jpeg',
+                              fault=standin.fault(photo_id, 'image'))
+
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND)
+
+    def _respond(self, body: bytes, content_type: str, fault: str = Faults.NONE) -> None:
+        """
+        Send the response, with the injected fault (if any).
+        """
+        profile = self.server.standin.profile
+
+        if fault == Faults.RESET:
+            # Close with SO_LINGER=0: the client receives a RST instead of a response
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER,
+                                       struct.pack('ii', 1, 0))
+            self.close_connection = True
+
+        elif fault == Faults.THROTTLE:
+            self._send_error(HTTPStatus.TOO_MANY_REQUESTS, retry_after=profile.retry_after)
+
+        elif fault == Faults.UNAVAILABLE:
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, retry_after=profile.retry_after)
+
+        elif fault == Faults.ERROR_PAGE:
+            self._send(b'<html><body><h1>Something went wrong</h1></body></html>\n',
+                       'text/html; charset=utf-8')
+
+        else:
+            self._send(body, content_type, stall=fault == Faults.STALL,
+                       truncate=fault == Faults.TRUNCATED)
+
+    def _send(self, body: bytes, content_type: str, stall: bool = False,
+              truncate: bool = False) -> None:
+        """
+        Send the response body, limited to the configured bandwidth.
+
+        :param body: Response body
+        :param content_type: Content-Type
+        :param stall: Stall (profile.stall seconds) after the first chunk, then close
+        :param truncate: Close the connection after half of the body
+
+        """
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        profile = self.server.standin.profile
+        chunk_size = StandInPxServer.CHUNK_SIZE
+        end = len(body) // 2 if truncate else len(body)
+        for offset in range(0, end, chunk_size):
+            chunk = body[offset:min(offset + chunk_size, end)]
+            self.wfile.write(chunk)
+            if stall:
+                self.wfile.flush()
+                time.sleep(profile.stall)
+                break
+            if profile.bandwidth:
+                time.sleep(len(chunk) / profile.bandwidth)
+
+        if stall or truncate:
+            self.close_connection = True
+
+    def _send_error(self, status: HTTPStatus, retry_after: Optional[int] = None) -> None:
+        self.server.standin.count('errors')
+        body = f"{status.value} {status.phrase}".encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class LocalRoutingAdapter(HTTPAdapter):
+    """
+    Sends the requests for the site's hosts to the stand-in server (HTTP), preserving
+    the path and query.
+    """
+    def __init__(self, base_url: str, **kwargs) -> None:
+        super(LocalRoutingAdapter, self).__init__(**kwargs)
+        self.base_url = base_url
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        url = urlsplit(request.url)
+        request.url = f"{self.base_url}{url.path}{'?' + url.query if url.query else ''}"
+        return super(LocalRoutingAdapter, self).send(request, **kwargs)
+
+
+def route_to_server(session: requests.Session, server: StandInPxServer,
+                    pool_maxsize: Optional[int] = None) -> None:
+    """
+    Mount the routing adapter for the site's hosts on the session.
+
+    :param session: HTTP session (e.g. - PDL.engine.download.http_session.get_session())
+    :param server: Stand-in server
+    :param pool_maxsize: Connection pool size (DEFAULT: requests' default)
+
+    :return: None
+
+    """
+    kwargs = dict() if pool_maxsize is None else {'pool_maxsize': pool_maxsize}
+    adapter = LocalRoutingAdapter(server.base_url, **kwargs)
+    for host in (SiteHosts.PAGE_HOST, SiteHosts.IMAGE_HOST):
+        session.mount(f"https://{host}/", adapter)
@@ -0,0 +1,87 @@
+"""
+    PURPOSE: Measure the URL sanitation pipeline (UrlArgProcessing.process_url_list)
+    ===========================================================================================
+        * Generate a URL dump: unique URLs, plus duplicates, concatenated URLs and invalid URLs.
+        * Time the complete sanitation (split, validate, remove duplicates) per dump size.
+
+    Usage: python -m PDL.benchmarks.url_sanitize [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+import prettytable
+
+from PDL.configuration.cli.urls import UrlArgProcessing
+from PDL.logger.logger import Logger
+
+PURPOSE_CLI = "Measure the URL sanitation pipeline."
+DOMAINS = ['500px.com']
+URL_FORMAT = "https://500px.com/photo/{0}/image-title-{0}"
+
+LOG = Logger()
+
+
+def parse_cli() -> argparse.Namespace:
+    """
+    Define basic CLI arguments
+
+    :return: Arguments parsed from CLI
+
+    """
+    parser = argparse.ArgumentParser(PURPOSE_CLI)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help="Number of entries in each generated URL dump")
+    parser.add_argument('--dup_rate', type=float, default=0.2, help="Fraction of duplicates")
+    return parser.parse_args()
+
+
+def build_url_dump(size: int, dup_rate: float, seed: int = 500) -> List[str]:
+    """
+    Generate a URL dump (similar to pasting a large list of URLs).
+
+    :param size: Number of entries in the dump
+    :param dup_rate: Fraction of entries that are duplicates of earlier entries
+    :param seed: Random seed (for repeatable dumps)
+
+    :return: List of entries
+
+    """
+    rand = random.Random(seed)
+    entries = []
+    for index in range(size):
+        choice = rand.random()
+        if entries and choice < dup_rate:
+            entries.append(rand.choice(entries))
+        elif choice < dup_rate + 0.01:
+            entries.append(URL_FORMAT.format(index) + URL_FORMAT.format(f"{index}-b"))
+        else:
+            entries.append(URL_FORMAT.format(index))
+    return entries
+
+
+def main_routine() -> None:
+    args = parse_cli()
+
+    table = prettytable.PrettyTable()
+    table.field_names = ['Entries', 'Unique URLs', 'Time (s)', 'URLs/sec']
+    for column in table.field_names:
+        table.align[column] = 'r'
+
+    for size in args.sizes:
+        entries = build_url_dump(size, args.dup_rate)
+
+        start = time.perf_counter()
+        urls = UrlArgProcessing.process_url_list(entries, domains=DOMAINS)
+        elapsed = time.perf_counter() - start
+
+        table.add_row([size, len(urls), f"{elapsed:0.3f}", f"{size / elapsed:,.0f}"])
+
+    for line in table.get_string().split('\n'):
+        LOG.info(line)
+
+
+if __name__ == '__main__':
+    main_routine()
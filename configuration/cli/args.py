@@ -34,12 +34,15 @@ class ArgSubmodules:
     Defined submodules for the application
 
     """
+    BENCH = 'bench'
     DATABASE = 'db'
     DOWNLOAD = 'dl'
     DUPLICATES = 'dups'
     GENERAL = 'general'
     INFO = 'info'
+    SERVE = 'serve'
     STATS = 'stats'
+    SUBMIT = 'submit'
 
     @classmethod
     def get_const_names(cls) -> List[str]:
@@ -72,6 +75,8 @@ class ArgOptions:
 
     """
     AUTHOR = 'author'
+    BANDWIDTH = 'bandwidth_mbps'
+    BENCH_TARGET = 'target'
     BUFFER = 'buffer'
     CFG = 'cfg'
     COMMAND = 'command'
@@ -80,17 +85,43 @@ class ArgOptions:
     DEBUG = 'debug'
     DETAILS = 'details'
     ENGINE = 'engine'
+    FAULT = 'fault'
+    FAULT_RATE = 'fault_rate'
     FILE = 'file'
     FILE_SPEC = 'filespec'
     FORCE_SCAN = 'force_scan'
     GENERAL = 'general'
+    HOST = 'host'
     IGNORE_DUPS = 'ignore_dups'
     IMAGE = 'image'
+    IMAGE_ERRORS = 'image_errors'
+    IMAGE_KB = 'image_kb'
+    IMAGES = 'images'
+    IMPORT_TIME = 'import_time'
+    JITTER = 'jitter_ms'
+    KEEP = 'keep'
+    LATENCY = 'latency_ms'
+    MEMORY = 'memory'
+    MEMORY_TOP = 'memory_top'
+    PAGE_ERRORS = 'page_errors'
+    PAGE_KB = 'page_kb'
+    PORT = 'port'
+    PROFILE = 'profile'
+    PROFILE_INTERVAL = 'profile_interval_ms'
+    PROFILE_SAMPLE = 'profile_sample'
+    PROFILE_TOP = 'profile_top'
+    READ_TIMEOUT = 'read_timeout'
+    RETRY_AFTER = 'retry_after'
+    RETRY_DELAY = 'retry_delay'
+    SEED = 'seed'
+    STALL = 'stall_s'
     RECORDS = 'records'
     SUMMARY = 'summary'
     SYNC = 'sync'
+    TRACE = 'trace'
     REMOVE_DUPS = 'remove_dups'
     URLS = 'urls'
+    WAIT = 'wait'
 
     SHORTCUTS = {
         AUTHOR: "a",
@@ -105,13 +136,66 @@ class ArgOptions:
         FILE_SPEC: "f",
         FORCE_SCAN: "s",
         IGNORE_DUPS: "i",
+        PORT: "p",
         RECORDS: "r",
         REMOVE_DUPS: "x",
         SUMMARY: "s",
         SYNC: "s",
+        WAIT: "w",
     }
 
 
+class ServiceDefaults:
+    """
+
+    Default address of the PDL service (serve/submit), and the service's access token:
+    generated per service instance, and written (owner-only) to
+    <TOKEN_DIR>/service_<port>.token for the client to send in the TOKEN_HEADER.
+
+    """
+    HOST = '127.0.0.1'
+    PORT = 8765
+    TOKEN_DIR = '~/.pdl'
+    TOKEN_HEADER = 'X-PDL-Token'
+
+
+class ProfileDefaults:
+    """
+
+    Profiling (--profile) modes and defaults
+
+    """
+    CPROFILE = 'cprofile'
+    SAMPLE = 'sample'
+    TOP = 30
+    INTERVAL_MS = 5.0
+    MEMORY_TOP = 10
+
+
+class BenchDefaults:
+    """
+
+    Defaults of the benchmark (bench) stand-in server and workload
+
+    """
+    TARGETS = ('download', 'faults')
+    ALL_FAULTS = 'all'
+    IMAGES = 200
+    IMAGE_KB = 500
+    PAGE_KB = 50
+    LATENCY_MS = 20.0
+    JITTER_MS = 10.0
+    BANDWIDTH_MBPS = 0.0
+    PAGE_ERRORS = 0.0
+    IMAGE_ERRORS = 0.0
+    RETRY_DELAY = 0.0
+    READ_TIMEOUT = 1.0
+    SEED = 500
+    FAULT_RATE = 0.3
+    STALL_S = 3.0
+    RETRY_AFTER = 1
+
+
 class CLIArgs:
     """
     The class parses the CLI arguments to determine what user actions are required.
@@ -130,13 +214,17 @@ class CLIArgs:
     """
     PURPOSE = "Image Download Utility"
     FLAGS = {
-        ArgSubmodules.GENERAL: [ArgOptions.DEBUG, ArgOptions.DRY_RUN],
+        ArgSubmodules.GENERAL: [ArgOptions.DEBUG, ArgOptions.DRY_RUN, ArgOptions.IMPORT_TIME,
+                                ArgOptions.MEMORY],
+        ArgSubmodules.BENCH: [ArgOptions.KEEP],
         ArgSubmodules.DATABASE: [ArgOptions.RECORDS, ArgOptions.SYNC,
                                  ArgOptions.DETAILS],
         ArgSubmodules.DOWNLOAD: [],
         ArgSubmodules.DUPLICATES: [ArgOptions.REMOVE_DUPS],
         ArgSubmodules.INFO: [],
+        ArgSubmodules.SERVE: [],
         ArgSubmodules.STATS: [],
+        ArgSubmodules.SUBMIT: [ArgOptions.WAIT],
     }
 
     def __init__(self, test_args_list: Optional[List[str]] = None) -> None:
@@ -145,11 +233,14 @@ class CLIArgs:
         self.subparsers = self.parser.add_subparsers(dest=ArgOptions.COMMAND)
 
         self._define_standard_args()
+        self._bench()
         self._downloads()
         self._database()
         self._duplicates()
         self._image_info()
+        self._serve()
         self._stats_()
+        self._submit()
 
         self.args = self.parse_args(test_args_list)
 
@@ -161,7 +252,7 @@ class CLIArgs:
 
         """
         modules = ArgSubmodules.get_const_values()
-        LOG.debug(f"Request for module names: {pprint.pformat(modules)}")
+        LOG.debug(lambda: f"Request for module names: {pprint.pformat(modules)}")
         return modules
 
     @staticmethod
@@ -212,6 +303,60 @@ class CLIArgs:
             help="Enable flag for dry-run. See what happens without taking action",
             action='store_true')
 
+        # IMPORT TIME REPORT
+        self.parser.add_argument(
+            f'--{ArgOptions.IMPORT_TIME}',
+            help="Report the time spent importing each module (similar to -X importtime)",
+            action='store_true')
+
+        # TRACE (Chrome trace_event JSON)
+        self.parser.add_argument(
+            f'--{ArgOptions.TRACE}',
+            metavar='FILE',
+            help="Record trace spans (per URL and stage) and write them to FILE, in the "
+                 "Chrome trace_event format (chrome://tracing, ui.perfetto.dev)")
+
+        # PROFILE (cProfile or sampling, written to the log directory)
+        profile = self.parser.add_mutually_exclusive_group()
+        profile.add_argument(
+            f'--{ArgOptions.PROFILE}',
+            dest=ArgOptions.PROFILE, action='store_const', const=ProfileDefaults.CPROFILE,
+            help="Profile the subcommand (cProfile) and write the profile (pstats) and a "
+                 "top-N report to the log directory")
+
+        profile.add_argument(
+            f'--{ArgOptions.PROFILE_SAMPLE}',
+            dest=ArgOptions.PROFILE, action='store_const', const=ProfileDefaults.SAMPLE,
+            help="Profile the subcommand by sampling the stacks (low overhead, for long "
+                 "download runs) and write the collapsed stacks and a top-N report to the "
+                 "log directory")
+
+        self.parser.add_argument(
+            f'--{ArgOptions.PROFILE_TOP}',
+            type=int, default=ProfileDefaults.TOP, metavar='N',
+            help=f"Number of functions in the profile report. "
+                 f"Default: {ProfileDefaults.TOP}")
+
+        self.parser.add_argument(
+            f'--{ArgOptions.PROFILE_INTERVAL}',
+            type=float, default=ProfileDefaults.INTERVAL_MS, metavar='MS',
+            help=f"Sampling interval (sample mode), in milliseconds. "
+                 f"Default: {ProfileDefaults.INTERVAL_MS}")
+
+        # MEMORY (tracemalloc, per pipeline stage)
+        self.parser.add_argument(
+            f'--{ArgOptions.MEMORY}',
+            help="Trace the memory allocations (tracemalloc), and log the memory and the top "
+                 "allocation sites of each stage (inventory unpickle, JSON ingest, inventory "
+                 "merge, download batch, report). Slows down the run",
+            action='store_true')
+
+        self.parser.add_argument(
+            f'--{ArgOptions.MEMORY_TOP}',
+            type=int, default=ProfileDefaults.MEMORY_TOP, metavar='N',
+            help=f"Number of allocation sites reported per stage. "
+                 f"Default: {ProfileDefaults.MEMORY_TOP}")
+
         # USER/APP CFG FILE
         self.parser.add_argument(
             self.get_shortcut(ArgOptions.CFG),
@@ -252,7 +397,8 @@ class CLIArgs:
         dl_args.add_argument(
             self.get_shortcut(ArgOptions.FILE),
             f'--{ArgOptions.FILE}',
-            help="Download PLAY file from a previous execution",
+            help=("Download PLAY file from a previous execution (or any file of URLs). "
+                  "Use '-' to read the URLs from stdin."),
             metavar="<DL_FILE>"
         )
 
@@ -333,7 +479,8 @@ class CLIArgs:
         dup_args.add_argument(
             self.get_shortcut(ArgOptions.REMOVE_DUPS),
             f'--{ArgOptions.REMOVE_DUPS}',
-            help="Remove duplicate for duplicate images",
+            help="Replace identical copies of images with links to a single copy "
+                 "(use with --dryrun to report the space that would be reclaimed)",
             action='store_true',
         )
 
@@ -353,6 +500,136 @@ class CLIArgs:
             help="Image Name to query",
             metavar="<IMAGE_NAME>")
 
+    def _service_address_args(self, parser: argparse.ArgumentParser) -> None:
+        """
+        Args for the address of the PDL service (shared by serve and submit)
+        :param parser: Subparser to add the args to
+        :return: None.
+        """
+        # SERVICE HOST
+        parser.add_argument(
+            f'--{ArgOptions.HOST}',
+            help=f"Service host (local interfaces only). Default: {ServiceDefaults.HOST}",
+            default=ServiceDefaults.HOST,
+            metavar="<HOST>")
+
+        # SERVICE PORT
+        parser.add_argument(
+            self.get_shortcut(ArgOptions.PORT),
+            f'--{ArgOptions.PORT}',
+            help=f"Service port. Default: {ServiceDefaults.PORT}",
+            default=ServiceDefaults.PORT,
+            type=int,
+            metavar="<PORT>")
+
+    def _bench(self) -> None:
+        """
+        Args associated with benchmarking against a local stand-in server
+        :param self: Automatically provided.
+        :return: None.
+        """
+        bench_args = self.subparsers.add_parser(
+            ArgSubmodules.BENCH,
+            help=("Benchmark against a local stand-in server (no network access), "
+                  "in a temporary workspace"))
+
+        # BENCHMARK
+        bench_args.add_argument(
+            ArgOptions.BENCH_TARGET, choices=BenchDefaults.TARGETS,
+            help=("Benchmark to run: 'download' = download_images() throughput, "
+                  "'faults' = retry behavior under injected faults (goodput, wasted time)"))
+
+        # WORKLOAD AND SERVER BEHAVIOR
+        options = [
+            (ArgOptions.IMAGES, int, BenchDefaults.IMAGES, "Number of images (URLs)"),
+            (ArgOptions.IMAGE_KB, int, BenchDefaults.IMAGE_KB, "Image size (KB)"),
+            (ArgOptions.PAGE_KB, int, BenchDefaults.PAGE_KB, "Display page size (KB)"),
+            (ArgOptions.LATENCY, float, BenchDefaults.LATENCY_MS,
+             "Server time to first byte (ms)"),
+            (ArgOptions.JITTER, float, BenchDefaults.JITTER_MS,
+             "Additional random server latency: 0..N (ms)"),
+            (ArgOptions.BANDWIDTH, float, BenchDefaults.BANDWIDTH_MBPS,
+             "Bandwidth per connection (MB/s, 0 = unlimited)"),
+            (ArgOptions.PAGE_ERRORS, float, BenchDefaults.PAGE_ERRORS,
+             "Fraction of display pages that fail (404)"),
+            (ArgOptions.IMAGE_ERRORS, float, BenchDefaults.IMAGE_ERRORS,
+             "Fraction of images that fail (503)"),
+            (ArgOptions.RETRY_DELAY, float, BenchDefaults.RETRY_DELAY,
+             "Delay between page/image download attempts (s)"),
+            (ArgOptions.READ_TIMEOUT, float, BenchDefaults.READ_TIMEOUT,
+             "HTTP read timeout (s)"),
+            (ArgOptions.FAULT_RATE, float, BenchDefaults.FAULT_RATE,
+             "faults: Fraction of the requests with the injected fault"),
+            (ArgOptions.STALL, float, BenchDefaults.STALL_S,
+             "faults: Duration of a stalled response (s)"),
+            (ArgOptions.RETRY_AFTER, int, BenchDefaults.RETRY_AFTER,
+             "faults: Retry-After of the 429/503 responses (s)"),
+            (ArgOptions.SEED, int, BenchDefaults.SEED, "Random seed (error mix, payloads)"),
+        ]
+        for option, option_type, default, help_text in options:
+            bench_args.add_argument(
+                f'--{option}', type=option_type, default=default,
+                help=f"{help_text}. Default: {default}")
+
+        # FAULT SCENARIO
+        bench_args.add_argument(
+            f'--{ArgOptions.FAULT}', default=BenchDefaults.ALL_FAULTS,
+            help=(f"faults: Fault to inject (reset, stall, throttle, unavailable, "
+                  f"truncated, error_page). Default: {BenchDefaults.ALL_FAULTS}"))
+
+        # KEEP THE WORKSPACE
+        bench_args.add_argument(
+            f'--{ArgOptions.KEEP}',
+            help="Keep the temporary workspace (downloads, logs, metrics) after the run",
+            action='store_true')
+
+    def _serve(self) -> None:
+        """
+        Args associated with running PDL as a service
+        :param self: Automatically provided.
+        :return: None.
+        """
+        serve_args = self.subparsers.add_parser(
+            ArgSubmodules.SERVE,
+            help=("Run as a service: keep the inventory and HTTP connections loaded, "
+                  "and download the URL batches submitted via 'submit'"))
+        self._service_address_args(serve_args)
+
+    def _submit(self) -> None:
+        """
+        Args associated with submitting URLs to the PDL service
+        :param self: Automatically provided.
+        :return: None.
+        """
+        submit_args = self.subparsers.add_parser(
+            ArgSubmodules.SUBMIT,
+            help="Submit URLs to download to a running PDL service (see 'serve')")
+
+        # URLS TO SUBMIT
+        submit_args.add_argument(
+            ArgOptions.URLS, nargs=argparse.REMAINDER,
+            help="List of URLs to download, should be last argument on the CLI",
+            metavar="<URLS>"
+        )
+
+        # FILE TO READ URLS
+        submit_args.add_argument(
+            self.get_shortcut(ArgOptions.FILE),
+            f'--{ArgOptions.FILE}',
+            help="Submit the URLs in the file. Use '-' to read the URLs from stdin.",
+            metavar="<DL_FILE>"
+        )
+
+        # WAIT FOR THE JOB TO COMPLETE
+        submit_args.add_argument(
+            self.get_shortcut(ArgOptions.WAIT),
+            f'--{ArgOptions.WAIT}',
+            help="Wait for the job to complete, and report the results",
+            action='store_true'
+        )
+
+        self._service_address_args(submit_args)
+
     def _stats_(self) -> None:
         """
         Args associated with collection stats
@@ -10,8 +10,8 @@
 
 import datetime
 import os
-import pprint
-from typing import List, Optional
+import sys
+from typing import Iterable, Iterator, List, Optional
 
 from PDL.configuration.cli.urls import UrlArgProcessing
 from PDL.logger.logger import Logger as Log
@@ -34,12 +34,13 @@ class UrlFile:
     URL_LIST_DELIM = 'CLI LIST'
     URL_DELIM = ' '
     EXTENSION = 'urls'
+    STDIN = '-'
 
-    def write_file(self, urls: List[str], location: str, filename: Optional[str] = None,
+    def write_file(self, urls: Iterable[str], location: str, filename: Optional[str] = None,
                    create_dir: bool = False) -> str:
         """
         Write the URL list to file. Human readable, but machine parse-able.
-        :param urls: (list) List of URLs to record
+        :param urls: (iterable) URLs to record
         :param location: (str) Location to store url file
         :param filename: (str) Name of file (use timestamp if none specified)
         :param create_dir: (bool) Create the location if it does not exist
@@ -48,54 +49,164 @@ class UrlFile:
         :return: (str) Name and path to file
 
         """
-        # Check if location exists, create if requested
-        if not utils.check_if_location_exists(
-                location=location, create_dir=create_dir):
-            return ''
-
-        # Create file name
-        if filename is None:
-            timestamp = datetime.datetime.now().strftime(self.TIMESTAMP)
-            filename = f'{timestamp}.{self.EXTENSION}'
-        filespec = os.path.abspath(os.path.join(location, filename))
-
-        # Write URLs to file
-        LOG.debug(f"Writing url input to file: {filespec}")
-        with open(filespec, 'w') as url_file:
-            url_file.write("URL LIST:\n")
-            for index, url in enumerate(urls):
-                url_file.write(f"{index + 1:>3}) {url}\n")
-            url_file.write(f"\n{self.URL_LIST_DELIM}:\n")
-            url_file.write(f"{self.URL_DELIM.join(urls)}\n")
-
-        LOG.info(f"Wrote urls to the input file: {filespec} --> ({len(urls)} urls)")
-
-        return filespec
+        with UrlFileWriter(location=location, filename=filename,
+                           create_dir=create_dir).open() as writer:
+            for url in urls:
+                writer.write_url(url)
+        return writer.filespec
 
     def read_file(self, filename: str) -> List[str]:
         """
         Read URL save file into list
-        :param filename: (str) path and name of file.
+        :param filename: (str) path and name of file ('-' = stdin).
 
         :return: (list) List of URLs
 
         """
-        # Check if file exists, return empty list if it does not.
+        url_list = list(self.iter_file(filename))
+        LOG.debug(f"URLs Found in File: {len(url_list)}")
+        return url_list
+
+    def iter_file(self, filename: str) -> Iterator[str]:
+        """
+        Lazily read the URLs from a URL save file (or any file/stream of URLs), one line
+        at a time, so large URL dumps are not read into memory.
+        :param filename: (str) path and name of file ('-' = stdin).
+
+        :return: (iterator) URLs, in file order
+
+        """
+        if filename == self.STDIN:
+            LOG.info('Reading urls from stdin')
+            yield from self._iter_lines(sys.stdin)
+            return
+
+        # Check if file exists, nothing to read if it does not.
         if not os.path.exists(os.path.abspath(filename)):
             LOG.error(f"Unable to find input file: {filename}")
-            return list()
+            return
 
-        # Read file
         LOG.info(f'Reading url file: {filename}')
         with open(filename, "r") as url_file:
-            lines = url_file.readlines()
+            yield from self._iter_lines(url_file)
 
-        # Split file entry into list
-        url_list = list()
+    def _iter_lines(self, lines: Iterator[str]) -> Iterator[str]:
+        """
+        Split each line that starts with a URL into URLs.
+        :param lines: (iterator) Lines of text
+
+        :return: (iterator) URLs
+
+        """
         for line in lines:
             if line.strip().startswith(UrlArgProcessing.PROTOCOL):
-                url_list.extend([x.strip() for x in line.split(self.URL_DELIM)])
+                for url in line.split(self.URL_DELIM):
+                    url = url.strip()
+                    if url:
+                        yield url
 
-        urls = pprint.pformat(url_list)
-        LOG.debug(f"URLs Found in File:\n{urls}")
-        return url_list
+
+class UrlFileWriter:
+    """
+
+    Writes a URL file (see UrlFile.write_file) one URL at a time, as the URLs are
+    accepted: the indexed list is written as the URLs arrive, and the space-delimited
+    list is appended when the writer is closed (read back from the indexed list, so the
+    URLs are not kept in memory).
+
+    The file is created when the first URL is written (or the writer is opened).
+
+    """
+    LIST_HEADER = 'URL LIST'
+
+    def __init__(self, location: str, filename: Optional[str] = None,
+                 create_dir: bool = False) -> None:
+        """
+        :param location: (str) Location to store url file
+        :param filename: (str) Name of file (use timestamp if none specified)
+        :param create_dir: (bool) Create the location if it does not exist
+                                  (default = False)
+
+        """
+        self.location = location
+        self.filename = filename
+        self.create_dir = create_dir
+        self.filespec = ''
+        self.count = 0
+        self._file = None
+        self._unavailable = False
+
+    def __enter__(self) -> "UrlFileWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def open(self) -> "UrlFileWriter":
+        """
+        Create the file, and write the header of the indexed list.
+
+        :return: self (filespec is '' if the location does not exist)
+
+        """
+        if self._file is not None or self._unavailable:
+            return self
+
+        # Check if location exists, create if requested
+        if not utils.check_if_location_exists(
+                location=self.location, create_dir=self.create_dir):
+            self._unavailable = True
+            return self
+
+        # Create file name
+        filename = self.filename
+        if filename is None:
+            timestamp = datetime.datetime.now().strftime(UrlFile.TIMESTAMP)
+            filename = f'{timestamp}.{UrlFile.EXTENSION}'
+        self.filespec = os.path.abspath(os.path.join(self.location, filename))
+
+        LOG.debug(f"Writing url input to file: {self.filespec}")
+        self._file = open(self.filespec, 'w')
+        self._file.write(f"{self.LIST_HEADER}:\n")
+        return self
+
+    def write_url(self, url: str) -> None:
+        """
+        Add a URL to the indexed list (flushed, so the file is current if the run stops).
+
+        :param url: (str) URL to record
+
+        :return: None
+
+        """
+        if self._file is None:
+            self.open()
+            if self._file is None:
+                return
+
+        self.count += 1
+        self._file.write(f"{self.count:>3}) {url}\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        """
+        Append the space-delimited list of the URLs, and close the file.
+
+        :return: None
+
+        """
+        if self._file is None:
+            return
+
+        self._file.write(f"\n{UrlFile.URL_LIST_DELIM}:\n")
+        self._file.flush()
+        with open(self.filespec, 'r') as indexed_list:
+            next(indexed_list)
+            for index, line in zip(range(self.count), indexed_list):
+                url = line.rstrip('\n').split(') ', 1)[1]
+                self._file.write(url if index == 0 else f"{UrlFile.URL_DELIM}{url}")
+        self._file.write("\n")
+        self._file.close()
+        self._file = None
+
+        LOG.info(f"Wrote urls to the input file: {self.filespec} --> ({self.count} urls)")
@@ -7,7 +7,9 @@
 
 """
 
-from typing import Dict, List, Optional
+from collections import Counter
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 import PDL.logger.logger as pdl_log
 
@@ -34,29 +36,24 @@ class UrlArgProcessing:
 
     @classmethod
     def process_url_list(
-            cls, url_list: List[str], domains: Optional[List[str]] = None) -> List[str]:
+            cls, url_list: Iterable[str], domains: Optional[List[str]] = None,
+            key: Optional[Callable[[str], str]] = None) -> List[str]:
 
         """
         Split any combined URLs, verify all URLs are valid, and remove any duplicates
+        (single pass, see UrlSanitizer).
 
-        :param url_list: List of URLs to process
+        :param url_list: List (or iterable) of URLs to process
         :param domains: List of possible domains URLs should contain
+        :param key: Routine that maps a URL to its dedup key (default: photo_key)
 
-        :return: List of valid, unique URLs
+        :return: List of valid, unique URLs (in input order)
 
         """
-        LOG.info(f"Number of entries (URLs) in list: {len(url_list)}")
-
-        domains = domains or list()
-
-        # Split and validate URLs (concatenated and/or invalid URLs), and check
-        # for the correct domains in the host portion of the URL
-        urls = UrlArgProcessing.split_urls(url_list, domains=domains)
-
-        # Remove duplicates
-        url_dict = UrlArgProcessing.reduce_url_list(urls)
-
-        return url_dict[cls.REDUCED_LIST]
+        sanitizer = UrlSanitizer(domains=domains, key=key)
+        urls = list(sanitizer.sanitize(url_list))
+        sanitizer.log_summary()
+        return urls
 
     @classmethod
     def reduce_url_list(cls, url_list: List[str]) -> Dict[str, List[str]]:
@@ -69,11 +66,12 @@ class UrlArgProcessing:
             * unique_dup_list: List of all unique duplicates
 
         """
-        reduced_list = list(set(url_list))
-        total_dups = [url for n, url in enumerate(url_list) if
-                      url in url_list[:n]]
-        unique_counts = UrlArgProcessing.counts_of_each_dup(total_dups)
-        unique_dups = unique_counts.keys()
+        # Single pass tally (Counter preserves the order of first occurrence)
+        counts = Counter(url_list)
+        reduced_list = list(counts.keys())
+        total_dups = [url for url, count in counts.items() for _ in range(count - 1)]
+        unique_counts = {url: count for url, count in counts.items() if count > 1}
+        unique_dups = list(unique_counts.keys())
 
         # TODO: Turn this stats output into a table and log
         LOG.info(f"Number of URLs in list: {len(url_list)}")
@@ -100,7 +98,7 @@ class UrlArgProcessing:
         :return: dictionary of tallied urls (k: unique_urls, v: count)
 
         """
-        return {url: duplicates.count(url) for url in list(set(duplicates))}
+        return dict(Counter(duplicates))
 
     @classmethod
     def split_urls(cls, url_list: List[str], domains: Optional[List[str]] = None,
@@ -116,36 +114,17 @@ class UrlArgProcessing:
         :return: List of valid URLs
 
         """
-        # Concatenate all entries into a space-delimited string
-        num_urls_init = len(url_list)
-        url_concat = ' '.join(url_list)
         domains = domains or list()
-
-        # Split on delimiter (Catches concatenated http entries)
-        # Rejoin with space delimiter (concatenated entries are now separate)
-        url_temp = f' {delimiter}'.join(url_concat.split(delimiter))
-        if url_concat != url_temp:
-            msg = f"Concatenated URL Found (Delimiter: {delimiter}) - Fixed"
-            LOG.debug(msg)
-
-        # Ignore '' urls, they are not valid, and the splitting generates a ''
-        # at the front of each element in a split list.
-        url_temp_list = [url for url in url_temp.split(' ') if url != '']
-
-        diff = len(url_temp_list) - num_urls_init
-
-        # If url = '' are found, they are removed, but skew the count.
-        diff = 0 if diff < 0 else diff
-        LOG.info(f"Number of concatenations: {diff}")
+        sanitizer = UrlSanitizer(domains=domains, delimiter=delimiter)
 
         # Check the validity of all existing URLs and classify based on validity
         urls = {cls.VALID: list(),
                 cls.INVALID: list()}
 
-        for url in url_temp_list:
-            urls[UrlArgProcessing.validate_url(
-                url, domains=domains)].append(url)
+        for url in sanitizer.split(url_list):
+            urls[sanitizer.is_valid(url)].append(url)
 
+        LOG.info(f"Number of concatenations: {sanitizer.concatenations}")
         LOG.info(f"Number of VALID URLs in list: {len(urls[cls.VALID])}")
         LOG.info(f"Number of INVALID URLs in list: {len(urls[cls.INVALID])}")
 
@@ -164,35 +143,7 @@ class UrlArgProcessing:
         :return: Boolean; True = Valid URL
 
         """
-        domains = domains or list()
-
-        LOG.debug(f'Checking for domains: {domains}')
-
-        valid = (url.lower().startswith(protocol.lower()) and
-                 url.lower() != protocol.lower())
-
-        if not valid:
-            msg = (f"Invalid URL: '{url.lower()}'. "
-                   f"Did not match expected protocol(s): '{protocol.lower()}'")
-            LOG.warn(msg)
-
-        # Filter out 'None' domains... it is an invalid domain.
-        domains = [x for x in domains if x is not None]
-
-        if domains and valid:
-            if any(x.lower() in url.lower() for x in domains):
-                valid = True
-                LOG.debug('Matching domain found.')
-            else:
-                valid = False
-                msg = ("Invalid URL: '{0}'. "
-                       "Did not match expected domains: '{1}'")
-                LOG.warn(msg.format(url.lower(), ', '.join(domains)))
-
-        url_status = "VALID" if valid else "INVALID"
-        LOG.debug(f"{url_status}: URL='{url}'")
-
-        return valid
+        return build_url_validator(domains=domains, protocol=protocol)(url)
 
     @classmethod
     def list_urls(cls, url_list: List[str]) -> str:
@@ -208,3 +159,197 @@ class UrlArgProcessing:
         url_list = [fmt.format(ctr=index + 1, url=url) for index, url
                     in enumerate(url_list)]
         return '\n'.join(url_list)
+
+
+# Host name prefixes that are aliases of the bare domain (e.g. - web.500px.com -> 500px.com)
+HOST_ALIASES = ('web.', 'www.')
+
+# URL parts: host (without alias prefix, user info or port) and path (no query or fragment)
+URL_PATTERN = re.compile(
+    r'^\s*(?:\w+:)?//(?:[^@/?#]*@)?(?:{aliases})?(?P<host>[^/?#:]*)(?::\d*)?(?P<path>[^?#]*)'.format(
+        aliases='|'.join(re.escape(alias) for alias in HOST_ALIASES)), re.IGNORECASE)
+
+# Photo id in the URL path: e.g. - /photo/123456789/title-of-image
+PHOTO_ID_PATTERN = re.compile(r'/photos?/(?P<id>\d+)(?:/|$)', re.IGNORECASE)
+
+
+def _split_url(url: str) -> (str, str):
+    """
+    Split the URL into the canonical (lower case, no alias prefix) host and the path.
+
+    :param url: URL
+
+    :return: Tuple of (host, path)
+
+    """
+    match = URL_PATTERN.match(url)
+    if match is None:
+        return '', url.strip()
+    return match.group('host').lower(), match.group('path')
+
+
+def canonical_url(url: str) -> str:
+    """
+    Canonical form of a URL: https, lower-case host without alias prefixes, no
+    query string, fragment, or trailing slash.
+
+    :param url: URL
+
+    :return: Canonical URL
+
+    """
+    host, path = _split_url(url)
+    return f"https://{host}{path.rstrip('/')}"
+
+
+def photo_key(url: str) -> str:
+    """
+    Dedup key for a photo page URL. All variants of a photo page URL (domain aliases,
+    tracking query strings, trailing slashes, title slugs) map to the same key.
+
+    :param url: Photo page URL
+
+    :return: '<domain>/photo/<photo id>' or, if the URL does not contain a
+        photo id, the canonical URL.
+
+    """
+    host, path = _split_url(url)
+    match = PHOTO_ID_PATTERN.search(path)
+    if match is None:
+        return f"https://{host}{path.rstrip('/')}"
+    return f"{host}/photo/{match.group('id')}"
+
+
+def build_url_validator(domains: Optional[List[str]] = None,
+                        protocol: str = UrlArgProcessing.PROTOCOL) -> Callable[[str], bool]:
+    """
+    Build a URL validation routine. The protocol and domains are lower-cased once (rather
+    than per URL), and each URL is lower-cased once.
+
+    :param domains: List of expected/required domains in URL (None domains are ignored)
+    :param protocol: protocol prefix for URL
+
+    :return: Callable(url) that returns True if the URL is valid.
+
+    """
+    protocol = protocol.lower()
+    domains = [domain for domain in (domains or list()) if domain is not None]
+    lower_domains = tuple(domain.lower() for domain in domains)
+
+    def validate(url: str) -> bool:
+        lower_url = url.lower()
+
+        if not lower_url.startswith(protocol) or lower_url == protocol:
+            LOG.warn(f"Invalid URL: '{lower_url}'. "
+                     f"Did not match expected protocol(s): '{protocol}'")
+            return UrlArgProcessing.INVALID
+
+        if lower_domains and not any(domain in lower_url for domain in lower_domains):
+            LOG.warn(f"Invalid URL: '{lower_url}'. "
+                     f"Did not match expected domains: '{', '.join(domains)}'")
+            return UrlArgProcessing.INVALID
+
+        return UrlArgProcessing.VALID
+
+    return validate
+
+
+class UrlSanitizer:
+    """
+    Single-pass, streaming URL sanitizer: splits concatenated URLs, drops invalid URLs
+    and drops duplicates (by canonical photo key, so aliases of a photo are duplicates),
+    yielding the remaining URLs in input order. Statistics are
+    accumulated as the URLs are consumed (see log_summary()).
+
+    """
+    MAX_DUPS_LISTED = 50
+
+    def __init__(self, domains: Optional[List[str]] = None,
+                 protocol: str = UrlArgProcessing.PROTOCOL,
+                 delimiter: str = UrlArgProcessing.PROTOCOL,
+                 key: Optional[Callable[[str], str]] = None) -> None:
+        """
+        :param domains: List of expected/required domains in URL
+        :param protocol: protocol prefix for URL
+        :param delimiter: Delimiter that indicates the start of a URL (concatenated URLs)
+        :param key: Routine that maps a URL to its dedup key (default: photo_key), so
+            aliases of the same photo are duplicates.
+
+        """
+        self.delimiter = delimiter
+        self.key = key or photo_key
+        self.is_valid = build_url_validator(domains=domains, protocol=protocol)
+
+        self.entries = 0
+        self.concatenations = 0
+        self.valid = 0
+        self.invalid = 0
+        self.duplicates = Counter()
+        self.aliases = 0
+        self._seen = dict()
+
+    def split(self, entries: Iterable[str]) -> Iterator[str]:
+        """
+        Split each entry into URLs (whitespace separated, or concatenated URLs).
+
+        :param entries: Iterable of strings (e.g. - CLI args or lines from a file)
+
+        :return: Iterator of (unvalidated) URLs
+
+        """
+        spaced_delimiter = f' {self.delimiter}'
+        for entry in entries:
+            self.entries += 1
+            urls = entry.replace(self.delimiter, spaced_delimiter).split()
+            if len(urls) > 1:
+                self.concatenations += len(urls) - 1
+            yield from urls
+
+    def sanitize(self, entries: Iterable[str]) -> Iterator[str]:
+        """
+        Split, validate, and remove duplicate URLs.
+
+        :param entries: Iterable of strings (e.g. - CLI args or lines from a file)
+
+        :return: Iterator of valid, unique URLs (in input order)
+
+        """
+        seen = self._seen
+        for url in self.split(entries):
+            key = self.key(url)
+            if key in seen:
+                self.duplicates[seen[key]] += 1
+                if url != seen[key]:
+                    self.aliases += 1
+                continue
+
+            if not self.is_valid(url):
+                self.invalid += 1
+                continue
+
+            self.valid += 1
+            seen[key] = url
+            yield url
+
+    def log_summary(self) -> None:
+        """
+        Log the statistics for the URLs processed.
+
+        :return: None
+
+        """
+        LOG.info(f"Number of entries (URLs) in list: {self.entries}")
+        LOG.info(f"Number of concatenations: {self.concatenations}")
+        LOG.info(f"Number of VALID URLs in list: {self.valid + sum(self.duplicates.values())}")
+        LOG.info(f"Number of INVALID URLs in list: {self.invalid}")
+        LOG.info(f"Number of Unique URLs:  {self.valid}")
+        LOG.info(f"Number of Duplicates:   {sum(self.duplicates.values())}")
+        LOG.info(f"Number of Unique Duplicates:  {len(self.duplicates)}")
+        LOG.info(f"Number of Aliases (same photo, different URL):  {self.aliases}")
+
+        # Log counts of the most common duplicate URLs (as a single message; a log call
+        # per duplicate dominates the run time for large URL dumps)
+        if self.duplicates:
+            dups = "\n".join(f"DUP: {url}: Count:  {count + 1}" for url, count in
+                             self.duplicates.most_common(self.MAX_DUPS_LISTED))
+            LOG.debug(f"Count of Each Unique Duplicate (top {self.MAX_DUPS_LISTED}):\n{dups}")
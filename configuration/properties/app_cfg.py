@@ -52,9 +52,13 @@ class AppCfgFileSectionKeys:
     LOG_DIRECTORY = 'log_directory'
     LOG_DRIVE_LETTER = 'log_drive_letter'
     LOG_LEVEL = 'log_level'
+    LOG_QUEUE_OVERFLOW = 'log_queue_overflow'
+    LOG_QUEUE_SIZE = 'log_queue_size'
+    METRICS_TEXTFILE_DIR = 'metrics_textfile_dir'
     NAME = 'name'
     PORT = 'port'
     PREFIX = 'prefix'
+    REPORT_FORMAT = 'report_format'
     SIMULTANEOUS_DLS = 'simultaneous_dls'
     STORAGE_DRIVE_LETTER = 'storage_drive_letter'
     STORAGE_DIR = 'storage_dir'
@@ -177,8 +181,7 @@ class AppConfig(ConfigParser):
         """
         if self.has_section(section=section):
             options = self.options(section)
-            LOG.debug("Options for {section}:\n{option_list}".format(
-                section=section, option_list=[f"\t{opt}\n" for opt in options]))
+            LOG.debug("Options for %s:\n%s", section, [f"\t{opt}\n" for opt in options])
             return options
 
         raise ConfigSectionDoesNotExist(section=section, cfg_file=self.cfg_file)
@@ -0,0 +1,133 @@
+"""
+    Shared HTTP session for the download engines.
+
+    A single requests.Session keeps the connection pools (and TLS sessions) to each
+    host warm, so consecutive page and image requests (and, when running as a
+    service, consecutive jobs) do not pay for a new connection/handshake per request.
+
+    Requests are bounded by connect/read timeouts (a stalled server fails the attempt
+    instead of blocking the download forever), and the retry logic of the download
+    engines can honor the server's Retry-After header (retry_after()).
+
+"""
+import datetime
+import email.utils
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from PDL.logger.logger import Logger
+
+LOG = Logger()
+
+
+class PoolSettings:
+    """
+    Connection pool sizing (per host, per protocol)
+    """
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 10
+    PROTOCOLS = ('http://', 'https://')
+
+
+class Timeouts:
+    """
+    Request timeouts (seconds). The read timeout applies to each read from the socket
+    (time without receiving data), not to the complete transfer.
+    """
+    CONNECT = 10.0
+    READ = 30.0
+
+
+class RetryPolicy:
+    """
+    Responses worth retrying (transient server conditions), and the longest
+    Retry-After delay honored (seconds)
+    """
+    RETRY_STATUS_CODES = (408, 429, 502, 503, 504)
+    MAX_RETRY_AFTER = 60.0
+
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Get the shared session (created on first use).
+
+    :return: requests.Session
+
+    """
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=PoolSettings.POOL_CONNECTIONS,
+                                      pool_maxsize=PoolSettings.POOL_MAXSIZE)
+                for protocol in PoolSettings.PROTOCOLS:
+                    session.mount(protocol, adapter)
+                _SESSION = session
+                LOG.debug("Created shared HTTP session.")
+    return _SESSION
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """
+    HTTP GET via the shared session (same arguments as requests.get()).
+
+    :param url: URL to retrieve
+    :param kwargs: Keyword arguments passed to requests.Session.get()
+                   (DEFAULT timeout: (Timeouts.CONNECT, Timeouts.READ))
+
+    :return: requests.Response
+
+    """
+    kwargs.setdefault('timeout', (Timeouts.CONNECT, Timeouts.READ))
+    return get_session().get(url, **kwargs)
+
+
+def retry_after(response: requests.Response) -> Optional[float]:
+    """
+    Delay requested by the server before retrying (Retry-After: seconds or HTTP date),
+    limited to RetryPolicy.MAX_RETRY_AFTER.
+
+    :param response: HTTP response (e.g. - 429 or 503)
+
+    :return: Delay in seconds, or None if the server did not request a delay
+
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            retry_time = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_time.tzinfo is None:
+            retry_time = retry_time.replace(tzinfo=datetime.timezone.utc)
+        delay = (retry_time - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+
+    return min(max(delay, 0.0), RetryPolicy.MAX_RETRY_AFTER)
+
+
+def close_session() -> None:
+    """
+    Close the shared session (and its pooled connections).
+
+    :return: None
+
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is not None:
+            _SESSION.close()
+            _SESSION = None
+            LOG.debug("Closed shared HTTP session.")
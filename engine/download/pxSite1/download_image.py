@@ -10,21 +10,44 @@ import os
 import re
 import shutil
 import time
+import urllib.error
 from typing import Optional
 
 import requests
+import urllib3
 import wget
 
+from PDL.engine.download import http_session
 from PDL.engine.download.download_base import DownloadImage
 from PDL.engine.images.image_info import ImageData
 from PDL.engine.images.status import (
     DownloadStatus as Status,
     ImageDataModificationStatus as ModStatus)
+from PDL.engine.metrics.pdl_metrics import MetricLabels, PdlMetrics
+from PDL.engine.timer.tracing import span
 from PDL.logger.logger import Logger
 
 LOG = Logger()
 
 
+class TimedWriter:
+    """
+    Output file wrapper: records the time spent in, and the bytes passed to, write().
+    (Separates the disk writes from the network reads when copying a response stream.)
+    """
+    def __init__(self, output_file) -> None:
+        self.output_file = output_file
+        self.elapsed = 0.0
+        self.bytes_written = 0
+
+    def write(self, data: bytes) -> int:
+        start = time.perf_counter()
+        written = self.output_file.write(data)
+        self.elapsed += time.perf_counter() - start
+        self.bytes_written += len(data)
+        return written
+
+
 class DownloadPX(DownloadImage):
     """
     Used for DL'ing images from PX site. Scrapes metadata from contact sheet,
@@ -41,6 +64,10 @@ class DownloadPX(DownloadImage):
     RETRY_DELAY = 5    # in seconds
     MAX_ATTEMPTS = 5   # Number of attempts to download
 
+    # Failures while streaming the image to the file (reset, read timeout, truncated body)
+    TRANSFER_ERRORS = (requests.exceptions.RequestException, urllib3.exceptions.HTTPError,
+                       OSError)
+
     def __init__(self, image_url: str, dl_dir: str, url_split_token: str = None,
                  image_info: ImageData = None, use_wget: bool = False,
                  test: bool = False) -> None:
@@ -66,6 +93,10 @@ class DownloadPX(DownloadImage):
         self.dl_file_spec = None
         self._status = Status.NOT_SET
 
+        # Retry control (set by each attempt)
+        self.retryable = True
+        self._retry_after = None
+
         self.parse_image_info()
 
 
@@ -84,6 +115,17 @@ class DownloadPX(DownloadImage):
         self._status = new_status
         self.image_info.dl_status = new_status
 
+    @property
+    def retry_delay(self) -> float:
+        """
+        Delay before the next attempt: RETRY_DELAY, or the server's Retry-After
+        (429/503 response) if longer.
+
+        :return: (float) delay in seconds
+
+        """
+        return max(self.RETRY_DELAY, self._retry_after or 0)
+
     def parse_image_info(self) -> None:
         """
         Scrape and store relevant storage information required for the download.
@@ -130,19 +172,22 @@ class DownloadPX(DownloadImage):
         # If image is PENDING and DNE
         if not exists and self.status == Status.PENDING and self.image_name != '':
 
-            # Try to DL
+            # Try to DL (until DL'd, out of attempts, or the failure is not transient)
             while (attempts < self.MAX_ATTEMPTS and
-                   self.status != Status.DOWNLOADED):
+                   self.status != Status.DOWNLOADED and self.retryable):
                 attempts += 1
 
                 LOG.debug(f"({attempts}/{self.MAX_ATTEMPTS}): Attempting to DL '{self.image_url}'")
 
                 # DL the image
-                self.status = self._dl_via_wget() if self.use_wget else self._dl_via_requests()
+                with span('download', url=self.image_url, attempt=attempts):
+                    self.status = (self._dl_via_wget() if self.use_wget else
+                                   self._dl_via_requests())
 
-                # Wait a little bit if the image was not DL'd.
-                if self.status != Status.DOWNLOADED:
-                    time.sleep(self.RETRY_DELAY)
+                # Wait a little bit if the image was not DL'd (and will be retried).
+                if (self.status != Status.DOWNLOADED and self.retryable and
+                        attempts < self.MAX_ATTEMPTS):
+                    time.sleep(self.retry_delay)
 
             # Adjust image status metadata if DL'd
             if self.status == Status.DOWNLOADED:
@@ -300,7 +345,8 @@ class DownloadPX(DownloadImage):
 
     def _dl_via_wget(self) -> str:
         """
-        Download the image via wget.
+        Download the image via wget (a single attempt: download_image() retries
+        the attempts that failed with a transient error).
 
         Currently having issues with certificates. Page changed process, and
         wget cannot validate the certificate. Wget does not have a method to
@@ -311,64 +357,43 @@ class DownloadPX(DownloadImage):
         :return: status (refer to PDL.engine.images.status)
 
         """
-        # Messages
-        retry_msg = f"Issue Retrieving File. Retrying in {self.RETRY_DELAY} seconds"
-        conn_err_fmt = ("Attempt {attempts} of {max}: Connection Error --> "
-                        "Trying again in {delay} seconds")
-
-        if self.use_wget:
-            attempts = 0
-
-            # Download image via wget.download()
-            while (attempts < self.MAX_ATTEMPTS and
-                   self.status != Status.DOWNLOADED):
-
-                attempts += 1
-                try:
-                    filename = wget.download(
-                        url=self.image_url, out=self.dl_file_spec)
-                    self.status = Status.DOWNLOADED
-
-                # Connection failed, wait and try again
-                except requests.exceptions.ConnectionError:
-                    self.status = Status.PENDING
-
-                    conn_err_msg = conn_err_fmt.format(
-                        attempts=attempts, delay=self.RETRY_DELAY,
-                        max=self.MAX_ATTEMPTS)
-
-                    LOG.error(conn_err_msg)
-                    time.sleep(self.RETRY_DELAY)
-
-                # Download successful, but check the file size. Error pages will
-                # be marked as a successful download, but aren't a success.
-                # Delete the file and try again.
-                else:
-                    if not self.test:
-                        file_size = os.path.getsize(filename)
-
-                        if file_size < self.MIN_KB * self.KILOBYTES:
-                            self.status = Status.ERROR
-                            error_msg = f"Incorrect filesize: {file_size}"
-                            self.image_info.error_info = error_msg
-                            LOG.warn(error_msg)
-                            LOG.warn(retry_msg)
-                            os.remove(filename)
-
-                            time.sleep(self.RETRY_DELAY)
-
-            # If out of the attempts loop and unable download: all attempts were
-            # connection failures, mark the download as a failure.
-            if self.status != Status.DOWNLOADED:
-                self.status = Status.ERROR
-                self.image_info.error_info = (
-                    "All attempts to download were connection failures.")
-
         # The wget download is not working, so it is an automatic failure.
-        else:
+        if not self.use_wget:
             self.status = Status.ERROR
             self.image_info.error_info = "Used wget but wget has SSL issues."
+            self.retryable = False
+            return self.status
+
+        # Download image via wget.download() (urllib)
+        self._retry_after = None
+        try:
+            filename = wget.download(url=self.image_url, out=self.dl_file_spec)
+
+        # HTTP error status. Transient (e.g. - 429/503): wait as requested by the server.
+        # Other client errors (e.g. - 404) will not succeed on a retry.
+        except urllib.error.HTTPError as exc:
+            if exc.code in http_session.RetryPolicy.RETRY_STATUS_CODES:
+                self._retry_after = http_session.retry_after(exc)
+            elif 400 <= exc.code < 500:
+                self.retryable = False
+            return self._failed_attempt(
+                f"Unable to DL '{self.image_url}': HTTP {exc.code} ({exc.reason})")
+
+        # Connection refused/reset, timeout or truncated body (URLError, socket errors)
+        except OSError as exc:
+            return self._failed_attempt(f"Unable to DL '{self.image_url}': {exc!r}")
+
+        # Download successful, but check the file size. Error pages will
+        # be marked as a successful download, but aren't a success.
+        # Delete the file and try again.
+        if not self.test:
+            file_size = os.path.getsize(filename)
+            if file_size < self.MIN_KB * self.KILOBYTES:
+                os.remove(filename)
+                return self._failed_attempt(f"Incorrect filesize: {file_size}")
 
+        self.status = Status.DOWNLOADED
+        self.image_info.error_info = None
         return self.status
 
     def _dl_via_requests(self) -> str:
@@ -379,7 +404,16 @@ class DownloadPX(DownloadImage):
 
         """
         # Download the image
-        image = requests.get(self.image_url, stream=True)
+        transfer_start = time.perf_counter()
+        write_time = 0.0
+        self._retry_after = None
+        try:
+            with span('request', url=self.image_url):
+                image = http_session.get(self.image_url, stream=True)
+
+        # Connection refused/reset, connect or read timeout: try again
+        except requests.exceptions.RequestException as exc:
+            return self._failed_attempt(f"Unable to DL '{self.image_url}': {exc!r}")
 
         status_msg = (f"File: {self.dl_file_spec} --> "
                       f"DL STATUS CODE: {image.status_code}")
@@ -389,11 +423,29 @@ class DownloadPX(DownloadImage):
             LOG.debug(status_msg)
 
             # Transfer binary contents to a file (dl_filespec)
-            with open(self.dl_file_spec, 'wb') as output_file:
-                image.raw.decode_content = True
-                shutil.copyfileobj(image.raw, output_file)
-                self.status = Status.DOWNLOADED
-                self.image_info.error_info = None
+            writer = TimedWriter(output_file=None)
+            try:
+                self._write_image(image, writer)
+
+            # The transfer failed part-way (reset, stalled, truncated body)
+            except self.TRANSFER_ERRORS as exc:
+                self._remove_partial_file()
+                self._failed_attempt(f"Transfer to {self.dl_file_spec} failed after "
+                                     f"{writer.bytes_written} bytes: {exc!r}")
+
+            else:
+                # Error pages (or truncated files) are not images: delete the file, try again.
+                error_msg = self._check_image_size(image, writer.bytes_written)
+                if error_msg is None:
+                    self.status = Status.DOWNLOADED
+                    self.image_info.error_info = None
+                else:
+                    self._remove_partial_file()
+                    self._failed_attempt(error_msg)
+
+            write_time = writer.elapsed
+            PdlMetrics.FILE_WRITE.observe(write_time)
+            PdlMetrics.BYTES.inc(writer.bytes_written, type=MetricLabels.IMAGE)
 
         # Any status other than 200 is an error...
         else:
@@ -401,5 +453,87 @@ class DownloadPX(DownloadImage):
             self.status = Status.ERROR
             self.image_info.error_info = status_msg
 
+            # Transient (e.g. - 429/503): wait as requested by the server. Other client
+            # errors (e.g. - 404) will not succeed on a retry.
+            if image.status_code in http_session.RetryPolicy.RETRY_STATUS_CODES:
+                self._retry_after = http_session.retry_after(image)
+            elif 400 <= image.status_code < 500:
+                self.retryable = False
+
+        # Release the connection back to the shared session's pool
+        image.close()
+        PdlMetrics.IMAGE_TRANSFER.observe(time.perf_counter() - transfer_start - write_time)
+
         # Return result of DL
         return self.status
+
+    def _write_image(self, image: requests.Response, writer: TimedWriter) -> None:
+        """
+        Stream the image (response body) into the download file.
+
+        :param image: Response (streamed)
+        :param writer: TimedWriter (records the bytes written, and the time spent writing,
+                       even if the transfer fails part-way)
+
+        :return: None
+
+        """
+        with span('write_file', file=self.dl_file_spec) as write_span, \
+                open(self.dl_file_spec, 'wb') as output_file:
+            image.raw.decode_content = True
+            writer.output_file = output_file
+            shutil.copyfileobj(image.raw, writer)
+
+        # The image is streamed: the span includes the network reads
+        if write_span is not None:
+            write_span.args.update(bytes=writer.bytes_written, write_s=writer.elapsed)
+
+    def _check_image_size(self, image: requests.Response, file_size: int) -> Optional[str]:
+        """
+        Verify the downloaded file is a complete image: the size announced by the server
+        (Content-Length, if the body was not encoded) was received, and the file is not
+        too small to be an image (error page).
+
+        :param image: Response
+        :param file_size: Bytes written to the file
+
+        :return: (str) error message, or None if the file is valid
+
+        """
+        expected = image.headers.get('Content-Length')
+        if (expected is not None and expected.isdigit() and int(expected) != file_size and
+                'Content-Encoding' not in image.headers):
+            return f"Truncated file: received {file_size} of {expected} bytes"
+
+        if file_size < self.MIN_KB * self.KILOBYTES:
+            return f"Incorrect filesize: {file_size}"
+
+        return None
+
+    def _failed_attempt(self, error_msg: str) -> str:
+        """
+        Record a failed (retryable) download attempt.
+
+        :param error_msg: Description of the failure
+
+        :return: status (refer to PDL.engine.images.status)
+
+        """
+        LOG.warn(error_msg)
+        self.status = Status.ERROR
+        self.image_info.error_info = error_msg
+        return self.status
+
+    def _remove_partial_file(self) -> None:
+        """
+        Delete the (incomplete) download file, if it was created.
+
+        :return: None
+
+        """
+        try:
+            os.remove(self.dl_file_spec)
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            LOG.warn(f"Unable to remove incomplete file '{self.dl_file_spec}': {exc}")
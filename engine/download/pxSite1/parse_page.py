@@ -22,9 +22,12 @@ import unicodedata
 import requests
 from six.moves.urllib.parse import quote
 
+from PDL.engine.download import http_session
 from PDL.engine.images.image_info import ImageData
 from PDL.engine.images.page_base import CatalogPage
 from PDL.engine.images.status import DownloadStatus
+from PDL.engine.metrics.pdl_metrics import MetricLabels, PdlMetrics
+from PDL.engine.timer.tracing import span
 from PDL.logger.logger import Logger
 
 
@@ -99,23 +102,34 @@ class ParseDisplayPage(CatalogPage):
                 LOG.info(f"Downloaded page in {self.image_info.download_duration:0.3f} seconds.")
                 return
 
-        # Using the page source, scrape and store the metadata (as a dictionary)
-        self._metadata = self._get_metadata()
-
-        # Calculation download duration
-        self.image_info.download_duration += (datetime.datetime.now() - dl_start).total_seconds()
-        LOG.info(f"Downloaded page in {self.image_info.download_duration:0.3f} seconds.")
+        with span('parse_page', url=self.page_url), PdlMetrics.PAGE_PARSE.time():
+            # Using the page source, scrape and store the metadata (as a dictionary)
+            self._metadata = self._get_metadata()
+
+            # Calculation download duration
+            self.image_info.download_duration += (
+                datetime.datetime.now() - dl_start).total_seconds()
+            LOG.info(f"Downloaded page in {self.image_info.download_duration:0.3f} seconds.")
+
+            # The page does not contain the metadata (e.g. - error page returned with a 200)
+            if self.PHOTO not in self._metadata:
+                msg = f"Unable to parse the image metadata from '{self.page_url}'"
+                LOG.error(msg)
+                self.image_info.page_url = self.page_url
+                self.image_info.error_info = msg
+                self.image_info.dl_status = DownloadStatus.ERROR
+                return
 
-        # Store the scraped metadata into the ImageData object
-        self.image_info.page_url = self.page_url
-        self.image_info.image_url = self.parse_page_for_link()
-        self.image_info.author = self._get_author_name()
-        self.image_info.image_name = self._get_title()
-        self.image_info.description = self._get_description()
-        self.image_info.image_date = self._get_image_date()
-        self.image_info.resolution = self._get_resolution()
-        self.image_info.filename = self._get_filename()
-        self.image_info.id = self._get_id()
+            # Store the scraped metadata into the ImageData object
+            self.image_info.page_url = self.page_url
+            self.image_info.image_url = self.parse_page_for_link()
+            self.image_info.author = self._get_author_name()
+            self.image_info.image_name = self._get_title()
+            self.image_info.description = self._get_description()
+            self.image_info.image_date = self._get_image_date()
+            self.image_info.resolution = self._get_resolution()
+            self.image_info.filename = self._get_filename()
+            self.image_info.id = self._get_id()
 
     def _get_author_name(self) -> str:
         """
@@ -203,7 +217,7 @@ class ParseDisplayPage(CatalogPage):
         image_list.sort(key=lambda x: x[self.SIZE])
         target_url = image_list[-1][self.URL]
 
-        LOG.debug(f"URL LIST:\n{pprint.pformat(image_list)}")
+        LOG.debug(lambda: f"URL LIST:\n{pprint.pformat(image_list)}")
         LOG.debug(f"Returning URL: {target_url}")
 
         return target_url
@@ -215,27 +229,49 @@ class ParseDisplayPage(CatalogPage):
         :return: list of source code (line by line)
 
         """
-        conn_err = (f"{{attempt}}/{self.MAX_ATTEMPTS}: Connection Error --> Trying again in "
-                    f"{self.RETRY_INTERVAL} seconds")
+        conn_err = ("{attempt}/{max}: Request Error ({error!r}) --> Trying again in "
+                    "{delay} seconds")
+        status_err = ("{attempt}/{max}: Received status code {status} --> Trying again in "
+                      "{delay} seconds")
 
         attempt = 0
         source = None
+        retry = True
 
-        # Attempt to retrieve primary page via requests.GET()
+        # Attempt to retrieve primary page via the shared HTTP session (GET)
         log_msg = "Attempt: {attempt}/{max}: Requesting page: '{url}'"
-        while attempt < self.MAX_ATTEMPTS and source is None:
+        while attempt < self.MAX_ATTEMPTS and retry:
             attempt += 1
+            delay = None
             LOG.debug(log_msg.format(
                 url=self.page_url, attempt=attempt, max=self.MAX_ATTEMPTS))
 
             # Try to download the source page
             try:
-                source = requests.get(url=self.page_url, headers=self.HEADERS)
-
-            # D'oh!! Connection error...
-            except requests.exceptions.ConnectionError:
-                LOG.warn(conn_err.format(attempt=attempt))
-                time.sleep(self.RETRY_INTERVAL)
+                with span('fetch_page', url=self.page_url, attempt=attempt), \
+                        PdlMetrics.PAGE_FETCH.time():
+                    source = http_session.get(url=self.page_url, headers=self.HEADERS)
+
+            # D'oh!! Connection error, timeout...
+            except requests.exceptions.RequestException as exc:
+                source = None
+                delay = self.RETRY_INTERVAL
+                LOG.warn(conn_err.format(attempt=attempt, max=self.MAX_ATTEMPTS, error=exc,
+                                         delay=delay))
+
+            else:
+                retry = source is None
+
+                # Transient server condition (e.g. - 429/503): wait as requested by the server
+                if (source is not None and
+                        source.status_code in http_session.RetryPolicy.RETRY_STATUS_CODES):
+                    retry = True
+                    delay = max(self.RETRY_INTERVAL, http_session.retry_after(source) or 0)
+                    LOG.warn(status_err.format(attempt=attempt, max=self.MAX_ATTEMPTS,
+                                               status=source.status_code, delay=delay))
+
+            if delay is not None and attempt < self.MAX_ATTEMPTS:
+                time.sleep(delay)
 
         # If the source was downloaded and the status code was not a 200 series
         # response code, the source will not contain the required metadata.
@@ -250,15 +286,23 @@ class ParseDisplayPage(CatalogPage):
             source = None
 
         # Source was downloaded successfully
-        elif attempt < self.MAX_ATTEMPTS:
+        elif source is not None:
             LOG.info(f"Primary page '{self.page_url}' DL'd!")
 
             # Split and strip the page into a list (elem per line), based on CR/LF.
             # Some pages are formatted with '\n' which made it difficult to parse at times.
             # Remove the '\n' and store as a list. The routines that need the full
             # source as a single can ''.join(<list.) as needed.
-            if source is not None:
-                source = [x.strip() for x in source.text.split('\n')]
+            PdlMetrics.BYTES.inc(len(source.content or b''), type=MetricLabels.PAGE)
+            source = [x.strip() for x in source.text.split('\n')]
+
+        # No response after all attempts (connection errors, timeouts, transient statuses)
+        else:
+            msg = f"Unable to DL primary page '{self.page_url}' after {attempt} attempts"
+            LOG.error(msg)
+            self.image_info.page_url = self.page_url
+            self.image_info.error_info = msg
+            self.image_info.dl_status = DownloadStatus.ERROR
 
         return source
 
@@ -355,7 +399,7 @@ class ParseDisplayPage(CatalogPage):
             LOG.error("*** Unable to parse metadata from page. ***")
             LOG.error(f"PAGE:\n{self.source_list}")
 
-        LOG.debug(f"Image Metadata:\n{pprint.pformat(metadata)}")
+        LOG.debug(lambda: f"Image Metadata:\n{pprint.pformat(metadata)}")
         return metadata
 
     @staticmethod
@@ -0,0 +1,278 @@
+"""
+    Persistent, memory-mapped Bloom filter of every URL (page and image) processed.
+
+    The filter answers "has this URL definitely NOT been seen?" in microseconds, without
+    loading the inventory. A positive answer means "probably seen" (false positive rate
+    is set by the capacity and error rate), and must be confirmed against the inventory.
+
+    The filter records the digest of the inventory file it holds all the URLs of
+    (see in_sync()), so it can be checked against the inventory file before the
+    inventory is loaded.
+
+    File layout (integers are big-endian):
+        HEADER (HEADER_FORMAT): magic, version, number of hash functions, number of bits,
+                                count of URLs added (approximate: URLs that collide
+                                with previously added URLs are not counted),
+                                digest of the inventory file at last sync (version 2;
+                                version 1 stored the inventory size)
+        BIT ARRAY:              number of bits / 8 bytes
+
+"""
+import hashlib
+import math
+import mmap
+import os
+import struct
+from typing import Iterable, Optional
+
+from PDL.logger.logger import Logger
+
+LOG = Logger()
+
+
+class InvalidBloomFilterFile(Exception):
+    """
+    Raised when the file is not a (supported) Bloom filter file.
+    """
+    def __init__(self, filename: str, reason: str) -> None:
+        self.message = f"Unable to read Bloom filter file '{filename}': {reason}"
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class UrlBloomFilter(object):
+    """
+    Bloom filter backed by a memory-mapped file. Changes are written to the file by the
+    OS (and explicitly on flush()/close()).
+
+    """
+    MAGIC = b'PDLBLM'
+    VERSION = 2
+
+    # magic, version, num hashes, num bits, count, synced (inventory file digest)
+    HEADER_FORMAT = '>6sHIQQQ'
+    HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+    CAPACITY = 1000000
+    ERROR_RATE = 0.001
+
+    def __init__(self, filename: str, capacity: int = CAPACITY,
+                 error_rate: float = ERROR_RATE) -> None:
+        """
+        Open the filter file, creating it (sized for capacity/error_rate) if it does
+        not exist. The sizing of an existing file is read from its header.
+
+        :param filename: Name of the filter file
+        :param capacity: Expected number of URLs (only used when creating the file)
+        :param error_rate: False positive rate at capacity (only used when creating the file)
+
+        """
+        self.filename = filename
+        self.created = not os.path.exists(filename)
+
+        if self.created:
+            self.num_bits = self.optimal_bits(capacity, error_rate)
+            self.num_hashes = self.optimal_hashes(capacity, self.num_bits)
+            self.count = 0
+            self.synced = 0
+            with open(filename, "wb") as bloom_file:
+                bloom_file.write(self._pack_header())
+                bloom_file.truncate(self.HEADER_SIZE + self.num_bits // 8 + 1)
+            LOG.info(f"Created URL filter: {filename} (capacity: {capacity}, "
+                     f"{os.stat(filename).st_size / 1024:0.1f} KB)")
+
+        self._file = open(filename, "r+b")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        except ValueError:
+            self._file.close()
+            raise InvalidBloomFilterFile(filename, "file is empty")
+        self._read_header()
+
+    @staticmethod
+    def optimal_bits(capacity: int, error_rate: float) -> int:
+        """
+        Number of bits required for capacity items at error_rate (m = -n*ln(p)/ln(2)^2).
+        """
+        return max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+
+    @staticmethod
+    def optimal_hashes(capacity: int, num_bits: int) -> int:
+        """
+        Number of hash functions that minimizes the false positive rate (k = m/n*ln(2)).
+        """
+        return max(1, int(round(num_bits / capacity * math.log(2))))
+
+    @property
+    def error_rate(self) -> float:
+        """
+        Estimated false positive rate for the current number of URLs.
+        """
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def add(self, url: Optional[str]) -> bool:
+        """
+        Add a URL to the filter.
+
+        :param url: URL to add (None is ignored)
+
+        :return: True if the URL was (probably) not in the filter before being added.
+
+        """
+        if not url:
+            return False
+
+        added = False
+        for byte, mask in self._positions(url):
+            value = self._map[byte]
+            if not value & mask:
+                self._map[byte] = value | mask
+                added = True
+
+        if added:
+            self.count += 1
+        return added
+
+    @staticmethod
+    def file_digest(filename: str) -> int:
+        """
+        64-bit digest of the contents of a file (the inventory file, see in_sync()).
+
+        :param filename: Name of the file
+
+        :return: Digest (0 if the file does not exist)
+
+        """
+        if not os.path.exists(filename):
+            return 0
+
+        digest = hashlib.blake2b(digest_size=8)
+        with open(filename, "rb") as data_file:
+            for block in iter(lambda: data_file.read(1024 * 1024), b''):
+                digest.update(block)
+        return int.from_bytes(digest.digest(), 'big')
+
+    def in_sync(self, inventory_digest: int) -> bool:
+        """
+        Check if the filter holds all the URLs of the inventory file.
+
+        :param inventory_digest: Digest of the inventory file (see file_digest())
+
+        :return: True if the filter was synchronized with this version of the file.
+
+        """
+        return not self.created and self.synced == inventory_digest
+
+    def mark_synced(self, inventory_digest: int) -> None:
+        """
+        Record that the filter holds all the URLs of the inventory file.
+
+        :param inventory_digest: Digest of the inventory file (see file_digest())
+
+        :return: None
+
+        """
+        self.synced = inventory_digest
+        self.flush()
+
+    def update(self, urls: Iterable[Optional[str]]) -> int:
+        """
+        Add multiple URLs to the filter.
+
+        :param urls: Iterable of URLs
+
+        :return: Number of URLs that were (probably) new to the filter.
+
+        """
+        return sum(self.add(url) for url in urls)
+
+    def __contains__(self, url: Optional[str]) -> bool:
+        if not url:
+            return False
+        return all(self._map[byte] & mask for byte, mask in self._positions(url))
+
+    def flush(self) -> None:
+        """
+        Write the header (counts) and any pending changes to the file.
+
+        :return: None
+
+        """
+        self._map[:self.HEADER_SIZE] = self._pack_header()
+        self._map.flush()
+
+    def close(self) -> None:
+        """
+        Flush and close the filter file.
+
+        :return: None
+
+        """
+        if self._map.closed:
+            return
+
+        self.flush()
+        self._map.close()
+        self._file.close()
+
+        if self.count and self.error_rate > self.ERROR_RATE * 10:
+            LOG.warn(f"URL filter '{self.filename}' is over capacity. Estimated false "
+                     f"positive rate: {self.error_rate:0.4f}. Delete the file to rebuild it.")
+
+    def __enter__(self) -> "UrlBloomFilter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _positions(self, url: str):
+        """
+        Bit positions for the URL, via double hashing of a single 128-bit digest.
+
+        :param url: URL to hash
+
+        :return: Generator of (byte offset in the file, bit mask) tuples
+
+        """
+        digest = hashlib.blake2b(url.strip().encode('utf-8'), digest_size=16).digest()
+        hash_1 = int.from_bytes(digest[:8], 'big')
+        hash_2 = int.from_bytes(digest[8:], 'big') | 1
+
+        for index in range(self.num_hashes):
+            bit = (hash_1 + index * hash_2) % self.num_bits
+            yield self.HEADER_SIZE + (bit >> 3), 1 << (bit & 7)
+
+    def _pack_header(self) -> bytes:
+        return struct.pack(self.HEADER_FORMAT, self.MAGIC, self.VERSION, self.num_hashes,
+                           self.num_bits, self.count, self.synced)
+
+    def _read_header(self) -> None:
+        """
+        Read and validate the header.
+
+        :return: None
+
+        """
+        if len(self._map) < self.HEADER_SIZE:
+            self._close_on_error("file is truncated")
+
+        (magic, version, self.num_hashes, self.num_bits,
+         self.count, self.synced) = struct.unpack_from(self.HEADER_FORMAT, self._map)
+
+        if magic != self.MAGIC:
+            self._close_on_error("not a URL filter file")
+        if version > self.VERSION:
+            self._close_on_error(f"format version {version} is newer than supported "
+                                 f"version {self.VERSION}")
+
+        # Version 1 recorded the inventory size at the last sync: resynchronize
+        if version < self.VERSION:
+            self.synced = 0
+        if len(self._map) < self.HEADER_SIZE + self.num_bits // 8 + 1:
+            self._close_on_error("bit array is truncated")
+
+    def _close_on_error(self, reason: str) -> None:
+        self._map.close()
+        self._file.close()
+        raise InvalidBloomFilterFile(self.filename, reason)
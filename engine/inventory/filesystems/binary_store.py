@@ -0,0 +1,330 @@
+"""
+    Versioned, compact binary container for the filesystem inventory.
+
+    File layout (integers are big-endian):
+
+        +----------------------------------------------------------+
+        | HEADER (HEADER_FORMAT)                                   |
+        |   magic, version, codec, record count, block size,       |
+        |   index offset, index length                             |
+        +----------------------------------------------------------+
+        | BLOCK 0: one compressed chunk per column                 |
+        |          (record keys first, then ImageData attributes)  |
+        | BLOCK 1: ...                                             |
+        +----------------------------------------------------------+
+        | INDEX (compressed JSON)                                  |
+        |   fields: column names, in stored order                  |
+        |   first:  first record key of each block                 |
+        |   blocks: per block, [offset, length] of each column     |
+        +----------------------------------------------------------+
+
+    Records are sorted by key and stored column-wise in blocks of `block_size` records.
+    A full load decompresses each column chunk once. A single record seek reads the
+    (small) index, bisects the first key of each block, and reads only that block.
+    Columns are stored by attribute name, so attributes added to (or removed from)
+    ImageData do not invalidate existing files.
+
+"""
+import bisect
+import dataclasses
+import json
+import lzma
+import os
+import pickle
+import struct
+import zlib
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from PDL.engine.images.image_info import ImageData
+from PDL.logger.logger import Logger
+
+LOG = Logger()
+
+
+class InvalidInventoryFile(Exception):
+    """
+    Raised when a file is not a (supported) binary inventory file.
+    """
+    def __init__(self, filename: str, reason: str) -> None:
+        self.message = f"Unable to read inventory file '{filename}': {reason}"
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class Codec(object):
+    """
+    Supported block compression codecs. The id is stored in the file header.
+    """
+    ZLIB = 'zlib'
+    LZMA = 'lzma'
+
+    IDS = {ZLIB: 1, LZMA: 2}
+    NAMES = {codec_id: name for name, codec_id in IDS.items()}
+
+    COMPRESS = {ZLIB: lambda data: zlib.compress(data, 6),
+                LZMA: lzma.compress}
+    DECOMPRESS = {ZLIB: zlib.decompress,
+                  LZMA: lzma.decompress}
+
+
+class BinaryInventoryFile(object):
+    """
+    Reads and writes the inventory (K: image id, V: ImageData object) in the
+    versioned binary container format described in the module docstring.
+
+    """
+    MAGIC = b'PDLINV'
+    VERSION = 1
+
+    # magic, version, codec, (pad), records, block size, index offset, index length
+    HEADER_FORMAT = '>6sHBxIIQQ'
+    HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+    BLOCK_SIZE = 1024
+    KEY_COLUMN = '_key'
+    FIELDS = [attr.name for attr in dataclasses.fields(ImageData)]
+
+    INDEX_FIELDS = 'fields'
+    INDEX_FIRST_KEYS = 'first'
+    INDEX_BLOCKS = 'blocks'
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.version = None
+        self.codec = None
+        self.records = 0
+        self.block_size = None
+        self._index = None
+
+    @classmethod
+    def is_binary_inventory(cls, filename: str) -> bool:
+        """
+        Check if the file starts with the binary inventory magic number.
+
+        :param filename: Name of file to check
+
+        :return: True if the file is a binary inventory file.
+
+        """
+        with open(filename, "rb") as inv_file:
+            return inv_file.read(len(cls.MAGIC)) == cls.MAGIC
+
+    @classmethod
+    def write(cls, data: Dict[str, ImageData], filename: str, codec: str = Codec.ZLIB,
+              block_size: int = BLOCK_SIZE) -> int:
+        """
+        Write the inventory to file. The file is written to a temporary name and moved
+        into place, so an interrupted write never replaces a good inventory file.
+
+        :param data: Inventory dictionary (K: image id, V: ImageData object)
+        :param filename: Name of file to write
+        :param codec: Compression codec (see Codec)
+        :param block_size: Number of records per block
+
+        :return: Size of the file written (bytes)
+
+        """
+        compress = Codec.COMPRESS[codec]
+        fields = [cls.KEY_COLUMN] + cls.FIELDS
+        keys = sorted(data.keys())
+        first_keys = []
+        blocks = []
+
+        temp_filename = f"{filename}.tmp"
+        with open(temp_filename, "wb") as inv_file:
+            inv_file.write(b'\0' * cls.HEADER_SIZE)
+
+            for start in range(0, len(keys), block_size):
+                block_keys = keys[start:start + block_size]
+                first_keys.append(block_keys[0])
+
+                columns = []
+                for attr in fields:
+                    if attr == cls.KEY_COLUMN:
+                        column = block_keys
+                    else:
+                        column = [getattr(data[key], attr, None) for key in block_keys]
+                    chunk = compress(cls._encode(column))
+                    columns.append([inv_file.tell(), len(chunk)])
+                    inv_file.write(chunk)
+                blocks.append(columns)
+
+            index = compress(cls._encode({cls.INDEX_FIELDS: fields,
+                                          cls.INDEX_FIRST_KEYS: first_keys,
+                                          cls.INDEX_BLOCKS: blocks}))
+            index_offset = inv_file.tell()
+            inv_file.write(index)
+
+            inv_file.seek(0)
+            inv_file.write(struct.pack(
+                cls.HEADER_FORMAT, cls.MAGIC, cls.VERSION, Codec.IDS[codec],
+                len(keys), block_size, index_offset, len(index)))
+
+            inv_file.flush()
+            os.fsync(inv_file.fileno())
+
+        os.replace(temp_filename, filename)
+        return os.stat(filename).st_size
+
+    def load(self) -> Dict[str, ImageData]:
+        """
+        Read the complete inventory from file.
+
+        :return: Inventory dictionary (K: image id, V: ImageData object)
+
+        """
+        data = dict()
+        with open(self.filename, "rb") as inv_file:
+            self._read_index(inv_file)
+            for block in self._index[self.INDEX_BLOCKS]:
+                data.update(self._read_block(inv_file, block))
+
+        if len(data) != self.records:
+            raise InvalidInventoryFile(
+                self.filename, f"read {len(data)} records; header lists {self.records}")
+        return data
+
+    def get(self, key: str) -> Optional[ImageData]:
+        """
+        Read a single record from file, without loading the rest of the inventory.
+
+        :param key: Image id of the record
+
+        :return: ImageData object, or None if the key is not in the file.
+
+        """
+        with open(self.filename, "rb") as inv_file:
+            self._read_index(inv_file)
+
+            # Find the block whose key range would contain the key
+            block_num = bisect.bisect_right(self._index[self.INDEX_FIRST_KEYS], key) - 1
+            if block_num < 0:
+                return None
+
+            block = self._index[self.INDEX_BLOCKS][block_num]
+            for _, record in self._read_block(inv_file, block, key=key):
+                return record
+        return None
+
+    def keys(self) -> Iterator[str]:
+        """
+        Iterate through the record keys stored in the file (reads only the key columns).
+
+        :return: Iterator of image ids, in sorted order.
+
+        """
+        with open(self.filename, "rb") as inv_file:
+            self._read_index(inv_file)
+            for block in self._index[self.INDEX_BLOCKS]:
+                offset, length = block[0]
+                inv_file.seek(offset)
+                yield from self._decode(inv_file.read(length))
+
+    def _read_index(self, inv_file: BinaryIO) -> None:
+        """
+        Read and validate the header, then read the index (once per object).
+
+        :param inv_file: Open (binary) file object
+
+        :return: None
+
+        """
+        if self._index is not None:
+            return
+
+        header = inv_file.read(self.HEADER_SIZE)
+        if len(header) < self.HEADER_SIZE:
+            raise InvalidInventoryFile(self.filename, "file is truncated")
+
+        (magic, version, codec_id, records, block_size,
+         index_offset, index_length) = struct.unpack(self.HEADER_FORMAT, header)
+
+        if magic != self.MAGIC:
+            raise InvalidInventoryFile(self.filename, "not a binary inventory file")
+        if version > self.VERSION:
+            raise InvalidInventoryFile(
+                self.filename, f"format version {version} is newer than supported "
+                               f"version {self.VERSION}")
+        if codec_id not in Codec.NAMES:
+            raise InvalidInventoryFile(self.filename, f"unknown codec id {codec_id}")
+
+        self.version = version
+        self.codec = Codec.NAMES[codec_id]
+        self.records = records
+        self.block_size = block_size
+
+        inv_file.seek(index_offset)
+        index = inv_file.read(index_length)
+        if len(index) < index_length:
+            raise InvalidInventoryFile(self.filename, "index is truncated")
+        self._index = self._decode(index)
+
+    def _read_block(self, inv_file: BinaryIO, block: List[Tuple[int, int]],
+                    key: Optional[str] = None) -> Iterator[Tuple[str, ImageData]]:
+        """
+        Read a block, and build an ImageData object per record. Columns for attributes
+        that are no longer defined in ImageData are skipped; attributes missing from the
+        file are set to the ImageData defaults.
+
+        :param inv_file: Open (binary) file object
+        :param block: List of [offset, length] per column (in INDEX_FIELDS order)
+        :param key: If provided, only build the record with this key.
+
+        :return: Iterator of (key, ImageData object) tuples, in record order.
+
+        """
+        known = set(self.FIELDS)
+        names = []
+        columns = []
+        keys = []
+        for attr, (offset, length) in zip(self._index[self.INDEX_FIELDS], block):
+            if attr != self.KEY_COLUMN and attr not in known:
+                continue
+            inv_file.seek(offset)
+            values = self._decode(inv_file.read(length))
+            if attr == self.KEY_COLUMN:
+                keys = values
+            else:
+                names.append(attr)
+                columns.append(values)
+
+        missing = [attr for attr in dataclasses.fields(ImageData) if attr.name not in names]
+
+        rows = zip(keys, zip(*columns))
+        if key is not None:
+            rows = ((record_key, values) for record_key, values in rows if record_key == key)
+
+        # Objects are populated directly (ImageData is a plain dataclass with no
+        # __post_init__), which avoids the cost of the generated __init__ per record.
+        new_obj = ImageData.__new__
+        for record_key, values in rows:
+            image_obj = new_obj(ImageData)
+            image_obj.__dict__ = attributes = dict(zip(names, values))
+            for attr in missing:
+                attributes[attr.name] = (attr.default_factory() if
+                                         attr.default is dataclasses.MISSING else attr.default)
+            yield record_key, image_obj
+
+    def _decode(self, chunk: bytes) -> Any:
+        return json.loads(Codec.DECOMPRESS[self.codec](chunk).decode('utf-8'))
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        return json.dumps(value, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def read_inventory(filename: str) -> Tuple[Dict[str, ImageData], bool]:
+    """
+    Read an inventory file, accepting either the binary container or a legacy pickle file.
+
+    :param filename: Name of file to read
+
+    :return: Tuple (inventory dictionary, True if the file was a legacy pickle file)
+
+    """
+    if BinaryInventoryFile.is_binary_inventory(filename):
+        return BinaryInventoryFile(filename).load(), False
+
+    with open(filename, "rb") as pickle_file:
+        return pickle.load(pickle_file), True
@@ -0,0 +1,371 @@
+"""
+    Content-based duplicate detection for the image archive.
+
+    Files are narrowed down in three stages, so only files that could be identical
+    are ever read in full:
+
+        1. Group by file size (stat only).
+        2. Group by a partial hash (first and last PARTIAL_BLOCK bytes of the file).
+        3. Group by a full content hash (file is read via mmap).
+
+    Hashing runs in a thread pool (hashlib and file I/O release the GIL). Hashes are
+    cached by (device, inode, size, mtime), so unchanged files are not re-read on
+    subsequent runs. Paths that are hardlinks to the same inode are only hashed once.
+
+"""
+import hashlib
+import json
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from PDL.logger.logger import Logger
+
+LOG = Logger()
+
+
+class FileInfo(NamedTuple):
+    """
+    Stat information used for grouping and caching.
+    """
+    path: str
+    size: int
+    device: int
+    inode: int
+    mtime_ns: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.device}:{self.inode}"
+
+    @classmethod
+    def from_path(cls, path: str) -> "FileInfo":
+        stat = os.stat(path)
+        return cls(path=path, size=stat.st_size, device=stat.st_dev,
+                   inode=stat.st_ino, mtime_ns=stat.st_mtime_ns)
+
+
+class DuplicateGroup(NamedTuple):
+    """
+    Set of files with identical content.
+    """
+    digest: str
+    size: int
+    files: List[FileInfo]
+
+    @property
+    def paths(self) -> List[str]:
+        return [info.path for info in self.files]
+
+    @property
+    def reclaimable(self) -> int:
+        """
+        Bytes that would be freed if all copies shared a single inode.
+        """
+        return self.size * (len({info.key for info in self.files}) - 1)
+
+
+class HashCache(object):
+    """
+    Persistent (JSON) cache of file hashes, keyed by (device, inode). An entry is only
+    used if the size and mtime of the file still match.
+
+    """
+    SIZE = 'size'
+    MTIME = 'mtime_ns'
+    PARTIAL = 'partial'
+    FULL = 'full'
+
+    def __init__(self, filename: Optional[str] = None) -> None:
+        self.filename = filename
+        self.hits = 0
+        self.misses = 0
+        self._entries = dict()
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """
+        Read the cache file, if it exists (an unreadable cache is discarded).
+
+        :return: None
+
+        """
+        if self.filename is None or not os.path.exists(self.filename):
+            return
+
+        try:
+            with open(self.filename) as cache_file:
+                self._entries = json.load(cache_file)
+        except (OSError, ValueError) as exc:
+            LOG.warn(f"Unable to read hash cache '{self.filename}': {exc}. Discarding cache.")
+            self._entries = dict()
+
+    def get(self, info: FileInfo, kind: str) -> Optional[str]:
+        """
+        Get the cached hash for the file.
+
+        :param info: FileInfo for the file
+        :param kind: Type of hash (PARTIAL or FULL)
+
+        :return: Hash (hex digest), or None if not cached or the file has changed.
+
+        """
+        entry = self._entries.get(info.key)
+        if (entry is not None and entry[self.SIZE] == info.size and
+                entry[self.MTIME] == info.mtime_ns and entry.get(kind) is not None):
+            self.hits += 1
+            return entry[kind]
+
+        self.misses += 1
+        return None
+
+    def set(self, info: FileInfo, kind: str, digest: str) -> None:
+        """
+        Store the hash for the file (replacing any entry for a previous version of the file).
+
+        :param info: FileInfo for the file
+        :param kind: Type of hash (PARTIAL or FULL)
+        :param digest: Hash (hex digest)
+
+        :return: None
+
+        """
+        with self._lock:
+            entry = self._entries.get(info.key)
+            if (entry is None or entry[self.SIZE] != info.size or
+                    entry[self.MTIME] != info.mtime_ns):
+                entry = {self.SIZE: info.size, self.MTIME: info.mtime_ns}
+                self._entries[info.key] = entry
+            entry[kind] = digest
+
+    def save(self, keep: Optional[Iterable[str]] = None) -> None:
+        """
+        Write the cache to file (via a temp file, so a failed write keeps the old cache).
+
+        :param keep: If provided, only the entries for these keys are saved (prunes files
+            that no longer exist).
+
+        :return: None
+
+        """
+        if self.filename is None:
+            return
+
+        entries = self._entries
+        if keep is not None:
+            entries = {key: entries[key] for key in set(keep) if key in entries}
+
+        temp_filename = f"{self.filename}.tmp"
+        with open(temp_filename, "w") as cache_file:
+            json.dump(entries, cache_file)
+        os.replace(temp_filename, self.filename)
+
+
+class DuplicateFinder(object):
+    """
+    Finds files with identical content (see module docstring for the stages).
+
+    """
+    PARTIAL_BLOCK = 64 * 1024
+    DIGEST_SIZE = 32
+
+    def __init__(self, cache_file: Optional[str] = None, workers: Optional[int] = None,
+                 extension: str = '.jpg') -> None:
+        """
+        :param cache_file: Name of the hash cache file (None = do not cache between runs)
+        :param workers: Number of hashing threads (default: ThreadPoolExecutor default)
+        :param extension: Extension of files to include when scanning a directory.
+
+        """
+        self.cache = HashCache(filename=cache_file)
+        self.workers = workers
+        self.extension = extension.lower()
+        self.bytes_hashed = 0
+        self._lock = threading.Lock()
+
+    def scan(self, base_dir: str) -> List[FileInfo]:
+        """
+        Recursively list the (matching) files under the base directory.
+
+        :param base_dir: Top level directory to scan
+
+        :return: List of FileInfo objects
+
+        """
+        files = []
+        for directory, _, filenames in os.walk(base_dir):
+            for filename in filenames:
+                if filename.lower().endswith(self.extension):
+                    try:
+                        files.append(FileInfo.from_path(os.path.join(directory, filename)))
+                    except OSError as exc:
+                        LOG.warn(f"Unable to stat '{filename}' in {directory}: {exc}")
+        return files
+
+    def find(self, files: List[FileInfo]) -> List[DuplicateGroup]:
+        """
+        Find the groups of files with identical content.
+
+        :param files: List of FileInfo objects (see scan())
+
+        :return: List of DuplicateGroups (largest reclaimable size first)
+
+        """
+        # STAGE 1: Group by size
+        candidates = self._group(files, lambda info: info.size)
+        LOG.debug(f"DUPLICATES: {len(candidates)} size groups "
+                  f"({sum(len(group) for group in candidates)} files)")
+
+        # STAGE 2: Group by partial hash
+        partial = self._hash_files(
+            [info for group in candidates for info in group], HashCache.PARTIAL)
+        candidates = [sub_group for group in candidates for sub_group in
+                      self._group(group, lambda info: partial[info.key])]
+        LOG.debug(f"DUPLICATES: {len(candidates)} partial hash groups "
+                  f"({sum(len(group) for group in candidates)} files)")
+
+        # STAGE 3: Group by full hash
+        full = self._hash_files([info for group in candidates for info in group],
+                                HashCache.FULL)
+        duplicates = [DuplicateGroup(digest=full[group[0].key], size=group[0].size,
+                                     files=sorted(group))
+                      for parent in candidates for group in
+                      self._group(parent, lambda info: full[info.key])]
+
+        self._save_cache(files)
+        LOG.info(f"DUPLICATES: {len(duplicates)} groups of identical files. "
+                 f"Hashed {self.bytes_hashed / 1024 ** 2:0.1f} MB "
+                 f"(Cache hits: {self.cache.hits}, misses: {self.cache.misses})")
+
+        return sorted(duplicates, key=lambda group: (-group.reclaimable, group.digest))
+
+    def find_name_conflicts(self, files: List[FileInfo]) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Find files with the same name (in different directories) whose content differs.
+
+        :param files: List of FileInfo objects (see scan())
+
+        :return: Dict (K: filename, V: Dict (K: content hash, V: list of paths))
+
+        """
+        by_name = self._group(files, lambda info: os.path.basename(info.path).lower())
+        full = self._hash_files([info for group in by_name for info in group], HashCache.FULL)
+        self._save_cache(files)
+
+        conflicts = dict()
+        for group in by_name:
+            versions = dict()
+            for info in sorted(group):
+                versions.setdefault(full[info.key], []).append(info.path)
+            if len(versions) > 1:
+                conflicts[os.path.basename(group[0].path)] = versions
+        return conflicts
+
+    @staticmethod
+    def _group(files: List[FileInfo], key: Callable) -> List[List[FileInfo]]:
+        """
+        Group files by the key, and keep the groups with more than one file.
+
+        :param files: List of FileInfo objects
+        :param key: Callable that returns the grouping key for a FileInfo object
+
+        :return: List of groups (lists of FileInfo objects)
+
+        """
+        groups = dict()
+        for info in files:
+            groups.setdefault(key(info), []).append(info)
+        return [group for group in groups.values() if len(group) > 1]
+
+    def _hash_files(self, files: List[FileInfo], kind: str) -> Dict[str, str]:
+        """
+        Hash the files (once per inode), using the cache where possible.
+
+        :param files: List of FileInfo objects
+        :param kind: Type of hash (HashCache.PARTIAL or HashCache.FULL)
+
+        :return: Dict (K: FileInfo.key, V: hex digest)
+
+        """
+        unique = {info.key: info for info in files}
+        digests = dict()
+        pending = []
+        for key, info in unique.items():
+            digest = self.cache.get(info, kind)
+            if digest is None:
+                pending.append(info)
+            else:
+                digests[key] = digest
+
+        hash_func = self.partial_hash if kind == HashCache.PARTIAL else self.full_hash
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for info, digest in zip(pending, pool.map(hash_func, pending)):
+                if digest is not None:
+                    self.cache.set(info, kind, digest)
+                    digests[info.key] = digest
+
+        # Files that could not be read get a unique value, so they are never grouped.
+        for key in unique:
+            digests.setdefault(key, f"unreadable:{key}")
+        return digests
+
+    def partial_hash(self, info: FileInfo) -> Optional[str]:
+        """
+        Hash the first and last PARTIAL_BLOCK bytes of the file.
+
+        :param info: FileInfo for the file
+
+        :return: Hex digest, or None if the file could not be read.
+
+        """
+        hasher = hashlib.blake2b(digest_size=self.DIGEST_SIZE)
+        try:
+            with open(info.path, "rb") as image_file:
+                data = image_file.read(self.PARTIAL_BLOCK)
+                hasher.update(data)
+                if info.size > 2 * self.PARTIAL_BLOCK:
+                    image_file.seek(-self.PARTIAL_BLOCK, os.SEEK_END)
+                    tail = image_file.read(self.PARTIAL_BLOCK)
+                    hasher.update(tail)
+                    data += tail
+        except OSError as exc:
+            LOG.warn(f"Unable to read '{info.path}': {exc}")
+            return None
+
+        self._count_bytes(len(data))
+        return hasher.hexdigest()
+
+    def full_hash(self, info: FileInfo) -> Optional[str]:
+        """
+        Hash the complete file (the file is memory-mapped rather than read into memory).
+
+        :param info: FileInfo for the file
+
+        :return: Hex digest, or None if the file could not be read.
+
+        """
+        hasher = hashlib.blake2b(digest_size=self.DIGEST_SIZE)
+        try:
+            with open(info.path, "rb") as image_file:
+                if info.size:
+                    with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        hasher.update(mapped)
+        except (OSError, ValueError) as exc:
+            LOG.warn(f"Unable to read '{info.path}': {exc}")
+            return None
+
+        self._count_bytes(info.size)
+        return hasher.hexdigest()
+
+    def _count_bytes(self, num_bytes: int) -> None:
+        with self._lock:
+            self.bytes_hashed += num_bytes
+
+    def _save_cache(self, files: List[FileInfo]) -> None:
+        try:
+            self.cache.save(keep=[info.key for info in files])
+        except OSError as exc:
+            LOG.warn(f"Unable to write hash cache '{self.cache.filename}': {exc}")
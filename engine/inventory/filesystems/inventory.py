@@ -5,15 +5,17 @@
 
 """
 import os
-import pickle
-from typing import Dict, Optional
-
-import prettytable
+from typing import Dict, Iterator, List, Optional
 
 from PDL.engine.images.image_info import ImageData
 from PDL.engine.images.status import DownloadStatus
+from PDL.engine.inventory.filesystems.binary_store import BinaryInventoryFile, read_inventory
+from PDL.engine.inventory.filesystems.duplicates import DuplicateFinder, DuplicateGroup
+from PDL.engine.inventory.filesystems.reclaim import LinkMethod, SpaceReclaimer
 from PDL.engine.inventory.base_inventory import BaseInventory
+from PDL.engine.metrics import memory
 from PDL.logger.logger import Logger
+from PDL.reporting.writers import TableDefaults, table_pages, write_report
 
 LOG = Logger()
 
@@ -97,7 +99,8 @@ class FSInv(BaseInventory):
         # Include the local storage in the inventory
         if scan_local:
             LOG.debug("Scanning local inventory.")
-            self._scan_(base_dir=self.base_dir)
+            with memory.stage('fs_scan'):
+                self._scan_(base_dir=self.base_dir)
 
         # Write inventory to file...
         if serialize:
@@ -105,30 +108,32 @@ class FSInv(BaseInventory):
             self.pickle(data=self._inventory, filename=pickle_fname)
 
     @staticmethod
+    @memory.measured('inventory_write')
     def pickle(data: dict, filename: str) -> None:
         """
-        Write the inventory to file in a binary format. (Binary=saves space)
+        Write the inventory to file in the versioned binary format (see binary_store).
+        The method name is retained from the original pickle-based implementation.
 
-        :param data: python data structure that can be pickled (no open connections, etc.)
+        :param data: Inventory dictionary (K: image id, V: ImageData object)
         :param filename: Name of file to write data
 
         :return: None
 
         """
-        LOG.debug(f"Pickling inventory to {filename}")
+        LOG.debug(f"Writing binary inventory to {filename}")
 
-        # Write to file
-        with open(filename, "wb") as pickle_file:
-            pickle.dump(data, pickle_file)
+        file_size = float(BinaryInventoryFile.write(data=data, filename=filename))
 
         # Report status and some details about the file.
-        file_size = float(os.stat(filename).st_size) / FSInv.KILOBYTE
-        LOG.info(f"Pickling inventory complete. {len(data.keys())} "
-                 f"records written. File Size:  {file_size:0.2f} KB.")
+        LOG.info(f"Writing inventory complete. {len(data.keys())} records written. "
+                 f"File Size:  {file_size / FSInv.KILOBYTE:0.2f} KB.")
 
+    @memory.measured('inventory_unpickle')
     def unpickle(self, filename: str) -> dict:
         """
-        Read the inventory from a binary (pickled) file.
+        Read the inventory from a binary file. Legacy (pickled) inventory files are
+        still read; they are converted to the binary format the next time the
+        inventory is written.
 
         :param filename: Name of file to read.
 
@@ -139,8 +144,10 @@ class FSInv(BaseInventory):
 
         # If the file exists, read it
         if os.path.exists(filename):
-            with open(filename, "rb") as pickle_file:
-                data = pickle.load(pickle_file)
+            data, legacy = read_inventory(filename)
+            if legacy:
+                LOG.info(f"Read legacy (pickled) inventory file: '{filename}'. "
+                         f"It will be converted when the inventory is written.")
 
             # Add the data to the obj._inventory dictionary
             self._inventory.update(data)
@@ -279,48 +286,158 @@ class FSInv(BaseInventory):
 
         LOG.info(f"TOTAL FILES ANALYZED: {len(self._inventory.keys())}")
 
-    def list_inventory(self) -> str:
+    def find_content_duplicates(self, cache_file: Optional[str] = None,
+                                workers: Optional[int] = None) -> List[DuplicateGroup]:
         """
-        Create pretty table based on _inventory.,
+        Find byte-identical images under the base directory (regardless of name), and log
+        same-named images whose content differs.
+
+        :param cache_file: Name of the file used to cache file hashes between runs
+        :param workers: Number of hashing threads
 
-        Header:
-        | Index | Name | <column per metadata> | Location |
+        :return: List of DuplicateGroups (largest reclaimable size first)
 
-        :return: String representation of the table
+        """
+        finder = DuplicateFinder(cache_file=cache_file, workers=workers,
+                                 extension=self.INV_FILE_EXT)
+        files = finder.scan(self.base_dir)
+        groups = finder.find(files)
+
+        # List/Log the identical files found
+        reclaimable = sum(group.reclaimable for group in groups)
+        LOG.info(f"IDENTICAL CONTENT: {len(groups)} groups. "
+                 f"Reclaimable: {float(reclaimable) / self.KILOBYTE:0.2f} KB")
+        for group in groups:
+            LOG.info(f"{group.digest[:16]} ({float(group.size) / self.KILOBYTE:0.2f} KB): "
+                     f"{', '.join(group.paths)}")
+
+        # List/Log the files with the same name, but different content
+        conflicts = finder.find_name_conflicts(files)
+        LOG.info(f"SAME NAME, DIFFERENT CONTENT: {len(conflicts)}")
+        for name, versions in sorted(conflicts.items()):
+            for digest, paths in versions.items():
+                LOG.info(f"{name}: {digest[:16]}: {', '.join(paths)}")
+
+        LOG.info(f"TOTAL FILES ANALYZED: {len(files)}")
+        return groups
+
+    def reclaim_duplicates(self, groups: List[DuplicateGroup], dry_run: bool = False,
+                           workers: Optional[int] = None) -> int:
+        """
+        Replace identical copies of an image with links (reflink or hardlink) to a single
+        copy. The image paths do not change, so the inventory locations remain valid.
 
+        :param groups: List of DuplicateGroups (see find_content_duplicates())
+        :param dry_run: Report the space that would be reclaimed, without changing files.
+        :param workers: Number of worker threads
+
+        :return: Number of bytes reclaimed (or that would be reclaimed, if dry_run)
+
+        """
+        results = SpaceReclaimer(dry_run=dry_run, workers=workers).reclaim(groups)
+
+        tally = dict()
+        reclaimed = 0
+        copies = 0
+        for result in results:
+            tally[result.method] = tally.get(result.method, 0) + 1
+            if result.method == LinkMethod.SKIPPED:
+                LOG.warn(f"Skipped {result.target}: {result.reason}")
+                continue
+            if result.method == LinkMethod.SHARED:
+                LOG.debug(f"Skipped {result.target}: {result.reason}")
+                continue
+
+            reclaimed += result.size
+            copies += 1
+            LOG.debug(f"{result.method.upper()}: {result.target} --> {result.source}")
+
+            # Verify the path is still valid (and still the same image)
+            if not os.path.exists(result.target):
+                LOG.error(f"{result.target} does not exist after linking to {result.source}")
+
+        action = "Would reclaim" if dry_run else "Reclaimed"
+        LOG.info(f"{action} {float(reclaimed) / self.KILOBYTE:0.2f} KB "
+                 f"from {copies} copies.")
+        for method, count in sorted(tally.items()):
+            LOG.info(f"\t{method.upper()}: {count}")
+
+        return reclaimed
+
+    def inventory_fields(self) -> List[str]:
         """
-        extra_header = 1000
+        Columns of the inventory listing/report:
+        | Index | Name | <column per metadata> | Locations |
 
-        table = prettytable.PrettyTable()
+        :return: List of column names
 
-        # Set up the headers
+        """
         header = ['Index', 'Name']
         header.extend([name.capitalize() for name in sorted(self.metadata)])
         header.append('Locations')
-        table.field_names = header
+        return header
+
+    def inventory_rows(self) -> Iterator[Dict[str, object]]:
+        """
+        Generates a row per image (sorted by name); see inventory_fields().
 
-        # Define the column alignments
-        table.align['Index'] = 'r'
-        table.align['Name'] = 'l'
-        table.align['Locations'] = 'l'
-        for metadata in sorted(self.metadata):
-            table.align[metadata.capitalize()] = 'c'
+        :return: Generator of rows (K: column name, V: value)
 
-        # Populate the table
+        """
+        metadata = sorted(self.metadata)
         for index, (name, data) in enumerate(sorted(self._inventory.items())):
-            row = [index, name]
-            for meta in sorted(self.metadata):
-                row.append('X' if meta in getattr(data, ImageData.CLASSIFICATION) else '')
-            row.append(', '.join(getattr(data, ImageData.LOCATIONS)) if
-                       getattr(data, ImageData.LOCATIONS) != [] else '')
-            table.add_row(row)
-
-        # Add the column headers at the bottom of the table for large tables
-        if len(self._inventory) > extra_header:
-            table.add_row(table.field_names)
-
-        # Return string representation of the table.
-        return table.get_string()
+            row = {'Index': index, 'Name': name}
+            classification = getattr(data, ImageData.CLASSIFICATION)
+            for meta in metadata:
+                row[meta.capitalize()] = 'X' if meta in classification else ''
+            row['Locations'] = ', '.join(getattr(data, ImageData.LOCATIONS))
+            yield row
+
+    def write_inventory(self, filespec: str, report_format: Optional[str] = None) -> int:
+        """
+        Stream the complete inventory listing to a report file.
+
+        :param filespec: Report file
+        :param report_format: CSV, TSV or JSONL (DEFAULT: determined by the file extension)
+
+        :return: Number of rows written
+
+        """
+        return write_report(filespec=filespec, field_names=self.inventory_fields(),
+                            rows=self.inventory_rows(), report_format=report_format)
+
+    def inventory_pages(self, limit: Optional[int] = TableDefaults.LIMIT,
+                        page_size: int = TableDefaults.PAGE_SIZE) -> Iterator[str]:
+        """
+        Pretty tables of the inventory (first `limit` images, by name), page_size rows
+        per table.
+
+        :param limit: Maximum number of images listed (None = all images)
+        :param page_size: Rows per table
+
+        :return: Generator of tables (str)
+
+        """
+        fields = self.inventory_fields()
+        align = {field: 'c' for field in fields}
+        align.update({'Index': 'r', 'Name': 'l', 'Locations': 'l'})
+        rows = ([row[field] for field in fields] for row in self.inventory_rows())
+        return table_pages(field_names=fields, rows=rows, page_size=page_size, limit=limit,
+                           align=align)
+
+    def list_inventory(self, limit: Optional[int] = TableDefaults.LIMIT,
+                       page_size: int = TableDefaults.PAGE_SIZE) -> str:
+        """
+        Create pretty table(s) based on _inventory (see inventory_pages()). The complete
+        inventory can be written to a file with write_inventory().
+
+        :param limit: Maximum number of images listed (None = all images)
+        :param page_size: Rows per table
+
+        :return: String representation of the table(s)
+
+        """
+        return '\n'.join(self.inventory_pages(limit=limit, page_size=page_size))
 
     def add_to_inventory(self, element):
         """
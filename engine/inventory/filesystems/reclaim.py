@@ -0,0 +1,244 @@
+"""
+    Reclaims disk space used by identical copies of an image (see duplicates.py), by
+    replacing each copy with a reflink (copy-on-write clone, where the filesystem supports
+    it) or a hardlink to a single retained copy.
+
+    Paths are not changed (only the file behind each path), so the inventory locations
+    remain valid. Each copy is replaced atomically: the link is created under a temporary
+    name in the same directory, and then renamed over the copy.
+
+    Reflinks keep a separate inode per path, so copies that already share their extents
+    with the retained copy (e.g. replaced by a previous run) are reported as SHARED, and
+    are not relinked or counted as reclaimed space.
+
+"""
+import errno
+import filecmp
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional, Tuple
+
+from PDL.engine.inventory.filesystems.duplicates import DuplicateGroup, FileInfo
+from PDL.logger.logger import Logger
+
+try:
+    import fcntl
+except ImportError:     # Not available on Windows (hardlinks only)
+    fcntl = None
+
+LOG = Logger()
+
+
+class LinkMethod(object):
+    """
+    How a duplicate copy was (or would be) replaced.
+    """
+    REFLINK = 'reflink'
+    HARDLINK = 'hardlink'
+    DRY_RUN = 'dry-run'
+    SHARED = 'shared'       # Already a reflink of the retained copy: nothing to reclaim
+    SKIPPED = 'skipped'
+
+
+class ReclaimResult(NamedTuple):
+    """
+    Result of replacing a single copy.
+    """
+    source: str
+    target: str
+    method: str
+    size: int
+    reason: str = ''
+
+
+class SpaceReclaimer(object):
+    """
+    Replaces identical copies with links to a single copy, in parallel batches.
+
+    """
+    FICLONE = 0x40049409            # linux/fs.h: _IOW(0x94, 9, int)
+    FIEMAP = 0xC020660B             # linux/fs.h: _IOWR('f', 11, struct fiemap)
+    FIEMAP_FLAG_SYNC = 0x1
+    FIEMAP_HEADER = struct.Struct('=QQIIII')
+    FIEMAP_EXTENT = struct.Struct('=QQQQQIIII')
+    FIEMAP_EXTENT_COUNT = 64
+    REFLINK_UNSUPPORTED = (errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV)
+    TEMP_SUFFIX = '.pdl-link'
+    BATCH_SIZE = 100
+
+    def __init__(self, dry_run: bool = False, workers: Optional[int] = None,
+                 batch_size: int = BATCH_SIZE, reflink: bool = True) -> None:
+        """
+        :param dry_run: Report what would be reclaimed, without changing any files.
+        :param workers: Number of worker threads (default: ThreadPoolExecutor default)
+        :param batch_size: Number of copies to replace per batch
+        :param reflink: Try a reflink before falling back to a hardlink.
+
+        """
+        self.dry_run = dry_run
+        self.workers = workers
+        self.batch_size = batch_size
+        self.reflink = reflink and fcntl is not None
+
+    @staticmethod
+    def plan(groups: List[DuplicateGroup]) -> List[Tuple[FileInfo, FileInfo]]:
+        """
+        Determine which copies to replace, and which copy each is linked to. Links can
+        not span devices, so a copy is retained per device. The retained copy is the
+        inode already shared by the most paths (then, by path order).
+
+        :param groups: List of DuplicateGroups
+
+        :return: List of (source, target) tuples: target is replaced by a link to source.
+
+        """
+        pairs = []
+        for group in groups:
+            by_device = dict()
+            for info in group.files:
+                by_device.setdefault(info.device, []).append(info)
+
+            for files in by_device.values():
+                links = dict()
+                for info in files:
+                    links[info.inode] = links.get(info.inode, 0) + 1
+                source = min(files, key=lambda info: (-links[info.inode], info.path))
+                pairs.extend((source, info) for info in files if info.inode != source.inode)
+        return pairs
+
+    def reclaim(self, groups: List[DuplicateGroup]) -> List[ReclaimResult]:
+        """
+        Replace the identical copies with links.
+
+        :param groups: List of DuplicateGroups
+
+        :return: List of ReclaimResults (one per copy)
+
+        """
+        pairs = self.plan(groups)
+        results = []
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for start in range(0, len(pairs), self.batch_size):
+                batch = pairs[start:start + self.batch_size]
+                results.extend(pool.map(lambda pair: self.replace(*pair), batch))
+                LOG.debug(f"RECLAIM: Processed {min(start + self.batch_size, len(pairs))} "
+                          f"of {len(pairs)} copies.")
+
+        return results
+
+    def replace(self, source: FileInfo, target: FileInfo) -> ReclaimResult:
+        """
+        Replace the target file with a link to the source file. The target is only
+        replaced if it is unchanged since it was scanned, and byte-identical to the source.
+
+        :param source: FileInfo of the copy to retain
+        :param target: FileInfo of the copy to replace
+
+        :return: ReclaimResult
+
+        """
+        def _result(method: str, reason: str = '') -> ReclaimResult:
+            return ReclaimResult(source=source.path, target=target.path, method=method,
+                                 size=target.size, reason=reason)
+
+        try:
+            if FileInfo.from_path(target.path) != target:
+                return _result(LinkMethod.SKIPPED, 'file changed since it was scanned')
+            if not filecmp.cmp(source.path, target.path, shallow=False):
+                return _result(LinkMethod.SKIPPED, 'content differs')
+        except OSError as exc:
+            return _result(LinkMethod.SKIPPED, str(exc))
+
+        if self._shares_extents(source.path, target.path):
+            return _result(LinkMethod.SHARED, 'already shares extents with the source')
+
+        if self.dry_run:
+            return _result(LinkMethod.DRY_RUN)
+
+        temp_path = os.path.join(os.path.dirname(target.path),
+                                 f".{os.path.basename(target.path)}{self.TEMP_SUFFIX}")
+        try:
+            method = self._link(source.path, temp_path)
+            os.replace(temp_path, target.path)
+        except OSError as exc:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return _result(LinkMethod.SKIPPED, str(exc))
+
+        return _result(method)
+
+    def _link(self, source: str, temp_path: str) -> str:
+        """
+        Create temp_path as a reflink of source (if supported), otherwise as a hardlink.
+
+        :param source: Path of the file to link to
+        :param temp_path: Path of the link to create
+
+        :return: LinkMethod used
+
+        """
+        if self.reflink:
+            try:
+                with open(source, "rb") as src_file, open(temp_path, "xb") as dest_file:
+                    fcntl.ioctl(dest_file.fileno(), self.FICLONE, src_file.fileno())
+                os.utime(temp_path, ns=(os.stat(source).st_atime_ns,
+                                        os.stat(source).st_mtime_ns))
+                return LinkMethod.REFLINK
+            except OSError as exc:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+                # Filesystem does not support reflinks; do not try again.
+                if exc.errno in self.REFLINK_UNSUPPORTED:
+                    self.reflink = False
+
+        os.link(source, temp_path)
+        return LinkMethod.HARDLINK
+
+    @classmethod
+    def _extents(cls, path: str) -> List[Tuple[int, int, int]]:
+        """
+        Get the extent map of a file (FIEMAP ioctl).
+
+        :param path: Path of the file
+
+        :return: List of (logical offset, physical offset, length) tuples; empty if the
+            filesystem does not report extents.
+
+        """
+        request = bytearray(cls.FIEMAP_HEADER.size +
+                            cls.FIEMAP_EXTENT.size * cls.FIEMAP_EXTENT_COUNT)
+        cls.FIEMAP_HEADER.pack_into(request, 0, 0, 0xFFFFFFFFFFFFFFFF, cls.FIEMAP_FLAG_SYNC,
+                                    0, cls.FIEMAP_EXTENT_COUNT, 0)
+        with open(path, "rb") as file_obj:
+            fcntl.ioctl(file_obj.fileno(), cls.FIEMAP, request)
+
+        mapped = cls.FIEMAP_HEADER.unpack_from(request, 0)[3]
+        extents = []
+        for index in range(mapped):
+            extent = cls.FIEMAP_EXTENT.unpack_from(
+                request, cls.FIEMAP_HEADER.size + index * cls.FIEMAP_EXTENT.size)
+            extents.append(extent[:3])
+        return extents
+
+    def _shares_extents(self, source: str, target: str) -> bool:
+        """
+        Determine if the target is already a reflink of the source (same physical extents),
+        e.g. replaced by a previous run. Relinking it would not free any space.
+
+        :param source: Path of the retained copy
+        :param target: Path of the copy to replace
+
+        :return: True if the files share all of their extents.
+
+        """
+        if fcntl is None:
+            return False
+        try:
+            source_extents = self._extents(source)
+            return bool(source_extents) and source_extents == self._extents(target)
+        except OSError:
+            # Filesystem does not support FIEMAP: the files can not be reflinks either
+            return False
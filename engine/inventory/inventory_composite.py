@@ -11,6 +11,7 @@ from PDL.configuration.properties.app_cfg import AppCfgFileSections, AppCfgFileS
 from PDL.engine.images.image_info import ImageData
 from PDL.engine.inventory.json.inventory import JsonInventory
 from PDL.engine.inventory.filesystems.inventory import FSInv
+from PDL.engine.metrics import memory
 from PDL.logger.logger import Logger
 
 LOG = Logger()
@@ -27,16 +28,21 @@ class Inventory:
     Currently this is done in a pickled, binary file, but can (and should be) replaced
     with a database such as ElasticSearch.
     """
-    def __init__(self, cfg, force_scan=False) -> None:
+    def __init__(self, cfg, force_scan=False, read_only=False) -> None:
         """
         :param cfg: Instantiated PdlConfig object
         :param force_scan: Bool: Force an inventory scan by default.
+        :param read_only: Bool: Do not write the inventory (or compact the JSON files),
+            for subcommands that only query the inventory. Unless force_scan is set,
+            the JSON files are not read (the read-only inventory is the file system
+            inventory, see _accumulate_inv()).
 
         Return: None
 
         """
 
         self.force_scan = force_scan
+        self.read_only = read_only
 
         # Get the classification metadata from the config file
         self.metadata = cfg.app_cfg.get_list(
@@ -48,11 +54,22 @@ class Inventory:
             base_dir=cfg.temp_storage_path, metadata=self.metadata, serialization=True,
             binary_filename=cfg.inv_pickle_file, force_scan=self.force_scan)
         self.fs_inv = self.fs_inventory_obj.get_inventory(
-            from_file=True, serialize=True, scan_local=True)
+            from_file=True, serialize=not self.read_only, scan_local=True)
 
-        # Get JSON listed inventory (read from the JSON inv files)
+        # Get JSON listed inventory (read from the JSON inv files), unless it is not used
         self.json_inventory_obj = JsonInventory(dir_location=cfg.json_log_location)
-        self.json_inv = self.json_inventory_obj.get_inventory()
+        self.json_inv = dict()
+        if self.force_scan or not self.read_only:
+            self.json_inv = self.json_inventory_obj.get_inventory()
+        else:
+            LOG.info("Read-only inventory: the JSON files are not read.")
+
+        # Compact the JSON files in the background (the current run's log is excluded),
+        # so the number of files read at startup stays bounded.
+        self.compaction = None
+        if not self.read_only:
+            self.compaction = self.json_inventory_obj.compact(
+                exclude=[cfg.json_logfile], background=True)
 
         LOG.info(f"NUM of FileSystem Records in inventory: {len(self.fs_inv.keys())}")
         LOG.info(f"NUM of JSON Records in inventory: {len(self.json_inv.keys())}")
@@ -62,8 +79,10 @@ class Inventory:
         self.inventory = self._accumulate_inv()
 
         # Write the updated inventory to file.
-        self.write()
+        if not self.read_only:
+            self.write()
 
+    @memory.measured('inventory_merge')
     def _accumulate_inv(self) -> Dict[str, ImageData]:
         """
         Combine the various inventory sources (e.g. JSON and File System inventories)
@@ -100,6 +119,12 @@ class Inventory:
             # represent the same file.
             total_inv = self._make_inv_consistent(data_dict=total_inv)
 
+        # Read-only: the file system inventory is the inventory file plus the local scan
+        # (which is what the inventory file would contain, if it had been written).
+        elif self.read_only:
+            total_inv = self.fs_inv
+            total_inv = self._make_inv_consistent(data_dict=total_inv)
+
         # Read the inventory from the pickled inventory file.
         else:
             LOG.info(f"Reading from {self.fs_inventory_obj.pickle_fname}")
@@ -120,7 +145,7 @@ class Inventory:
 
     def _pickle_(self, data: Optional[Dict[str, ImageData]] = None) -> None:
         """
-        Write the inventory to file (binary, pickled file)
+        Write the inventory to file (versioned binary format, see binary_store)
 
         :param data: Inventory dictionary (k: image_name, v: ImageData object)
 
@@ -134,7 +159,7 @@ class Inventory:
 
     def _unpickle_(self) -> Dict[str, ImageData]:
         """
-        Read the inventory from a pickled/binary file.
+        Read the inventory from a binary (or legacy pickled) file.
 
         :return: Dictionary for the inventory (k: image_name, v: ImageData object)
 
@@ -222,7 +247,7 @@ class Inventory:
         new_inv = dict()
 
         # Iterate through the existing inventory:
-        new_keys_lc = []
+        new_keys_lc = set()
         for image_name, image_obj in data_dict.items():
 
             # Split the key name. Correct keys will not split, so [0] is the only element.
@@ -239,7 +264,7 @@ class Inventory:
             # Otherwise, add the ImageData object with the corrected key.
             else:
                 new_inv[image_name] = image_obj
-                new_keys_lc.append(image_name)
+                new_keys_lc.add(image_name)
 
         # Return the corrected inventory dictionary
         return new_inv
@@ -0,0 +1,491 @@
+"""
+
+    Log-structured compaction of the JSON inventory log directory.
+
+    Each run writes a new JSON Lines file, so the directory grows by one file per run.
+    The compactor groups the data files by size tier (tier N holds files of roughly
+    BASE_SIZE * FANOUT^N bytes), and when a tier has FANOUT or more files, the files are
+    merged (sorted runs + k-way merge) into a single, larger LEVEL file. The number of
+    files read at startup is bounded by (FANOUT - 1) files per tier, regardless of how
+    many runs have been recorded.
+
+    The merge primitives (sorted runs, k-way merge, key digests, fsync helpers) are also
+    used by scripts/consolidate_json_files.py.
+
+"""
+
+import hashlib
+import heapq
+from itertools import groupby
+import json
+import math
+import os
+import re
+import shutil
+import tempfile
+import threading
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from PDL.engine.images.image_info import ImageData
+from PDL.engine.images.status import DownloadStatus
+from PDL.logger.json_log import JsonLinesLog, read_records
+from PDL.logger.logger import Logger
+
+LOG = Logger()
+
+EXTENSION = JsonLinesLog.EXTENSION
+
+DIGEST_SIZE = 16                        # Bytes per key digest
+DIGEST_MODULUS = 1 << (DIGEST_SIZE * 8)  # Key digests are summed modulo 2^128
+
+
+class RunSummary(NamedTuple):
+    """ Sorted run results for a single data file. """
+    data_file: str
+    run_file: str
+    raw_records: int
+    records: int
+    digest: int
+
+
+class MergeSummary(NamedTuple):
+    """ Results of merging the sorted runs into a single file. """
+    records: int
+    duplicates: int
+    duplicates_digest: int
+
+
+def last_record(records: List[dict]) -> dict:
+    """
+    Default reducer for records with the same key: the last (newest) record wins.
+
+    :param records: Records with the same key (oldest to newest)
+
+    :return: Record to keep
+
+    """
+    return records[-1]
+
+
+def key_digest(key: str) -> int:
+    """
+    Digest of a single record key. Digests are summed (order independent), so the digest
+    of a set of keys can be built incrementally and compared between passes.
+
+    :param key: Record key (image filename)
+
+    :return: (int) 128-bit digest of the key
+
+    """
+    return int.from_bytes(hashlib.blake2b(
+        key.encode('utf-8'), digest_size=DIGEST_SIZE).digest(), 'big')
+
+
+def write_line(output_file, key: str, record: dict) -> None:
+    """
+    Write a single {key: record} JSON Lines entry.
+
+    :param output_file: Open (text) file handle
+    :param key: Record key (image filename)
+    :param record: JSON record
+
+    :return: None
+
+    """
+    output_file.write(f"{json.dumps({key: record})}\n")
+
+
+def fsync_file(output_file) -> None:
+    """
+    Flush the file's buffers and force the contents to disk.
+
+    :param output_file: Open file handle
+
+    :return: None
+
+    """
+    output_file.flush()
+    os.fsync(output_file.fileno())
+
+
+def fsync_directory(directory: str) -> None:
+    """
+    fsync the directory, so a rename into the directory is durable. Not all platforms
+    support opening a directory (e.g. - Windows), so this is best effort.
+
+    :param directory: Directory to fsync
+
+    :return: None
+
+    """
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def build_sorted_run(data_file: str, run_dir: str, index: int,
+                     keep: Optional[Callable[[dict], bool]] = None,
+                     reduce: Callable[[List[dict]], dict] = last_record) -> RunSummary:
+    """
+    Read a single data file, and write the records to a run file sorted by key.
+    Only the one data file is held in memory.
+
+    :param data_file: Absolute path <data>.json(l) file
+    :param run_dir: Directory to write the sorted run file
+    :param index: Position of the data file (used to name the run file)
+    :param keep: Filter: only records where keep(record) is True are written. (DEFAULT: all)
+    :param reduce: Combines records with the same key within the file.
+
+    :return: RunSummary (record counts and key digest for the data file)
+
+    """
+    LOG.info(f"Reading JSON File: {data_file}")
+    records = dict()
+    raw_records = 0
+    for image, record in read_records(data_file):
+        raw_records += 1
+        if keep is None or keep(record):
+            records.setdefault(image, list()).append(record)
+
+    digest = 0
+    run_file = os.path.join(run_dir, f"run_{index:06d}.{EXTENSION}")
+    with open(run_file, "w") as run:
+        for image in sorted(records):
+            write_line(run, image, reduce(records[image]))
+            digest = (digest + key_digest(image)) % DIGEST_MODULUS
+
+    LOG.debug(f"{data_file}: RAW RECORDS: {raw_records}  KEPT: {len(records)}")
+    return RunSummary(data_file=data_file, run_file=run_file, raw_records=raw_records,
+                      records=len(records), digest=digest)
+
+
+def _keyed_run(run_file: str, index: int) -> Iterator[Tuple[str, int, dict]]:
+    """
+    Stream a sorted run as (key, run index, record) so the merge can order duplicates
+    by the order of the source data files.
+
+    :param run_file: Sorted run file
+    :param index: Position of the run (later runs are newer)
+
+    :return: Generator of (key, index, record)
+
+    """
+    for key, record in read_records(run_file):
+        yield key, index, record
+
+
+def merge_runs(run_files: List[str], filename: str,
+               reduce: Callable[[List[dict]], dict] = last_record) -> MergeSummary:
+    """
+    K-way merge of the sorted runs into a single JSON Lines file. Each record is
+    written as it is merged; records with the same key in multiple runs are combined
+    via reduce() (DEFAULT: the last run wins). The file is fsync'd before returning.
+
+    :param run_files: Sorted run files (oldest to newest)
+    :param filename: Absolute path/filename of the merged file.
+    :param reduce: Combines records with the same key (records are oldest to newest)
+
+    :return: MergeSummary (records written, and the duplicates combined)
+
+    """
+    streams = [_keyed_run(run_file, index) for index, run_file in enumerate(run_files)]
+    merged = heapq.merge(*streams, key=lambda entry: (entry[0], entry[1]))
+
+    records = duplicates = duplicates_digest = 0
+    with open(filename, "w") as output_file:
+        for key, entries in groupby(merged, key=lambda entry: entry[0]):
+            entries = [entry[2] for entry in entries]
+            write_line(output_file, key, reduce(entries))
+            records += 1
+
+            # Track the combined duplicates, so a verification can account for them.
+            if len(entries) > 1:
+                duplicates += len(entries) - 1
+                duplicates_digest = (duplicates_digest +
+                                     key_digest(key) * (len(entries) - 1)) % DIGEST_MODULUS
+
+        fsync_file(output_file)
+
+    LOG.info(f"Wrote {records} records to: {filename} ({duplicates} duplicates merged)")
+    return MergeSummary(records=records, duplicates=duplicates,
+                        duplicates_digest=duplicates_digest)
+
+
+def combine_records(records: List[dict]) -> dict:
+    """
+    Reducer used by compaction. Mirrors how JsonInventory builds the inventory: the first
+    DOWNLOADED record is the image's record, and any metadata it is missing is filled
+    in from the other records for the same image.
+
+    :param records: Records with the same key (oldest to newest)
+
+    :return: Combined record
+
+    """
+    downloaded = [record for record in records
+                  if record.get(ImageData.DL_STATUS) == DownloadStatus.DOWNLOADED]
+    combined = dict((downloaded or records)[0])
+
+    for record in records:
+        for attribute in ImageData.METADATA:
+            if combined.get(attribute) is None and record.get(attribute) is not None:
+                combined[attribute] = record[attribute]
+
+    return combined
+
+
+class JsonLogCompactor:
+    """
+    Size-tiered compaction of the JSON log directory, tracked by a manifest.
+
+    The manifest (not a .json file, so it is not read as inventory) records each
+    LEVEL file, its tier, and its record count. It is replaced atomically after each
+    merge, and source files are only deleted after the merged file and the manifest are
+    on disk. If the process stops part way through, the remaining source files are simply
+    merged again (combining records is idempotent).
+
+    Only the run logs (named after the run's timestamp) and the compactor's own LEVEL
+    files are compacted, and only if they contain image records: other files in the
+    directory (e.g. - CONSOLIDATED_<n>.jsonl files) are left alone.
+
+    """
+    MANIFEST = "compaction.manifest"
+    MANIFEST_VERSION = 1
+    LEVEL_PREFIX = "LEVEL_"
+    LEVEL_PATTERN = re.compile(rf"^{LEVEL_PREFIX}\d+_\d+\.{EXTENSION}$")
+
+    # Run logs (see PdlConfig._build_json_logfile_name): the run's timestamp
+    # (logger.utils.TIMESTAMP), stripped of the configured prefix/suffix, so no '_'.
+    RUN_LOG_PATTERN = re.compile(r"^[^_]*\d{6}T\d{6}[^_]*\.(json|jsonl)$", re.IGNORECASE)
+
+    FANOUT = 4                 # Number of files in a tier that triggers a merge
+    BASE_SIZE = 256 * 1024     # Files smaller than this (in bytes) are tier 0
+
+    def __init__(self, dir_location: str, fanout: int = FANOUT,
+                 base_size: int = BASE_SIZE) -> None:
+        self.location = dir_location
+        self.fanout = max(2, int(fanout))
+        self.base_size = base_size
+        self.manifest_file = os.path.join(self.location, self.MANIFEST)
+        self._lock = threading.Lock()
+
+    def tier(self, size: int) -> int:
+        """
+        Determine the size tier for a file.
+
+        :param size: File size, in bytes
+
+        :return: (int) tier (0 = smaller than base_size)
+
+        """
+        if size < self.base_size:
+            return 0
+        return 1 + int(math.log(size / self.base_size, self.fanout))
+
+    def load_manifest(self) -> Dict[str, dict]:
+        """
+        Read the manifest, dropping entries for files that no longer exist.
+
+        :return: Dictionary of LEVEL files (k: filename, v: {'tier': int, 'records': int})
+
+        """
+        files = dict()
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, "r") as manifest:
+                files = json.load(manifest).get('files', dict())
+
+        return {name: info for name, info in files.items()
+                if os.path.exists(os.path.join(self.location, name))}
+
+    def _write_manifest(self, files: Dict[str, dict]) -> None:
+        """
+        Atomically replace the manifest.
+
+        :param files: Dictionary of LEVEL files (k: filename, v: file info)
+
+        :return: None
+
+        """
+        temp_file = f"{self.manifest_file}.tmp"
+        with open(temp_file, "w") as manifest:
+            manifest.write(json.dumps(
+                {'version': self.MANIFEST_VERSION, 'files': files}, indent=2, sort_keys=True))
+            fsync_file(manifest)
+        os.replace(temp_file, self.manifest_file)
+        fsync_directory(self.location)
+
+    def is_compactable(self, name: str) -> bool:
+        """
+        Determine if the file name is a run log or a LEVEL file.
+
+        :param name: File name (without the directory)
+
+        :return: (bool) True if the file can be compacted
+
+        """
+        return bool(self.RUN_LOG_PATTERN.match(name) or self.LEVEL_PATTERN.match(name))
+
+    @staticmethod
+    def has_image_records(data_file: str) -> bool:
+        """
+        Check the first record of the file is an image record ({filename: {dl_status: ...}}).
+        An empty file has no records to merge, and is accepted.
+
+        :param data_file: Absolute path of the data file
+
+        :return: (bool) True if the file contains image records
+
+        """
+        try:
+            for _, record in read_records(data_file):
+                return isinstance(record, dict) and ImageData.DL_STATUS in record
+        except (OSError, ValueError, AttributeError) as exc:
+            LOG.warn(f"Unable to read records from {data_file}: {exc}")
+            return False
+        return True
+
+    def get_data_files(self, exclude: Optional[List[str]] = None) -> List[str]:
+        """
+        List the data files eligible for compaction (run logs and LEVEL files containing
+        image records), oldest first.
+
+        :param exclude: Files to leave alone (e.g. - the log for the current run)
+
+        :return: List of absolute path data files
+
+        """
+        exclude = {os.path.abspath(name) for name in (exclude or list())}
+
+        files = list()
+        if os.path.exists(self.location):
+            files = [os.path.abspath(os.path.join(self.location, name)) for name
+                     in os.listdir(self.location) if self.is_compactable(name)]
+
+        files = [name for name in files if name not in exclude and os.path.isfile(name)]
+        for name in [name for name in files if not self.has_image_records(name)]:
+            LOG.warn(f"Not compacting {name}: the file does not contain image records.")
+            files.remove(name)
+        return sorted(files, key=lambda name: (os.stat(name).st_mtime, name))
+
+    def plan(self, exclude: Optional[List[str]] = None) -> List[List[str]]:
+        """
+        Group the data files by size tier, and return the groups that need to be merged.
+
+        :param exclude: Files to leave alone (e.g. - the log for the current run)
+
+        :return: List of groups of files (oldest first) to merge (one group per tier)
+
+        """
+        tiers = dict()
+        for data_file in self.get_data_files(exclude=exclude):
+            tiers.setdefault(self.tier(os.stat(data_file).st_size), list()).append(data_file)
+
+        return [files for _, files in sorted(tiers.items()) if len(files) >= self.fanout]
+
+    def compact(self, exclude: Optional[List[str]] = None) -> List[str]:
+        """
+        Merge tiers until no tier has FANOUT or more files.
+
+        :param exclude: Files to leave alone (e.g. - the log for the current run)
+
+        :return: List of LEVEL files created
+
+        """
+        created = list()
+        with self._lock:
+            groups = self.plan(exclude=exclude)
+            while groups:
+                created.append(self._merge(groups[0]))
+                groups = self.plan(exclude=exclude)
+
+        if created:
+            LOG.info(f"Compaction complete: {len(created)} LEVEL file(s) created. "
+                     f"{len(self.get_data_files(exclude=exclude))} data files remain.")
+        return created
+
+    def compact_in_background(self, exclude: Optional[List[str]] = None) -> threading.Thread:
+        """
+        Run the compaction in a background thread. The thread is not a daemon, so the
+        application waits for an in-progress merge to finish before exiting.
+
+        :param exclude: Files to leave alone (e.g. - the log for the current run)
+
+        :return: The (started) compaction thread
+
+        """
+        thread = threading.Thread(target=self.compact, kwargs={'exclude': exclude},
+                                  name='json-log-compaction', daemon=False)
+        thread.start()
+        return thread
+
+    def _next_sequence(self, manifest: Dict[str, dict]) -> int:
+        """
+        Determine the next LEVEL file sequence number. LEVEL files on disk are included,
+        in case a merge was interrupted before the manifest was updated.
+
+        :param manifest: Current manifest file entries
+
+        :return: (int) next sequence number
+
+        """
+        sequences = [info.get('sequence', 0) for info in manifest.values()]
+        for name in os.listdir(self.location):
+            if name.startswith(self.LEVEL_PREFIX):
+                sequence = name.split('.')[0].split('_')[-1]
+                if sequence.isdigit():
+                    sequences.append(int(sequence))
+        return 1 + max(sequences + [0])
+
+    def _merge(self, data_files: List[str]) -> str:
+        """
+        Merge the data files into a single LEVEL file, update the manifest, and delete
+        the merged data files.
+
+        :param data_files: Files to merge (oldest first)
+
+        :return: Absolute path of the LEVEL file created
+
+        """
+        manifest = self.load_manifest()
+        LOG.info(f"Compacting {len(data_files)} JSON data files.")
+
+        run_dir = tempfile.mkdtemp(prefix="compaction_", dir=self.location)
+        try:
+            runs = [build_sorted_run(data_file=data_file, run_dir=run_dir, index=index,
+                                     reduce=combine_records)
+                    for index, data_file in enumerate(data_files)]
+
+            temp_file = os.path.join(run_dir, f"merged.{EXTENSION}")
+            merge = merge_runs(run_files=[run.run_file for run in runs], filename=temp_file,
+                               reduce=combine_records)
+
+            tier = self.tier(os.stat(temp_file).st_size)
+            sequence = self._next_sequence(manifest)
+            level_name = f"{self.LEVEL_PREFIX}{tier}_{sequence:06d}.{EXTENSION}"
+            level_file = os.path.join(self.location, level_name)
+
+            os.replace(temp_file, level_file)
+            fsync_directory(self.location)
+
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+        # Record the new LEVEL file (and drop the merged ones), then remove the sources.
+        merged_names = {os.path.basename(name) for name in data_files}
+        manifest = {name: info for name, info in manifest.items() if name not in merged_names}
+        manifest[level_name] = {'tier': tier, 'records': merge.records, 'sequence': sequence}
+        self._write_manifest(manifest)
+
+        for data_file in data_files:
+            os.remove(data_file)
+            LOG.debug(f"Compacted and removed: {data_file}")
+
+        LOG.info(f"Created {level_name}: {merge.records} records (tier {tier}).")
+        return level_file
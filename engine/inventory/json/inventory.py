@@ -4,11 +4,14 @@
 
 """
 
-import json
 import os
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from PDL.engine.inventory.base_inventory import BaseInventory
+from PDL.engine.inventory.json.compaction import JsonLogCompactor
+from PDL.engine.metrics import memory
+from PDL.logger.json_log import JsonLinesLog, read_records
 from PDL.logger.logger import Logger
 from PDL.engine.images.status import DownloadStatus
 from PDL.engine.images.image_info import ImageData
@@ -25,16 +28,20 @@ class JsonInventory(BaseInventory):
        key = image_name
        value = ImageData object
 
-     NOTE: Temp solution until database is in place; this solution will not scale well
-     for large numbers of JSON files - major performance hit!)
+     NOTE: Temp solution until database is in place. To keep the number of files read
+     bounded, the run files are periodically compacted into larger LEVEL files
+     (see JsonInventory.compact()).
 
     """
     EXT = "json"
+    LINES_EXT = JsonLinesLog.EXTENSION
 
     def __init__(self, dir_location: str) -> None:
         super(JsonInventory, self).__init__()
         self.location = dir_location
+        self.compactor = JsonLogCompactor(dir_location=self.location)
 
+    @memory.measured('json_ingest')
     def get_inventory(self) -> Dict[str, ImageData]:
         """
         Get the unique inventory contained in the JSON files.
@@ -45,18 +52,34 @@ class JsonInventory(BaseInventory):
         # Get list of JSON files
         filename_list = self.get_json_files(loc=self.location)
 
-        # Read all json files and return list of json blobs (1 blob per file)
-        content_list = self._read_content(files=filename_list)
+        # Lazily read the (image_name, image_info) records from all json/jsonl files
+        records = self._read_records(files=filename_list)
 
-        # Parse list of json blobs, update data based on detected duplicates, and
+        # Parse the records, update data based on detected duplicates, and
         # build dictionary of ImageData objects.
-        inv = self._build_inventory_dict(content_list)
+        inv = self._build_inventory_dict(records)
 
         return inv
 
+    def compact(self, exclude: Optional[List[str]] = None,
+                background: bool = True) -> Optional[threading.Thread]:
+        """
+        Compact the JSON files (merge small run files into larger LEVEL files by size tier).
+
+        :param exclude: Files to leave alone (e.g. - the log for the current run)
+        :param background: Run the compaction in a background thread. (DEFAULT: True)
+
+        :return: The compaction thread if run in the background, otherwise None.
+
+        """
+        if background:
+            return self.compactor.compact_in_background(exclude=exclude)
+        self.compactor.compact(exclude=exclude)
+        return None
+
     def get_json_files(self, loc: Optional[str] = None) -> List[str]:
         """
-        Get list of JSON files (<filespec>.json)
+        Get list of JSON files (<filespec>.json and <filespec>.jsonl)
 
         :param loc: directory containing JSON files
 
@@ -68,14 +91,15 @@ class JsonInventory(BaseInventory):
         files = list()
         if os.path.exists(loc):
             files = [os.path.sep.join([loc, x]) for x in os.listdir(loc) if
-                     x.lower().endswith(self.EXT.lower())]
+                     x.lower().endswith((self.EXT.lower(), self.LINES_EXT.lower()))]
         else:
             LOG.error(f"Specified directory DOES NOT EXIST: '{loc}'")
         return files
 
-    def _build_inventory_dict(self, content_list: List[dict]) -> Dict[str, ImageData]:
+    def _build_inventory_dict(
+            self, records: Iterable[Tuple[str, dict]]) -> Dict[str, ImageData]:
         """
-        Build the inventory dictionary from the contents of the JSON files.
+        Build the inventory dictionary from the records in the JSON files.
 
         Iterates through the content, creates ImageData objects per image, and stores
         in dictionary:
@@ -89,40 +113,39 @@ class JsonInventory(BaseInventory):
         [1] - This is done because there will be DUPs that were DL'd before this functionality
         was available.
 
-        :param content_list: List of JSON blobs (1 blob per file)
+        :param records: Iterable of (image_name, image_info) records
         :return: Dictionary of Images in inventory (key=image_name, value=ImageData of image)
 
         """
         inv = dict()
         dups = dict()
-        for images_info in content_list:
-            for image_name, image_info in images_info.items():
-                image_obj = ImageData.build_obj(image_info)
-                if image_name.endswith('jpg'):
-                    image_name = image_name.split(".")[0]
-
-                # If the image name is not in the inventory...
-                if image_name not in inv.keys():
-
-                    # If the image was DL'd
-                    if image_info[ImageData.DL_STATUS] == DownloadStatus.DOWNLOADED:
-                        inv[image_name] = image_obj
-
-                    # Otherwise it may have already existed and included in the JSON,
-                    # so classify as a DUP.
-                    else:
-                        self._add_to_dups(dups, image_obj)
-                        LOG.debug(f"Download Status for '{image_obj.image_name}': "
-                                  f"{image_obj.dl_status}")
-                        LOG.debug(f"Duplicate in the inventory? {image_obj.image_name in inv}")
-
-                # Image was already in the inventory.
+        for image_name, image_info in records:
+            image_obj = ImageData.build_obj(image_info)
+            if image_name.endswith('jpg'):
+                image_name = image_name.split(".")[0]
+
+            # If the image name is not in the inventory...
+            if image_name not in inv.keys():
+
+                # If the image was DL'd
+                if image_info[ImageData.DL_STATUS] == DownloadStatus.DOWNLOADED:
+                    inv[image_name] = image_obj
+
+                # Otherwise it may have already existed and included in the JSON,
+                # so classify as a DUP.
                 else:
                     self._add_to_dups(dups, image_obj)
                     LOG.debug(f"Download Status for '{image_obj.image_name}': "
                               f"{image_obj.dl_status}")
                     LOG.debug(f"Duplicate in the inventory? {image_obj.image_name in inv}")
 
+            # Image was already in the inventory.
+            else:
+                self._add_to_dups(dups, image_obj)
+                LOG.debug(f"Download Status for '{image_obj.image_name}': "
+                          f"{image_obj.dl_status}")
+                LOG.debug(f"Duplicate in the inventory? {image_obj.image_name in inv}")
+
         # Update the metadata of the inventory, if needed, and return the inventory dict.
         return self._update_info(inv, dups)
 
@@ -177,21 +200,18 @@ class JsonInventory(BaseInventory):
         return dictionary
 
     @staticmethod
-    def _read_content(files: List[str]) -> List[dict]:
+    def _read_records(files: List[str]) -> Iterator[Tuple[str, dict]]:
         """
-        Read json file and append contents to a storage list
+        Lazily read the records from each json/jsonl file, one file at a time.
 
         :param files: List of files to read (full path filespec required)
 
-        :return: List of JSON blobs, 1 blob per file.
+        :return: Generator of (image_name, image_info) records across all files.
 
         """
-        content = list()
         for json_file in files:
-            with open(json_file) as json_file:
-                lines = json_file.readlines()
-            content.append(json.loads(''.join(lines)))
-        return content
+            LOG.debug(f"Reading JSON records from: {json_file}")
+            yield from read_records(json_file)
 
     # TODO: Add logic to add_to_inventory, list_inventory, remove_from_inventory
     def add_to_inventory(self, element):
@@ -0,0 +1,161 @@
+"""
+  Export a MetricsRegistry:
+    * Prometheus text format (for the node_exporter textfile collector)
+    * JSON
+
+  Files are written to a temporary file and renamed, so a reader (e.g. - node_exporter)
+  never sees a partially written file.
+
+"""
+
+import json
+import math
+import os
+import tempfile
+import time
+from typing import Dict
+
+from PDL.engine.metrics.registry import MetricsRegistry, MetricTypes, REGISTRY
+from PDL.logger.logger import Logger
+
+LOG = Logger()
+
+
+def _format_value(value: float) -> str:
+    """
+    Format a sample value (or bucket bound) in the Prometheus text format.
+
+    :param value: Numeric value
+
+    :return: str
+
+    """
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """
+    Format the labels in the Prometheus text format (values escaped).
+
+    :param labels: Label values (k: label name, v: value)
+
+    :return: str ('' if there are no labels)
+
+    """
+    if not labels:
+        return ''
+    escaped = [(name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+               for name, value in labels.items()]
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def to_prometheus(registry: MetricsRegistry = REGISTRY) -> str:
+    """
+    Render the metrics in the Prometheus text exposition format.
+
+    :param registry: Metrics to render
+
+    :return: str
+
+    """
+    lines = list()
+    for metric in registry.metrics():
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+
+        for labels, value in metric.samples():
+            if metric.TYPE == MetricTypes.HISTOGRAM:
+                for upper_bound, count in value['buckets'].items():
+                    bucket_labels = dict(labels, le=_format_value(upper_bound))
+                    lines.append(f"{metric.name}_bucket{_format_labels(bucket_labels)} {count}")
+                lines.append(f"{metric.name}_sum{_format_labels(labels)} "
+                             f"{_format_value(value['sum'])}")
+                lines.append(f"{metric.name}_count{_format_labels(labels)} {value['count']}")
+            else:
+                lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(value)}")
+
+    return '\n'.join(lines) + '\n'
+
+
+def to_dict(registry: MetricsRegistry = REGISTRY) -> dict:
+    """
+    Build a JSON-serializable dictionary of the metrics.
+
+    :param registry: Metrics to export
+
+    :return: dictionary (timestamp, metrics: {name: {type, help, samples}})
+
+    """
+    metrics = dict()
+    for metric in registry.metrics():
+        samples = list()
+        for labels, value in metric.samples():
+            if metric.TYPE == MetricTypes.HISTOGRAM:
+                samples.append({'labels': labels,
+                                'count': value['count'],
+                                'sum': value['sum'],
+                                'buckets': {_format_value(bound): count
+                                            for bound, count in value['buckets'].items()}})
+            else:
+                samples.append({'labels': labels, 'value': value})
+
+        metrics[metric.name] = {'type': metric.TYPE,
+                                'help': metric.help_text,
+                                'samples': samples}
+
+    return {'timestamp': time.time(), 'metrics': metrics}
+
+
+def _write_atomic(filespec: str, contents: str) -> None:
+    """
+    Write the file via a temporary file in the same directory, then rename it.
+
+    :param filespec: File to write
+    :param contents: File contents
+
+    :return: None
+
+    """
+    directory = os.path.dirname(os.path.abspath(filespec))
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_file = tempfile.mkstemp(dir=directory, prefix='.metrics_', suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'w') as output:
+            output.write(contents)
+        os.replace(temp_file, filespec)
+    except OSError:
+        os.remove(temp_file)
+        raise
+
+
+def write_textfile(filespec: str, registry: MetricsRegistry = REGISTRY) -> None:
+    """
+    Write the metrics as a Prometheus textfile (file name must end in .prom to be read
+    by the node_exporter textfile collector).
+
+    :param filespec: File to write
+    :param registry: Metrics to export
+
+    :return: None
+
+    """
+    _write_atomic(filespec, to_prometheus(registry))
+    LOG.debug(f"Wrote metrics (Prometheus textfile): {filespec}")
+
+
+def write_json(filespec: str, registry: MetricsRegistry = REGISTRY) -> None:
+    """
+    Write the metrics as JSON.
+
+    :param filespec: File to write
+    :param registry: Metrics to export
+
+    :return: None
+
+    """
+    _write_atomic(filespec, json.dumps(to_dict(registry), indent=2))
+    LOG.debug(f"Wrote metrics (JSON): {filespec}")
@@ -0,0 +1,295 @@
+"""
+  Memory usage per pipeline stage (tracemalloc), enabled via the CLI (--memory).
+
+  A stage is measured with the context manager or the decorator:
+
+      with stage('report'):
+          ...
+
+      @measured('json_ingest')
+      def get_inventory(...):
+
+  For each stage, the traced memory at the start and the end of the stage, the peak
+  during the stage, the process' max RSS and the top allocation sites (the lines that
+  allocated the most memory during the stage, still allocated at the end of the stage)
+  are recorded, and logged at the end of the run. Stages can be nested (e.g. - the
+  inventory unpickle within the inventory merge).
+
+  While measuring is disabled (the default), stage() returns a no-op context manager.
+  NOTE: Each stage takes two tracemalloc snapshots: with large inventories, measuring adds
+  seconds (and memory) per stage, so it is only intended for sizing/investigation runs.
+
+"""
+
+from contextlib import contextmanager, nullcontext
+import functools
+import itertools
+import os
+import threading
+import tracemalloc
+from typing import Callable, Iterator, List, NamedTuple, Optional
+
+import prettytable
+
+from PDL.logger.logger import Logger
+
+try:
+    import resource
+except ImportError:     # Windows: max RSS is not reported
+    resource = None
+
+LOG = Logger()
+
+KILOBYTE = 1024
+MEGABYTE = 1024 * 1024
+
+
+class AllocationSite(NamedTuple):
+    """
+    Memory allocated by a source line during a stage (and not yet released)
+    """
+    site: str
+    size: int       # bytes
+    count: int      # blocks
+
+
+class MemoryStage(NamedTuple):
+    """
+    Memory measurements of a stage (bytes)
+    """
+    name: str
+    order: int      # Order the stage started in (the stages are recorded as they complete)
+    depth: int
+    start: int
+    end: int
+    peak: int
+    max_rss: Optional[int]
+    sites: List[AllocationSite]
+
+    @property
+    def delta(self) -> int:
+        return self.end - self.start
+
+
+class _OpenStage:
+    """
+    A stage being measured
+    """
+    __slots__ = ('name', 'order', 'depth', 'start', 'peak', 'snapshot')
+
+    def __init__(self, name: str, order: int, depth: int, start: int,
+                 snapshot: tracemalloc.Snapshot) -> None:
+        self.name = name
+        self.order = order
+        self.depth = depth
+        self.start = start
+        self.peak = start
+        self.snapshot = snapshot
+
+
+class MemoryTracker:
+    """
+    Records the memory usage of the stages (between start() and stop()).
+    """
+    TOP_SITES = 10
+    FRAMES = 1
+    FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__),
+               tracemalloc.Filter(False, __file__),
+               tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+               tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+               tracemalloc.Filter(False, '<unknown>'))
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.top = self.TOP_SITES
+        self.stages: List[MemoryStage] = list()
+        self._stack: List[_OpenStage] = list()
+        self._order = itertools.count()
+        self._lock = threading.RLock()
+        self._started_tracing = False
+
+    def start(self, top: int = TOP_SITES, frames: int = FRAMES) -> "MemoryTracker":
+        """
+        Start tracing the memory allocations (clears any previously recorded stages).
+
+        :param top: Number of allocation sites recorded per stage
+        :param frames: Number of frames stored per allocation traceback
+
+        :return: self
+
+        """
+        with self._lock:
+            self.stages = list()
+            self._stack = list()
+            self._order = itertools.count()
+            self.top = top
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._started_tracing = True
+            self.enabled = True
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop tracing (if the tracing was started by start()).
+
+        :return: None
+
+        """
+        with self._lock:
+            self.enabled = False
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def stage(self, name: str):
+        """
+        Context manager: measure the memory used by the block.
+
+        :param name: Stage name
+
+        :return: Context manager
+
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, name: str) -> Iterator[None]:
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+
+            # The peak is reset for each stage: keep the enclosing stage's peak so far
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, peak)
+            open_stage = _OpenStage(name=name, order=next(self._order), depth=len(self._stack),
+                                    start=current, snapshot=self._snapshot())
+            self._stack.append(open_stage)
+            tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._close(open_stage)
+
+    def _close(self, open_stage: _OpenStage) -> None:
+        """
+        Record the measurements of the stage (the lock is held).
+
+        :param open_stage: Stage being closed
+
+        :return: None
+
+        """
+        if not tracemalloc.is_tracing():
+            return
+
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(open_stage.peak, peak)
+        if open_stage in self._stack:
+            self._stack.remove(open_stage)
+        if self._stack:
+            self._stack[-1].peak = max(self._stack[-1].peak, peak)
+
+        differences = self._snapshot().compare_to(open_stage.snapshot, 'lineno')
+        sites = [AllocationSite(site=self._site(stat.traceback), size=stat.size_diff,
+                                count=stat.count_diff)
+                 for stat in differences[:self.top] if stat.size_diff > 0]
+
+        self.stages.append(MemoryStage(
+            name=open_stage.name, order=open_stage.order, depth=open_stage.depth,
+            start=open_stage.start, end=current, peak=peak, max_rss=max_rss(), sites=sites))
+        open_stage.snapshot = None
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+
+    @staticmethod
+    def _site(traceback: tracemalloc.Traceback) -> str:
+        """
+        :param traceback: Allocation traceback
+
+        :return: Source line of the allocation: <package dir>/<file>:<line>
+
+        """
+        frame = traceback[0]
+        directory, filename = os.path.split(frame.filename)
+        return f"{os.path.basename(directory)}/{filename}:{frame.lineno}"
+
+    def measured(self, name: Optional[str] = None) -> Callable:
+        """
+        Decorator: measure each call of the routine as a stage.
+
+        :param name: Stage name (DEFAULT: the routine's qualified name)
+
+        :return: decorator
+
+        """
+        def wrap(func):
+            stage_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapped_func(*args, **kwargs):
+                with self.stage(stage_name):
+                    return func(*args, **kwargs)
+            return wrapped_func
+        return wrap
+
+    def report(self) -> str:
+        """
+        Report of the stages (in the order they started: nested stages follow their
+        enclosing stage), followed by the top allocation sites of each stage.
+
+        :return: Multi-line string
+
+        """
+        stages = sorted(self.stages, key=lambda record: record.order)
+        table = prettytable.PrettyTable()
+        table.field_names = ['Stage', 'Start (MB)', 'End (MB)', 'Delta (MB)', 'Peak (MB)',
+                             'Max RSS (MB)']
+        table.align = 'r'
+        table.align['Stage'] = 'l'
+        for record in stages:
+            table.add_row([f"{'  ' * record.depth}{record.name}",
+                           f"{record.start / MEGABYTE:0.2f}", f"{record.end / MEGABYTE:0.2f}",
+                           f"{record.delta / MEGABYTE:+0.2f}", f"{record.peak / MEGABYTE:0.2f}",
+                           (f"{record.max_rss / MEGABYTE:0.1f}" if record.max_rss is not None
+                            else 'n/a')])
+
+        lines = [table.get_string(title='MEMORY PER STAGE (tracemalloc)')]
+        for record in stages:
+            if not record.sites:
+                continue
+            lines.append(f"Top allocation sites: {record.name}")
+            for site in record.sites:
+                lines.append(f"  {site.size / KILOBYTE:>12.1f} KB  {site.count:>9} blocks  "
+                             f"{site.site}")
+        return '\n'.join(lines)
+
+    def log_report(self) -> None:
+        """
+        Log the report.
+
+        :return: None
+
+        """
+        for line in self.report().split('\n'):
+            LOG.info(line)
+
+
+def max_rss() -> Optional[int]:
+    """
+    :return: Maximum resident set size of the process (bytes), or None if not available
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return rss if os.uname().sysname == 'Darwin' else rss * 1024
+
+
+# Process-wide tracker, and shortcuts
+MEMORY = MemoryTracker()
+stage = MEMORY.stage
+measured = MEMORY.measured
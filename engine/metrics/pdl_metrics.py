@@ -0,0 +1,65 @@
+"""
+  Application metrics (registered in the process-wide registry), grouped by stage:
+
+    * Images processed, per DownloadStatus
+    * Latency: page fetch, page parse, image transfer, image file write
+    * Bytes transferred (pages, images)
+    * Queue depths: service jobs, log records
+
+"""
+
+from PDL.engine.images.status import DownloadStatus
+from PDL.engine.metrics.registry import REGISTRY
+from PDL.logger.logger import Logger
+
+
+class MetricLabels:
+    """
+    Label names, and values of the 'type' label of BYTES
+    """
+    STATUS = 'status'
+    TYPE = 'type'
+
+    PAGE = 'page'
+    IMAGE = 'image'
+
+
+class PdlMetrics:
+    """
+    Metrics recorded by the application
+    """
+    # Counters
+    IMAGES = REGISTRY.counter(
+        'pdl_images_total', 'Images processed, by download status',
+        label_names=[MetricLabels.STATUS])
+    BYTES = REGISTRY.counter(
+        'pdl_bytes_transferred_total', 'Bytes received, by content type (page, image)',
+        label_names=[MetricLabels.TYPE])
+
+    # Latency histograms (seconds)
+    PAGE_FETCH = REGISTRY.histogram(
+        'pdl_page_fetch_seconds', 'Time to retrieve a display page')
+    PAGE_PARSE = REGISTRY.histogram(
+        'pdl_page_parse_seconds', 'Time to scrape the metadata and image URL from a page')
+    IMAGE_TRANSFER = REGISTRY.histogram(
+        'pdl_image_transfer_seconds',
+        'Time to request and receive an image (excluding the file writes)')
+    FILE_WRITE = REGISTRY.histogram(
+        'pdl_file_write_seconds', 'Time spent writing an image to disk')
+
+    # Queue depths
+    JOBS_QUEUED = REGISTRY.gauge(
+        'pdl_service_jobs_queued', 'Jobs waiting in the service queue')
+    LOG_QUEUE = REGISTRY.gauge(
+        'pdl_log_queue_depth', 'Log records waiting to be written')
+    LOG_DROPPED = REGISTRY.gauge(
+        'pdl_log_records_dropped', 'Log records dropped because the log queue was full')
+
+
+# Report every status (as 0) and the log queue, even before anything is recorded
+for _status in DownloadStatus.get_statuses():
+    PdlMetrics.IMAGES.inc(0, status=getattr(DownloadStatus, _status))
+for _type in (MetricLabels.PAGE, MetricLabels.IMAGE):
+    PdlMetrics.BYTES.inc(0, type=_type)
+PdlMetrics.LOG_QUEUE.set_function(lambda: Logger.queue_stats()[0])
+PdlMetrics.LOG_DROPPED.set_function(lambda: Logger.queue_stats()[1])
@@ -0,0 +1,318 @@
+"""
+  In-process metrics: counters, gauges and histograms (Prometheus data model).
+
+  Metrics are registered (by name) in a MetricsRegistry; REGISTRY is the process-wide
+  registry used by the application (see PDL.engine.metrics.pdl_metrics). The registry
+  is exported by PDL.engine.metrics.export (Prometheus textfile, JSON).
+
+  Labels are passed as keyword arguments, and must match the metric's label names:
+      IMAGES.inc(status='Downloaded')
+      with PAGE_FETCH.time():
+          ...
+
+"""
+
+from contextlib import contextmanager
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+class MetricTypes:
+    """
+    Metric types (Prometheus TYPE names)
+    """
+    COUNTER = 'counter'
+    GAUGE = 'gauge'
+    HISTOGRAM = 'histogram'
+
+
+class MetricError(Exception):
+    """
+    Raised when a metric is used or registered incorrectly.
+    """
+    def __init__(self, name: str, reason: str) -> None:
+        self.message = f"Metric '{name}': {reason}"
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class Metric:
+    """
+    Base metric: a value per combination of label values.
+    """
+    TYPE = None
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> None:
+        """
+        :param name: Metric name (e.g. - pdl_images_total)
+        :param help_text: Description of the metric
+        :param label_names: Names of the labels
+
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = dict()
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """
+        Validate the labels, and build the key (label values, in label name order).
+
+        :param labels: Label values (k: label name, v: value)
+
+        :return: tuple of label values
+
+        """
+        if set(labels) != set(self.label_names):
+            raise MetricError(self.name, f"Expected labels ({', '.join(self.label_names)}), "
+                                         f"received ({', '.join(sorted(labels))})")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> List[Tuple[Dict[str, str], object]]:
+        """
+        Current values.
+
+        :return: List of (labels, value) tuples
+
+        """
+        with self._lock:
+            items = sorted(self._values.items())
+
+        # An unlabelled metric always has a value (zero until recorded)
+        if not items and not self.label_names:
+            items = [((), self._initial_value())]
+
+        return [(dict(zip(self.label_names, key)), self._snapshot(value))
+                for key, value in items]
+
+    def _initial_value(self):
+        return 0
+
+    @staticmethod
+    def _snapshot(value):
+        return value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing value (e.g. - number of images, bytes transferred)
+    """
+    TYPE = MetricTypes.COUNTER
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """
+        Increment the counter.
+
+        :param amount: Amount to add (>= 0)
+        :param labels: Label values
+
+        :return: None
+
+        """
+        if amount < 0:
+            raise MetricError(self.name, f"Counters can not decrease (amount: {amount})")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Value that can go up and down (e.g. - queue depth). An unlabelled gauge can be
+    bound to a function, which is called when the gauge is read.
+    """
+    TYPE = MetricTypes.GAUGE
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> None:
+        super(Gauge, self).__init__(name, help_text, label_names)
+        self._function = None
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """
+        Read the (unlabelled) gauge's value from a function.
+
+        :param function: Routine returning the current value (None: use the set value)
+
+        :return: None
+
+        """
+        if self.label_names:
+            raise MetricError(self.name, "Only unlabelled gauges can be bound to a function")
+        self._function = function
+
+    def samples(self) -> List[Tuple[Dict[str, str], object]]:
+        if self._function is not None:
+            return [(dict(), self._function())]
+        return super(Gauge, self).samples()
+
+
+class HistogramValue:
+    """
+    Observations of a histogram (for one combination of label values)
+    """
+    def __init__(self, num_buckets: int) -> None:
+        self.bucket_counts = [0] * num_buckets
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values (e.g. - latency), counted in buckets.
+    The samples are (labels, dict(buckets={upper bound: cumulative count}, count, sum)).
+    """
+    TYPE = MetricTypes.HISTOGRAM
+
+    # Upper bounds (seconds): sub-ms file writes through multi-second transfers
+    LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                       30.0, 60.0)
+    INFINITY = float('inf')
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        """
+        :param name: Metric name (e.g. - pdl_page_fetch_seconds)
+        :param help_text: Description of the metric
+        :param label_names: Names of the labels
+        :param buckets: Bucket upper bounds (+Inf is added)
+
+        """
+        super(Histogram, self).__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(set(buckets))) + (self.INFINITY,)
+
+    def observe(self, value: float, **labels) -> None:
+        """
+        Record an observation.
+
+        :param value: Observed value
+        :param labels: Label values
+
+        :return: None
+
+        """
+        key = self._key(labels)
+        with self._lock:
+            observations = self._values.get(key)
+            if observations is None:
+                observations = self._values[key] = self._initial_value()
+
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    observations.bucket_counts[index] += 1
+                    break
+            observations.count += 1
+            observations.sum += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """
+        Observe the elapsed time (seconds) of the block.
+
+        :param labels: Label values
+
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _initial_value(self) -> HistogramValue:
+        return HistogramValue(len(self.buckets))
+
+    def _snapshot(self, value: HistogramValue) -> dict:
+        cumulative = 0
+        buckets = dict()
+        for upper_bound, count in zip(self.buckets, value.bucket_counts):
+            cumulative += count
+            buckets[upper_bound] = cumulative
+        return {'buckets': buckets, 'count': value.count, 'sum': value.sum}
+
+
+class MetricsRegistry:
+    """
+    Metrics, by name. Registering an existing name returns the existing metric
+    (if the type matches), so modules can declare the metrics they use.
+    """
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = dict()
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help_text, label_names)
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, help_text, label_names)
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = Histogram.LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help_text, label_names, buckets=buckets)
+
+    def _register(self, metric_class: type, name: str, help_text: str,
+                  label_names: Sequence[str], **kwargs) -> Metric:
+        """
+        Get or create the metric.
+
+        :param metric_class: Metric class
+        :param name: Metric name
+        :param help_text: Description of the metric
+        :param label_names: Names of the labels
+        :param kwargs: Additional arguments for the metric class
+
+        :return: Metric
+
+        """
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, help_text, label_names,
+                                                            **kwargs)
+            elif (not isinstance(metric, metric_class) or
+                  metric.label_names != tuple(label_names)):
+                raise MetricError(name, f"Already registered as a {metric.TYPE} with labels "
+                                        f"({', '.join(metric.label_names)})")
+        return metric
+
+    def metrics(self) -> List[Metric]:
+        """
+        :return: Registered metrics (sorted by name)
+        """
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """
+        Clear the values of all metrics (the metrics remain registered).
+
+        :return: None
+
+        """
+        for metric in self.metrics():
+            metric.reset()
+
+
+# Process-wide registry
+REGISTRY = MetricsRegistry()
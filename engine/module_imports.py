@@ -81,10 +81,9 @@ def import_module_class(dotted_path_class: str) -> Callable:
 
     if klass not in dir(module):
         LOG.error(f"Class ({klass}) not found in module: {path}")
-        msg = ("Available classes, routines, and variables available in "
-               "{module}:\n{avail}")
-        LOG.debug(msg.format(module=path, avail=', '.join(
-            [x for x in dir(module) if not x.startswith('_')])))
+        LOG.debug(lambda: "Available classes, routines, and variables available in "
+                          "{module}:\n{avail}".format(module=path, avail=', '.join(
+                              [x for x in dir(module) if not x.startswith('_')])))
 
         raise ClassNotFoundInImportedModule(klass=klass, module=path)
 
@@ -0,0 +1,144 @@
+"""
+  Import time report (similar to `python -X importtime`), enabled via the CLI (--import_time).
+
+  While the timer is running, a meta path finder wraps the loader of each module that is
+  imported, and records the time to execute the module: the self time, and the cumulative
+  time (including the modules it imports).
+
+  NOTE: This module intentionally has no PDL imports, so it can be started before the
+  application modules are loaded.
+"""
+
+import sys
+import threading
+import time
+from importlib.abc import MetaPathFinder
+from typing import List, NamedTuple
+
+
+class ImportRecord(NamedTuple):
+    """
+    Execution time of a single imported module (seconds)
+    """
+    name: str
+    depth: int
+    self_time: float
+    cumulative: float
+
+
+class ImportTimer(MetaPathFinder):
+    """
+    Records the execution time of the modules imported between start() and stop().
+    """
+    CLI_FLAG = '--import_time'
+    REPORT_LIMIT = 30
+    MICROSECONDS = 1000000
+
+    def __init__(self) -> None:
+        self.records: List[ImportRecord] = list()
+        self._local = threading.local()
+
+    @property
+    def running(self) -> bool:
+        return self in sys.meta_path
+
+    def start(self) -> "ImportTimer":
+        """
+        Start recording imports.
+
+        :return: self
+
+        """
+        if not self.running:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop recording imports.
+
+        :return: None
+
+        """
+        if self.running:
+            sys.meta_path.remove(self)
+
+    @property
+    def total(self) -> float:
+        """
+        Total time (seconds) spent importing (top-level imports only, to avoid double counting)
+        """
+        return sum(record.cumulative for record in self.records if record.depth == 0)
+
+    def find_spec(self, fullname, path, target=None):
+        """
+        Find the module spec via the remaining finders, and time the loader's exec_module().
+        """
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        # Builtin and frozen modules are loaded by classes (not instances): not timed.
+        loader = spec.loader
+        if (loader is not None and not isinstance(loader, type) and
+                hasattr(loader, 'exec_module') and hasattr(loader, '__dict__')):
+            loader.exec_module = self._timed(fullname, loader.exec_module)
+        return spec
+
+    def _timed(self, name: str, exec_module):
+        """
+        Wrap the exec_module() routine, to record the execution time of the module.
+
+        :param name: Module name
+        :param exec_module: Loader's exec_module() routine
+
+        :return: Wrapped routine
+
+        """
+        def exec_module_timed(module) -> None:
+            stack = self._stack()
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                cumulative = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += cumulative
+                self.records.append(ImportRecord(
+                    name=name, depth=len(stack), self_time=cumulative - children,
+                    cumulative=cumulative))
+        return exec_module_timed
+
+    def _stack(self) -> List[float]:
+        """
+        Per-thread stack of the time spent importing children of the modules being executed
+        """
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = list()
+        return self._local.stack
+
+    def report(self, limit: int = REPORT_LIMIT) -> str:
+        """
+        Report of the slowest imports (by cumulative time), in the -X importtime format.
+
+        :param limit: Maximum number of modules to list
+
+        :return: Multi-line string
+
+        """
+        lines = [f"Imported {len(self.records)} modules in {self.total:0.3f}s. "
+                 f"Slowest {min(limit, len(self.records))} (by cumulative time):",
+                 f"{'self [us]':>10} | {'cumulative':>10} | imported package"]
+        for record in sorted(self.records, key=lambda rec: rec.cumulative,
+                             reverse=True)[:limit]:
+            lines.append(f"{int(record.self_time * self.MICROSECONDS):>10} | "
+                         f"{int(record.cumulative * self.MICROSECONDS):>10} | "
+                         f"{'  ' * record.depth}{record.name}")
+        return '\n'.join(lines)
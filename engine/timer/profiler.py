@@ -0,0 +1,306 @@
+"""
+  Profile a complete run of a subcommand, enabled via the CLI (--profile or --profile_sample).
+
+  Modes:
+    * cprofile: Deterministic profile (cProfile) of every function call, in the main thread
+                and in the threads started while profiling (e.g. - hashing pools). Written as
+                a pstats file (<base>.pstats: snakeviz, pstats, gprof2dot), plus a table of
+                the top N functions by cumulative time (<base>.txt).
+                NOTE: Before Python 3.12, a thread's profiler can only be disabled from the
+                thread itself: the threads still running when the profile is collected are
+                left out (logged), so the threads included are captured exactly.
+
+    * sample:   Low-overhead statistical profile: a background thread records the stack of
+                every thread at a fixed interval (sys._current_frames()). Suited to long
+                download runs, where the cProfile overhead would skew the network/CPU balance.
+                Written as collapsed stacks (<base>.collapsed: flamegraph.pl, speedscope),
+                plus a table of the top N functions by inclusive samples (<base>.txt).
+
+"""
+
+import cProfile
+import collections
+import io
+import os
+import pstats
+import sys
+import threading
+from typing import Counter, Dict, List, Optional, Tuple
+
+from PDL.logger.logger import Logger
+
+LOG = Logger()
+
+REPORT_LIMIT = 30
+REPORT_EXT = '.txt'
+
+
+class CallProfiler:
+    """
+    Deterministic profile (cProfile) of the main thread, and of the threads started while
+    the profiler is running.
+    """
+    MODE = 'cprofile'
+    STATS_EXT = '.pstats'
+
+    # From 3.12, cProfile is built on sys.monitoring, which covers all threads (and only
+    # one profiler can be enabled): threads only need their own profiler before 3.12.
+    PER_THREAD = sys.version_info < (3, 12)
+
+    def __init__(self) -> None:
+        self._profiles: List[cProfile.Profile] = list()
+        self._threads: List[Tuple[threading.Thread, cProfile.Profile]] = list()
+        self._lock = threading.Lock()
+
+    def start(self) -> "CallProfiler":
+        """
+        Start profiling the current thread, and each thread started from now on.
+
+        :return: self
+
+        """
+        if self.PER_THREAD:
+            threading.setprofile(self._profile_thread)
+        profile = cProfile.Profile()
+        self._profiles.append(profile)
+        profile.enable()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop profiling the current thread (and stop profiling new threads). The profilers
+        of the threads still running can not be disabled from this thread: they stop when
+        their thread exits (see stats()).
+
+        :return: None
+
+        """
+        if self.PER_THREAD:
+            threading.setprofile(None)
+        if self._profiles:
+            self._profiles[0].disable()
+
+    def _profile_thread(self, *_) -> None:
+        """
+        Profile hook installed in each new thread (threading.setprofile), called on the
+        thread's first profiling event. It creates a profiler dedicated to the thread:
+        profile.enable() replaces this hook (the thread's sys.setprofile function) with the
+        profiler, which then records until it is disabled or the thread exits.
+        """
+        profile = cProfile.Profile()
+        with self._lock:
+            self._threads.append((threading.current_thread(), profile))
+        profile.enable()
+
+    def running_threads(self) -> List[str]:
+        """
+        :return: Names of the profiled threads that are still running
+        """
+        with self._lock:
+            return [thread.name for thread, _ in self._threads if thread.is_alive()]
+
+    def stats(self) -> pstats.Stats:
+        """
+        Combined statistics of the main thread and of the profiled threads that have
+        exited. A thread that is still running is still recording (its profiler can only
+        be disabled from the thread), so taking a snapshot of its profiler would race with
+        the thread: it is left out.
+
+        :return: Combined statistics
+        """
+        stats = pstats.Stats(self._profiles[0])
+        with self._lock:
+            finished = [profile for thread, profile in self._threads if not thread.is_alive()]
+        for profile in finished:
+            stats.add(profile)
+
+        running = self.running_threads()
+        if running:
+            LOG.warn(f"Profile excludes {len(running)} thread(s) still running: "
+                     f"{', '.join(running)}")
+        return stats
+
+    def report(self, limit: int = REPORT_LIMIT) -> str:
+        """
+        Table of the top functions, by cumulative time.
+
+        :param limit: Maximum number of functions to list
+
+        :return: Multi-line string
+
+        """
+        output = io.StringIO()
+        stats = self.stats()
+        stats.stream = output
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        threads = 1 + len(self._threads) - len(self.running_threads())
+        return (f"Profiled {threads} thread(s). Top {limit} functions "
+                f"(by cumulative time):\n{output.getvalue().strip()}")
+
+    def write(self, base_filespec: str, limit: int = REPORT_LIMIT) -> List[str]:
+        """
+        Write the pstats file and the report.
+
+        :param base_filespec: Filespec of the output files, without the extension
+        :param limit: Maximum number of functions in the report
+
+        :return: List of files written
+
+        """
+        stats_file = f"{base_filespec}{self.STATS_EXT}"
+        self.stats().dump_stats(stats_file)
+        return [stats_file, write_report(f"{base_filespec}{REPORT_EXT}", self.report(limit))]
+
+
+class SamplingProfiler:
+    """
+    Statistical profile: samples the stack of every thread at a fixed interval.
+    """
+    MODE = 'sample'
+    STACKS_EXT = '.collapsed'
+    INTERVAL = 0.005
+    THREAD_NAME = 'pdl-profiler'
+
+    def __init__(self, interval: float = INTERVAL) -> None:
+        """
+        :param interval: Time between samples (seconds)
+
+        """
+        self.interval = interval
+        self.stacks: Counter[Tuple[str, ...]] = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        """
+        Start sampling (in a background thread).
+
+        :return: self
+
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name=self.THREAD_NAME, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop sampling.
+
+        :return: None
+
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _sample(self) -> None:
+        """
+        Sampling loop: record the stack (outermost frame first) of each thread, except
+        the sampling thread.
+        """
+        sampler_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+                stack = list()
+                while frame is not None:
+                    stack.append(self.function_name(frame.f_code))
+                    frame = frame.f_back
+                self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    @staticmethod
+    def function_name(code) -> str:
+        """
+        :param code: Code object of the frame
+
+        :return: Function name, in the pstats format: file:line(function)
+
+        """
+        return f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}({code.co_name})"
+
+    def function_samples(self) -> Dict[str, Tuple[int, int]]:
+        """
+        :return: Dictionary (K: function, V: (inclusive samples, self samples))
+        """
+        inclusive = collections.Counter()
+        own = collections.Counter()
+        for stack, count in self.stacks.items():
+            for function in set(stack):
+                inclusive[function] += count
+            own[stack[-1]] += count
+        return {function: (inclusive[function], own[function]) for function in inclusive}
+
+    def report(self, limit: int = REPORT_LIMIT) -> str:
+        """
+        Table of the top functions, by inclusive samples (the percentages are relative
+        to the number of thread stacks sampled).
+
+        :param limit: Maximum number of functions to list
+
+        :return: Multi-line string
+
+        """
+        total = sum(self.stacks.values()) or 1
+        functions = sorted(self.function_samples().items(), key=lambda item: item[1],
+                           reverse=True)[:limit]
+        lines = [f"Sampled {self.samples} times ({self.interval * 1000:0.1f} ms interval), "
+                 f"{total} thread stacks. Top {len(functions)} functions "
+                 f"(by inclusive samples):",
+                 f"{'inclusive':>10} | {'self':>10} | function"]
+        for function, (inclusive, own) in functions:
+            lines.append(f"{inclusive / total:>10.1%} | {own / total:>10.1%} | {function}")
+        return '\n'.join(lines)
+
+    def write(self, base_filespec: str, limit: int = REPORT_LIMIT) -> List[str]:
+        """
+        Write the collapsed stacks ("outer;...;inner <samples>" per line) and the report.
+
+        :param base_filespec: Filespec of the output files, without the extension
+        :param limit: Maximum number of functions in the report
+
+        :return: List of files written
+
+        """
+        stacks_file = f"{base_filespec}{self.STACKS_EXT}"
+        with open(stacks_file, "w") as stacks:
+            for stack, count in sorted(self.stacks.items()):
+                stacks.write(f"{';'.join(stack)} {count}\n")
+        return [stacks_file, write_report(f"{base_filespec}{REPORT_EXT}", self.report(limit))]
+
+
+PROFILERS = {profiler.MODE: profiler for profiler in (CallProfiler, SamplingProfiler)}
+
+
+def build_profiler(mode: str, interval: float = SamplingProfiler.INTERVAL):
+    """
+    :param mode: Profile mode (see PROFILERS)
+    :param interval: Sampling interval (seconds; sample mode only)
+
+    :return: Profiler (not started)
+
+    """
+    if mode == SamplingProfiler.MODE:
+        return SamplingProfiler(interval=interval)
+    return PROFILERS[mode]()
+
+
+def write_report(filespec: str, report: str) -> str:
+    """
+    Write the report to a file, and to the log.
+
+    :param filespec: Filespec of the report
+    :param report: Report (multi-line string)
+
+    :return: filespec
+
+    """
+    with open(filespec, "w") as report_file:
+        report_file.write(f"{report}\n")
+    for line in report.split('\n'):
+        LOG.info(line)
+    return filespec
@@ -7,6 +7,7 @@
 import time
 from typing import Callable
 
+from PDL.engine.timer.tracing import TRACER
 import PDL.logger.logger as logger
 
 BASE = 10.0
@@ -18,7 +19,8 @@ LOG = logger.Logger()
 
 def measure_elapsed_time(event: str, test: bool = False) -> Callable:
     """
-    Decorator for measuring the execution time of a specific call
+    Decorator for measuring the execution time of a specific call (also recorded as
+    a trace span, when tracing is enabled: see PDL.engine.timer.tracing)
 
     :param event: (str) Name or keyword identifier of event being measured
     :param test:  (bool) If True, returns the time elapsed as part of output.
@@ -32,7 +34,8 @@ def measure_elapsed_time(event: str, test: bool = False) -> Callable:
     def wrap(func):
         def wrapped_func(*args, **kwargs):
             start = time.time()
-            ret_val = func(*args, **kwargs)
+            with TRACER.span(event):
+                ret_val = func(*args, **kwargs)
             elapsed = int((time.time() - start) * MULTIPLIER) / MULTIPLIER
             msg = f"[{event.upper()}]: Elapsed Time: {elapsed} s"
             LOG.info(msg)
@@ -0,0 +1,212 @@
+"""
+  Hierarchical tracing spans, exported in the Chrome trace_event format (JSON), which
+  can be loaded into chrome://tracing or https://ui.perfetto.dev. Enabled via the CLI
+  (--trace).
+
+  A span is opened with the context manager or the decorator:
+
+      with span('fetch_page', url=page_url):
+          ...
+
+      @traced('parse_page')
+      def parse(...):
+
+  Spans opened while another span is open (in the same thread) are its children. Each
+  span records its thread id and name, and its parent's id, so the trace of each URL
+  (fetch page -> parse -> dedup -> download -> write) can be followed across stages.
+
+  While tracing is disabled (the default), span() returns a no-op context manager and
+  nothing is recorded.
+
+"""
+
+from contextlib import contextmanager, nullcontext
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from PDL.logger.logger import Logger
+
+LOG = Logger()
+
+
+class Span:
+    """
+    A timed operation (times in seconds, relative to time.perf_counter())
+    """
+    __slots__ = ('span_id', 'parent_id', 'name', 'category', 'args', 'start', 'end',
+                 'thread_id', 'thread_name')
+
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, category: str,
+                 args: dict) -> None:
+        thread = threading.current_thread()
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.category = category
+        self.args = args
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.start = time.perf_counter()
+        self.end = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class Tracer:
+    """
+    Records the spans (between start() and stop()) and exports them as a Chrome trace.
+    """
+    CATEGORY = 'pdl'
+    MAX_SPANS = 1000000   # Bound the memory used by a long-running (traced) service
+    MICROSECONDS = 1000000
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.spans: List[Span] = list()
+        self.dropped = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    def start(self) -> "Tracer":
+        """
+        Start recording spans (clears any previously recorded spans).
+
+        :return: self
+
+        """
+        with self._lock:
+            self.spans = list()
+            self.dropped = 0
+            self._origin = time.perf_counter()
+            self.enabled = True
+        return self
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    def _stack(self) -> List[Span]:
+        """
+        Per-thread stack of the open spans
+        """
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = list()
+        return self._local.stack
+
+    def span(self, name: str, category: str = CATEGORY, **args):
+        """
+        Context manager: record the block as a span (child of the thread's open span).
+
+        :param name: Span name (e.g. - stage name)
+        :param category: Span category
+        :param args: Additional information recorded with the span (e.g. - url)
+
+        :return: Context manager (yields the Span, or None if tracing is disabled)
+
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._record(name, category, args)
+
+    @contextmanager
+    def _record(self, name: str, category: str, args: dict) -> Iterator[Span]:
+        stack = self._stack()
+        span = Span(span_id=next(self._ids), parent_id=stack[-1].span_id if stack else None,
+                    name=name, category=category, args=args)
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            stack.pop()
+            with self._lock:
+                if len(self.spans) < self.MAX_SPANS:
+                    self.spans.append(span)
+                else:
+                    self.dropped += 1
+
+    def traced(self, name: Optional[str] = None, category: str = CATEGORY) -> Callable:
+        """
+        Decorator: record each call of the routine as a span.
+
+        :param name: Span name (DEFAULT: the routine's qualified name)
+        :param category: Span category
+
+        :return: decorator
+
+        """
+        def wrap(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapped_func(*args, **kwargs):
+                with self.span(span_name, category=category):
+                    return func(*args, **kwargs)
+            return wrapped_func
+        return wrap
+
+    def to_chrome_trace(self) -> Dict[str, list]:
+        """
+        Build the trace in the Chrome trace_event format: a complete ('X') event per
+        span, and a metadata ('M') event naming each thread.
+
+        :return: dictionary (JSON-serializable)
+
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+
+        events = list()
+        thread_names = dict()
+        for span in sorted(spans, key=lambda record: record.start):
+            thread_names[span.thread_id] = span.thread_name
+            args = dict(span.args, span_id=span.span_id)
+            if span.parent_id is not None:
+                args['parent_id'] = span.parent_id
+
+            events.append({'name': span.name,
+                           'cat': span.category,
+                           'ph': 'X',
+                           'ts': (span.start - self._origin) * self.MICROSECONDS,
+                           'dur': span.duration * self.MICROSECONDS,
+                           'pid': pid,
+                           'tid': span.thread_id,
+                           'args': args})
+
+        for thread_id, thread_name in thread_names.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_id,
+                           'args': {'name': thread_name}})
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, filespec: str) -> None:
+        """
+        Write the recorded spans as a Chrome trace (JSON).
+
+        :param filespec: File to write
+
+        :return: None
+
+        """
+        with open(filespec, 'w') as trace_file:
+            json.dump(self.to_chrome_trace(), trace_file)
+
+        LOG.info(f"Wrote {len(self.spans)} trace spans to: {filespec}")
+        if self.dropped:
+            LOG.warn(f"Trace span limit ({self.MAX_SPANS}) reached: "
+                     f"{self.dropped} spans were not recorded.")
+
+
+# Process-wide tracer, and shortcuts
+TRACER = Tracer()
+span = TRACER.span
+traced = TRACER.traced
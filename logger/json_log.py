@@ -1,9 +1,11 @@
 """
- Export multiple ImageData Objects to a single JSON file
+ Export multiple ImageData Objects to a single JSON file, or stream them
+ (one record per line) to a JSON Lines file as each image completes.
 """
 
 import json
-from typing import List
+import os
+from typing import Iterator, List, Tuple
 
 from PDL.engine.images.image_info import ImageData
 from PDL.logger.logger import Logger as Log
@@ -62,3 +64,96 @@ class JsonLog:
         output = json.dumps(self.data)
         for line in output.split('\n'):
             LOG.info(line)
+
+
+class JsonLinesLog:
+    """
+    Appends ImageData records to a JSON Lines file as each image completes, so a
+    crash or interrupt only loses the record being written (not the entire run).
+
+    Each line is a single-entry JSON object, {filename: image_metadata}, which keeps
+    the same key/value layout as the files written by JsonLog.
+
+    """
+    EXTENSION = 'jsonl'
+
+    def __init__(self, log_filespec: str, fsync: bool = True) -> None:
+        """
+        Create the log object (the file is not created until the first record is appended)
+
+        :param log_filespec: Filespec (full path/filename) for JSONL file
+        :param fsync: Force each record to disk after it is written (DEFAULT: True)
+
+        """
+        self.logfile_name = log_filespec
+        self.fsync = fsync
+        self.count = 0
+        self._file = None
+
+    def __enter__(self) -> "JsonLinesLog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def append(self, image_obj: ImageData) -> None:
+        """
+        Append a single ImageData record to the file, and flush it to disk.
+
+        :param image_obj: ImageData object to record
+
+        :return: None
+
+        """
+        if self._file is None:
+            self._file = open(self.logfile_name, "a")
+            LOG.debug(f"Opened JSONL log for appending: {self.logfile_name}")
+
+        self._file.write(f"{json.dumps({image_obj.filename: image_obj.to_dict()})}\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.count += 1
+
+    def close(self) -> None:
+        """
+        Close the file (if opened), and log the number of records written.
+
+        :return: None
+
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            LOG.info(f"Output {self.count} image records to: {self.logfile_name}")
+
+
+def read_records(filespec: str) -> Iterator[Tuple[str, dict]]:
+    """
+    Lazily read the (filename, image_metadata) records from a JSON or JSON Lines file.
+    JSON Lines files are read a line at a time; a partial last line (e.g. - the run was
+    interrupted mid-write) is logged and skipped.
+
+    :param filespec: Filespec (full path/filename) of the .json or .jsonl file
+
+    :return: Generator of (filename, image_metadata dictionary) tuples
+
+    """
+    with open(filespec, "r") as json_file:
+
+        # Single JSON blob: {filename: metadata, ...}
+        if not filespec.lower().endswith(f".{JsonLinesLog.EXTENSION}"):
+            yield from json.load(json_file).items()
+            return
+
+        # JSON Lines: one {filename: metadata} object per line
+        for line_num, line in enumerate(json_file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                LOG.warn(f"Skipping malformed record (line {line_num}) in {filespec}")
+                continue
+            yield from record.items()
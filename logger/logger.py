@@ -8,18 +8,69 @@
       * LOGLEVEL (explicitly listed)
       * FILENAME, ROUTINE, and LINE NUMBER of invoking code
 
+    Messages are only built if the level is enabled: pass %-style arguments
+    (LOG.debug("Data: %s", data)), or a callable that returns the message
+    (LOG.debug(lambda: pprint.pformat(data))) for expensive messages.
+
+    The root logger (set_root=True) writes through a bounded queue: log calls enqueue the
+    record, and a background listener thread writes it to the file/console handlers, so
+    logging does not block the calling (e.g. - download) threads on the handler I/O.
+
 """
-import inspect
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
 import os
-from typing import List, Optional
-
-import prettytable
+import queue
+import sys
+from typing import Dict, List, Optional, Tuple
 
 
 # TODO: <DOC> Add README.md to directory
 
 
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler for a bounded queue. When the queue is full, the record is either
+    dropped (and counted), or the caller blocks until there is room in the queue.
+    """
+    OVERFLOW_BLOCK = 'block'
+    OVERFLOW_DROP = 'drop'
+    OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP)
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = OVERFLOW_DROP) -> None:
+        """
+        :param log_queue: Bounded queue (read by a QueueListener)
+        :param overflow: Overflow policy (OVERFLOW_DROP or OVERFLOW_BLOCK)
+
+        """
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown log queue overflow policy: '{overflow}'. "
+                             f"Valid policies: {', '.join(self.OVERFLOW_POLICIES)}")
+        super(BoundedQueueHandler, self).__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.overflow == self.OVERFLOW_BLOCK:
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BoundedQueueListener(QueueListener):
+    """
+    QueueListener for a bounded queue: the stop sentinel waits for room in the queue
+    (the stock listener raises queue.Full if the queue is full when it is stopped).
+    """
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
 class Logger:
     """
     Creates a logging facility that can be used by any module.
@@ -66,6 +117,9 @@ class Logger:
     # e.g. = 40 --> INFO
     VAL_TO_STR = {value: text for text, value in STR_TO_VAL.items()}
 
+    # Level of each logging routine (e.g. - exception() logs at ERROR)
+    ROUTINE_LEVELS = dict(STR_TO_VAL, exception=ERROR)
+
     # Logging statement format
     LOG_FORMAT = (r'[%(asctime)-15s][%(pid)s][%(levelname)-5s]'
                   r'[%(file_name)s:%(routine)s|%(linenum)d] - %(message)s')
@@ -77,10 +131,22 @@ class Logger:
     DEFAULT_STACK_DEPTH = 3
     ROOT_LOGGER = 'root'
 
+    # Root logger queue: maximum number of pending records, and policy when full
+    QUEUE_SIZE = 10000
+    QUEUE_OVERFLOW = BoundedQueueHandler.OVERFLOW_DROP
+
+    # Cache of source file path -> dotted module path (shared by all loggers)
+    _module_paths: Dict[Tuple[str, str], str] = dict()
+
+    # Queue handler and listener of the root logger (one per process)
+    _queue_handler: Optional[BoundedQueueHandler] = None
+    _listener: Optional[QueueListener] = None
+
     def __init__(
             self, filename: Optional[str] = None, default_level: Optional[str] = None,
             added_depth: int = 0, project: Optional[str] = None, set_root: bool = False,
-            test_name: Optional[str] = None) -> None:
+            test_name: Optional[str] = None, queue_size: Optional[int] = QUEUE_SIZE,
+            queue_overflow: str = QUEUE_OVERFLOW) -> None:
         """
         :param filename: Filename to write logs to...
         :param default_level: Default stack level (default = DEFAULT_STACK_DEPTH)
@@ -90,6 +156,10 @@ class Logger:
         :param set_root: Boolean (set root, see class description for information)
         :param test_name: Used for testing... allows setting of specific name
                     in log preamable for validation
+        :param queue_size: (set_root only) Size of the queue between the log calls and
+                    the handlers. None = synchronous handlers (no queue).
+        :param queue_overflow: (set_root only) Policy when the queue is full (see
+                    BoundedQueueHandler: 'drop' or 'block')
 
         """
         self.filename = filename
@@ -105,6 +175,9 @@ class Logger:
         # Reason: Updating the config with handlers attached is a 'no-op'
         if self.root:
 
+            # Restore the handlers from a previous root logger queue (if any)
+            self.stop_queue()
+
             # Store (copy) the list of handlers associated with the root handler
             handlers = logging.root.handlers[:]
 
@@ -119,10 +192,85 @@ class Logger:
             for handler in handlers:
                 logging.root.addHandler(handler)
 
+            # Move the handlers behind the queue
+            if queue_size is not None:
+                self.start_queue(queue_size=queue_size, overflow=queue_overflow)
+
         else:
             # Start the logger for the given module.
             self._start_logger()
 
+    @classmethod
+    def start_queue(cls, queue_size: int = QUEUE_SIZE, overflow: str = QUEUE_OVERFLOW) -> None:
+        """
+        Move the root logger's handlers behind a bounded queue, serviced by a background
+        listener thread (the handlers' levels are still applied).
+
+        :param queue_size: Maximum number of records in the queue
+        :param overflow: Policy when the queue is full (see BoundedQueueHandler)
+
+        :return: None
+
+        """
+        cls.stop_queue()
+
+        root = logging.getLogger()
+        handlers = root.handlers[:]
+        log_queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        queue_handler = BoundedQueueHandler(log_queue, overflow=overflow)
+
+        for handler in handlers:
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+
+        cls._queue_handler = queue_handler
+        cls._listener = BoundedQueueListener(log_queue, *handlers, respect_handler_level=True)
+        cls._listener.start()
+
+    @classmethod
+    def stop_queue(cls) -> None:
+        """
+        Write the queued records, stop the listener thread, and re-attach the handlers
+        to the root logger (logging is synchronous until the queue is restarted).
+        Registered to run at exit.
+
+        :return: None
+
+        """
+        if cls._listener is None:
+            return
+
+        root = logging.getLogger()
+        cls._listener.stop()
+        root.removeHandler(cls._queue_handler)
+        for handler in cls._listener.handlers:
+            root.addHandler(handler)
+
+        if cls._queue_handler.dropped:
+            root.warning(f"Log queue was full: {cls._queue_handler.dropped} log records "
+                         f"were dropped.",
+                         extra={'file_name': cls._translate_to_dotted_lib_path(
+                                    os.path.basename(__file__)),
+                                'linenum': sys._getframe().f_lineno,
+                                'routine': 'stop_queue',
+                                'pid': os.getpid()})
+
+        cls._listener = None
+        cls._queue_handler = None
+
+    @classmethod
+    def queue_stats(cls) -> Tuple[int, int]:
+        """
+        Root logger queue statistics.
+
+        :return: tuple(number of queued records, number of dropped records);
+                 (0, 0) if the queue is not running.
+
+        """
+        if cls._queue_handler is None:
+            return 0, 0
+        return cls._queue_handler.queue.qsize(), cls._queue_handler.dropped
+
     def _start_logger(self) -> None:
         """
         Define the logger for the current context.
@@ -190,26 +338,48 @@ class Logger:
 
         :return: string - dotted path lib
         """
-        frame_info = inspect.stack()[self.depth]
-        filename = str(os.path.abspath(frame_info[1]).split(
-            f'{self.project}{os.path.sep}')[-1])
+        return self._get_dotted_path(sys._getframe(self.depth).f_code.co_filename)
+
+    def _get_dotted_path(self, source_file: str) -> str:
+        """
+        Get the dotted module path (relative to the project) of a source file (cached).
+
+        :param source_file: Path of the source file
 
-        return self._translate_to_dotted_lib_path(filename)
+        :return: string - dotted path lib
+        """
+        key = (source_file, self.project)
+        dotted_path = self._module_paths.get(key)
+        if dotted_path is None:
+            filename = str(os.path.abspath(source_file).split(
+                f'{self.project}{os.path.sep}')[-1])
+            dotted_path = self._translate_to_dotted_lib_path(filename)
+            self._module_paths[key] = dotted_path
+        return dotted_path
 
-    def _log_level(self, level: str, msg: str, prefix: str = '') -> None:
+    def _log_level(self, level: str, msg, *args, prefix: str = '') -> None:
         """
         Determine and use the proper logging level (abstracted to expose logging
         routines at class level; also reduces the dotted path when invoking in
         code.
 
         :param level: logging.LEVEL
-        :param msg: message to log
+        :param msg: message to log, or a callable that returns the message
+        :param args: %-style arguments for the message
         :param prefix: If preamble needs an additional internal prefix.
 
         :return: None
         """
-        log_routine = getattr(self.logger, level.lower())
-        log_routine(str(prefix) + str(msg), extra=self._method())
+        # Check the level before any message formatting or frame inspection
+        level = level.lower()
+        if not self.logger.isEnabledFor(self.ROUTINE_LEVELS[level]):
+            return
+
+        if callable(msg):
+            msg = msg()
+
+        log_routine = getattr(self.logger, level)
+        log_routine(str(prefix) + str(msg), *args, extra=self._method())
 
     def _list_loggers(self) -> List[List[str]]:
         """
@@ -234,6 +404,9 @@ class Logger:
         alphabetically listing children.
 
         """
+        # Imported here: every subcommand imports the logger, few list the loggers.
+        import prettytable
+
         child = "CHILD LOGGER"
         level = 'LOG LEVEL'
 
@@ -282,13 +455,14 @@ class Logger:
         :return: Dictionary of values listed above.
 
         """
-        frame_info = inspect.stack()[self.depth]
-        filename = str(os.path.abspath(frame_info[1]).split(
-            f'{self.project}{os.path.sep}')[-1])
+        # sys._getframe() only walks the frame links: inspect.stack() builds frame
+        # records (including source context) for the entire stack.
+        frame = sys._getframe(self.depth)
+        code = frame.f_code
 
-        return {'file_name': self._translate_to_dotted_lib_path(path=filename),
-                'linenum': frame_info[2],
-                'routine': frame_info[3],
+        return {'file_name': self._get_dotted_path(code.co_filename),
+                'linenum': frame.f_lineno,
+                'routine': code.co_name,
                 'pid': os.getpid()}
 
     # Quick class level references to logger methods.
@@ -296,64 +470,74 @@ class Logger:
     # ==> Simplification from obj.log.log_level() to obj.log_level()
     # ------------------------------------------------------------------
 
-    def fatal(self, msg) -> None:
+    def fatal(self, msg, *args) -> None:
         """
         Shortcut to logging.fatal() logging call
-        :param msg: Message to log
+        :param msg: Message to log (or a callable that returns the message)
+        :param args: %-style arguments for the message
 
         :return: None
 
         """
-        self._log_level(level='FATAL', msg=msg)
+        self._log_level('FATAL', msg, *args)
 
-    def error(self, msg) -> None:
+    def error(self, msg, *args) -> None:
         """
         Shortcut to logging.error() logging call
-        :param msg: Message to log
+        :param msg: Message to log (or a callable that returns the message)
+        :param args: %-style arguments for the message
 
         :return: None
 
         """
-        self._log_level(level='ERROR', msg=msg)
+        self._log_level('ERROR', msg, *args)
 
-    def warn(self, msg) -> None:
+    def warn(self, msg, *args) -> None:
         """
         Shortcut to logging.warn() logging call
-        :param msg: Message to log
+        :param msg: Message to log (or a callable that returns the message)
+        :param args: %-style arguments for the message
 
         :return: None
 
         """
-        self._log_level(level='WARN', msg=msg)
+        self._log_level('WARN', msg, *args)
 
-    def info(self, msg) -> None:
+    def info(self, msg, *args) -> None:
         """
         Shortcut to logging.info() logging call
-        :param msg: Message to log
+        :param msg: Message to log (or a callable that returns the message)
+        :param args: %-style arguments for the message
 
         :return: None
 
         """
-        self._log_level(level='INFO', msg=msg)
+        self._log_level('INFO', msg, *args)
 
-    def debug(self, msg) -> None:
+    def debug(self, msg, *args) -> None:
         """
         Shortcut to logging.debug() logging call
-        :param msg: Message to log
+        :param msg: Message to log (or a callable that returns the message)
+        :param args: %-style arguments for the message
 
         :return: None
 
         """
-        self._log_level(level='DEBUG', msg=msg)
+        self._log_level('DEBUG', msg, *args)
 
-    def exception(self, msg) -> None:
+    def exception(self, msg, *args) -> None:
         """
         Shortcut to logging.exception() logging call
-        :param msg: Message to log
+        :param msg: Message to log (or a callable that returns the message)
+        :param args: %-style arguments for the message
         :return: None
 
         """
-        self._log_level(level='EXCEPTION', msg=msg)
+        self._log_level('EXCEPTION', msg, *args)
+
+
+# Write any queued log records before the interpreter exits
+atexit.register(Logger.stop_queue)
 
 
 # FOR VISUAL/MANUAL TESTING PURPOSES
@@ -8,22 +8,160 @@
 
 """
 
-from PDL.app.pdl_config import PdlConfig, AppLogging
-import PDL.app.app as app
-import PDL.configuration.cli.args as args
-from PDL.engine.inventory.inventory_composite import Inventory
-from PDL.reporting.invstats import DiskStats
+import sys
+
+from PDL.engine.timer.import_timer import ImportTimer
+
+# Time the imports (--import_time). The timer is started before the application modules
+# are loaded, so the report covers the complete startup.
+IMPORT_TIMER = ImportTimer()
+if ImportTimer.CLI_FLAG in sys.argv:
+    IMPORT_TIMER.start()
+
+# NOTE: Only the CLI and the logger are imported here. The configuration, reporting and
+# instrumentation (--trace, --memory, --profile) modules are imported where they are used
+# (see main() and run()), so each subcommand only pays for the modules it uses: e.g. -
+# submit (thin client) does not load the configuration or the inventory modules.
+import PDL.configuration.cli.args as args             # noqa: E402
+from PDL.logger.logger import Logger                   # noqa: E402
+
+
+class SubcommandInit:
+    """
+    Initialization required by each subcommand.
+    """
+    # Subcommands that use the inventory (value: True = inventory is updated and written)
+    INVENTORY = {
+        args.ArgSubmodules.DOWNLOAD: True,
+        args.ArgSubmodules.DUPLICATES: True,
+        args.ArgSubmodules.SERVE: True,
+        args.ArgSubmodules.INFO: False,
+        args.ArgSubmodules.STATS: False,
+    }
+
+    # Subcommands that add images to temp storage (report the number to catalog)
+    DISK_STATS = (args.ArgSubmodules.DOWNLOAD, args.ArgSubmodules.SERVE)
 
 
 def main():
     """
-    Primary start up logic.
+    Parse the CLI and run the selected subcommand.
+
+    :return: None
+
+    """
+    cli_args = args.CLIArgs().args
+    trace_file = getattr(cli_args, args.ArgOptions.TRACE, None)
+    if trace_file is not None:
+        from PDL.engine.timer.tracing import TRACER
+        TRACER.start()
+
+    measure_memory = getattr(cli_args, args.ArgOptions.MEMORY, False)
+    if measure_memory:
+        from PDL.engine.metrics.memory import MEMORY
+        MEMORY.start(top=getattr(cli_args, args.ArgOptions.MEMORY_TOP))
+
+    profiler = None
+    profile_mode = getattr(cli_args, args.ArgOptions.PROFILE, None)
+    if profile_mode is not None:
+        from PDL.engine.timer.profiler import build_profiler
+        profiler = build_profiler(
+            mode=profile_mode,
+            interval=getattr(cli_args, args.ArgOptions.PROFILE_INTERVAL) / 1000.0).start()
+
+    app_config = None
+    try:
+        app_config = run(cli_args=cli_args)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            write_profile(profiler=profiler, cli_args=cli_args, app_config=app_config)
+        if measure_memory:
+            MEMORY.stop()
+            MEMORY.log_report()
+        if trace_file is not None:
+            TRACER.stop()
+            TRACER.write_chrome_trace(trace_file)
+        if getattr(cli_args, args.ArgOptions.IMPORT_TIME, False):
+            IMPORT_TIMER.stop()
+            log = Logger()
+            for line in IMPORT_TIMER.report().split('\n'):
+                log.info(line)
+
+
+def write_profile(profiler, cli_args, app_config=None) -> None:
+    """
+    Write the profile of the subcommand (--profile) to the log directory.
+
+    :param profiler: Stopped profiler (see engine/timer/profiler.py)
+    :param cli_args: Parsed CLI args
+    :param app_config: PdlConfig of the run (None if the subcommand does not load one:
+                       the profile is written to the current directory)
+
+    :return: None
+
+    """
+    if app_config is not None:
+        base_filespec = app_config.profile_file
+    else:
+        from PDL.app.pdl_config import build_profile_filename
+        base_filespec = build_profile_filename(command=cli_args.command)
+    log = Logger()
+    for filespec in profiler.write(base_filespec,
+                                   limit=getattr(cli_args, args.ArgOptions.PROFILE_TOP)):
+        log.info(f"Wrote profile: {filespec}")
+
+
+def load_inventory(app_config) -> None:
+    """
+    Load the inventory (app_config.inventory), read-only unless the subcommand updates it.
+
+    :param app_config: PdlConfig of the run
 
     :return: None
 
     """
+    from PDL.engine.inventory.inventory_composite import Inventory
+    command = app_config.cli_args.command
+    app_config.inventory = Inventory(
+        cfg=app_config, force_scan=getattr(app_config.cli_args, args.ArgOptions.FORCE_SCAN),
+        read_only=not SubcommandInit.INVENTORY[command])
+
 
-    app_config = PdlConfig()
+def run(cli_args):
+    """
+    Primary start up logic.
+
+    :param cli_args: Parsed CLI args
+
+    :return: PdlConfig of the run (None for the subcommands that do not load one)
+
+    """
+    # -----------------------------------------------------------------
+    #                SUBMIT (thin client: no config/inventory load)
+    # -----------------------------------------------------------------
+    if cli_args.command == args.ArgSubmodules.SUBMIT:
+        import PDL.app.client as client
+        try:
+            client.submit_urls(cli_args=cli_args)
+        except client.ServiceRequestError as exc:
+            client.LOG.error(exc)
+        return None
+
+    # -----------------------------------------------------------------
+    #                BENCHMARK (temporary workspace: own config/inventory)
+    # -----------------------------------------------------------------
+    if cli_args.command == args.ArgSubmodules.BENCH:
+        if getattr(cli_args, args.ArgOptions.BENCH_TARGET) == 'faults':
+            import PDL.benchmarks.fault_injection as fault_injection
+            fault_injection.run_fault_scenarios(cli_args=cli_args)
+        else:
+            import PDL.benchmarks.download_throughput as download_throughput
+            download_throughput.run_benchmark(cli_args=cli_args)
+        return None
+
+    from PDL.app.pdl_config import PdlConfig, AppLogging
+    app_config = PdlConfig(cli_args=cli_args)
     log = AppLogging.configure_logging(app_cfg_obj=app_config)
 
     def _option_to_be_implemented(module_name):
@@ -32,23 +170,45 @@ def main():
         log.warn(f"'{module_name}' option still to be implemented.")
         log.depth -= 1
 
-    app_config.inventory = Inventory(
-        cfg=app_config, force_scan=getattr(app_config.cli_args, args.ArgOptions.FORCE_SCAN))
+    # Load the inventory (only for the subcommands that use it). DOWNLOAD loads the
+    # inventory once the URL filter is open (see below).
+    if (cli_args.command in SubcommandInit.INVENTORY and
+            cli_args.command != args.ArgSubmodules.DOWNLOAD):
+        load_inventory(app_config=app_config)
 
     # -----------------------------------------------------------------
     #                      DOWNLOAD
     # -----------------------------------------------------------------
     if app_config.cli_args.command == args.ArgSubmodules.DOWNLOAD:
         log.debug("Selected args.ArgSubmodules.DOWNLOAD")
-        app.download_images(cfg_obj=app_config)
+        import PDL.app.app as app
+        from PDL.engine.inventory.bloom import UrlBloomFilter
+
+        # Open and check the URL filter against the inventory file before the inventory
+        # is loaded (the load rewrites the file).
+        with UrlBloomFilter(filename=app_config.url_filter_file) as url_filter:
+            in_sync = app.check_url_filter(cfg_obj=app_config, url_filter=url_filter)
+            load_inventory(app_config=app_config)
+            app.sync_url_filter(cfg_obj=app_config, url_filter=url_filter, in_sync=in_sync)
+            app.download_images(cfg_obj=app_config, url_filter=url_filter)
 
     # -----------------------------------------------------------------
     #                DUPLICATE MANAGEMENT
     # -----------------------------------------------------------------
     elif app_config.cli_args.command == args.ArgSubmodules.DUPLICATES:
         log.debug("Selected args.ArgSubmodules.DUPLICATES")
+        from PDL.reporting.summary import ReportingSummary
         app_config.inventory.fs_inventory_obj.list_duplicates()
-        log.info(app_config.inventory.fs_inventory_obj.list_inventory())
+        duplicates = app_config.inventory.fs_inventory_obj.find_content_duplicates(
+            cache_file=app_config.hash_cache_file)
+        if getattr(app_config.cli_args, args.ArgOptions.REMOVE_DUPS, False):
+            app_config.inventory.fs_inventory_obj.reclaim_duplicates(
+                groups=duplicates,
+                dry_run=getattr(app_config.cli_args, args.ArgOptions.DRY_RUN, False))
+        fs_inventory_obj = app_config.inventory.fs_inventory_obj
+        for page in fs_inventory_obj.inventory_pages():
+            ReportingSummary.log_table(page)
+        fs_inventory_obj.write_inventory(filespec=app_config.inventory_report_file)
 
     # -----------------------------------------------------------------
     #                      DATABASE
@@ -69,12 +229,23 @@ def main():
         else:
             log.info(f"Image '{image_id}' not found.")
 
+    # -----------------------------------------------------------------
+    #                      SERVICE
+    # -----------------------------------------------------------------
+    elif app_config.cli_args.command == args.ArgSubmodules.SERVE:
+        log.debug("Selected args.ArgSubmodules.SERVE")
+        import PDL.app.service as service
+        service.PdlService(
+            cfg_obj=app_config, host=getattr(app_config.cli_args, args.ArgOptions.HOST),
+            port=getattr(app_config.cli_args, args.ArgOptions.PORT)).serve_forever()
+
     # -----------------------------------------------------------------
     #                      INVENTORY STATS
     # -----------------------------------------------------------------
     elif app_config.cli_args.command == args.ArgSubmodules.STATS:
         log.debug("Selected args.ArgSubmodules.STATS")
-        app.display_statistics(app_config)
+        import PDL.app.stats as stats
+        stats.display_statistics(app_config)
 
     # -----------------------------------------------------------------
     #                UNRECOGNIZED SUB-COMMAND
@@ -83,9 +254,13 @@ def main():
         # Should never get here, argparse should prevent it...
         raise args.UnrecognizedModule(app_config.cli_args.command)
 
-    diskstats = DiskStats(app_cfg=app_config)
-    diskstats.log_number_in_temp_storage_to_catalog()
+    if cli_args.command in SubcommandInit.DISK_STATS:
+        from PDL.reporting.invstats import DiskStats
+        diskstats = DiskStats(app_cfg=app_config)
+        diskstats.log_number_in_temp_storage_to_catalog()
+
     log.info(f"LOGGED TO: {app_config.logfile_name}")
+    return app_config
 
 
 if __name__ == '__main__':
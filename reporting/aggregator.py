@@ -0,0 +1,131 @@
+"""
+Single-pass aggregation of the download results (the data behind the ReportingSummary tables).
+
+Each image is visited once (add()), and the aggregator keeps, per download status:
+  * the count and the total download duration
+  * a histogram of the download durations (DURATION_BUCKETS)
+  * the slowest images (bounded: `top` images per status)
+and the list of images in error.
+
+The download pipeline can feed the aggregator as each image completes, so the tables built at
+the end of the run do not need to scan the images again.
+
+NOTE: An image is aggregated with the status/duration it has when it is added; the image
+    should be added once its processing is complete.
+
+"""
+
+import bisect
+import heapq
+import itertools
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PDL.engine.images.image_info import ImageData
+from PDL.engine.images.status import DownloadStatus
+from PDL.reporting.writers import TableDefaults
+
+
+class StatusAggregator:
+    """
+    Accumulates the per-status counts, durations, duration histograms, slowest images and errors.
+    """
+
+    # All possible statuses (values), determined once (get_statuses() scans the class)
+    STATUSES = [getattr(DownloadStatus, status) for status in DownloadStatus.get_statuses()]
+
+    # Upper bounds (seconds) of the duration histogram buckets; the last bucket is unbounded
+    DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, image_data: Optional[Iterable[ImageData]] = None,
+                 top: int = TableDefaults.LIMIT) -> None:
+        """
+        :param image_data: Images to aggregate (more can be added with add()/extend())
+        :param top: Number of slowest images kept per status
+
+        """
+        self.top = top
+        self.total = 0
+        self.counts: Dict[str, int] = {status: 0 for status in self.STATUSES}
+        self.durations: Dict[str, float] = {status: 0.0 for status in self.STATUSES}
+        self.histograms: Dict[str, List[int]] = {
+            status: self._empty_histogram() for status in self.STATUSES}
+        self.errors: List[ImageData] = list()
+
+        # Min-heaps of (duration, sequence, image): the root is the fastest of the slowest
+        self._slowest: Dict[str, List[Tuple[float, int, ImageData]]] = {
+            status: list() for status in self.STATUSES}
+        self._sequence = itertools.count()
+
+        if image_data is not None:
+            self.extend(image_data)
+
+    def _empty_histogram(self) -> List[int]:
+        return [0] * (len(self.DURATION_BUCKETS) + 1)
+
+    def add(self, image: ImageData) -> None:
+        """
+        Aggregate an image.
+
+        :param image: ImageData object (processing complete)
+
+        :return: None
+
+        """
+        status = image.dl_status
+        duration = image.download_duration
+        if status not in self.counts:
+            self.counts[status] = 0
+            self.durations[status] = 0.0
+            self.histograms[status] = self._empty_histogram()
+            self._slowest[status] = list()
+
+        self.total += 1
+        self.counts[status] += 1
+        self.durations[status] += duration
+        self.histograms[status][bisect.bisect_left(self.DURATION_BUCKETS, duration)] += 1
+
+        slowest = self._slowest[status]
+        entry = (duration, next(self._sequence), image)
+        if len(slowest) < self.top:
+            heapq.heappush(slowest, entry)
+        elif duration > slowest[0][0]:
+            heapq.heapreplace(slowest, entry)
+
+        if status == DownloadStatus.ERROR:
+            self.errors.append(image)
+
+    def extend(self, images: Iterable[ImageData]) -> None:
+        """
+        Aggregate the images.
+
+        :param images: Iterable of ImageData objects
+
+        :return: None
+
+        """
+        for image in images:
+            self.add(image)
+
+    def slowest(self, status: str, limit: Optional[int] = None) -> List[ImageData]:
+        """
+        Slowest images of a status, slowest first.
+
+        :param status: Download status
+        :param limit: Maximum number of images (DEFAULT/max: top)
+
+        :return: List of ImageData objects
+
+        """
+        entries = sorted(self._slowest.get(status, list()), reverse=True)
+        return [image for _, _, image in entries[:limit]]
+
+    @property
+    def total_duration(self) -> float:
+        return sum(self.durations.values())
+
+    def bucket_labels(self) -> List[str]:
+        """
+        :return: Labels of the histogram buckets (upper bound, in seconds)
+        """
+        return ([f"<= {bound:g} s" for bound in self.DURATION_BUCKETS] +
+                [f"> {self.DURATION_BUCKETS[-1]:g} s"])
@@ -4,13 +4,21 @@ This module creates the various prettyTable tables used within the application.
 NOTE: There is a wrapper function _log_table that will process a string_version of
    the table and record it into the logs (at requested or default level)
 
+NOTE: The tables are built from a StatusAggregator (a single pass over the images), which
+   the download pipeline can feed as the images are processed.
+
+NOTE: The logged tables are limited to the top-N rows (see reporting.writers.TableDefaults).
+   The complete per-image results are streamed to a report file (CSV/TSV/JSONL) by
+   write_download_results().
+
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
 from PDL.engine.images.image_info import ImageData
-from PDL.engine.images.status import DownloadStatus
 from PDL.logger.logger import Logger
+from PDL.reporting.aggregator import StatusAggregator
+from PDL.reporting.writers import TableDefaults, write_report
 
 import prettytable
 
@@ -32,8 +40,19 @@ class ReportingSummary:
     DEFAULT_VALUE_TYPE = INT_VALUE_TYPE
     DEFAULT_LOG_LEVEL = 'info'
 
-    def __init__(self, image_data: List[ImageData]) -> None:
+    # Columns of the download results report (file)
+    RESULT_FIELDS = ['status', 'image', 'duration', 'image_url', 'page_url', 'error_info']
+
+    def __init__(self, image_data: List[ImageData],
+                 aggregator: Optional[StatusAggregator] = None) -> None:
+        """
+        :param image_data: ImageData objects to report
+        :param aggregator: StatusAggregator already fed with image_data
+                           (DEFAULT: None = aggregate image_data now)
+
+        """
         self.data = image_data
+        self.aggregator = aggregator if aggregator is not None else StatusAggregator(image_data)
         self.status_tally = None
         self.url_results = None
 
@@ -82,23 +101,23 @@ class ReportingSummary:
         init_dict = dict()
         debug_msg = "Creating status dict with '{type_}' value structure."
 
-        # Get a list of all the possible statuses
-        statuses = DownloadStatus.get_statuses()
+        # All the possible statuses
+        statuses = StatusAggregator.STATUSES
 
         # Value Type = INTEGER
         if value_type.lower() == self.INT_VALUE_TYPE:
             LOG.debug(debug_msg.format(type_=self.INT_VALUE_TYPE))
-            init_dict = {getattr(DownloadStatus, status): 0 for status in statuses}
+            init_dict = {status: 0 for status in statuses}
 
         # Value Type = LIST
         elif value_type.lower() == self.LIST_VALUE_TYPE:
             LOG.debug(debug_msg.format(type_=self.LIST_VALUE_TYPE))
-            init_dict = {getattr(DownloadStatus, status): list() for status in statuses}
+            init_dict = {status: list() for status in statuses}
 
         # Value Type = DICTIONARY
         elif value_type.lower() == self.DICT_VALUE_TYPE:
             LOG.debug(debug_msg.format(type_=self.DICT_VALUE_TYPE))
-            init_dict = {getattr(DownloadStatus, status): dict() for status in statuses}
+            init_dict = {status: dict() for status in statuses}
 
         return init_dict
 
@@ -112,14 +131,7 @@ class ReportingSummary:
 
         """
         LOG.debug("Tallying Download Status results.")
-        status_tally = self.init_status_dict_(value_type=self.INT_VALUE_TYPE)
-
-        # Iterate through all ImageData objects, and
-        # add to the tally based on the ImageData.dl_status
-        for image in self.data:
-            status_tally[image.dl_status] += 1
-
-        return status_tally
+        return dict(self.aggregator.counts)
 
     def status_table(self, recalculate: bool = False) -> str:
         """
@@ -174,11 +186,43 @@ class ReportingSummary:
 
     # ------------------- URL RESULTS -------------------
 
-    def detailed_download_results_table(self, specific_status: Optional[str] = None) -> str:
+    def download_result_rows(self) -> Iterator[Dict[str, object]]:
         """
-        Generates a table of download statuses, and the DL'd links for each status
+        Generates a row per image (see RESULT_FIELDS), in the order the images were processed.
+
+        :return: Generator of rows (K: field name, V: value)
+
+        """
+        for image in self.data:
+            yield {'status': image.dl_status,
+                   'image': image.filename if image.filename is not None else image.page_url,
+                   'duration': f"{image.download_duration:0.3f}",
+                   'image_url': image.image_url,
+                   'page_url': image.page_url,
+                   'error_info': image.error_info}
+
+    def write_download_results(self, filespec: str, report_format: Optional[str] = None) -> int:
+        """
+        Stream the results of every image to a report file.
+
+        :param filespec: Report file
+        :param report_format: CSV, TSV or JSONL (DEFAULT: determined by the file extension)
+
+        :return: Number of rows written
+
+        """
+        return write_report(filespec=filespec, field_names=self.RESULT_FIELDS,
+                            rows=self.download_result_rows(), report_format=report_format)
+
+    def detailed_download_results_table(self, specific_status: Optional[str] = None,
+                                        limit: Optional[int] = TableDefaults.LIMIT) -> str:
+        """
+        Generates a table of download statuses, and the DL'd links for each status.
+        Only the slowest `limit` links are listed per status (the status counts and
+        durations include all links); the complete list is written by write_download_results().
 
         :param specific_status: Generate the table for a specific status
+        :param limit: Maximum number of links listed per status (None = all links)
 
         :return: (Str) Table of status + count + links/statur
 
@@ -212,11 +256,6 @@ class ReportingSummary:
         table.field_names = [image_header, duration_header]
         table.align[image_header] = 'l'
 
-        # Aggregating data
-        data_dict = self.init_status_dict_(value_type='list')
-        for image in self.data:
-            data_dict[image.dl_status].append(image)
-
         if specific_status is not None:
             LOG.debug(f"Displaying specific status: '{str(specific_status).upper()}'")
 
@@ -224,15 +263,19 @@ class ReportingSummary:
         total_dur = 0.0
 
         # Iterate through data, scanning for status types and corresponding links
-        for status, image_obj_list in sorted(data_dict.items()):
+        for status, count in sorted(self.aggregator.counts.items()):
 
             # Develop the status header... (either specific one (filter) or all (specific=None)
             if specific_status is None or specific_status.lower() == status.lower():
-                table.add_row([f"{status.upper()} ({len(image_obj_list)})", ''])
-                status_dur = 0.0
-
-                # Add each link and DL duration that corresponds to the status
-                for image in image_obj_list:
+                table.add_row([f"{status.upper()} ({count})", ''])
+
+                # Add the (slowest) links and DL durations that correspond to the status
+                # (the aggregator keeps the slowest links; listing more requires a full pass)
+                if limit is not None and limit <= self.aggregator.top:
+                    listed = self.aggregator.slowest(status, limit=limit)
+                else:
+                    listed = [image for image in self.data if image.dl_status == status]
+                for image in listed:
                     table.add_row([
                         "{delim}{url}".format(
                             url='{name}'.format(
@@ -242,26 +285,33 @@ class ReportingSummary:
                             delim=delimiter),
                         time_format.format(image.download_duration)])
 
-                    status_dur += image.download_duration
-                    total_dur += image.download_duration
+                if len(listed) < count:
+                    table.add_row([f"{delimiter}... {count - len(listed)} more "
+                                   f"(limit: {limit})", ""])
+
+                status_dur = self.aggregator.durations[status]
+                total_dur += status_dur
 
                 table.add_row(["", time_format.format(status_dur)])
                 table.add_row(["", ""])
         table.add_row(["TOTAL DURATION", time_format.format(total_dur)])
         return table.get_string(title='URL Status')
 
-    def log_detailed_download_results_table(self, specific_status: Optional[str] = None) -> None:
+    def log_detailed_download_results_table(self, specific_status: Optional[str] = None,
+                                            limit: Optional[int] = TableDefaults.LIMIT) -> None:
         """
         Generate the detailed results table, and log to file.
 
         :param specific_status: Specific status to summarize
               (DEFAULT = None, implying summarize all statuses)
+        :param limit: Maximum number of links listed per status (None = all links)
 
         :return: None
 
         """
         self.log_table(
-            table=self.detailed_download_results_table(specific_status=specific_status))
+            table=self.detailed_download_results_table(specific_status=specific_status,
+                                                       limit=limit))
 
     def error_table(self) -> str:
         """
@@ -288,12 +338,8 @@ class ReportingSummary:
         table.align[status_header] = 'l'
         table.align[url_header] = 'l'
 
-        # Collect all ImageData objects that have a dl_status of ERROR.
-        data = [x for x in self.data if
-                x.dl_status == DownloadStatus.ERROR]
-
-        # Populate table
-        for image in data:
+        # Populate table (ImageData objects that have a dl_status of ERROR)
+        for image in self.aggregator.errors:
 
             # For images that could not be DL'd, list parent page
             if image.image_url is None:
@@ -304,3 +350,41 @@ class ReportingSummary:
                 [image.image_name, image.error_info, image.image_url])
 
         return table.get_string(title='Download Errors')
+
+    # ------------------- DURATION HISTOGRAM -------------------
+
+    def duration_histogram_table(self) -> str:
+        """
+        Build a table of the DL duration distribution per status (statuses with images only)
+
+        :return: (Str) Table of Status + count per duration bucket
+
+        +============+==========+===========+=====+========+
+        |  Status    | <= 0.1 s | <= 0.25 s | ... | > 30 s |
+        +============+==========+===========+=====+========+
+        | DOWNLOADED |       12 |        30 | ... |      1 |
+        | ERROR      |        3 |         0 | ... |      0 |
+        +============+==========+===========+=====+========+
+
+        """
+        status_header = 'Status'
+
+        table = prettytable.PrettyTable()
+        table.field_names = [status_header] + self.aggregator.bucket_labels()
+        table.align = 'r'
+        table.align[status_header] = 'l'
+
+        for status, histogram in sorted(self.aggregator.histograms.items()):
+            if self.aggregator.counts[status]:
+                table.add_row([status.upper()] + histogram)
+
+        return table.get_string(title='Download Durations')
+
+    def log_duration_histogram_table(self) -> None:
+        """
+        Generate the duration histogram table, and log to file.
+
+        :return: None
+
+        """
+        self.log_table(table=self.duration_histogram_table())
@@ -0,0 +1,211 @@
+"""
+Streaming report writers, for reports too large to build as a single table.
+
+  * RowWriter writes the rows (CSV, TSV or JSON Lines) as they are produced, so the
+    size of the report does not affect the memory used to build it.
+  * table_pages() renders rows as pretty tables, a page (bounded number of rows) at a time,
+    and stops after a limit (top-N), noting how many rows were omitted.
+
+"""
+
+import csv
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import prettytable
+
+from PDL.logger.logger import Logger
+
+LOG = Logger()
+
+
+class ReportFormats:
+    """
+    Supported report (file) formats
+    """
+    CSV = 'csv'
+    TSV = 'tsv'
+    JSONL = 'jsonl'
+    FORMATS = (CSV, TSV, JSONL)
+    DEFAULT = CSV
+
+
+class TableDefaults:
+    """
+    Pretty table (logged) output limits
+    """
+    PAGE_SIZE = 100   # Rows per rendered table
+    LIMIT = 50        # Rows logged (the complete report is written to file)
+
+
+class UnsupportedReportFormat(Exception):
+    """
+    The requested report format is not supported
+    """
+    msg_fmt = "Unsupported report format: '{fmt}'. Supported formats: {formats}"
+
+    def __init__(self, fmt: str) -> None:
+        self.message = self.msg_fmt.format(fmt=fmt, formats=', '.join(ReportFormats.FORMATS))
+        super(UnsupportedReportFormat, self).__init__(self.message)
+
+
+class RowWriter:
+    """
+    Writes report rows to a file as they are produced (CSV/TSV: header + one line per row;
+    JSON Lines: one JSON object per row).
+    """
+
+    def __init__(self, filespec: str, field_names: Sequence[str],
+                 report_format: Optional[str] = None) -> None:
+        """
+        :param filespec: Report file
+        :param field_names: Column names (the keys of the rows)
+        :param report_format: One of ReportFormats.FORMATS
+                              (DEFAULT: determined by the file extension, or CSV)
+
+        """
+        self.filespec = filespec
+        self.field_names = list(field_names)
+        self.report_format = (report_format or self.format_from_filename(filespec)).lower()
+        if self.report_format not in ReportFormats.FORMATS:
+            raise UnsupportedReportFormat(self.report_format)
+
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    @staticmethod
+    def format_from_filename(filespec: str) -> str:
+        """
+        :param filespec: Report file
+
+        :return: Report format matching the file extension (DEFAULT: CSV)
+
+        """
+        extension = os.path.splitext(filespec)[1].lstrip('.').lower()
+        return extension if extension in ReportFormats.FORMATS else ReportFormats.DEFAULT
+
+    def __enter__(self) -> "RowWriter":
+        return self.open()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def open(self) -> "RowWriter":
+        """
+        Open the file (and write the header, for CSV/TSV).
+
+        :return: self
+
+        """
+        self._file = open(self.filespec, "w", newline='')
+        if self.report_format != ReportFormats.JSONL:
+            delimiter = '\t' if self.report_format == ReportFormats.TSV else ','
+            self._writer = csv.DictWriter(self._file, fieldnames=self.field_names,
+                                          delimiter=delimiter, extrasaction='ignore')
+            self._writer.writeheader()
+        return self
+
+    def write_row(self, row: Dict[str, object]) -> None:
+        """
+        Write a row.
+
+        :param row: Row (K: field name, V: value); fields not in field_names are ignored
+
+        :return: None
+
+        """
+        if self._writer is not None:
+            self._writer.writerow(row)
+        else:
+            self._file.write(f"{json.dumps({name: row.get(name) for name in self.field_names})}\n")
+        self.count += 1
+
+    def write_rows(self, rows: Iterable[Dict[str, object]]) -> int:
+        """
+        Write the rows.
+
+        :param rows: Iterable of rows (see write_row())
+
+        :return: Number of rows written (by this call)
+
+        """
+        start = self.count
+        for row in rows:
+            self.write_row(row)
+        return self.count - start
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+
+def write_report(filespec: str, field_names: Sequence[str], rows: Iterable[Dict[str, object]],
+                 report_format: Optional[str] = None) -> int:
+    """
+    Stream the rows to a report file.
+
+    :param filespec: Report file
+    :param field_names: Column names (the keys of the rows)
+    :param rows: Iterable of rows (K: field name, V: value)
+    :param report_format: One of ReportFormats.FORMATS (DEFAULT: by the file extension)
+
+    :return: Number of rows written
+
+    """
+    with RowWriter(filespec=filespec, field_names=field_names,
+                   report_format=report_format) as writer:
+        writer.write_rows(rows)
+    LOG.info(f"Wrote {writer.count} rows ({writer.report_format.upper()}) to: {filespec}")
+    return writer.count
+
+
+def table_pages(field_names: Sequence[str], rows: Iterable[List[object]],
+                page_size: int = TableDefaults.PAGE_SIZE, limit: Optional[int] = TableDefaults.LIMIT,
+                align: Optional[Dict[str, str]] = None, title: Optional[str] = None) -> Iterator[str]:
+    """
+    Render the rows as pretty tables, at most page_size rows per table, and stop after
+    `limit` rows (the remaining rows are counted, not rendered).
+
+    :param field_names: Column names
+    :param rows: Iterable of rows (list of values, in the order of the field names)
+    :param page_size: Rows per table
+    :param limit: Maximum number of rows rendered (None = all rows)
+    :param align: Column alignment (K: field name, V: 'l', 'c' or 'r')
+    :param title: Title of the first table
+
+    :return: Generator of tables (str)
+
+    """
+    def new_table() -> prettytable.PrettyTable:
+        table = prettytable.PrettyTable()
+        table.field_names = list(field_names)
+        for field, alignment in (align or dict()).items():
+            table.align[field] = alignment
+        return table
+
+    rows = iter(rows)
+    table = new_table()
+    page = 1
+    rendered = 0
+    for row in rows:
+        if limit is not None and rendered >= limit:
+            omitted = 1 + sum(1 for _ in rows)
+            yield (f"{table.get_string(title=title if page == 1 else None)}\n"
+                   f"... {omitted} more row(s) not listed (limit: {limit}).")
+            return
+
+        table.add_row(row)
+        rendered += 1
+        if len(table.rows) >= page_size:
+            if limit is not None and rendered >= limit:
+                continue    # Keep the page: the omitted rows note (if any) is attached to it
+            yield table.get_string(title=title if page == 1 else None)
+            table = new_table()
+            page += 1
+
+    if table.rows or rendered == 0:
+        yield table.get_string(title=title if page == 1 else None)
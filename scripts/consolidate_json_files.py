@@ -1,33 +1,40 @@
 """
     PURPOSE: Utility to combine multiple JSON files into a single JSON file (DL'd images only)
     ===========================================================================================
-        * Find all <data>.json files
-        * Read all records with dl_status == DOWNLOADED into a single dictionary
-        * Write dictionary to file in JSON format
-        * Verify data integrity
+        * Find all <data>.json/<data>.jsonl files
+        * FIRST PASS: Stream each file (one at a time), keep records with dl_status == DOWNLOADED,
+              and write them to a sorted run file. Record the per-file record counts and key digests.
+        * Merge the sorted runs (k-way merge) into the consolidated JSON Lines file, writing
+              each record as it is merged. Later files win when the same image is in multiple files.
+        * fsync the consolidated file, then verify the counts and key digests.
         * Delete <data>.json files
         * Verify all <data>.json files were deleted.
+
+    Memory use is bounded by the largest single data file (not the total of all data files).
 """
 
 import argparse
 import configparser
-import json
 import os
-import pprint
-from typing import Dict, List
+import shutil
+import tempfile
+from typing import List
 
 from PDL.configuration.properties.app_cfg import (
     AppConfig, AppCfgFileSections, AppCfgFileSectionKeys)
 from PDL.engine.images.image_info import ImageData
 from PDL.engine.images.status import DownloadStatus
+from PDL.engine.inventory.json.compaction import (
+    DIGEST_MODULUS, EXTENSION, MergeSummary, RunSummary, build_sorted_run, fsync_directory,
+    key_digest, merge_runs)
 from PDL.engine.inventory.json.inventory import JsonInventory
+from PDL.logger.json_log import read_records
 from PDL.logger.logger import Logger
 import PDL.logger.utils as utils
 
 
 PURPOSE_CLI = "Consolidate JSON files into single file."
 BASE_FILE_NAME = "CONSOLIDATED_"
-EXTENSION = "json"
 
 LOG = Logger()
 
@@ -72,54 +79,87 @@ def build_json_log_location(cfg: configparser.ConfigParser) -> str:
     return json_log_location
 
 
-def read_files(files: List[str]) -> Dict[str, ImageData]:
+def is_download(record: dict) -> bool:
     """
-    Read list of <data>.json files into a common dictionary. All keeps stats about
-    how many records were found, and how many were dl_status == DOWNLOAD.
+    Determine if the JSON record has dl_status == DOWNLOAD.
 
-    :param files: list of absolute_path <data>.json files
+    :param record: JSON record (dictionary representation of an ImageData object)
 
-    :return: dictionary of all json records for status==DOWNLOAD from all data files
+    :return: (bool) Record was DOWNLOADED
 
     """
-    data = dict()
-    num_raw_recs = 0
-    num_dl_recs = 0
+    return record.get(ImageData.DL_STATUS) == DownloadStatus.DOWNLOADED
+
 
-    # Iterate through the files
-    for json_file in files:
+def verify_consolidated_file(filename: str, runs: List[RunSummary], merge: MergeSummary) -> bool:
+    """
+    Stream the consolidated file and verify its record count and key digest match the
+    values computed from the data files in the first pass (less the merged duplicates).
 
-        # Read JSON contents and convert into python structure
-        with open(json_file, "r") as source_json_file:
-            lines = "\n".join(source_json_file.readlines())
-        raw_data = json.loads(lines)
-        num_raw_recs += len(raw_data.keys())
+    :param filename: Absolute path/filename of the consolidated file.
+    :param runs: First pass results for each data file
+    :param merge: Results of the merge
 
-        LOG.info(f"Reading JSON File: {json_file}")
+    :return: (bool) Success = True, Errors = False
 
-        # Filter out non-DOWNLOAD'ed records
-        dl_images = get_downloads_only(raw_data)
-        num_dl_recs += len(dl_images.keys())
+    """
+    expected_records = sum(run.records for run in runs) - merge.duplicates
+    expected_digest = (sum(run.digest for run in runs) -
+                       merge.duplicates_digest) % DIGEST_MODULUS
 
-        # Add entries to dictionary
-        data.update(dl_images)
+    records = 0
+    digest = 0
+    for key, _ in read_records(filename):
+        records += 1
+        digest = (digest + key_digest(key)) % DIGEST_MODULUS
 
-    LOG.info(f"RAW RECORDS: {num_raw_recs}  DOWNLOADED: {num_dl_recs}")
-    LOG.debug(pprint.pformat(data))
-    return data
+    success = True
+    if records != expected_records:
+        success = False
+        LOG.error(f"*** Missing records!!! Expected: {expected_records}  Found: {records}")
 
+    if digest != expected_digest:
+        success = False
+        LOG.error("*** Key digest does not match the source files!!!")
 
-def get_downloads_only(json_dict: Dict[str, ImageData]) -> Dict[str, ImageData]:
+    if success:
+        LOG.info(f"VALIDATED: All {records} records accounted for.")
+
+    return success
+
+
+def consolidate(data_files: List[str], filename: str) -> bool:
     """
-    Filter out records from dictionary, where the record does not have dl_status == DOWNLOAD.
+    Consolidate the data files into a single JSON Lines file (DOWNLOADED records only),
+    and verify the contents. The consolidated file is written to a temporary directory
+    (alongside the sorted runs) and only moved into place once it has been fsync'd.
 
-    :param json_dict: dictionary of JSON records
+    :param data_files: List of absolute path <data>.json(l) files
+    :param filename: Absolute path/filename of the consolidated file.
 
-    :return: dictionary of JSON records where dl_status == DOWNLOAD
+    :return: (bool) Consolidated file was written and verified.
 
     """
-    return {image: data for image, data in json_dict.items() if
-            getattr(data, ImageData.DL_STATUS) == DownloadStatus.DOWNLOADED}
+    run_dir = tempfile.mkdtemp(prefix="consolidate_", dir=os.path.dirname(filename))
+    temp_filename = os.path.join(run_dir, os.path.basename(filename))
+    try:
+        runs = [build_sorted_run(data_file=data_file, run_dir=run_dir, index=index,
+                                 keep=is_download)
+                for index, data_file in enumerate(data_files)]
+        LOG.info(f"RAW RECORDS: {sum(run.raw_records for run in runs)}  "
+                 f"DOWNLOADED: {sum(run.records for run in runs)}")
+
+        merge = merge_runs(run_files=[run.run_file for run in runs], filename=temp_filename)
+        success = verify_consolidated_file(filename=temp_filename, runs=runs, merge=merge)
+
+        if success:
+            os.replace(temp_filename, filename)
+            fsync_directory(os.path.dirname(filename))
+
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+    return success
 
 
 def determine_consolidate_file_name(files: List[str], target_dir: str) -> str:
@@ -153,75 +193,12 @@ def determine_consolidate_file_name(files: List[str], target_dir: str) -> str:
     return os.path.abspath(os.path.sep.join([target_dir, filename]))
 
 
-def write_json_file(filename: str, data: dict) -> None:
-    """
-    Write data to filename (in json format)
-
-    :param filename: Absolute path/filename of JSON file to create.
-    :param data: Data (dictionary) to write to file.
-
-    :return: None
-    """
-    with open(filename, "w") as json_output_file:
-        json_output_file.write(json.dumps(data))
-    LOG.info(f"Wrote data to: {filename}")
-
-
-def read_json_file(filename: str) -> dict:
-    """
-    Read data from filename (in json format)
-
-    :param filename: Absolute path/filename of JSON file to read.
-
-    :return: python data structure from JSON.loads()
-
-    """
-    data = dict()
-    with open(filename, "r") as json_file:
-        data.update(json.loads('\n'.join(json_file.readlines())))
-    LOG.info(f"Read data from: {filename}")
-    return data
-
-
-def verify_records_match(original: dict, consolidated: dict) -> bool:
-    """
-    Verify dictionaries are identical (in key names only)
-
-    :param original: Original/Master dictionary
-    :param consolidated: New/Consolidated dictionary
-
-    :return: (bool) Success = True, Errors = False
-
-    """
-    errors = False
-
-    # Convert to sets to do easy comparison of keys
-    orig = set(original.keys())
-    consolid = set(consolidated.keys())
-
-    # If the sets are not equal... something did not copy correctly.
-    if orig != consolid:
-        errors = True
-        diff = orig - consolid
-
-        LOG.error("*** Missing records!!!")
-        for rec in diff:
-            LOG.error(f"+ Did not find: {rec}")
-
-    # Dictionaries match!
-    else:
-        LOG.info("VALIDATED: All records accounted for.")
-
-    return not errors
-
-
 def main_routine():
     """
     Primary routine:
        * Get list of non-consolidated JSON files based on info from config file
-       * Read all JSON files into a common structure, and combine any identical items
-       * Write data to file.
-       * Verify all data in consolidated file matches the source files.
+       * Stream all JSON files into sorted runs, and merge the runs into the consolidated file
+       * Verify the consolidated file's counts and key digests match the source files.
        * Delete source JSON files that were consolidated (and verify all files were deleted)
 
     :return: None
@@ -247,24 +224,19 @@ def main_routine():
     json_files = inv.get_json_files()
 
     # Find all files that DO NOT HAVE the consolidated base filename.
-    # Put data from all matching files into a single dictionary.
-    data_files = [x for x in json_files if not x.split(os.path.sep)[-1].startswith(BASE_FILE_NAME)]
-    records = read_files(files=data_files)
+    # Data files are timestamped, so sorting by name orders them by age (newest wins).
+    data_files = sorted(
+        x for x in json_files if not x.split(os.path.sep)[-1].startswith(BASE_FILE_NAME))
 
     # Determine name and location of where CONSOLIDATED JSON file
     consolidated_log = determine_consolidate_file_name(files=json_files, target_dir=log_location)
     LOG.info(f"Consolidating to: {consolidated_log}")
 
-    # Create the CONSOLIDATED JSON file
-    write_json_file(data=records, filename=consolidated_log)
-
-    # Verify CONSOLIDATED JSON file matches the original data
+    # Create and verify the CONSOLIDATED JSON file
     LOG.info(border)
-    LOG.info("    VERIFY CONTENTS MATCH ORIGINAL FILES")
+    LOG.info("    CONSOLIDATE AND VERIFY CONTENTS MATCH ORIGINAL FILES")
     LOG.info(border)
-    success = verify_records_match(
-        original=read_files(files=data_files),
-        consolidated=read_json_file(consolidated_log))
+    success = consolidate(data_files=data_files, filename=consolidated_log)
 
     # Verify all <data>.json files have been deleted
     if success:
@@ -6,20 +6,31 @@
 
     Can be used as a module or as a stand-alone script.
 
+    * The data is deterministic: the same seed, number of data sets and max records
+      always produce the same files (regardless of the number of worker processes).
+    * Image ids are unique across all of the data sets (the index is global).
+    * Each data set is streamed to its file (JSON or JSON Lines) by a worker process,
+      so the data is never held in memory as a whole.
+    * Optionally, a matching tree of (fake) JPEG files is created: one file per record,
+      in a directory named after the record's classification.
+
 """
 
 import argparse
 import configparser
+import itertools
 import json
+import multiprocessing
 import os
-import pprint
-from random import choice, choices, randint
-from typing import Dict, List
+import random
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from PDL.configuration.properties.app_cfg import (
     AppConfig, AppCfgFileSections, AppCfgFileSectionKeys)
 from PDL.engine.images.image_info import ImageData, ModStatus
 from PDL.engine.images.status import DownloadStatus
+from PDL.logger.json_log import JsonLinesLog, JsonLog
 from PDL.logger.logger import Logger
 import PDL.logger.utils as utils
 
@@ -28,6 +39,34 @@ PURPOSE_CLI = ("Generate JSON data files for testing the parsing and "
 
 LOG = Logger()
 
+DEFAULT_SEED = 500
+FILENAME_FMT = 'test_data_{0}'
+METADATA = [f"category_{x}" for x in range(1, 7)]
+STATUSES = [getattr(DownloadStatus, status) for status in DownloadStatus.get_statuses()]
+CLASSIFICATIONS = [list(combo) for size in range(len(METADATA) + 1)
+                   for combo in itertools.combinations(METADATA, size)]
+KILOBYTE = 1024
+
+# Smallest file that passes as a JPEG: SOI + JFIF APP0 header ... EOI
+JPEG_HEADER = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'
+JPEG_TRAILER = b'\xff\xd9'
+
+WRITE_BUFFER = 1024 * 1024
+
+# The records are flat (no cycles): skipping the circular reference check makes
+# encoding ~35% faster.
+ENCODER = json.JSONEncoder(check_circular=False)
+
+
+class DataSet(NamedTuple):
+    """
+    Description of a single data set (file) to generate
+    """
+    number: int             # Data set number (1-based)
+    first_index: int        # Global index of the first record (image ids are unique)
+    num_records: int        # Number of records in the data set
+    seed: int               # Random seed for the data set's records
+
 
 def parse_cli() -> argparse.Namespace:
     """
@@ -42,6 +81,24 @@ def parse_cli() -> argparse.Namespace:
         'num_data_sets', help="Number of data sets to generate.")
     parser.add_argument(
         'max_records', help="Max number of records per data set.")
+    parser.add_argument(
+        '-s', '--seed', type=int, default=DEFAULT_SEED,
+        help=f"Random seed (DEFAULT: {DEFAULT_SEED}).")
+    parser.add_argument(
+        '-f', '--fixed', action='store_true',
+        help="Every data set has max_records records (DEFAULT: random, 1 - max_records).")
+    parser.add_argument(
+        '-l', '--jsonl', action='store_true',
+        help="Write JSON Lines files (.jsonl), one record per line.")
+    parser.add_argument(
+        '-w', '--workers', type=int, default=os.cpu_count(),
+        help="Number of worker processes (DEFAULT: number of CPUs).")
+    parser.add_argument(
+        '-i', '--images_dir', default=None,
+        help="Create a matching tree of (fake) JPEG files in this directory.")
+    parser.add_argument(
+        '-k', '--image_kb', type=int, default=0,
+        help="Size of each fake JPEG file, in KB (DEFAULT: 0 = header only).")
     parser.add_argument(
         '-d', '--debug', help="Enabled debug", action='store_true')
     return parser.parse_args()
@@ -73,84 +130,286 @@ def build_json_log_location(cfg: configparser.ConfigParser) -> str:
     return json_log_location
 
 
-def build_data_element(index: int) -> ImageData:
+def plan_data_sets(num_data_sets: int, max_num_recs_per_file: int,
+                   seed: int = DEFAULT_SEED, fixed: bool = False) -> List[DataSet]:
+    """
+    Determine the size, first (global) record index and seed of each data set.
+    The plan only depends on the arguments, so the data can be generated in any order
+    (e.g. - in parallel) and still be repeatable.
+
+    :param num_data_sets: Number of data sets to define
+    :param max_num_recs_per_file: Maximum number of data records per data set
+    :param seed: Random seed
+    :param fixed: If True, every data set has max_num_recs_per_file records;
+                  otherwise a random number of records from 1 to max_num_recs_per_file
+
+    :return: List of DataSets
+
+    """
+    rand = random.Random(seed)
+    data_sets = []
+    first_index = 0
+    for number in range(1, num_data_sets + 1):
+        num_records = (max_num_recs_per_file if fixed else
+                       rand.randint(1, max_num_recs_per_file))
+        data_sets.append(DataSet(number=number, first_index=first_index,
+                                 num_records=num_records, seed=rand.getrandbits(64)))
+        first_index += num_records
+    return data_sets
+
+
+def build_locations(location: str) -> List[str]:
+    """
+    Determine the directory of the images for each entry in CLASSIFICATIONS: the first
+    classification's sub-directory of the location (or the location, if unclassified).
+
+    :param location: Directory for the images
+
+    :return: List of directories (same order as CLASSIFICATIONS)
+
+    """
+    return [os.path.join(location, classifications[0]) if classifications else location
+            for classifications in CLASSIFICATIONS]
+
+
+DEFAULT_LOCATIONS = build_locations('/tmp/pdl/images')
+
+
+def build_record(index: int, rand: random.Random, locations: Optional[List[str]] = None) -> dict:
+    """
+    Builds the artificial ImageData record (dictionary) based on index
+
+    :param index: Value to identify the record (unique across the data sets)
+    :param rand: Random number generator (seeded per data set)
+    :param locations: Image directory per classification (see build_locations());
+                      DEFAULT: under /tmp/pdl/images
+
+    :return: Dictionary representation of an ImageData object
+
+    """
+    # rand.random() is used directly (instead of randint/choice): this is the hot path
+    # when generating millions of records.
+    random_value = rand.random
+    classification = int(random_value() * len(CLASSIFICATIONS))
+    locations = locations or DEFAULT_LOCATIONS
+
+    image_id = FILENAME_FMT.format(index)
+    return {
+        ImageData.AUTHOR: f"Picasso{index}",
+        ImageData.CLASSIFICATION: list(CLASSIFICATIONS[classification]),
+        ImageData.DESCRIPTION: f"Mock Image Data - {index}",
+        ImageData.DL_STATUS: STATUSES[int(random_value() * len(STATUSES))],
+        'download_duration': index,
+        ImageData.DOWNLOADED_ON: f"08/{index % 30 + 1:02d}/19",
+        ImageData.ERROR_INFO: None,
+        ImageData.FILENAME: f"{image_id}.{ImageData.EXTENSION}",
+        ImageData.FILE_SIZE: f"{100 + random_value() * 9900:0.2f} KB",
+        ImageData.ID: image_id,
+        ImageData.IMAGE_DATE: f"01/{index % 31 + 1:02d}/19",
+        ImageData.IMAGE_NAME: f"image_{index}",
+        ImageData.IMAGE_URL: f"http://foo.com/image/{index}",
+        ImageData.LOCATIONS: [locations[classification]],
+        'mod_status': ModStatus.NEW,
+        ImageData.PAGE_URL: f"http://foo.com/page/{index}",
+        ImageData.RESOLUTION: f"{1000 + int(random_value() * 5000)}x"
+                              f"{1000 + int(random_value() * 5000)}",
+    }
+
+
+def build_data_element(index: int, rand: Optional[random.Random] = None) -> ImageData:
     """
     Builds artificial ImageData object based on index
 
     :param index: Value to identify the object in the data set
+    :param rand: Random number generator (DEFAULT: seeded with the index)
 
     :return: Instantiated ImageData Object
 
     """
     LOG.debug(f"Building dataset #:{index}")
-    metadata = [f"category_{x}" for x in range(1, 7)]
-
-    return ImageData.build_obj({
-        'image_name': f"image_{index}",
-        'description': f"Mock Image Data - {index}",
-        'page_url': 'http://foo.com/page/{0:<16}'.format(
-            str(index) * 8).strip(),
-        'image_url': 'http://foo.com/image/{0:<16}'.format(
-            str(index) * 8).strip(),
-        'author': f"Picasso{index}",
-        'filename': 'test_data_{0}.jpg'.format(index),
-        'image_date': "01/{0:02d}/19".format(index % 31),
-        'resolution': "1600x7{0:02d}".format(index),
-        'downloaded_on': "08/{0:02d}/19".format(index % 30),
-        'classification_metadata': sorted(list(set(choices(
-            population=metadata, k=randint(0, len(metadata)))))),
-        'download_duration': index,
-        'locations': '/tmp/pdl/images',
-        'dl_status': choice(DownloadStatus.get_statuses()),
-        'mod_status': ModStatus.NEW,
-        'error_info': None,
-    })
+    return ImageData.build_obj(build_record(index, rand or random.Random(index)))
 
 
-def generate_data(num_data_sets: int, max_num_recs_per_file: int) -> \
-        Dict[str, Dict[str, ImageData]]:
+def generate_data(num_data_sets: int, max_num_recs_per_file: int, seed: int = DEFAULT_SEED,
+                  fixed: bool = False) -> Dict[str, Dict[str, ImageData]]:
     """
-    Builds dictionary of data_sets for each filename
+    Builds dictionary of data_sets for each filename (in memory; use write_data_set()
+    to stream large data sets to files)
 
     key: filename value: dict of data (key = image_name, value = ImageObj)
 
     :param num_data_sets: Number of data sets to define
     :param max_num_recs_per_file: Maximum number of data records to define
            per data set
+    :param seed: Random seed
+    :param fixed: If True, every data set has max_num_recs_per_file records
 
     :return: Builds dictionary of data_sets for each filename, each with a
              random number of records from 1 to max_num_recs_per_file
 
     """
-    filename_fmt = 'test_data_{0}.json'
-
     data_sets = dict()
 
     LOG.info(f"Generating {num_data_sets} data sets.")
-    for number in range(num_data_sets):
-        filename = filename_fmt.format(number + 1)
-        data_sets[filename] = dict()
-
-        num_records = randint(1, max_num_recs_per_file)
-        LOG.info(f"Data set has {num_records} records.")
+    for data_set in plan_data_sets(num_data_sets, max_num_recs_per_file, seed, fixed):
+        filename = f"{FILENAME_FMT.format(data_set.number)}.{JsonLog.EXTENSION}"
+        LOG.info(f"Data set has {data_set.num_records} records.")
 
-        for data_set in range(num_records):
-            record = build_data_element(data_set)
+        rand = random.Random(data_set.seed)
+        data_sets[filename] = dict()
+        for index in range(data_set.first_index, data_set.first_index + data_set.num_records):
+            record = build_data_element(index, rand)
             data_sets[filename][getattr(record, ImageData.FILENAME)] = record
 
     return data_sets
 
 
-def execute(num_data_sets: int, max_records: int, cfg_file: str) -> List[str]:
+def fake_jpeg(image_kb: int = 0) -> bytes:
+    """
+    Build the content of a fake JPEG file (JPEG header and trailer, zero-filled to the
+    requested size).
+
+    :param image_kb: Size of the file, in KB (0 = header and trailer only)
+
+    :return: File content
+
+    """
+    padding = max(image_kb * KILOBYTE - len(JPEG_HEADER) - len(JPEG_TRAILER), 0)
+    return JPEG_HEADER + bytes(padding) + JPEG_TRAILER
+
+
+def write_image(filespec: str, content: bytes) -> None:
+    """
+    Write an image file. Uses the os-level calls: ~3x faster than open() when creating
+    hundreds of thousands of small files.
+
+    :param filespec: Filespec of the image
+    :param content: File content (see fake_jpeg())
+
+    :return: None
+
+    """
+    image_fd = os.open(filespec, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(image_fd, content)
+    finally:
+        os.close(image_fd)
+
+
+def write_data_set(data_set: DataSet, json_dir: str, jsonl: bool = False,
+                   images_dir: Optional[str] = None, image_kb: int = 0) -> Tuple[str, int]:
+    """
+    Stream a data set to a JSON (or JSON Lines) file, one record at a time, and
+    optionally create the matching fake images:
+    <images_dir>/<data set>/[<classification>/]<image id>.jpg
+
+    :param data_set: DataSet to write (see plan_data_sets())
+    :param json_dir: Directory for the data file
+    :param jsonl: Write JSON Lines (one record per line) instead of a single JSON object
+    :param images_dir: Create the fake images in this directory (None = no images)
+    :param image_kb: Size of each fake image, in KB
+
+    :return: Tuple: (filespec of the data file, number of records written)
+
+    """
+    extension = JsonLinesLog.EXTENSION if jsonl else JsonLog.EXTENSION
+    filespec = os.path.join(json_dir, f"{FILENAME_FMT.format(data_set.number)}.{extension}")
+
+    locations = (build_locations(os.path.join(images_dir, FILENAME_FMT.format(data_set.number)))
+                 if images_dir else DEFAULT_LOCATIONS)
+    directories = set()
+    image = fake_jpeg(image_kb)
+
+    # JSON Lines: one {filename: record} object per line. JSON: the same objects without
+    # their braces, separated by commas, inside a single object.
+    separator, trim = ('\n', slice(None)) if jsonl else (', ', slice(1, -1))
+
+    rand = random.Random(data_set.seed)
+    with open(filespec, "w", buffering=WRITE_BUFFER) as data_file:
+        if not jsonl:
+            data_file.write('{')
+
+        for index in range(data_set.first_index, data_set.first_index + data_set.num_records):
+            record = build_record(index, rand, locations=locations)
+            filename = record[ImageData.FILENAME]
+
+            if index > data_set.first_index:
+                data_file.write(separator)
+            data_file.write(ENCODER.encode({filename: record})[trim])
+
+            if images_dir:
+                directory = record[ImageData.LOCATIONS][0]
+                if directory not in directories:
+                    os.makedirs(directory, exist_ok=True)
+                    directories.add(directory)
+                write_image(os.path.join(directory, filename), image)
+
+        data_file.write('\n' if jsonl else '}')
+
+    return filespec, data_set.num_records
+
+
+def _write_data_set(task: tuple) -> Tuple[str, int]:
+    """
+    Worker process entry point (Pool.imap passes a single argument).
+
+    :param task: Tuple of write_data_set() arguments
+
+    :return: See write_data_set()
+
+    """
+    return write_data_set(*task)
+
+
+def write_data_sets(data_sets: List[DataSet], json_dir: str, jsonl: bool = False,
+                    images_dir: Optional[str] = None, image_kb: int = 0,
+                    workers: int = 1) -> List[str]:
+    """
+    Write the data sets, in parallel (one data set per task).
+
+    :param data_sets: DataSets to write (see plan_data_sets())
+    :param json_dir: Directory for the data files
+    :param jsonl: Write JSON Lines files
+    :param images_dir: Create matching fake images in this directory (None = no images)
+    :param image_kb: Size of each fake image, in KB
+    :param workers: Number of worker processes (1 = write in this process)
+
+    :return: List of files generated
+
+    """
+    tasks = [(data_set, json_dir, jsonl, images_dir, image_kb) for data_set in data_sets]
+    workers = max(1, min(workers, len(tasks)))
+
+    if workers == 1:
+        results = [_write_data_set(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(processes=workers) as pool:
+            results = list(pool.imap(_write_data_set, tasks))
+
+    for filespec, num_records in results:
+        LOG.debug(f"Wrote {num_records} records to '{filespec}'.")
+    return [filespec for filespec, _ in results]
+
+
+def execute(num_data_sets: int, max_records: int, cfg_file: str, seed: int = DEFAULT_SEED,
+            fixed: bool = False, jsonl: bool = False, workers: int = 1,
+            images_dir: Optional[str] = None, image_kb: int = 0) -> List[str]:
     """
 
     Given the parameters, generate the requested data files in the specified directory.
-    The number of records per data set is a random value between [1, max_records].
-    The files will be generated in the log directory defined in the App cfg file provided.
+    The number of records per data set is a random value between [1, max_records]
+    (or max_records, if fixed). The files will be generated in the log directory defined
+    in the App cfg file provided.
 
     :param num_data_sets: Number of files to generate
     :param max_records: Max number of records per data set.
     :param cfg_file: PDL cfg file to use for generating data
+    :param seed: Random seed
+    :param fixed: Every data set has max_records records
+    :param jsonl: Write JSON Lines files (one record per line)
+    :param workers: Number of worker processes
+    :param images_dir: Create a matching tree of fake JPEG files in this directory
+    :param image_kb: Size of each fake JPEG file, in KB
 
     :return: List of files generated by routine.
 
@@ -159,33 +418,24 @@ def execute(num_data_sets: int, max_records: int, cfg_file: str) -> List[str]:
     config = AppConfig(cfg_file=cfg_file, test=False)
     json_dir = build_json_log_location(cfg=config)
 
-    # Generate the data
-    data = generate_data(
-        num_data_sets=int(num_data_sets),
-        max_num_recs_per_file=int(max_records))
-    LOG.debug(pprint.pformat(data))
-
-    # Determine the number of records generated
-    actual_count = sum([len(x.keys()) for x in data.values()])
+    # Determine the data sets (and the number of records generated)
+    data_sets = plan_data_sets(
+        num_data_sets=int(num_data_sets), max_num_recs_per_file=int(max_records),
+        seed=seed, fixed=fixed)
+    actual_count = sum(data_set.num_records for data_set in data_sets)
     max_count = int(num_data_sets) * int(max_records)
     LOG.info(f"Count: {actual_count} (MAX: {max_count})")
 
-    # Write the dictionary to JSON files in the predetermined directory
-    gen_files = []
-    for filename, data in data.items():
-
-        # Convert the ImageData objects to dictionaries (json-serializable)
-        for data_id, data_obj in data.items():
-            data[data_id] = data_obj.to_dict()
-
-        # Build the full filespec for the current dataset
-        filepath = os.path.sep.join([json_dir, filename])
-        gen_files.append(filepath)
+    # Stream the data sets to files in the predetermined directory
+    start = time.perf_counter()
+    gen_files = write_data_sets(data_sets=data_sets, json_dir=json_dir, jsonl=jsonl,
+                                images_dir=images_dir, image_kb=image_kb, workers=workers)
+    elapsed = time.perf_counter() - start
 
-        # Write the data to file.
-        with open(filepath, "w") as data_file:
-            data_file.write(json.dumps(data))
-        LOG.info(f"Wrote data to '{filepath}'.")
+    LOG.info(f"Wrote {actual_count} records to {len(gen_files)} files in '{json_dir}' "
+             f"({elapsed:0.2f} s, {actual_count / elapsed if elapsed else 0:0.0f} records/s).")
+    if images_dir:
+        LOG.info(f"Created {actual_count} images in '{images_dir}'.")
 
     LOG.info("Done")
     return gen_files
@@ -209,7 +459,13 @@ def main_test_routine():
 
     execute(num_data_sets=args.num_data_sets,
             max_records=args.max_records,
-            cfg_file=args.cfg)
+            cfg_file=args.cfg,
+            seed=args.seed,
+            fixed=args.fixed,
+            jsonl=args.jsonl,
+            workers=args.workers,
+            images_dir=args.images_dir,
+            image_kb=args.image_kb)
 
 
 if __name__ == '__main__':
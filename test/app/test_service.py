@@ -0,0 +1,138 @@
+try:
+    # Python 2.7+
+    from unittest.mock import patch, MagicMock
+except ImportError:
+    from mock import patch, MagicMock
+
+from http import HTTPStatus
+import json
+import os
+import stat
+import tempfile
+import threading
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from PDL.app.client import PdlClient, ServiceRequestError
+from PDL.app.service import JobStatus, PdlService, ServiceError
+from PDL.configuration.cli.args import ServiceDefaults
+from PDL.engine.images.image_info import ImageData
+from PDL.engine.images.status import DownloadStatus
+
+from nose.tools import assert_equals, assert_false, assert_raises, assert_true
+
+
+class TestPdlService(object):
+
+    URLS = ['https://500px.com/photo/1/image-1', 'https://500px.com/photo/2/image-2']
+
+    @staticmethod
+    def _image_data(status: str) -> ImageData:
+        image_data = ImageData()
+        image_data.dl_status = status
+        return image_data
+
+    def _start_service(self) -> (PdlService, PdlClient, threading.Thread):
+        cfg_obj = MagicMock()
+        cfg_obj.inventory.inventory = dict()
+        token_dir = tempfile.mkdtemp()
+        service = PdlService(cfg_obj=cfg_obj, port=0, token_dir=token_dir)
+        thread = threading.Thread(target=service.serve_forever)
+        thread.start()
+        client = PdlClient(port=service.server.server_address[1], token_dir=token_dir)
+        return service, client, thread
+
+    def test_jobs_are_processed_in_order(self):
+        results = [self._image_data(DownloadStatus.DOWNLOADED),
+                   self._image_data(DownloadStatus.EXISTS)]
+
+        with patch('PDL.app.service.app.download_images',
+                   return_value=results) as download_images:
+            service, client, thread = self._start_service()
+            first = client.submit(self.URLS)
+            second = client.submit(self.URLS[:1])
+            job = client.wait(second['job_id'], poll_interval=0.01)
+            status = client.status()
+            client.shutdown()
+            thread.join(timeout=10)
+
+        assert_false(thread.is_alive())
+        assert_equals(job['status'], JobStatus.DONE)
+        assert_equals(job['results'], {DownloadStatus.DOWNLOADED: 1, DownloadStatus.EXISTS: 1})
+        assert_equals(status['jobs'], {JobStatus.DONE: 2})
+        assert_equals([call[1]['urls'] for call in download_images.call_args_list],
+                      [self.URLS, self.URLS[:1]])
+        assert_true(all(not call[1]['write_inventory']
+                        for call in download_images.call_args_list))
+        assert_true(first['job_id'] < second['job_id'])
+
+        # Inventory written when the queue drained (not per job)
+        assert_true(service.cfg_obj.inventory.write.call_count >= 1)
+        assert_false(service.inventory_dirty)
+
+    def test_failed_job_is_reported(self):
+        with patch('PDL.app.service.app.download_images', side_effect=ValueError('boom')):
+            service, client, thread = self._start_service()
+            job = client.wait(client.submit(self.URLS)['job_id'], poll_interval=0.01)
+            client.shutdown()
+            thread.join(timeout=10)
+
+        assert_equals(job['status'], JobStatus.FAILED)
+        assert_equals(job['error'], 'ValueError: boom')
+
+    def test_invalid_requests_are_rejected(self):
+        service, client, thread = self._start_service()
+        try:
+            assert_raises(ServiceRequestError, client.submit, [])
+            assert_raises(ServiceRequestError, client.get_job, 999)
+        finally:
+            client.shutdown()
+            thread.join(timeout=10)
+
+    def test_non_local_host_is_rejected(self):
+        assert_raises(ServiceError, PdlService, cfg_obj=MagicMock(), host='0.0.0.0')
+
+    def test_token_file_is_private_and_removed_at_shutdown(self):
+        service, client, thread = self._start_service()
+        try:
+            mode = stat.S_IMODE(os.stat(service.token_file).st_mode)
+            assert_equals(mode, 0o600)
+        finally:
+            client.shutdown()
+            thread.join(timeout=10)
+        assert_false(os.path.exists(service.token_file))
+
+    def test_requests_without_a_valid_token_are_rejected(self):
+        with patch('PDL.app.service.app.download_images') as download_images:
+            service, client, thread = self._start_service()
+            try:
+                intruder = PdlClient(port=service.server.server_address[1], token='guess')
+                with assert_raises(ServiceRequestError) as context:
+                    intruder.submit(self.URLS)
+                assert_true(str(context.exception).endswith(
+                    f"{HTTPStatus.UNAUTHORIZED.value}: Missing or invalid "
+                    f"'{ServiceDefaults.TOKEN_HEADER}' header."))
+                assert_raises(ServiceRequestError, intruder.shutdown)
+                assert_true(thread.is_alive())
+            finally:
+                client.shutdown()
+                thread.join(timeout=10)
+
+        assert_equals(service.jobs, dict())
+        assert_false(download_images.called)
+
+    def test_posts_that_are_not_json_are_rejected(self):
+        service, client, thread = self._start_service()
+        try:
+            # e.g. - a "simple" cross-origin POST from a web page
+            request = Request(f"{client.base_url}/shutdown", data=b'{}',
+                              headers={'Content-Type': 'text/plain',
+                                       ServiceDefaults.TOKEN_HEADER: service.token})
+            with assert_raises(HTTPError) as context:
+                urlopen(request, timeout=client.TIMEOUT)
+            assert_equals(context.exception.code, HTTPStatus.UNSUPPORTED_MEDIA_TYPE)
+            assert_true('Content-Type' in json.loads(context.exception.read())['error'])
+            assert_true(thread.is_alive())
+        finally:
+            client.shutdown()
+            thread.join(timeout=10)
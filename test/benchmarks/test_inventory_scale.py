@@ -0,0 +1,27 @@
+from PDL.benchmarks.inventory_scale import Stages, compare
+
+from nose.tools import assert_equals
+
+
+class TestInventoryScaleCompare(object):
+
+    @staticmethod
+    def _timings(seconds):
+        return {stage: seconds for stage in Stages.ORDER}
+
+    def test_slower_stages_are_flagged(self):
+        baseline = {'10000': self._timings(1.0)}
+        results = {'10000': dict(self._timings(1.0), **{Stages.FS_SCAN: 1.5})}
+        table, regressions = compare(results, baseline, tolerance=0.25, min_delta=0.05)
+
+        assert_equals(regressions, 1)
+        flagged = [row[1] for row in table.rows if row[-1]]
+        assert_equals(flagged, [Stages.FS_SCAN])
+
+    def test_small_slowdowns_and_missing_baseline_are_not_flagged(self):
+        baseline = {'10000': self._timings(0.010)}
+        results = {'10000': self._timings(0.030), '100000': self._timings(5.0)}
+        table, regressions = compare(results, baseline, tolerance=0.25, min_delta=0.05)
+
+        assert_equals(regressions, 0)
+        assert_equals(len(table.rows), 2 * len(Stages.ORDER))
@@ -0,0 +1,77 @@
+import requests
+
+from PDL.benchmarks.download_throughput import percentile
+from PDL.benchmarks.px_server import Faults, ServerProfile, StandInPxServer, route_to_server
+from PDL.engine.download.pxSite1.parse_page import ParseDisplayPage
+
+from nose.tools import assert_equals, assert_raises, assert_true
+
+
+class TestStandInPxServer(object):
+
+    PHOTO_ID = 100000001
+
+    @staticmethod
+    def _server(**profile) -> StandInPxServer:
+        return StandInPxServer(profile=ServerProfile(
+            latency=0, jitter=0, image_kb=4, page_kb=1, **profile)).start()
+
+    def test_display_page_is_parsed_and_image_is_served(self):
+        server = self._server()
+        session = requests.Session()
+        route_to_server(session, server)
+        try:
+            page_url = server.page_url(self.PHOTO_ID)
+            response = session.get(page_url)
+            assert_equals(response.status_code, 200)
+
+            page = ParseDisplayPage(page_url=page_url)
+            page.source_list = [line.strip() for line in response.text.split('\n')]
+            page.get_image_info()
+            assert_equals(page.image_info.author, f"author_{self.PHOTO_ID % 100}")
+            assert_true(str(self.PHOTO_ID) in page.image_info.image_url)
+
+            image = session.get(page.image_info.image_url)
+            assert_equals(image.status_code, 200)
+            assert_equals(len(image.content), 4 * StandInPxServer.KILOBYTES)
+            assert_equals(server.requests, {'pages': 1, 'images': 1, 'errors': 0, 'faults': 0})
+        finally:
+            session.close()
+            server.stop()
+
+    def test_failures_are_deterministic_per_photo(self):
+        profile = ServerProfile(image_error_rate=0.5, seed=1)
+        first = StandInPxServer(profile=profile)
+        second = StandInPxServer(profile=profile)
+        try:
+            failures = [first.fails(photo_id, 'image') for photo_id in range(200)]
+            assert_equals(failures, [second.fails(photo_id, 'image')
+                                     for photo_id in range(200)])
+            assert_true(0 < sum(failures) < 200)
+            assert_true(not any(first.fails(photo_id, 'page') for photo_id in range(200)))
+        finally:
+            first.server.server_close()
+            second.server.server_close()
+
+    def test_injected_faults(self):
+        server = self._server(fault=Faults.THROTTLE, fault_rate=1.0, retry_after=2)
+        session = requests.Session()
+        route_to_server(session, server)
+        try:
+            response = session.get(server.page_url(self.PHOTO_ID))
+            assert_equals(response.status_code, 429)
+            assert_equals(response.headers['Retry-After'], '2')
+
+            server.profile = server.profile._replace(fault=Faults.RESET)
+            assert_raises(requests.exceptions.ConnectionError,
+                          session.get, server.page_url(self.PHOTO_ID))
+            assert_equals(server.requests['faults'], 2)
+        finally:
+            session.close()
+            server.stop()
+
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(100, 0, -1))
+        assert_equals([percentile(values, pct) for pct in (50, 95, 99, 100)],
+                      [50, 95, 99, 100])
+        assert_equals(percentile([], 50), 0.0)
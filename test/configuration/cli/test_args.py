@@ -1,7 +1,7 @@
 import copy
 from typing import NoReturn, List
 
-from PDL.configuration.cli.args import CLIArgs, ArgSubmodules, ArgOptions
+from PDL.configuration.cli.args import CLIArgs, ArgSubmodules, ArgOptions, ProfileDefaults
 from nose.tools import raises, assert_equals, assert_false, assert_true
 
 
@@ -57,8 +57,40 @@ class TestCommandLine(object):
         print(f"{attr} ATTRIBUTE: {attribute}")
         assert_equals(attribute, designator)
 
+    def test_if_profile_option_defaults_to_cprofile(self):
+        # Validate --profile without a mode selects the cProfile mode.
+
+        attr = ArgOptions.PROFILE
+        cli = CLIArgs(test_args_list=[self._build_longword_option(attr), ArgSubmodules.STATS])
+        assert_equals(getattr(cli.args, attr), ProfileDefaults.CPROFILE)
+        assert_equals(getattr(cli.args, ArgOptions.COMMAND), ArgSubmodules.STATS)
+
+    def test_if_profile_sample_mode_is_stored(self):
+        # Validate --profile_sample selects the sample mode, and --profile_interval_ms is stored.
+
+        cli = CLIArgs(test_args_list=[
+            self._build_longword_option(ArgOptions.PROFILE_SAMPLE),
+            self._build_longword_option(ArgOptions.PROFILE_INTERVAL), '2',
+            ArgSubmodules.STATS])
+        assert_equals(getattr(cli.args, ArgOptions.PROFILE), ProfileDefaults.SAMPLE)
+        assert_equals(getattr(cli.args, ArgOptions.PROFILE_INTERVAL), 2.0)
+
+    def test_if_profile_is_not_set_by_default(self):
+        # Validate profiling is disabled unless requested.
+
+        cli = CLIArgs(test_args_list=[ArgSubmodules.STATS])
+        assert_equals(getattr(cli.args, ArgOptions.PROFILE), None)
+
 # --------- Improper CLI Argument Sets -------------
 
+    @raises(SystemExit)
+    def test_if_profile_modes_are_mutually_exclusive(self):
+        # Test if --profile and --profile_sample are mutually exclusive.
+
+        CLIArgs(test_args_list=[self._build_longword_option(ArgOptions.PROFILE),
+                                self._build_longword_option(ArgOptions.PROFILE_SAMPLE),
+                                ArgSubmodules.STATS])
+
     @raises(SystemExit)
     def test_if_app_cfg_option_without_file_specified(self):
         # Test if cfg option throws error if file is not specified.
@@ -4,12 +4,13 @@ try:
 except ImportError:
     from mock import patch, create_autospec
 
+import io
 import os
 import tempfile
 
 import PDL.configuration.cli.url_file as url_file
 
-from nose.tools import assert_equals
+from nose.tools import assert_equals, assert_true
 
 
 class TestUrlFile(object):
@@ -64,3 +65,44 @@ class TestUrlFile(object):
             url_list = url_file.UrlFile().read_file(file_obj.name)
 
         assert_equals(url_list, list())
+
+    def test_iter_file_is_lazy(self):
+        url_filer = url_file.UrlFile()
+        filespec = url_filer.write_file(urls=self.URLS, location=self.FILE_DIR)
+
+        urls = url_filer.iter_file(filespec)
+        assert_equals(next(urls), self.URLS[0])
+        assert_equals(list(urls), self.URLS[1:])
+        os.remove(filespec)
+
+    def test_iter_file_reads_stdin(self):
+        lines = io.StringIO(f"{' '.join(self.URLS[:2])}\nnot a url\n  {self.URLS[2]}\n")
+        with patch('sys.stdin', lines):
+            url_list = list(url_file.UrlFile().iter_file(url_file.UrlFile.STDIN))
+        assert_equals(url_list, self.URLS)
+
+    def test_writer_records_urls_as_they_are_written(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            with url_file.UrlFileWriter(location=work_dir, filename='run.urls') as writer:
+                assert_equals(os.listdir(work_dir), list())
+
+                writer.write_url(self.URLS[0])
+                with open(writer.filespec) as partial:
+                    assert_true(self.URLS[0] in partial.read())
+
+                for url in self.URLS[1:]:
+                    writer.write_url(url)
+
+            with open(writer.filespec) as url_list:
+                lines = url_list.read().split('\n')
+            url_list = url_file.UrlFile().read_file(writer.filespec)
+
+        assert_equals(lines[-2], ' '.join(self.URLS))
+        assert_equals(url_list, self.URLS)
+
+    def test_writer_without_urls_creates_no_file(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            with url_file.UrlFileWriter(location=work_dir) as writer:
+                pass
+            assert_equals(os.listdir(work_dir), list())
+        assert_equals(writer.filespec, '')
@@ -1,4 +1,4 @@
-from PDL.configuration.cli.urls import UrlArgProcessing
+from PDL.configuration.cli.urls import UrlArgProcessing, UrlSanitizer, canonical_url, photo_key
 
 from nose.tools import assert_equals, assert_not_equals, assert_true, assert_false
 
@@ -314,3 +314,67 @@ class TestUrlProcessing(object):
         url_list.extend([self.VALID_URL_FORMAT.format(index) for index in range(10, 10 + num_urls)])
         processed_list = UrlArgProcessing.process_url_list(url_list)
         assert_equals(num_urls * 2, len(processed_list))
+
+    def test_processed_urls_preserve_input_order(self):
+        url_list = [self.VALID_URL_FORMAT.format(index) for index in range(10, 0, -1)]
+        dup_list = url_list + list(reversed(url_list))
+        processed_list = UrlArgProcessing.process_url_list(dup_list)
+        assert_equals(processed_list, url_list)
+
+    # ===============================================================
+    # -------   UrlSanitizer::sanitize(entries)   -------
+    # ===============================================================
+    def test_sanitizer_is_lazy_and_tallies_statistics(self):
+        num_urls = 5
+        url_list = [self.VALID_URL_FORMAT.format(index) for index in range(0, num_urls)]
+        entries = iter(url_list + [url_list[0] + url_list[1], self.INVALID_URL])
+
+        sanitizer = UrlSanitizer(domains=[self.VALID_DOMAIN])
+        urls = sanitizer.sanitize(entries)
+
+        # Nothing is consumed until the URLs are requested
+        assert_equals(sanitizer.entries, 0)
+        assert_equals(next(urls), url_list[0])
+
+        assert_equals(list(urls), url_list[1:])
+        assert_equals(sanitizer.entries, num_urls + 2)
+        assert_equals(sanitizer.concatenations, 1)
+        assert_equals(sanitizer.valid, num_urls)
+        assert_equals(sanitizer.invalid, 1)
+        assert_equals(dict(sanitizer.duplicates), {url_list[0]: 1, url_list[1]: 1})
+
+    # ===============================================================
+    # -------   canonical_url(url) / photo_key(url)   -------
+    # ===============================================================
+    PHOTO_URL = 'https://500px.com/photo/123456789/sunset-over-the-bay'
+    PHOTO_ALIASES = [
+        'https://web.500px.com/photo/123456789/sunset-over-the-bay',
+        'https://500px.com/photo/123456789/sunset-over-the-bay/',
+        'https://500px.com/photo/123456789/sunset-over-the-bay?ctx_page=1&from=popular',
+        'https://www.500PX.com/photo/123456789/sunset-over-the-bay#comments',
+        'https://500px.com/photo/123456789',
+        'https://500px.com/photo/123456789/a-renamed-title',
+    ]
+
+    def test_canonical_url_strips_aliases_query_and_trailing_slash(self):
+        assert_equals(canonical_url('https://Web.500px.com/photo/1/title/?utm_source=x#top'),
+                      'https://500px.com/photo/1/title')
+
+    def test_photo_aliases_map_to_same_key(self):
+        expected = photo_key(self.PHOTO_URL)
+        assert_equals(expected, '500px.com/photo/123456789')
+        for url in self.PHOTO_ALIASES:
+            assert_equals(photo_key(url), expected, f"Alias did not match: {url}")
+
+    def test_different_photos_have_different_keys(self):
+        assert_not_equals(photo_key(self.PHOTO_URL),
+                          photo_key('https://500px.com/photo/12345678/sunset-over-the-bay'))
+
+    def test_url_without_photo_id_uses_canonical_url(self):
+        assert_equals(photo_key(self.VALID_URL), canonical_url(self.VALID_URL))
+
+    def test_aliases_are_removed_as_duplicates(self):
+        sanitizer = UrlSanitizer(domains=['500px.com'])
+        urls = list(sanitizer.sanitize([self.PHOTO_URL] + self.PHOTO_ALIASES))
+        assert_equals(urls, [self.PHOTO_URL])
+        assert_equals(sanitizer.aliases, len(self.PHOTO_ALIASES))
@@ -1,7 +1,9 @@
 from mock import patch, create_autospec
+import email.message
 import os
 import requests
 import tempfile
+import urllib.error
 
 import PDL.engine.download.pxSite1.download_image as dl
 import PDL.engine.images.image_info as imageinfo
@@ -18,6 +20,13 @@ def create_temp_file(size=1024):
     return file_obj
 
 
+def copy_image_body(size):
+    # copyfileobj side effect: write <size> bytes (the image body) to the destination
+    def copy(source, destination):
+        destination.write(b'*' * size)
+    return copy
+
+
 def remove_temp_file(filename):
     try:
         os.remove(filename)
@@ -108,9 +117,12 @@ class TestDownloadPX(object):
         def __init__(self, decode=False):
             self.decode_content = decode
 
+    IMAGE_SIZE = (dl.DownloadPX.MIN_KB + 1) * dl.DownloadPX.KILOBYTES
+
     mocked_get_response_proper = create_autospec(requests.Response)
     mocked_get_response_proper.status_code = 200
     mocked_get_response_proper.raw = MockedContent()
+    mocked_get_response_proper.headers = {'Content-Length': str(IMAGE_SIZE)}
 
     def mocked_shutils_copyfileobj(self, arg1, arg2):
         """
@@ -123,10 +135,10 @@ class TestDownloadPX(object):
         """
         pass
 
-    @patch('PDL.engine.download.pxSite1.download_image.requests.get',
+    @patch('PDL.engine.download.pxSite1.download_image.http_session.get',
            return_value=mocked_get_response_proper)
     @patch('PDL.engine.download.pxSite1.download_image.shutil.copyfileobj',
-           return_value=mocked_shutils_copyfileobj)
+           side_effect=copy_image_body(IMAGE_SIZE))
     def test_dl_via_requests_200(self, copyfileobj, requests_get):
 
         if os.name.lower() in ['nt']:
@@ -156,7 +168,7 @@ class TestDownloadPX(object):
     mocked_get_response_proper.status_code = 404
     mocked_get_response_proper.raw = MockedContent()
 
-    @patch('PDL.engine.download.pxSite1.download_image.requests.get',
+    @patch('PDL.engine.download.pxSite1.download_image.http_session.get',
            return_value=mocked_get_response_proper)
     @patch('PDL.engine.download.pxSite1.download_image.shutil.copyfileobj',
            return_value=mocked_shutils_copyfileobj)
@@ -183,6 +195,73 @@ class TestDownloadPX(object):
         assert dl_status == status.DownloadStatus.ERROR
         assert not os.path.exists(image_obj.dl_file_spec)
 
+    @staticmethod
+    def mocked_response(status_code, headers=None):
+        response = create_autospec(requests.Response)
+        response.status_code = status_code
+        response.raw = TestDownloadPX.MockedContent()
+        response.headers = headers or {}
+        return response
+
+    def _image_obj(self):
+        image_obj = dl.DownloadPX(image_url=self.DNE_DUMMY_URL, dl_dir=self.DL_DIR)
+        image_obj.dl_file_spec = os.path.join(tempfile.mkdtemp(), self.DNE_IMAGE_NAME)
+        return image_obj
+
+    def test_dl_via_requests_404_is_not_retried(self):
+        image_obj = self._image_obj()
+        with patch('PDL.engine.download.pxSite1.download_image.http_session.get',
+                   return_value=self.mocked_response(404)):
+            dl_status = image_obj._dl_via_requests()
+
+        assert_equals(dl_status, status.DownloadStatus.ERROR)
+        assert not image_obj.retryable
+
+    def test_dl_via_requests_503_uses_retry_after(self):
+        image_obj = self._image_obj()
+        with patch('PDL.engine.download.pxSite1.download_image.http_session.get',
+                   return_value=self.mocked_response(503, {'Retry-After': '7'})):
+            dl_status = image_obj._dl_via_requests()
+
+        assert_equals(dl_status, status.DownloadStatus.ERROR)
+        assert image_obj.retryable
+        assert_equals(image_obj.retry_delay, 7)
+
+    def test_dl_via_requests_connection_error_is_retryable(self):
+        image_obj = self._image_obj()
+        with patch('PDL.engine.download.pxSite1.download_image.http_session.get',
+                   side_effect=requests.exceptions.ConnectionError('reset')):
+            dl_status = image_obj._dl_via_requests()
+
+        assert_equals(dl_status, status.DownloadStatus.ERROR)
+        assert image_obj.retryable
+        assert 'reset' in image_obj.image_info.error_info
+
+    def test_dl_via_requests_error_page_is_removed(self):
+        image_obj = self._image_obj()
+        with patch('PDL.engine.download.pxSite1.download_image.http_session.get',
+                   return_value=self.mocked_response(200, {'Content-Length': '100'})), \
+                patch('PDL.engine.download.pxSite1.download_image.shutil.copyfileobj',
+                      side_effect=copy_image_body(100)):
+            dl_status = image_obj._dl_via_requests()
+
+        assert_equals(dl_status, status.DownloadStatus.ERROR)
+        assert image_obj.image_info.error_info.startswith('Incorrect filesize')
+        assert not os.path.exists(image_obj.dl_file_spec)
+
+    def test_dl_via_requests_truncated_body_is_removed(self):
+        image_obj = self._image_obj()
+        headers = {'Content-Length': str(self.IMAGE_SIZE * 2)}
+        with patch('PDL.engine.download.pxSite1.download_image.http_session.get',
+                   return_value=self.mocked_response(200, headers)), \
+                patch('PDL.engine.download.pxSite1.download_image.shutil.copyfileobj',
+                      side_effect=copy_image_body(self.IMAGE_SIZE)):
+            dl_status = image_obj._dl_via_requests()
+
+        assert_equals(dl_status, status.DownloadStatus.ERROR)
+        assert image_obj.image_info.error_info.startswith('Truncated file')
+        assert not os.path.exists(image_obj.dl_file_spec)
+
 # -----------------------------------------------------------------------
 # ------------------------ DOWNLOAD VIA WGET ----------------------------
 # -----------------------------------------------------------------------
@@ -236,7 +315,8 @@ class TestDownloadPX(object):
         image_obj.RETRY_DELAY = 0
         assert image_obj.status == status.DownloadStatus.PENDING
 
-        dl_status = image_obj._dl_via_wget()
+        # Each wget attempt is a single download: download_image() retries
+        dl_status = image_obj.download_image()
 
         print(f"Deleted temp file: {image_file}")
         print(f"Mock WGET call count: {wget_mock.call_count}")
@@ -255,7 +335,7 @@ class TestDownloadPX(object):
 
     @patch('PDL.engine.download.pxSite1.download_image.wget.download',
            return_value=wget_tmp_file_obj_conn_error.name,
-           side_effect=requests.exceptions.ConnectionError())
+           side_effect=urllib.error.URLError(ConnectionResetError()))
     def test_dl_via_wget_conn_err(
             self, wget_mock):
 
@@ -268,7 +348,7 @@ class TestDownloadPX(object):
         image_obj.RETRY_DELAY = 0
         assert image_obj.status == status.DownloadStatus.PENDING
 
-        dl_status = image_obj._dl_via_wget()
+        dl_status = image_obj.download_image()
 
         print(f"Deleted temp file: {image_file}")
         print(f"Mock WGET call count: {wget_mock.call_count}")
@@ -281,6 +361,39 @@ class TestDownloadPX(object):
         remove_temp_file(wget_mock.return_value)
         assert not os.path.exists(wget_mock.return_value)
 
+    def test_dl_via_wget_client_error_is_not_retried(self):
+        not_found = urllib.error.HTTPError(
+            url=self.DNE_DUMMY_URL, code=404, msg='Not Found', hdrs=None, fp=None)
+        image_obj = dl.DownloadPX(
+            image_url=self.DNE_DUMMY_URL, dl_dir=self.DL_DIR, use_wget=True)
+        image_obj.RETRY_DELAY = 0
+
+        with patch('PDL.engine.download.pxSite1.download_image.wget.download',
+                   side_effect=not_found) as wget_mock:
+            dl_status = image_obj.download_image()
+
+        assert_equals(wget_mock.call_count, 1)
+        assert_equals(dl_status, status.DownloadStatus.ERROR)
+        assert not image_obj.retryable
+        assert '404' in image_obj.image_info.error_info
+
+    def test_dl_via_wget_throttled_waits_for_retry_after(self):
+        headers = email.message.Message()
+        headers['Retry-After'] = '7'
+        throttled = urllib.error.HTTPError(
+            url=self.DNE_DUMMY_URL, code=503, msg='Service Unavailable', hdrs=headers, fp=None)
+        image_obj = dl.DownloadPX(
+            image_url=self.DNE_DUMMY_URL, dl_dir=self.DL_DIR, use_wget=True)
+        image_obj.RETRY_DELAY = 0
+
+        with patch('PDL.engine.download.pxSite1.download_image.wget.download',
+                   side_effect=throttled):
+            dl_status = image_obj._dl_via_wget()
+
+        assert_equals(dl_status, status.DownloadStatus.ERROR)
+        assert image_obj.retryable
+        assert_equals(image_obj.retry_delay, 7)
+
     @patch('PDL.engine.download.pxSite1.download_image.wget.download',
            return_value=wget_tmp_file_wget_disabled)
     def test_dl_via_wget_but_wget_is_disabled(self, wget_mock):
@@ -368,6 +481,17 @@ class TestDownloadPX(object):
         assert dl_image.status == status.DownloadStatus.PENDING
         assert dl_pending_mock.call_count == dl.DownloadPX.MAX_ATTEMPTS
 
+    @patch('PDL.engine.download.pxSite1.download_image.time.sleep')
+    @patch('PDL.engine.download.pxSite1.download_image.DownloadPX._dl_via_requests',
+           return_value=status.DownloadStatus.ERROR)
+    def test_download_image_does_not_wait_after_last_attempt(self, dl_error_mock, sleep_mock):
+        dl_image = dl.DownloadPX(image_url=self.DNE_DUMMY_URL, dl_dir=self.DL_DIR)
+        dl_status = dl_image.download_image()
+
+        assert_equals(dl_status, status.DownloadStatus.ERROR)
+        assert_equals(dl_error_mock.call_count, dl.DownloadPX.MAX_ATTEMPTS)
+        assert_equals(sleep_mock.call_count, dl.DownloadPX.MAX_ATTEMPTS - 1)
+
     @patch('PDL.engine.download.pxSite1.download_image.DownloadPX._dl_via_requests',
            return_value=status.DownloadStatus.DOWNLOADED)
     def test_download_image_successful_dl(self, dl_pending_mock):
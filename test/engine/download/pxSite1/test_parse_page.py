@@ -61,6 +61,11 @@ mocked_metadata_dict = {
 
 mocked_get_no_response = None
 
+mocked_get_unavailable_response = requests.Response()
+mocked_get_unavailable_response._content = b'Service Unavailable'
+mocked_get_unavailable_response.status_code = 503
+mocked_get_unavailable_response.headers['Retry-After'] = '0'
+
 mocked_get_error_response = requests.Response()
 mocked_get_error_response._content = None
 mocked_get_error_response.status_code = 500
@@ -85,7 +90,7 @@ class TestParsePage(object):
 # ------------ ParseDisplayPage:get_page() ------------
 
     @patch(
-        'PDL.engine.download.pxSite1.parse_page.requests.get',
+        'PDL.engine.download.pxSite1.parse_page.http_session.get',
         return_value=mocked_get_response_proper)
     def test_get_valid_page(self, mock_get):
         valid_page = page.ParseDisplayPage(page_url=self.DUMMY_URL_1)
@@ -95,7 +100,7 @@ class TestParsePage(object):
         assert_equals(mock_get.call_count, 1)
 
     @patch(
-        'PDL.engine.download.pxSite1.parse_page.requests.get',
+        'PDL.engine.download.pxSite1.parse_page.http_session.get',
         return_value=mocked_get_no_response)
     def test_get_page_with_no_content(self, mock_get):
         valid_page = page.ParseDisplayPage(page_url=self.DUMMY_URL_1)
@@ -105,7 +110,7 @@ class TestParsePage(object):
         assert_equals(mock_get.call_count, page.ParseDisplayPage.MAX_ATTEMPTS)
 
     @patch(
-        'PDL.engine.download.pxSite1.parse_page.requests.get',
+        'PDL.engine.download.pxSite1.parse_page.http_session.get',
         side_effect=requests.exceptions.ConnectionError)
     def test_connection_error(self, mock_get):
         # Mocks a connection error. requests.get returns None, so return value
@@ -121,7 +126,7 @@ class TestParsePage(object):
 
 # ------------ ParseDisplayPage:parse_page_for_link() ------------
     @patch(
-        'PDL.engine.download.pxSite1.parse_page.requests.get',
+        'PDL.engine.download.pxSite1.parse_page.http_session.get',
         return_value=mocked_get_response_proper)
     @patch(
         'PDL.engine.download.pxSite1.parse_page.ParseDisplayPage._get_metadata',
@@ -158,7 +163,7 @@ class TestParsePage(object):
 
 # ------------ ParseDisplayPage:get_author_name() ------------
     @patch(
-        'PDL.engine.download.pxSite1.parse_page.requests.get',
+        'PDL.engine.download.pxSite1.parse_page.http_session.get',
         return_value=mocked_get_response_proper)
     @patch(
         'PDL.engine.download.pxSite1.parse_page.ParseDisplayPage._get_metadata',
@@ -174,7 +179,7 @@ class TestParsePage(object):
 
 # ------------ ParseDisplayPage:get_image_info() ------------
     @patch(
-        'PDL.engine.download.pxSite1.parse_page.requests.get',
+        'PDL.engine.download.pxSite1.parse_page.http_session.get',
         return_value=mocked_get_response_proper)
     @patch(
         'PDL.engine.download.pxSite1.parse_page.ParseDisplayPage._get_metadata',
@@ -197,7 +202,7 @@ class TestParsePage(object):
         target_page.get_image_info()
         assert target_page.source_list is None
 
-    @patch('PDL.engine.download.pxSite1.parse_page.requests.get',
+    @patch('PDL.engine.download.pxSite1.parse_page.http_session.get',
            return_value=mocked_get_error_response)
     def test_get_source_page_returns_non_200_code(self, mocked_request_error):
         target_page = page.ParseDisplayPage(page_url=self.DUMMY_URL_1)
@@ -205,6 +210,31 @@ class TestParsePage(object):
         assert source is None
         assert_equals(mocked_request_error.call_count, 1)
 
+    @patch('PDL.engine.download.pxSite1.parse_page.time.sleep')
+    @patch('PDL.engine.download.pxSite1.parse_page.http_session.get',
+           side_effect=[mocked_get_unavailable_response, mocked_get_response_proper])
+    def test_get_page_retries_unavailable_response(self, mock_get, mock_sleep):
+        target_page = page.ParseDisplayPage(page_url=self.DUMMY_URL_1)
+        source = target_page.get_page()
+        assert_equals(len(source), len(sample_valid_html_page.split('\n')))
+        assert_equals(mock_get.call_count, 2)
+        assert_equals(mock_sleep.call_count, 1)
+
+    @patch('PDL.engine.download.pxSite1.parse_page.http_session.get',
+           side_effect=requests.exceptions.ReadTimeout)
+    def test_get_page_read_timeout_is_retried(self, mock_get):
+        target_page = page.ParseDisplayPage(page_url=self.DUMMY_URL_1)
+        target_page.RETRY_INTERVAL = 0
+        assert target_page.get_page() is None
+        assert_equals(mock_get.call_count, page.ParseDisplayPage.MAX_ATTEMPTS)
+
+    def test_page_without_metadata_is_an_error(self):
+        target_page = page.ParseDisplayPage(page_url=self.DUMMY_URL_1)
+        target_page.source_list = ['<html><body>Something went wrong</body></html>']
+        target_page.get_image_info()
+        assert_equals(target_page.image_info.dl_status, status.DownloadStatus.ERROR)
+        assert target_page.image_info.image_url is None
+
     def test_no_html_source_found_returns_empty_metadata_dict(self):
         valid_page = page.ParseDisplayPage(page_url=self.DUMMY_URL_1)
         metadata = valid_page._get_metadata()
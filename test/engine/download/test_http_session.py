@@ -0,0 +1,36 @@
+import datetime
+import email.utils
+
+import requests
+
+from PDL.engine.download import http_session
+
+from nose.tools import assert_equals, assert_is_none, assert_true
+
+
+class TestRetryAfter(object):
+
+    @staticmethod
+    def _response(retry_after=None):
+        response = requests.Response()
+        response.status_code = 503
+        if retry_after is not None:
+            response.headers['Retry-After'] = retry_after
+        return response
+
+    def test_retry_after_in_seconds(self):
+        assert_equals(http_session.retry_after(self._response('3')), 3.0)
+
+    def test_retry_after_http_date(self):
+        retry_time = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=30)
+        delay = http_session.retry_after(
+            self._response(email.utils.format_datetime(retry_time, usegmt=True)))
+        assert_true(25 <= delay <= 30)
+
+    def test_retry_after_is_capped(self):
+        assert_equals(http_session.retry_after(self._response('86400')),
+                      http_session.RetryPolicy.MAX_RETRY_AFTER)
+
+    def test_missing_or_invalid_retry_after(self):
+        assert_is_none(http_session.retry_after(self._response()))
+        assert_is_none(http_session.retry_after(self._response('soon')))
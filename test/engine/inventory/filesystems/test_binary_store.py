@@ -0,0 +1,101 @@
+import os
+import pickle
+import tempfile
+
+from PDL.engine.images.image_info import ImageData
+from PDL.engine.images.status import DownloadStatus
+from PDL.engine.inventory.filesystems.binary_store import (
+    BinaryInventoryFile, Codec, InvalidInventoryFile, read_inventory)
+from PDL.engine.inventory.filesystems.inventory import FSInv
+
+from nose.tools import assert_equals, assert_false, assert_is_none, assert_raises, assert_true
+
+
+class TestBinaryInventoryFile(object):
+
+    NUM_RECORDS = 25
+    BLOCK_SIZE = 4
+
+    def _build_inventory(self) -> dict:
+        return {f'image_{index:03d}': ImageData(
+                    filename=f'image_{index:03d}.jpg',
+                    image_name=f'Image {index}',
+                    dl_status=DownloadStatus.DOWNLOADED,
+                    download_duration=index / 10.0,
+                    locations=[f'/images/dir_{index % 3}'])
+                for index in range(self.NUM_RECORDS)}
+
+    @staticmethod
+    def _temp_filespec() -> str:
+        return os.path.join(tempfile.mkdtemp(), 'inventory.dat')
+
+    def test_round_trip_each_codec(self):
+        inventory = self._build_inventory()
+        for codec in (Codec.ZLIB, Codec.LZMA):
+            filename = self._temp_filespec()
+            BinaryInventoryFile.write(data=inventory, filename=filename, codec=codec,
+                                      block_size=self.BLOCK_SIZE)
+
+            inv_file = BinaryInventoryFile(filename)
+            assert_equals(inv_file.load(), inventory)
+            assert_equals(inv_file.codec, codec)
+            assert_equals(inv_file.version, BinaryInventoryFile.VERSION)
+
+    def test_single_record_seek(self):
+        inventory = self._build_inventory()
+        filename = self._temp_filespec()
+        BinaryInventoryFile.write(data=inventory, filename=filename, block_size=self.BLOCK_SIZE)
+
+        inv_file = BinaryInventoryFile(filename)
+        for key in ['image_000', 'image_013', f'image_{self.NUM_RECORDS - 1:03d}']:
+            assert_equals(inv_file.get(key), inventory[key])
+        assert_is_none(inv_file.get('image_0005'))
+        assert_is_none(inv_file.get('aaa'))
+        assert_equals(list(inv_file.keys()), sorted(inventory.keys()))
+
+    def test_added_and_removed_attributes_are_tolerated(self):
+        inventory = self._build_inventory()
+        filename = self._temp_filespec()
+
+        # Simulate a file written by a version of ImageData with one attribute
+        # removed (author) and one extra attribute (obsolete).
+        fields = [field for field in BinaryInventoryFile.FIELDS if field != ImageData.AUTHOR]
+        for image_obj in inventory.values():
+            image_obj.obsolete = 'value'
+
+        class OtherVersion(BinaryInventoryFile):
+            FIELDS = fields + ['obsolete']
+
+        OtherVersion.write(data=inventory, filename=filename, block_size=self.BLOCK_SIZE)
+        data = BinaryInventoryFile(filename).load()
+
+        assert_equals(set(data.keys()), set(inventory.keys()))
+        for key, image_obj in data.items():
+            assert_is_none(image_obj.author)
+            assert_false(hasattr(image_obj, 'obsolete'))
+            assert_equals(image_obj.locations, inventory[key].locations)
+
+    def test_legacy_pickle_file_is_read(self):
+        inventory = self._build_inventory()
+        filename = self._temp_filespec()
+        with open(filename, "wb") as pickle_file:
+            pickle.dump(inventory, pickle_file)
+
+        data, legacy = read_inventory(filename)
+        assert_true(legacy)
+        assert_equals(data, inventory)
+
+        # Writing via FSInv converts the file to the binary format
+        FSInv.pickle(data=data, filename=filename)
+        assert_true(BinaryInventoryFile.is_binary_inventory(filename))
+        assert_equals(FSInv(base_dir='.').unpickle(filename=filename), inventory)
+
+    def test_truncated_file_raises(self):
+        filename = self._temp_filespec()
+        BinaryInventoryFile.write(data=self._build_inventory(), filename=filename)
+        with open(filename, "rb") as inv_file:
+            contents = inv_file.read()
+        with open(filename, "wb") as inv_file:
+            inv_file.write(contents[:-10])
+
+        assert_raises(InvalidInventoryFile, BinaryInventoryFile(filename).load)
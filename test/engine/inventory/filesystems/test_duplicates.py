@@ -0,0 +1,147 @@
+import argparse
+import os
+import tempfile
+
+from PDL.app.pdl_config import PdlConfig
+from PDL.benchmarks.inventory_format import build_inventory
+from PDL.engine.inventory.filesystems.duplicates import DuplicateFinder
+from PDL.engine.inventory.json.inventory import JsonInventory
+from PDL.logger.json_log import JsonLinesLog
+
+from nose.tools import assert_equals, assert_false, assert_true
+
+APP_CFG = """[storage]
+local_drive_letter =
+local_dir = {work_dir}/images
+temp_storage_drive =
+temp_storage_path = {work_dir}/temp
+
+[logging]
+prefix =
+suffix =
+extension = log
+log_level = info
+log_drive_letter =
+log_directory = {work_dir}/logs
+json_file_dir = {work_dir}/data
+"""
+
+
+class TestDuplicateFinder(object):
+
+    BLOCK = DuplicateFinder.PARTIAL_BLOCK
+
+    @staticmethod
+    def _write(directory: str, name: str, contents: bytes) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, name)
+        with open(path, "wb") as image_file:
+            image_file.write(contents)
+        return path
+
+    def _build_archive(self) -> str:
+        base_dir = tempfile.mkdtemp()
+        image = os.urandom(self.BLOCK * 3)
+
+        # Identical content, different names and directories
+        self._write(os.path.join(base_dir, 'nature'), 'a.jpg', image)
+        self._write(os.path.join(base_dir, 'people'), 'b.jpg', image)
+
+        # Same size and same first/last blocks, different middle (partial hash collision)
+        middle = bytearray(image)
+        middle[self.BLOCK + 10] ^= 0xFF
+        self._write(os.path.join(base_dir, 'city'), 'c.jpg', bytes(middle))
+
+        # Same name as a.jpg, different content
+        self._write(os.path.join(base_dir, 'city'), 'a.jpg', os.urandom(1000))
+
+        # Not an image
+        self._write(base_dir, 'notes.txt', image)
+        return base_dir
+
+    def test_identical_content_is_grouped(self):
+        base_dir = self._build_archive()
+        finder = DuplicateFinder()
+        groups = finder.find(finder.scan(base_dir))
+
+        assert_equals(len(groups), 1)
+        assert_equals(sorted(os.path.basename(path) for path in groups[0].paths),
+                      ['a.jpg', 'b.jpg'])
+        assert_equals(groups[0].reclaimable, self.BLOCK * 3)
+
+    def test_hardlinks_are_hashed_once_and_not_reclaimable(self):
+        base_dir = tempfile.mkdtemp()
+        original = self._write(base_dir, 'a.jpg', os.urandom(self.BLOCK))
+        os.link(original, os.path.join(base_dir, 'b.jpg'))
+
+        finder = DuplicateFinder()
+        groups = finder.find(finder.scan(base_dir))
+
+        assert_equals(len(groups), 1)
+        assert_equals(groups[0].reclaimable, 0)
+        assert_equals(finder.bytes_hashed, self.BLOCK * 2)
+
+    def test_cached_hashes_are_reused(self):
+        base_dir = self._build_archive()
+        cache_file = os.path.join(tempfile.mkdtemp(), 'hashes.json')
+
+        finder = DuplicateFinder(cache_file=cache_file)
+        expected = finder.find(finder.scan(base_dir))
+        assert_true(finder.bytes_hashed > 0)
+
+        finder = DuplicateFinder(cache_file=cache_file)
+        assert_equals([group.digest for group in finder.find(finder.scan(base_dir))],
+                      [group.digest for group in expected])
+        assert_equals(finder.bytes_hashed, 0)
+
+        # A modified file is re-hashed
+        self._write(os.path.join(base_dir, 'people'), 'b.jpg', os.urandom(self.BLOCK * 3))
+        finder = DuplicateFinder(cache_file=cache_file)
+        assert_equals(finder.find(finder.scan(base_dir)), [])
+        assert_true(finder.bytes_hashed > 0)
+
+    def test_same_name_different_content(self):
+        base_dir = self._build_archive()
+        finder = DuplicateFinder()
+        conflicts = finder.find_name_conflicts(finder.scan(base_dir))
+
+        assert_equals(list(conflicts.keys()), ['a.jpg'])
+        assert_equals(len(conflicts['a.jpg']), 2)
+
+    @staticmethod
+    def _write_cfg_files(work_dir: str) -> argparse.Namespace:
+        app_cfg = os.path.join(work_dir, 'app.cfg')
+        with open(app_cfg, "w") as cfg_file:
+            cfg_file.write(APP_CFG.format(work_dir=work_dir))
+        engine_cfg = os.path.join(work_dir, 'pdl.cfg')
+        with open(engine_cfg, "w") as cfg_file:
+            cfg_file.write("[python_project]\nname = PDL\n")
+        return argparse.Namespace(cfg=app_cfg, engine=engine_cfg, command='dups')
+
+    def test_legacy_hash_cache_is_moved_out_of_the_json_inventory(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            cli_args = self._write_cfg_files(work_dir)
+            json_dir = os.path.join(work_dir, 'data')
+            os.makedirs(json_dir)
+            records = build_inventory(3)
+            run_log = JsonLinesLog(os.path.join(json_dir, f"run.{JsonLinesLog.EXTENSION}"),
+                                   fsync=False)
+            for image_obj in records.values():
+                run_log.append(image_obj)
+            run_log.close()
+
+            # Cache written by the previous version, next to the JSON inventory files
+            finder = DuplicateFinder(cache_file=os.path.join(json_dir, 'PDL_hashes.json'))
+            finder.find(finder.scan(self._build_archive()))
+            legacy_cache = finder.cache.filename
+            assert_true(os.path.exists(legacy_cache))
+
+            cfg_obj = PdlConfig(cli_args=cli_args)
+
+            assert_false(os.path.exists(legacy_cache))
+            assert_true(os.path.exists(cfg_obj.hash_cache_file))
+            assert_equals(os.path.dirname(cfg_obj.hash_cache_file), cfg_obj.temp_storage_path)
+
+            # Only the image records are left to read as inventory
+            inventory = JsonInventory(dir_location=json_dir).get_inventory()
+            assert_equals(sorted(inventory.keys()), sorted(records.keys()))
@@ -0,0 +1,93 @@
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+import os
+import tempfile
+
+from PDL.engine.inventory.filesystems.duplicates import DuplicateFinder
+from PDL.engine.inventory.filesystems.reclaim import LinkMethod, SpaceReclaimer
+
+from nose.tools import assert_equals, assert_false, assert_true
+
+
+class TestSpaceReclaimer(object):
+
+    NUM_COPIES = 4
+    SIZE = 10000
+
+    def _build_archive(self) -> (str, bytes):
+        base_dir = tempfile.mkdtemp()
+        image = os.urandom(self.SIZE)
+        for index in range(self.NUM_COPIES):
+            directory = os.path.join(base_dir, f'category_{index}')
+            os.makedirs(directory)
+            with open(os.path.join(directory, 'image.jpg'), "wb") as image_file:
+                image_file.write(image)
+        return base_dir, image
+
+    @staticmethod
+    def _find(base_dir: str) -> list:
+        finder = DuplicateFinder()
+        return finder.find(finder.scan(base_dir))
+
+    def test_dry_run_does_not_change_files(self):
+        base_dir, _ = self._build_archive()
+        groups = self._find(base_dir)
+
+        results = SpaceReclaimer(dry_run=True).reclaim(groups)
+
+        assert_equals([result.method for result in results],
+                      [LinkMethod.DRY_RUN] * (self.NUM_COPIES - 1))
+        assert_equals(sum(result.size for result in results),
+                      self.SIZE * (self.NUM_COPIES - 1))
+        assert_equals(self._find(base_dir)[0].reclaimable, self.SIZE * (self.NUM_COPIES - 1))
+
+    def test_copies_are_replaced_with_hardlinks(self):
+        base_dir, image = self._build_archive()
+        groups = self._find(base_dir)
+
+        results = SpaceReclaimer(reflink=False, batch_size=2).reclaim(groups)
+        assert_equals([result.method for result in results],
+                      [LinkMethod.HARDLINK] * (self.NUM_COPIES - 1))
+
+        # Same paths, same content, single inode
+        for path in groups[0].paths:
+            with open(path, "rb") as image_file:
+                assert_equals(image_file.read(), image)
+        assert_equals(len({os.stat(path).st_ino for path in groups[0].paths}), 1)
+        assert_equals(self._find(base_dir)[0].reclaimable, 0)
+
+        # No temp files left behind
+        assert_true(all(name == 'image.jpg' for _, _, files in os.walk(base_dir)
+                        for name in files))
+
+    def test_changed_file_is_skipped(self):
+        base_dir, _ = self._build_archive()
+        groups = self._find(base_dir)
+
+        changed = groups[0].paths[-1]
+        with open(changed, "wb") as image_file:
+            image_file.write(os.urandom(self.SIZE))
+
+        results = SpaceReclaimer(reflink=False).reclaim(groups)
+        skipped = [result.target for result in results if result.method == LinkMethod.SKIPPED]
+        assert_equals(skipped, [changed])
+
+    def test_copies_sharing_extents_are_not_relinked(self):
+        base_dir, _ = self._build_archive()
+        groups = self._find(base_dir)
+        inodes = {os.stat(path).st_ino for path in groups[0].paths}
+
+        # Separate copies do not share extents
+        source, target = SpaceReclaimer.plan(groups)[0]
+        assert_false(SpaceReclaimer()._shares_extents(source.path, target.path))
+
+        # Copies already reflinked (e.g. by a previous run) are not relinked or reclaimed
+        with patch.object(SpaceReclaimer, '_shares_extents', return_value=True):
+            results = SpaceReclaimer().reclaim(groups)
+
+        assert_equals([result.method for result in results],
+                      [LinkMethod.SHARED] * (self.NUM_COPIES - 1))
+        assert_equals({os.stat(path).st_ino for path in groups[0].paths}, inodes)
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+
+from PDL.engine.images.image_info import ImageData
+from PDL.engine.images.status import DownloadStatus
+from PDL.engine.inventory.json.compaction import JsonLogCompactor, combine_records
+from PDL.engine.inventory.json.inventory import JsonInventory
+from PDL.logger.json_log import JsonLinesLog
+
+from nose.tools import assert_equals, assert_false, assert_true
+
+
+class TestJsonLogCompactor(object):
+
+    FANOUT = 3
+
+    @staticmethod
+    def _read(filespec: str) -> str:
+        with open(filespec) as data_file:
+            return data_file.read()
+
+    @staticmethod
+    def _run_name(run: int) -> str:
+        # Run logs are named after the run's timestamp
+        return f"261019T1200{run:02d}"
+
+    @staticmethod
+    def _write_run(directory: str, name: str, indices: list,
+                   status: str = DownloadStatus.DOWNLOADED) -> str:
+        filespec = os.path.join(directory, f"{name}.{JsonLinesLog.EXTENSION}")
+        with JsonLinesLog(log_filespec=filespec, fsync=False) as run_log:
+            for index in indices:
+                run_log.append(ImageData.build_obj({
+                    ImageData.FILENAME: f'image_{index}.jpg',
+                    ImageData.IMAGE_NAME: f'Image {index}',
+                    ImageData.DL_STATUS: status}))
+        return filespec
+
+    def test_tiers_grow_by_fanout(self):
+        compactor = JsonLogCompactor(dir_location='.', fanout=4, base_size=100)
+        assert_equals(compactor.tier(99), 0)
+        assert_equals(compactor.tier(100), 1)
+        assert_equals(compactor.tier(399), 1)
+        assert_equals(compactor.tier(400), 2)
+
+    def test_no_compaction_below_fanout(self):
+        directory = tempfile.mkdtemp()
+        for run in range(self.FANOUT - 1):
+            self._write_run(directory, self._run_name(run), [run])
+
+        compactor = JsonLogCompactor(dir_location=directory, fanout=self.FANOUT)
+        assert_equals(compactor.compact(), [])
+        assert_equals(len(compactor.get_data_files()), self.FANOUT - 1)
+
+    def test_compaction_preserves_inventory(self):
+        directory = tempfile.mkdtemp()
+        for run in range(self.FANOUT * 2):
+            self._write_run(directory, self._run_name(run), [run, run + 1])
+        expected = JsonInventory(dir_location=directory).get_inventory()
+
+        compactor = JsonLogCompactor(dir_location=directory, fanout=self.FANOUT)
+        created = compactor.compact()
+
+        assert_true(created)
+        assert_true(len(compactor.get_data_files()) < self.FANOUT)
+        assert_equals(set(JsonInventory(dir_location=directory).get_inventory().keys()),
+                      set(expected.keys()))
+
+        # Manifest lists the LEVEL files
+        with open(os.path.join(directory, JsonLogCompactor.MANIFEST)) as manifest:
+            files = json.load(manifest)['files']
+        assert_true(all(os.path.basename(name) in files for name in created))
+
+    def test_excluded_files_are_not_compacted(self):
+        directory = tempfile.mkdtemp()
+        runs = [self._write_run(directory, self._run_name(run), [run]) for run in range(self.FANOUT)]
+
+        compactor = JsonLogCompactor(dir_location=directory, fanout=self.FANOUT)
+        assert_equals(compactor.compact(exclude=[runs[-1]]), [])
+        assert_true(all(os.path.exists(run) for run in runs))
+
+    def test_combine_records_prefers_downloaded_and_fills_metadata(self):
+        records = [
+            {ImageData.DL_STATUS: DownloadStatus.EXISTS, ImageData.AUTHOR: 'Picasso'},
+            {ImageData.DL_STATUS: DownloadStatus.DOWNLOADED, ImageData.AUTHOR: None},
+        ]
+        combined = combine_records(records)
+        assert_equals(combined[ImageData.DL_STATUS], DownloadStatus.DOWNLOADED)
+        assert_equals(combined[ImageData.AUTHOR], 'Picasso')
+        assert_false(records[1][ImageData.AUTHOR])
+
+    def test_foreign_files_are_left_untouched(self):
+        directory = tempfile.mkdtemp()
+        for run in range(self.FANOUT):
+            self._write_run(directory, self._run_name(run), [run])
+
+        # Image records not owned by the compactor, and files that are not image records
+        consolidated = self._write_run(directory, 'CONSOLIDATED_1', [100])
+        hash_cache = os.path.join(directory, 'PDL_hashes.json')
+        not_records = os.path.join(directory, f"{self._run_name(99)}.json")
+        for filespec in (hash_cache, not_records):
+            with open(filespec, "w") as foreign_file:
+                json.dump({'/images/a.jpg': [1024, 1.0, 'abc123']}, foreign_file)
+        foreign = {filespec: self._read(filespec)
+                   for filespec in (consolidated, hash_cache, not_records)}
+
+        compactor = JsonLogCompactor(dir_location=directory, fanout=self.FANOUT)
+        assert_equals(len(compactor.compact()), 1)
+        for filespec, contents in foreign.items():
+            assert_equals(self._read(filespec), contents)
@@ -0,0 +1,93 @@
+import os
+import tempfile
+
+from PDL.engine.inventory.bloom import InvalidBloomFilterFile, UrlBloomFilter
+
+from nose.tools import assert_equals, assert_false, assert_raises, assert_true
+
+
+class TestUrlBloomFilter(object):
+
+    CAPACITY = 5000
+    ERROR_RATE = 0.01
+    URL = 'https://500px.com/photo/{index}/image-{index}'
+
+    def _temp_filespec(self) -> str:
+        return os.path.join(tempfile.mkdtemp(), 'urls.bloom')
+
+    def _urls(self, start: int, stop: int) -> list:
+        return [self.URL.format(index=index) for index in range(start, stop)]
+
+    def test_added_urls_are_found(self):
+        with UrlBloomFilter(self._temp_filespec(), capacity=self.CAPACITY,
+                            error_rate=self.ERROR_RATE) as url_filter:
+            assert_true(url_filter.created)
+
+            # URLs that collide with a previously added URL are not counted as new
+            added = url_filter.update(self._urls(0, self.CAPACITY))
+            assert_true(self.CAPACITY * (1 - self.ERROR_RATE) <= added <= self.CAPACITY)
+
+            # No false negatives
+            assert_true(all(url in url_filter for url in self._urls(0, self.CAPACITY)))
+
+            # False positive rate is close to the configured rate
+            false_positives = sum(url in url_filter for url in
+                                  self._urls(self.CAPACITY, self.CAPACITY * 3))
+            assert_true(false_positives < self.CAPACITY * 2 * self.ERROR_RATE * 2)
+
+    def test_filter_persists_between_runs(self):
+        filespec = self._temp_filespec()
+        with UrlBloomFilter(filespec, capacity=self.CAPACITY) as url_filter:
+            url_filter.update(self._urls(0, 100))
+            url_filter.synced = 42
+
+        with UrlBloomFilter(filespec) as url_filter:
+            assert_false(url_filter.created)
+            assert_equals(url_filter.count, 100)
+            assert_equals(url_filter.synced, 42)
+            assert_true(all(url in url_filter for url in self._urls(0, 100)))
+            assert_false(url_filter.add(self.URL.format(index=0)))
+            assert_false(None in url_filter)
+
+    def test_sync_is_keyed_on_the_inventory_file_contents(self):
+        filespec = self._temp_filespec()
+        inventory_file = os.path.join(os.path.dirname(filespec), 'PDL.dat')
+        with open(inventory_file, "wb") as inv_file:
+            inv_file.write(b'inventory-1')
+
+        with UrlBloomFilter(filespec, capacity=self.CAPACITY) as url_filter:
+            digest = url_filter.file_digest(inventory_file)
+            assert_false(url_filter.in_sync(digest))    # New filter: not synced yet
+            url_filter.mark_synced(digest)
+
+        # Same size, different contents
+        with open(inventory_file, "wb") as inv_file:
+            inv_file.write(b'inventory-2')
+
+        with UrlBloomFilter(filespec) as url_filter:
+            assert_true(url_filter.in_sync(digest))
+            assert_false(url_filter.in_sync(url_filter.file_digest(inventory_file)))
+        assert_equals(UrlBloomFilter.file_digest(f"{inventory_file}.missing"), 0)
+
+    def test_version_1_filter_is_resynchronized(self):
+        filespec = self._temp_filespec()
+        with UrlBloomFilter(filespec, capacity=self.CAPACITY) as url_filter:
+            url_filter.update(self._urls(0, 10))
+            url_filter.mark_synced(42)
+
+        # Rewrite the header as version 1 (the sync field held the inventory size)
+        with open(filespec, "r+b") as bloom_file:
+            header = bytearray(bloom_file.read(UrlBloomFilter.HEADER_SIZE))
+            header[6:8] = (1).to_bytes(2, 'big')
+            bloom_file.seek(0)
+            bloom_file.write(header)
+
+        with UrlBloomFilter(filespec) as url_filter:
+            assert_false(url_filter.in_sync(42))
+            assert_true(all(url in url_filter for url in self._urls(0, 10)))
+
+    def test_invalid_file_raises(self):
+        filespec = self._temp_filespec()
+        with open(filespec, "wb") as bloom_file:
+            bloom_file.write(b'not a filter file' * 10)
+        assert_raises(InvalidBloomFilterFile, UrlBloomFilter, filespec)
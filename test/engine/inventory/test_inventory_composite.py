@@ -0,0 +1,43 @@
+try:
+    # Python 2.7+
+    from unittest.mock import patch, MagicMock
+except ImportError:
+    from mock import patch, MagicMock
+
+import os
+import tempfile
+
+from PDL.engine.inventory.inventory_composite import Inventory
+from PDL.engine.inventory.json.inventory import JsonInventory
+
+from nose.tools import assert_equals
+
+
+class TestInventory(object):
+
+    @staticmethod
+    def _build_cfg(work_dir: str) -> MagicMock:
+        cfg = MagicMock()
+        cfg.app_cfg.get_list.return_value = list()
+        cfg.temp_storage_path = work_dir
+        cfg.json_log_location = work_dir
+        cfg.inv_pickle_file = os.path.join(work_dir, 'PDL.dat')
+        cfg.json_logfile = os.path.join(work_dir, 'run.jsonl')
+        return cfg
+
+    def test_read_only_inventory_does_not_read_the_json_files(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            with patch.object(JsonInventory, 'get_inventory',
+                              return_value=dict()) as get_inventory:
+                inventory = Inventory(cfg=self._build_cfg(work_dir), read_only=True)
+
+        assert_equals(get_inventory.call_count, 0)
+        assert_equals(inventory.json_inv, dict())
+
+    def test_forced_scan_reads_the_json_files(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            with patch.object(JsonInventory, 'get_inventory',
+                              return_value=dict()) as get_inventory:
+                Inventory(cfg=self._build_cfg(work_dir), force_scan=True, read_only=True)
+
+        assert_equals(get_inventory.call_count, 1)
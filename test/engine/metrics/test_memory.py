@@ -0,0 +1,63 @@
+from PDL.engine.metrics.memory import MemoryTracker
+
+from nose.tools import assert_equals, assert_false, assert_is_none, assert_true
+
+KILOBYTE = 1024
+
+
+def allocate(blocks: int, size: int = KILOBYTE) -> list:
+    return [bytearray(size) for _ in range(blocks)]
+
+
+class TestMemoryTracker(object):
+
+    def test_stages_are_not_recorded_when_disabled(self):
+        tracker = MemoryTracker()
+        with tracker.stage('disabled') as stage:
+            assert_is_none(stage)
+        assert_equals(tracker.stages, [])
+
+    def test_stage_records_memory_and_allocation_sites(self):
+        tracker = MemoryTracker().start(top=5)
+        with tracker.stage('allocate'):
+            data = allocate(blocks=500)
+        tracker.stop()
+
+        stage = tracker.stages[0]
+        assert_equals(stage.name, 'allocate')
+        assert_true(stage.delta >= 500 * KILOBYTE)
+        assert_true(stage.peak >= stage.end)
+        assert_true(any('test_memory.py' in site.site and site.count >= 500
+                        for site in stage.sites))
+        assert_equals(len(data), 500)
+
+    def test_nested_stages_record_depth_and_parent_peak(self):
+        tracker = MemoryTracker().start()
+
+        @tracker.measured('inner')
+        def temporary_allocation():
+            allocate(blocks=1000)
+
+        with tracker.stage('outer'):
+            temporary_allocation()
+        tracker.stop()
+
+        stages = {stage.name: stage for stage in tracker.stages}
+        assert_equals((stages['outer'].depth, stages['inner'].depth), (0, 1))
+        assert_true(stages['inner'].order > stages['outer'].order)
+
+        # The inner allocation is released, but counts toward both peaks
+        assert_true(stages['inner'].peak - stages['inner'].start >= 1000 * KILOBYTE)
+        assert_true(stages['outer'].peak >= stages['inner'].peak)
+        assert_true(stages['outer'].delta < 1000 * KILOBYTE)
+
+    def test_report_lists_stages_in_start_order(self):
+        tracker = MemoryTracker().start()
+        with tracker.stage('outer'):
+            with tracker.stage('inner'):
+                allocate(blocks=10)
+        tracker.stop()
+
+        report = tracker.report()
+        assert_true(report.index('| outer') < report.index('|   inner'))
+        assert_false(tracker.enabled)
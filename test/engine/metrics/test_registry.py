@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+
+from PDL.engine.metrics import export
+from PDL.engine.metrics.registry import MetricError, MetricsRegistry
+
+from nose.tools import assert_equals, assert_in, assert_raises, assert_true
+
+
+class TestMetricsRegistry(object):
+
+    def test_counter_is_incremented_per_label(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('test_images_total', 'Images', label_names=['status'])
+        counter.inc(status='Downloaded')
+        counter.inc(2, status='Downloaded')
+        counter.inc(status='Error')
+
+        assert_equals(counter.samples(), [({'status': 'Downloaded'}, 3),
+                                          ({'status': 'Error'}, 1)])
+
+    def test_wrong_labels_raise(self):
+        counter = MetricsRegistry().counter('test_total', 'Test', label_names=['status'])
+        assert_raises(MetricError, counter.inc, type='page')
+
+    def test_registering_an_existing_name_returns_the_metric(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('test_total', 'Test')
+        assert_true(registry.counter('test_total', 'Test') is counter)
+        assert_raises(MetricError, registry.gauge, 'test_total', 'Test')
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = MetricsRegistry().histogram('test_seconds', 'Test', buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 5.0):
+            histogram.observe(value)
+
+        (labels, value), = histogram.samples()
+        assert_equals(list(value['buckets'].values()), [1, 3, 4])
+        assert_equals(value['count'], 4)
+        assert_true(abs(value['sum'] - 6.25) < 1e-9)
+
+    def test_unlabelled_metrics_report_zero_until_recorded(self):
+        registry = MetricsRegistry()
+        assert_equals(registry.gauge('test_depth', 'Test').samples(), [({}, 0)])
+        (labels, value), = registry.histogram('test_seconds', 'Test').samples()
+        assert_equals((value['count'], value['sum']), (0, 0.0))
+
+    def test_gauge_function_is_read_on_export(self):
+        gauge = MetricsRegistry().gauge('test_depth', 'Test')
+        depth = [3]
+        gauge.set_function(lambda: depth[0])
+        depth[0] = 5
+        assert_equals(gauge.samples(), [({}, 5)])
+
+
+class TestMetricsExport(object):
+
+    @staticmethod
+    def _registry() -> MetricsRegistry:
+        registry = MetricsRegistry()
+        registry.counter('test_images_total', 'Images', label_names=['status']).inc(
+            status='Down"loaded')
+        registry.histogram('test_seconds', 'Latency', buckets=(1.0,)).observe(0.5)
+        return registry
+
+    def test_prometheus_text_format(self):
+        text = export.to_prometheus(self._registry())
+        expected_lines = ['# TYPE test_images_total counter',
+                          'test_images_total{status="Down\\"loaded"} 1',
+                          '# TYPE test_seconds histogram',
+                          'test_seconds_bucket{le="1.0"} 1',
+                          'test_seconds_bucket{le="+Inf"} 1',
+                          'test_seconds_sum 0.5',
+                          'test_seconds_count 1']
+        for line in expected_lines:
+            assert_in(line, text.split('\n'))
+
+    def test_json_and_textfile_are_written(self):
+        directory = tempfile.mkdtemp()
+        json_file = os.path.join(directory, 'metrics.json')
+        textfile = os.path.join(directory, 'pdl.prom')
+
+        export.write_json(json_file, registry=self._registry())
+        export.write_textfile(textfile, registry=self._registry())
+
+        with open(json_file) as json_data:
+            metrics = json.load(json_data)['metrics']
+        assert_equals(metrics['test_seconds']['samples'][0]['buckets'], {'1.0': 1, '+Inf': 1})
+        with open(textfile) as text:
+            assert_in('test_seconds_count 1', text.read())
+        assert_equals(sorted(os.listdir(directory)), ['metrics.json', 'pdl.prom'])
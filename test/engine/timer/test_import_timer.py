@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+from PDL.engine.timer.import_timer import ImportTimer
+
+from nose.tools import assert_equals, assert_false, assert_in, assert_true
+
+
+class TestImportTimer(object):
+
+    PARENT = 'pdl_import_timer_parent'
+    CHILD = 'pdl_import_timer_child'
+
+    def _build_modules(self) -> str:
+        module_dir = tempfile.mkdtemp()
+        with open(os.path.join(module_dir, f"{self.PARENT}.py"), "w") as module:
+            module.write(f"import time\nimport {self.CHILD}\ntime.sleep(0.02)\n")
+        with open(os.path.join(module_dir, f"{self.CHILD}.py"), "w") as module:
+            module.write("import time\ntime.sleep(0.01)\n")
+        return module_dir
+
+    def test_nested_imports_are_timed(self):
+        module_dir = self._build_modules()
+        sys.path.insert(0, module_dir)
+        timer = ImportTimer()
+        try:
+            timer.start()
+            __import__(self.PARENT)
+        finally:
+            timer.stop()
+            sys.path.remove(module_dir)
+            sys.modules.pop(self.PARENT, None)
+            sys.modules.pop(self.CHILD, None)
+
+        assert_false(timer.running)
+        records = {record.name: record for record in timer.records}
+        parent, child = records[self.PARENT], records[self.CHILD]
+
+        assert_equals((parent.depth, child.depth), (0, 1))
+        assert_true(child.self_time >= 0.01)
+        assert_true(parent.self_time >= 0.02)
+        assert_true(abs(parent.cumulative - parent.self_time - child.cumulative) < 1e-6)
+        assert_equals(timer.total, parent.cumulative)
+
+        report = timer.report(limit=1)
+        assert_in(self.PARENT, report)
+        assert_false(self.CHILD in report)
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import threading
+import time
+
+from PDL.engine.timer.profiler import CallProfiler, SamplingProfiler, build_profiler
+
+from nose import SkipTest
+from nose.tools import assert_equals, assert_true
+
+
+def busy_work(seconds: float = 0.0) -> int:
+    total = 0
+    end = time.perf_counter() + seconds
+    while True:
+        total += sum(range(100))
+        if time.perf_counter() >= end:
+            return total
+
+
+def profiled_functions(stats) -> list:
+    return [function for (_, _, function) in stats.stats]
+
+
+class TestCallProfiler(object):
+
+    def test_calls_in_the_main_and_new_threads_are_profiled(self):
+        profiler = CallProfiler().start()
+        busy_work()
+        thread = threading.Thread(target=busy_work, name='profiled-thread')
+        thread.start()
+        thread.join()
+        profiler.stop()
+
+        stats = profiler.stats()
+        busy = [stat for func, stat in stats.stats.items() if func[2] == 'busy_work']
+        assert_equals(busy[0][1], 2)     # Primitive calls: main thread + new thread
+
+    def test_threads_still_running_are_left_out(self):
+        if not CallProfiler.PER_THREAD:
+            raise SkipTest("All threads share one profiler (sys.monitoring)")
+
+        release = threading.Event()
+        profiler = CallProfiler().start()
+        thread = threading.Thread(target=lambda: busy_work() and release.wait(),
+                                  name='running-thread')
+        thread.start()
+        profiler.stop()
+
+        try:
+            assert_equals(profiler.running_threads(), ['running-thread'])
+            assert_true('busy_work' not in profiled_functions(profiler.stats()))
+        finally:
+            release.set()
+            thread.join()
+
+        # Once the thread exits, its profile is complete and included
+        assert_equals(profiler.running_threads(), [])
+        assert_true('busy_work' in profiled_functions(profiler.stats()))
+
+    def test_write_creates_pstats_and_report(self):
+        profiler = CallProfiler().start()
+        busy_work()
+        profiler.stop()
+
+        base = os.path.join(tempfile.mkdtemp(), 'run_profile')
+        files = profiler.write(base, limit=5)
+
+        assert_equals(files, [f"{base}{CallProfiler.STATS_EXT}", f"{base}.txt"])
+        with open(files[1]) as report:
+            assert_true('busy_work' in report.read())
+
+
+class TestSamplingProfiler(object):
+
+    def test_busy_thread_is_sampled(self):
+        profiler = SamplingProfiler(interval=0.001).start()
+        thread = threading.Thread(target=busy_work, args=(0.2,))
+        thread.start()
+        thread.join()
+        profiler.stop()
+
+        samples = {function.split('(')[-1].rstrip(')'): counts
+                   for function, counts in profiler.function_samples().items()}
+        assert_true(profiler.samples > 0)
+        assert_true(samples['busy_work'][0] > 0)
+        assert_true(SamplingProfiler.THREAD_NAME not in
+                    [thread.name for thread in threading.enumerate()])
+
+    def test_inclusive_and_self_samples(self):
+        profiler = SamplingProfiler()
+        profiler.stacks.update({('main', 'parse', 'regex'): 3, ('main', 'parse'): 1,
+                                ('main', 'write'): 2})
+
+        samples = profiler.function_samples()
+        assert_equals(samples['main'], (6, 0))
+        assert_equals(samples['parse'], (4, 1))
+        assert_equals(samples['regex'], (3, 3))
+
+    def test_write_creates_collapsed_stacks(self):
+        profiler = SamplingProfiler()
+        profiler.stacks.update({('main', 'parse'): 4})
+
+        base = os.path.join(tempfile.mkdtemp(), 'run_profile')
+        files = profiler.write(base)
+        with open(files[0]) as stacks:
+            assert_equals(stacks.read(), "main;parse 4\n")
+
+
+class TestBuildProfiler(object):
+
+    def test_modes(self):
+        assert_true(isinstance(build_profiler(CallProfiler.MODE), CallProfiler))
+        sampler = build_profiler(SamplingProfiler.MODE, interval=0.01)
+        assert_true(isinstance(sampler, SamplingProfiler))
+        assert_equals(sampler.interval, 0.01)
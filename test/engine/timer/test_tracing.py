@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import threading
+
+from PDL.engine.timer.tracing import Tracer
+
+from nose.tools import assert_equals, assert_is_none, assert_true
+
+
+class TestTracer(object):
+
+    def test_spans_are_not_recorded_when_disabled(self):
+        tracer = Tracer()
+        with tracer.span('disabled') as span:
+            assert_is_none(span)
+        assert_equals(tracer.spans, [])
+
+    def test_nested_spans_record_parent(self):
+        tracer = Tracer().start()
+        with tracer.span('page', url='https://example.com/photo/1') as page:
+            with tracer.span('fetch_page') as fetch:
+                pass
+        tracer.stop()
+
+        assert_equals([span.name for span in tracer.spans], ['fetch_page', 'page'])
+        assert_is_none(page.parent_id)
+        assert_equals(fetch.parent_id, page.span_id)
+        assert_equals(page.args, {'url': 'https://example.com/photo/1'})
+        assert_true(page.start <= fetch.start and fetch.end <= page.end)
+
+    def test_decorator_records_a_span_per_call(self):
+        tracer = Tracer().start()
+
+        @tracer.traced('work')
+        def work(value):
+            return value * 2
+
+        assert_equals([work(1), work(2)], [2, 4])
+        assert_equals([span.name for span in tracer.spans], ['work', 'work'])
+
+    def test_threads_have_separate_span_stacks(self):
+        tracer = Tracer().start()
+
+        def worker():
+            with tracer.span('worker'):
+                pass
+
+        with tracer.span('main'):
+            thread = threading.Thread(target=worker, name='worker-thread')
+            thread.start()
+            thread.join()
+
+        spans = {span.name: span for span in tracer.spans}
+        assert_is_none(spans['worker'].parent_id)
+        assert_equals(spans['worker'].thread_name, 'worker-thread')
+        assert_true(spans['worker'].thread_id != spans['main'].thread_id)
+
+    def test_chrome_trace_export(self):
+        tracer = Tracer().start()
+        with tracer.span('page', url='u'):
+            with tracer.span('parse_page'):
+                pass
+
+        trace_file = os.path.join(tempfile.mkdtemp(), 'trace.json')
+        tracer.write_chrome_trace(trace_file)
+        with open(trace_file) as trace_data:
+            events = json.load(trace_data)['traceEvents']
+
+        complete = [event for event in events if event['ph'] == 'X']
+        metadata = [event for event in events if event['ph'] == 'M']
+        assert_equals([event['name'] for event in complete], ['page', 'parse_page'])
+        assert_equals(complete[1]['args']['parent_id'], complete[0]['args']['span_id'])
+        assert_equals(complete[0]['args']['url'], 'u')
+        assert_true(complete[0]['dur'] >= complete[1]['dur'] >= 0)
+        assert_equals(metadata[0]['args']['name'], threading.current_thread().name)
@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+
+from PDL.engine.images.image_info import ImageData
+from PDL.engine.images.status import DownloadStatus
+from PDL.logger.json_log import JsonLinesLog, read_records
+
+from nose.tools import assert_equals, assert_false, assert_true
+
+
+class TestJsonLinesLog(object):
+
+    NUM_RECORDS = 5
+
+    @staticmethod
+    def _build_image(index: int) -> ImageData:
+        return ImageData.build_obj({
+            'filename': f'image_{index}.jpg',
+            'image_name': f'Image {index}',
+            'dl_status': DownloadStatus.DOWNLOADED})
+
+    @staticmethod
+    def _temp_filespec(extension: str = JsonLinesLog.EXTENSION) -> str:
+        return os.path.join(tempfile.mkdtemp(), f"test_log.{extension}")
+
+    def test_file_not_created_without_records(self):
+        filespec = self._temp_filespec()
+        with JsonLinesLog(log_filespec=filespec) as run_log:
+            pass
+        assert_equals(run_log.count, 0)
+        assert_false(os.path.exists(filespec))
+
+    def test_each_append_is_written_immediately(self):
+        filespec = self._temp_filespec()
+        run_log = JsonLinesLog(log_filespec=filespec)
+
+        for index in range(self.NUM_RECORDS):
+            run_log.append(self._build_image(index))
+
+            # Record is on disk before the log is closed
+            with open(filespec) as jsonl_file:
+                assert_equals(len(jsonl_file.readlines()), index + 1)
+
+        run_log.close()
+        assert_equals(run_log.count, self.NUM_RECORDS)
+
+    def test_read_records_round_trip(self):
+        filespec = self._temp_filespec()
+        with JsonLinesLog(log_filespec=filespec) as run_log:
+            for index in range(self.NUM_RECORDS):
+                run_log.append(self._build_image(index))
+
+        records = list(read_records(filespec))
+        assert_equals(len(records), self.NUM_RECORDS)
+        for index, (filename, record) in enumerate(records):
+            assert_equals(filename, f'image_{index}.jpg')
+            assert_equals(record[ImageData.DL_STATUS], DownloadStatus.DOWNLOADED)
+
+    def test_read_records_skips_truncated_last_line(self):
+        filespec = self._temp_filespec()
+        with JsonLinesLog(log_filespec=filespec) as run_log:
+            for index in range(self.NUM_RECORDS):
+                run_log.append(self._build_image(index))
+
+        # Simulate a crash mid-write
+        with open(filespec, "a") as jsonl_file:
+            jsonl_file.write('{"image_99.jpg": {"filename": "ima')
+
+        assert_equals(len(list(read_records(filespec))), self.NUM_RECORDS)
+
+    def test_read_records_from_json_blob(self):
+        filespec = self._temp_filespec(extension='json')
+        data = {f'image_{index}.jpg': self._build_image(index).to_dict()
+                for index in range(self.NUM_RECORDS)}
+        with open(filespec, "w") as json_file:
+            json_file.write(json.dumps(data))
+
+        records = dict(read_records(filespec))
+        assert_equals(set(records.keys()), set(data.keys()))
+        assert_true(all(records[key] == data[key] for key in data))
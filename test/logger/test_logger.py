@@ -1,5 +1,8 @@
-from PDL.logger.logger import Logger
-from nose.tools import assert_equals
+import logging
+import queue
+
+from PDL.logger.logger import BoundedQueueHandler, Logger
+from nose.tools import assert_equals, assert_raises, assert_true
 
 
 class TestLogger(object):
@@ -66,3 +69,79 @@ class TestLogger(object):
         reported_module_path = log_1._get_module_name()
         print(f"Module Name: {reported_module_path}")
         assert(expected_module_path in reported_module_path)
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super(RecordingHandler, self).__init__()
+        self.messages = list()
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class TestLoggerQueue(object):
+
+    def test_full_queue_drops_records(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+        for index in range(5):
+            handler.handle(logging.makeLogRecord({'msg': f"message {index}"}))
+
+        assert_equals(handler.queue.qsize(), 2)
+        assert_equals(handler.dropped, 3)
+
+    def test_unknown_overflow_policy_raises(self):
+        assert_raises(ValueError, BoundedQueueHandler, queue.Queue(), 'spill')
+
+    def test_queued_records_are_written_on_stop(self):
+        root = logging.getLogger()
+        recorder = RecordingHandler()
+        root.addHandler(recorder)
+        try:
+            Logger.start_queue(queue_size=100, overflow=BoundedQueueHandler.OVERFLOW_BLOCK)
+            assert_true(recorder not in root.handlers)
+
+            log = Logger(test_name='queue_test')
+            for index in range(50):
+                log.warn(f"message {index}")
+            Logger.stop_queue()
+
+            # All records were written (in order), and the handler was re-attached
+            assert_equals(recorder.messages[-50:], [f"message {index}" for index in range(50)])
+            assert_true(recorder in root.handlers)
+        finally:
+            Logger.stop_queue()
+            root.removeHandler(recorder)
+
+
+
+class TestLoggerDeferredMessages(object):
+
+    @staticmethod
+    def _log_at_info(routine, *args):
+        root = logging.getLogger()
+        recorder = RecordingHandler()
+        root.addHandler(recorder)
+        log = Logger(test_name='deferred_test')
+        log.logger.setLevel(Logger.INFO)
+        try:
+            routine(log)(*args)
+        finally:
+            root.removeHandler(recorder)
+            log.logger.setLevel(logging.NOTSET)
+        return recorder.messages
+
+    def test_callable_is_not_called_when_level_is_disabled(self):
+        calls = list()
+        messages = self._log_at_info(lambda log: log.debug,
+                                     lambda: calls.append('called') or 'debug message')
+        assert_equals(calls, [])
+        assert_equals(messages, [])
+
+    def test_callable_is_called_when_level_is_enabled(self):
+        messages = self._log_at_info(lambda log: log.warn, lambda: 'warn message')
+        assert_equals(messages, ['warn message'])
+
+    def test_percent_style_args_are_formatted(self):
+        messages = self._log_at_info(lambda log: log.warn, "%s of %d", 'part', 3)
+        assert_equals(messages, ['part of 3'])
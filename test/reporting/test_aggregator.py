@@ -0,0 +1,53 @@
+from PDL.engine.images.image_info import ImageData
+from PDL.engine.images.status import DownloadStatus as Status
+from PDL.reporting.aggregator import StatusAggregator
+from PDL.reporting.summary import ReportingSummary
+
+from nose.tools import assert_almost_equals, assert_equals, assert_in
+
+
+def build_image(status: str, duration: float, name: str) -> ImageData:
+    image = ImageData()
+    image.dl_status = status
+    image.download_duration = duration
+    image.filename = name
+    return image
+
+
+DURATIONS = [0.05, 0.3, 0.7, 2.0, 45.0]
+IMAGES = ([build_image(Status.DOWNLOADED, duration, f"dl_{index}.jpg")
+           for index, duration in enumerate(DURATIONS)] +
+          [build_image(Status.ERROR, 0.2, 'error.jpg')])
+IMAGES[-1].error_info = '404 - File Not Found'
+
+
+class TestStatusAggregator(object):
+
+    def test_counts_durations_and_errors_in_one_pass(self):
+        aggregator = StatusAggregator(IMAGES)
+
+        assert_equals(aggregator.total, len(IMAGES))
+        assert_equals(aggregator.counts[Status.DOWNLOADED], len(DURATIONS))
+        assert_equals(aggregator.counts[Status.EXISTS], 0)
+        assert_almost_equals(aggregator.durations[Status.DOWNLOADED], sum(DURATIONS))
+        assert_equals([image.filename for image in aggregator.errors], ['error.jpg'])
+
+    def test_histogram_buckets(self):
+        histogram = StatusAggregator(IMAGES).histograms[Status.DOWNLOADED]
+        assert_equals(sum(histogram), len(DURATIONS))
+        assert_equals(histogram[0], 1)      # <= 0.1 s
+        assert_equals(histogram[-1], 1)     # > 30 s
+
+    def test_slowest_images_are_bounded_and_sorted(self):
+        aggregator = StatusAggregator(top=2)
+        for image in IMAGES:
+            aggregator.add(image)
+        assert_equals([image.filename for image in aggregator.slowest(Status.DOWNLOADED)],
+                      ['dl_4.jpg', 'dl_3.jpg'])
+
+    def test_summary_uses_a_fed_aggregator(self):
+        aggregator = StatusAggregator(IMAGES)
+        summary = ReportingSummary(IMAGES, aggregator=aggregator)
+        assert_equals(summary.tally_status_results(), aggregator.counts)
+        assert_in('DOWNLOADED', summary.duration_histogram_table())
+        assert_in('404 - File Not Found', summary.error_table())
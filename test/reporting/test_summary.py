@@ -28,3 +28,23 @@ class TestReportingSummary(object):
         for status in statuses:
             status_value = getattr(Status, status)
             assert results[status_value] == data_tally[status_value]
+
+    def test_detailed_table_lists_the_slowest_images_per_status(self):
+        images = list()
+        for index in range(10):
+            image = ImageData()
+            image.dl_status = Status.DOWNLOADED
+            image.filename = f"image_{index}.jpg"
+            image.download_duration = float(index)
+            images.append(image)
+
+        table = ReportingSummary(image_data=images).detailed_download_results_table(limit=3)
+        assert 'image_9.jpg' in table and 'image_7.jpg' in table
+        assert 'image_6.jpg' not in table
+        assert '... 7 more (limit: 3)' in table
+        assert '45.000 sec' in table
+
+    def test_download_result_rows_cover_every_image(self):
+        rows = list(ReportingSummary(image_data=data).download_result_rows())
+        assert len(rows) == num_data
+        assert set(rows[0].keys()) == set(ReportingSummary.RESULT_FIELDS)
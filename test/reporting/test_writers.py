@@ -0,0 +1,75 @@
+import csv
+import json
+import os
+import tempfile
+
+from PDL.reporting.writers import (
+    ReportFormats, RowWriter, UnsupportedReportFormat, table_pages, write_report)
+
+from nose.tools import assert_equals, assert_in, assert_raises, assert_true
+
+FIELDS = ['name', 'size']
+ROWS = [{'name': f"image_{index}", 'size': index, 'extra': 'ignored'} for index in range(5)]
+
+
+class TestRowWriter(object):
+
+    def test_csv_and_tsv_reports_have_header_and_rows(self):
+        for extension, delimiter in ((ReportFormats.CSV, ','), (ReportFormats.TSV, '\t')):
+            with tempfile.TemporaryDirectory() as work_dir:
+                filespec = os.path.join(work_dir, f"report.{extension}")
+                assert_equals(write_report(filespec, FIELDS, iter(ROWS)), len(ROWS))
+
+                with open(filespec, newline='') as report:
+                    rows = list(csv.DictReader(report, delimiter=delimiter))
+            assert_equals([row['name'] for row in rows], [row['name'] for row in ROWS])
+            assert_equals(list(rows[0].keys()), FIELDS)
+
+    def test_jsonl_report_has_one_object_per_row(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            filespec = os.path.join(work_dir, 'report.jsonl')
+            with RowWriter(filespec, FIELDS) as writer:
+                for row in ROWS:
+                    writer.write_row(row)
+
+            with open(filespec) as report:
+                rows = [json.loads(line) for line in report]
+        assert_equals(writer.report_format, ReportFormats.JSONL)
+        assert_equals(rows[-1], {'name': 'image_4', 'size': 4})
+
+    def test_format_defaults_to_csv_and_unknown_formats_are_rejected(self):
+        assert_equals(RowWriter.format_from_filename('report.txt'), ReportFormats.CSV)
+        assert_raises(UnsupportedReportFormat, RowWriter,
+                      'report.xml', FIELDS, 'xml')
+
+
+class TestTablePages(object):
+
+    def test_rows_are_paginated(self):
+        pages = list(table_pages(FIELDS, ([index, index] for index in range(25)),
+                                 page_size=10, limit=None))
+        assert_equals(len(pages), 3)
+        assert_in(' 24 ', pages[-1])
+
+    def test_rows_beyond_the_limit_are_counted_not_rendered(self):
+        pages = list(table_pages(FIELDS, ([index, index] for index in range(25)),
+                                 page_size=10, limit=12, title='Sizes'))
+        assert_equals(len(pages), 2)
+        assert_in('Sizes', pages[0])
+        assert_true(pages[-1].endswith("... 13 more row(s) not listed (limit: 12)."))
+
+    def test_limit_on_a_page_boundary_does_not_render_an_empty_table(self):
+        pages = list(table_pages(FIELDS, ([index, index] for index in range(5)),
+                                 page_size=2, limit=4))
+        assert_equals(len(pages), 2)
+        assert_in(' 3 ', pages[-1])
+        assert_true(pages[-1].endswith("... 1 more row(s) not listed (limit: 4)."))
+
+        # No rows remain beyond the limit: no note
+        pages = list(table_pages(FIELDS, ([index, index] for index in range(4)),
+                                 page_size=2, limit=4))
+        assert_equals(len(pages), 2)
+        assert_true(pages[-1].endswith('+'))
+
+    def test_empty_rows_render_an_empty_table(self):
+        assert_equals(len(list(table_pages(FIELDS, []))), 1)
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+
+from PDL.engine.images.image_info import ImageData
+from PDL.engine.images.status import DownloadStatus
+from PDL.logger.json_log import read_records
+import PDL.scripts.consolidate_json_files as consolidate
+
+from nose.tools import assert_equals, assert_false, assert_true
+
+
+class TestConsolidateJsonFiles(object):
+
+    @staticmethod
+    def _record(index: int, status: str = DownloadStatus.DOWNLOADED, source: str = '') -> dict:
+        return {ImageData.FILENAME: f'image_{index}.jpg',
+                ImageData.DL_STATUS: status,
+                ImageData.DESCRIPTION: source}
+
+    def _write_data_file(self, directory: str, name: str, indices: list,
+                         status: str = DownloadStatus.DOWNLOADED) -> str:
+        filespec = os.path.join(directory, name)
+        data = {f'image_{index}.jpg': self._record(index, status, source=name)
+                for index in indices}
+        with open(filespec, "w") as data_file:
+            data_file.write(json.dumps(data))
+        return filespec
+
+    def test_consolidate_merges_and_removes_duplicates(self):
+        directory = tempfile.mkdtemp()
+        data_files = [
+            self._write_data_file(directory, 'data_1.json', [3, 1, 2]),
+            self._write_data_file(directory, 'data_2.json', [2, 4]),
+            self._write_data_file(directory, 'data_3.json', [5, 6], status=DownloadStatus.ERROR),
+        ]
+        filename = os.path.join(directory, 'CONSOLIDATED_1.jsonl')
+
+        assert_true(consolidate.consolidate(data_files=data_files, filename=filename))
+
+        records = list(read_records(filename))
+        keys = [key for key, _ in records]
+
+        # Sorted, unique, DOWNLOADED records only
+        assert_equals(keys, [f'image_{index}.jpg' for index in range(1, 5)])
+
+        # Later files win for duplicate records
+        assert_equals(dict(records)['image_2.jpg'][ImageData.DESCRIPTION], 'data_2.json')
+
+        # Only the consolidated file remains (no temp or run files)
+        assert_equals(os.listdir(directory).count('CONSOLIDATED_1.jsonl'), 1)
+        assert_equals(len(os.listdir(directory)), len(data_files) + 1)
+
+    def test_verification_detects_missing_record(self):
+        directory = tempfile.mkdtemp()
+        data_file = self._write_data_file(directory, 'data_1.json', [1, 2, 3])
+        run = consolidate.build_sorted_run(data_file=data_file, run_dir=directory, index=0)
+
+        filename = os.path.join(directory, 'merged.jsonl')
+        merge = consolidate.merge_runs(run_files=[run.run_file], filename=filename)
+        assert_true(consolidate.verify_consolidated_file(
+            filename=filename, runs=[run], merge=merge))
+
+        # Drop the last record from the consolidated file
+        with open(filename) as merged_file:
+            lines = merged_file.readlines()
+        with open(filename, "w") as merged_file:
+            merged_file.writelines(lines[:-1])
+
+        assert_false(consolidate.verify_consolidated_file(
+            filename=filename, runs=[run], merge=merge))
+
+    def test_determine_consolidate_file_name_increments_index(self):
+        directory = tempfile.mkdtemp()
+        files = [os.path.join(directory, name) for name in
+                 ['CONSOLIDATED_1.json', 'CONSOLIDATED_2.jsonl', 'data.jsonl']]
+        filename = consolidate.determine_consolidate_file_name(files=files, target_dir=directory)
+        assert_equals(os.path.basename(filename),
+                      f'{consolidate.BASE_FILE_NAME}3.{consolidate.EXTENSION}')
@@ -0,0 +1,89 @@
+import os
+import tempfile
+
+from PDL.engine.images.image_info import ImageData
+from PDL.logger.json_log import read_records
+import PDL.scripts.generate_dl_data as generate
+
+from nose.tools import assert_equals, assert_true
+
+
+class TestGenerateDlData(object):
+
+    NUM_DATA_SETS = 3
+    MAX_RECORDS = 25
+
+    def _plan(self, seed: int = generate.DEFAULT_SEED, fixed: bool = False) -> list:
+        return generate.plan_data_sets(num_data_sets=self.NUM_DATA_SETS,
+                                       max_num_recs_per_file=self.MAX_RECORDS,
+                                       seed=seed, fixed=fixed)
+
+    @staticmethod
+    def _read(filespec: str) -> str:
+        with open(filespec) as data_file:
+            return data_file.read()
+
+    def test_plan_is_repeatable_and_indices_are_global(self):
+        data_sets = self._plan()
+        assert_equals(data_sets, self._plan())
+
+        expected_first = 0
+        for data_set in data_sets:
+            assert_equals(data_set.first_index, expected_first)
+            assert_true(1 <= data_set.num_records <= self.MAX_RECORDS)
+            expected_first += data_set.num_records
+
+    def test_fixed_plan_uses_max_records(self):
+        assert_equals([data_set.num_records for data_set in self._plan(fixed=True)],
+                      [self.MAX_RECORDS] * self.NUM_DATA_SETS)
+
+    def test_json_and_jsonl_files_contain_the_same_unique_records(self):
+        json_dir = tempfile.mkdtemp()
+        data_sets = self._plan()
+
+        records = dict()
+        for jsonl in (False, True):
+            files = generate.write_data_sets(data_sets=data_sets, json_dir=json_dir,
+                                             jsonl=jsonl)
+            records[jsonl] = [record for filespec in files
+                              for record in read_records(filespec)]
+
+        assert_equals(records[False], records[True])
+
+        keys = [key for key, _ in records[False]]
+        assert_equals(len(keys), sum(data_set.num_records for data_set in data_sets))
+        assert_equals(len(set(keys)), len(keys))
+
+        image_obj = ImageData.build_obj(records[False][0][1])
+        assert_equals(image_obj.filename, keys[0])
+
+    def test_parallel_output_matches_serial_output(self):
+        data_sets = self._plan()
+        output = dict()
+        for workers in (1, 2):
+            json_dir = tempfile.mkdtemp()
+            files = generate.write_data_sets(data_sets=data_sets, json_dir=json_dir,
+                                             workers=workers)
+            output[workers] = [(os.path.basename(filespec), self._read(filespec))
+                               for filespec in files]
+
+        assert_equals(output[1], output[2])
+
+    def test_image_tree_matches_records(self):
+        json_dir = tempfile.mkdtemp()
+        images_dir = os.path.join(json_dir, 'images')
+        data_set = self._plan()[0]
+
+        filespec, num_records = generate.write_data_set(
+            data_set=data_set, json_dir=json_dir, images_dir=images_dir, image_kb=1)
+
+        for filename, record in read_records(filespec):
+            location = record[ImageData.LOCATIONS][0]
+            image = os.path.join(location, filename)
+            assert_true(location.startswith(images_dir))
+            assert_true(os.path.exists(image))
+            assert_equals(os.path.getsize(image), generate.KILOBYTE)
+
+            classifications = record[ImageData.CLASSIFICATION]
+            if classifications:
+                assert_equals(os.path.basename(location), classifications[0])